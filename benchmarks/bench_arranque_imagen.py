@@ -0,0 +1,149 @@
+# bench_arranque_imagen.py
+
+"""
+Arranque en frío de la imagen del job de áreas: la original (laborum_areas_job/Dockerfile, con
+`playwright install --with-deps` de todos los navegadores) frente a la variante con solo el
+Chromium headless shell (laborum_areas_job/Dockerfile.headless-shell).
+
+Para cada imagen se construye (salvo --sin-build), se informa su tamaño (lo que Cloud Run
+descarga en un arranque en frío sin caché de imagen) y se mide --repeticiones veces el tiempo
+desde `docker run` hasta que termina el primer `page.goto`. Dentro del contenedor corre SONDA:
+importa Playwright, pide el navegador a jobs_common.navegador (el mismo lanzamiento que el job)
+y abre la página de áreas de los snapshots sintéticos, servida desde el host (--network host).
+Se desglosa el import, el lanzamiento del navegador y el goto; el resto es el arranque del
+contenedor y del intérprete.
+
+Requiere docker. Sin docker se informa y se termina sin medir.
+
+Uso:
+    python benchmarks/bench_arranque_imagen.py [--repeticiones 5] [--sin-build] [--json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import comun  # noqa: E402
+import datos_sinteticos  # noqa: E402
+
+IMAGENES = {
+    "completa": "laborum_areas_job/Dockerfile",
+    "headless_shell": "laborum_areas_job/Dockerfile.headless-shell",
+}
+
+# Corre dentro del contenedor (WORKDIR /app): primer page.goto con el navegador del job
+SONDA = """
+import json, sys, time
+inicio = time.time()
+from jobs_common import navegador
+from playwright.sync_api import sync_playwright  # navegador la importa recién al lanzar
+importado = time.time()
+with navegador.abrir(headless=True) as browser:
+    if browser is None:
+        sys.exit(1)
+    lanzado = time.time()
+    context = browser.new_context(**navegador.opciones_contexto())
+    page = context.new_page()
+    page.goto(sys.argv[1], wait_until="domcontentloaded")
+    fin = time.time()
+    context.close()
+print(json.dumps({"inicio": inicio, "import_s": importado - inicio, "lanzamiento_s": lanzado - importado,
+                  "goto_s": fin - lanzado, "fin": fin}))
+"""
+
+
+def etiqueta(nombre):
+    return f"vocational-bench/laborum-areas:{nombre.replace('_', '-')}"
+
+
+def docker(*argumentos, **kwargs):
+    return subprocess.run(["docker", *argumentos], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **kwargs)
+
+
+def construir(nombre, dockerfile):
+    inicio = time.perf_counter()
+    resultado = docker("build", "-f", os.path.join(comun.RAIZ_REPO, dockerfile), "-t", etiqueta(nombre), comun.RAIZ_REPO)
+    if resultado.returncode != 0:
+        raise RuntimeError(f"No se pudo construir {dockerfile}: {resultado.stderr.strip()[-500:]}")
+    return time.perf_counter() - inicio
+
+
+def tamano_mb(nombre):
+    resultado = docker("image", "inspect", "-f", "{{.Size}}", etiqueta(nombre))
+    if resultado.returncode != 0:
+        raise RuntimeError(f"No existe la imagen {etiqueta(nombre)}; construirla sin --sin-build.")
+    return int(resultado.stdout.strip()) / 1e6
+
+
+def primer_goto(nombre, url):
+    """
+    Un arranque: segundos desde `docker run` hasta el fin del primer goto, con el desglose de SONDA.
+    """
+    inicio = time.time()
+    resultado = docker("run", "--rm", "--network", "host", etiqueta(nombre), "python", "-c", SONDA, url)
+    if resultado.returncode != 0:
+        raise RuntimeError(f"La sonda falló en {etiqueta(nombre)}: {resultado.stderr.strip()[-500:]}")
+    sonda = json.loads(resultado.stdout.strip().splitlines()[-1])
+    return {
+        "total_s": sonda["fin"] - inicio,
+        "contenedor_s": sonda["inicio"] - inicio,
+        "import_s": sonda["import_s"],
+        "lanzamiento_s": sonda["lanzamiento_s"],
+        "goto_s": sonda["goto_s"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arranque en frío de las imágenes del job de áreas hasta el primer goto.")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--sin-build", action="store_true", help="Usar las imágenes ya construidas.")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if shutil.which("docker") is None or docker("info").returncode != 0:
+        print("docker no está disponible: no se pueden construir ni arrancar las imágenes.")
+        return 0
+
+    tmp = tempfile.mkdtemp(prefix="bench_arranque_imagen_")
+    resultado = {}
+    try:
+        datos_sinteticos.escribir_snapshots_laborum(tmp, 30, 0, 0)
+        with comun.servidor_local(tmp) as base:
+            for nombre, dockerfile in IMAGENES.items():
+                build = None if args.sin_build else construir(nombre, dockerfile)
+                # El primer arranque también carga las capas del disco; se descarta como calentamiento
+                primer_goto(nombre, f"{base}/salarios/")
+                arranques = [primer_goto(nombre, f"{base}/salarios/") for _ in range(args.repeticiones)]
+                resultado[nombre] = {
+                    "dockerfile": dockerfile,
+                    "tamano_mb": round(tamano_mb(nombre), 1),
+                    "build_s": round(build, 1) if build is not None else None,
+                    **{f"{campo}_mediana": round(statistics.median(arranque[campo] for arranque in arranques), 3)
+                       for campo in ("total_s", "contenedor_s", "import_s", "lanzamiento_s", "goto_s")},
+                    "total_s_max": round(max(arranque["total_s"] for arranque in arranques), 3),
+                }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"Arranque hasta el primer page.goto, mediana de {args.repeticiones} (segundos)")
+        print(f"{'imagen':16} {'MB':>8} {'total':>7} {'máx':>7} {'contenedor':>11} {'import':>7} {'navegador':>10} {'goto':>6}")
+        for nombre, datos in resultado.items():
+            print(f"{nombre:16} {datos['tamano_mb']:8.1f} {datos['total_s_mediana']:7.2f} {datos['total_s_max']:7.2f} "
+                  f"{datos['contenedor_s_mediana']:11.2f} {datos['import_s_mediana']:7.2f} "
+                  f"{datos['lanzamiento_s_mediana']:10.2f} {datos['goto_s_mediana']:6.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
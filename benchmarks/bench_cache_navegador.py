@@ -0,0 +1,166 @@
+# bench_cache_navegador.py
+
+"""
+Caché HTTP en disco del navegador (NAVEGADOR_CACHE_DIR, ver jobs_common/navegador.py): bytes
+servidos, solicitudes y segundos por página de scrape_subareas() sin caché, con la caché vacía
+(primera ejecución) y con la caché de la ejecución anterior (segunda ejecución).
+
+Los snapshots sintéticos de las páginas de subáreas se sirven desde un servidor local con
+--latencia-ms por respuesta y recursos estáticos como los de la SPA de Laborum (un bundle JS de
+--js-kb, una hoja CSS y una fuente) con Cache-Control de un año. Cada variante corre
+scrape_subareas() real sobre --paginas páginas dentro de un navegador.compartido(), como el job;
+el servidor cuenta los bytes y solicitudes que recibe y las métricas dan el tiempo de carga
+(etapa scraping) y la proporción de aciertos de caché. Solo se mide: la caché no cambia qué
+filas se extraen, solo de dónde llegan los recursos estáticos.
+
+Requiere Chromium de Playwright; sin él se informa y se termina sin medir.
+
+Uso:
+    python benchmarks/bench_cache_navegador.py [--paginas 10] [--js-kb 800] [--latencia-ms 80] [--json]
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import comun  # noqa: E402
+import datos_sinteticos  # noqa: E402
+
+RECURSOS = (
+    '<link rel="stylesheet" href="/static/app.css">'
+    '<script src="/static/app.js" defer></script>'
+)
+
+
+def escribir_recursos(directorio, args):
+    """
+    Bundle JS, CSS y fuente de la SPA; las páginas de subáreas los piden desde su <head>.
+    """
+    estaticos = os.path.join(directorio, "static")
+    os.makedirs(estaticos, exist_ok=True)
+    with open(os.path.join(estaticos, "app.js"), "w", encoding="utf-8") as f:
+        linea = "window.__laborum = (window.__laborum || 0) + 1; // relleno del bundle\n"
+        f.write(linea * (args.js_kb * 1024 // len(linea)))
+    with open(os.path.join(estaticos, "app.css"), "w", encoding="utf-8") as f:
+        f.write('@font-face { font-family: "Laborum"; src: url("/static/fuente.woff2") format("woff2"); }\n')
+        f.write('body { font-family: "Laborum", sans-serif; }\n')
+        f.write("".join(f".c{i} {{ margin: {i % 7}px; }}\n" for i in range(4000)))
+    with open(os.path.join(estaticos, "fuente.woff2"), "wb") as f:
+        f.write(os.urandom(args.fuente_kb * 1024))
+
+
+def servidor(directorio, latencia, contador):
+    class Manejador(http.server.SimpleHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latencia)
+            super().do_GET()
+
+        def end_headers(self):
+            if self.path.startswith("/static/"):
+                self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+            super().end_headers()
+
+        def send_header(self, clave, valor):
+            if clave.lower() == "content-length":
+                with contador["lock"]:
+                    contador["bytes"] += int(valor)
+                    contador["solicitudes"] += 1
+            super().send_header(clave, valor)
+
+        def log_message(self, *args):
+            pass
+
+    instancia = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Manejador, directory=directorio))
+    threading.Thread(target=instancia.serve_forever, daemon=True).start()
+    return instancia
+
+
+def ejecutar(nombre, urls, directorio_cache, contador):
+    from jobs_common import metricas, navegador
+    from laborum_subareas_job import subareas_scrapper_v2 as subareas
+
+    navegador.CACHE_DIR = directorio_cache
+    metricas_variante = metricas.iniciar(f"bench_cache_{nombre}")
+    with contador["lock"]:
+        contador["bytes"] = contador["solicitudes"] = 0
+    filas = 0
+    with navegador.compartido(headless=True):
+        for area, url in enumerate(urls):
+            filas += len(subareas.scrape_subareas(area, url))
+    resumen = metricas_variante.resumen()
+    scraping = resumen["etapas"].get("scraping", {"segundos": 0.0, "veces": 0})
+    return {
+        "kb_servidos": round(contador["bytes"] / 1024, 1),
+        "solicitudes": contador["solicitudes"],
+        "segundos_por_pagina": round(scraping["segundos"] / max(1, scraping["veces"]), 3),
+        "kb_red_navegador": round(resumen["contadores"].get("bytes_red_navegador", 0) / 1024, 1),
+        "proporcion_aciertos_cache": resumen["tasas"].get("proporcion_aciertos_cache"),
+        "filas": filas,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la caché HTTP en disco del navegador.")
+    parser.add_argument("--paginas", type=int, default=10)
+    parser.add_argument("--subcards", type=int, default=15)
+    parser.add_argument("--js-kb", type=int, default=800)
+    parser.add_argument("--fuente-kb", type=int, default=60)
+    parser.add_argument("--latencia-ms", type=float, default=80)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    disponible, motivo = comun.chromium_disponible()
+    if not disponible:
+        print(f"Chromium no disponible: {motivo}")
+        return 0
+
+    tmp = tempfile.mkdtemp(prefix="bench_cache_navegador_")
+    comun.configurar_logging(tmp)
+    os.environ["LABORUM_FEED_CACHE"] = os.path.join(tmp, "laborum_feed.json")
+    rutas = datos_sinteticos.escribir_snapshots_laborum(tmp, 1, args.paginas, args.subcards)
+    for ruta in rutas:
+        pagina = os.path.join(tmp, ruta, "index.html")
+        with open(pagina, encoding="utf-8") as f:
+            contenido = f.read()
+        with open(pagina, "w", encoding="utf-8") as f:
+            f.write(contenido.replace("</head>", RECURSOS + "</head>"))
+    escribir_recursos(tmp, args)
+
+    contador = {"bytes": 0, "solicitudes": 0, "lock": threading.Lock()}
+    instancia = servidor(tmp, args.latencia_ms / 1000, contador)
+    base = f"http://127.0.0.1:{instancia.server_address[1]}"
+    urls = [f"{base}/{ruta}" for ruta in rutas]
+    directorio_cache = os.path.join(tmp, "cache")
+    try:
+        resultado = {
+            "sin_cache": ejecutar("sin_cache", urls, None, contador),
+            "cache_primera": ejecutar("cache_primera", urls, directorio_cache, contador),
+            "cache_segunda": ejecutar("cache_segunda", urls, directorio_cache, contador),
+        }
+    finally:
+        instancia.shutdown()
+        instancia.server_close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"{args.paginas} páginas de subáreas, bundle de {args.js_kb} KB, latencia {args.latencia_ms} ms")
+        print(f"{'variante':14} {'KB servidos':>12} {'solicitudes':>12} {'s/página':>9} {'KB red (CDP)':>13} {'aciertos':>9}")
+        for nombre, datos in resultado.items():
+            print(f"{nombre:14} {datos['kb_servidos']:12.1f} {datos['solicitudes']:12} {datos['segundos_por_pagina']:9.3f} "
+                  f"{datos['kb_red_navegador']:13.1f} {str(datos['proporcion_aciertos_cache']):>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# bench_calcular_fecha.py
+
+"""
+Micro-benchmark de calcular_fecha (news_job/main.py).
+
+Se parsean N fechas (100.000 por defecto, mezcla de todos los formatos de la tabla de
+tests/test_calcular_fecha.py, que es donde se verifican los resultados) con la implementación
+actual y con la original basada en nueve re.match por llamada, y se reporta fechas/segundo de
+cada una.
+
+Uso:
+    python benchmarks/bench_calcular_fecha.py [--n 100000] [--json]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_job.main import calcular_fecha  # noqa: E402
+from tests.test_calcular_fecha import TABLA  # noqa: E402
+
+def calcular_fecha_original(date):
+    """
+    Implementación anterior (nueve re.match y varias llamadas a datetime.now() por fecha),
+    conservada solo como línea base del benchmark.
+    """
+    posted_day = None
+    try:
+        posted_day = datetime.strptime(date, "%d-%m-%Y").strftime("%Y-%m-%d %H:%M:%S")
+        return posted_day
+    except ValueError:
+        pass
+
+    days_match = re.match(r'hace (\d+) días?', date)
+    hours_match = re.match(r'hace (\d+) horas?', date)
+    minutes_match = re.match(r'hace (\d+) mins?', date)
+    seconds_match = re.match(r'hace (\d+) segundos?', date)
+
+    weeks_match = re.match(r'hace (\d+) semanas?', date)
+    weeks_match = re.match(r'hace (\d+) semana?', date) if weeks_match is None else weeks_match
+
+    months_match = re.match(r'hace (\d+) meses?', date)
+    months_match = re.match(r'hace (\d+) mes?', date) if months_match is None else months_match
+
+    if months_match:
+        posted_day = datetime.now() - timedelta(days=30 * int(months_match.group(1)))
+    elif weeks_match:
+        posted_day = datetime.now() - timedelta(days=7 * int(weeks_match.group(1)))
+    elif days_match:
+        posted_day = datetime.now() - timedelta(days=int(days_match.group(1)))
+    elif hours_match:
+        posted_day = datetime.now() - timedelta(hours=int(hours_match.group(1)))
+    elif minutes_match:
+        posted_day = datetime.now() - timedelta(minutes=int(minutes_match.group(1)))
+    elif seconds_match:
+        posted_day = datetime.now() - timedelta(seconds=int(seconds_match.group(1)))
+
+    return posted_day.strftime("%Y-%m-%d %H:%M:%S") if isinstance(posted_day, datetime) else None
+
+
+def medir(funcion, fechas):
+    inicio = time.perf_counter()
+    for fecha in fechas:
+        funcion(fecha)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de calcular_fecha.")
+    parser.add_argument("--n", type=int, default=100_000, help="Cantidad de fechas a parsear.")
+    parser.add_argument("--json", action="store_true", help="Imprimir el resultado en JSON.")
+    args = parser.parse_args()
+
+    fechas = list(itertools.islice(itertools.cycle(texto for texto, _ in TABLA), args.n))
+
+    # Igual que en almacenar_noticias_en_db: una referencia por lote
+    referencia = datetime.now()
+    segundos_actual = medir(lambda fecha: calcular_fecha(fecha, referencia), fechas)
+    segundos_original = medir(calcular_fecha_original, fechas)
+
+    resultado = {
+        "n": args.n,
+        "actual_fechas_por_segundo": round(args.n / segundos_actual),
+        "original_fechas_por_segundo": round(args.n / segundos_original),
+        "aceleracion": round(segundos_original / segundos_actual, 2),
+        "reconocidas_actual": sum(calcular_fecha(t, referencia) is not None for t, _ in TABLA),
+        "reconocidas_original": sum(calcular_fecha_original(t) is not None for t, _ in TABLA),
+    }
+
+    if args.json:
+        print(json.dumps(resultado, indent=2))
+    else:
+        print(f"actual:   {resultado['actual_fechas_por_segundo']:>10} fechas/s "
+              f"({resultado['reconocidas_actual']}/{len(TABLA)} formatos reconocidos)")
+        print(f"original: {resultado['original_fechas_por_segundo']:>10} fechas/s "
+              f"({resultado['reconocidas_original']}/{len(TABLA)} formatos reconocidos)")
+        print(f"aceleración: x{resultado['aceleracion']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
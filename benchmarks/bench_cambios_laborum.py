@@ -0,0 +1,158 @@
+# bench_cambios_laborum.py
+
+"""
+Detección de cambios de los jobs de Laborum (jobs_common.huellas): filas escritas, sentencias
+SQL y tiempo de guardar_en_bd()/guardar_subareas_en_bd() escribiendo todo en cada ejecución
+(DETECTAR_CAMBIOS desactivado, el comportamiento anterior) frente a escribir solo lo que cambió.
+
+Se simulan --ejecuciones ejecuciones diarias (cruzando fines de mes) de --areas áreas con
+--subareas subáreas cada una; en cada ejecución cada área o subárea cambia su salario con
+probabilidad --prob-cambio. Las dos variantes corren sobre bases SQLite separadas con el mismo
+reloj y los mismos datos. Que la serie y el resumen mensual se reconstruyan desde los cambios
+se verifica en tests/test_laborum_areas.py.
+
+Uso:
+    python benchmarks/bench_cambios_laborum.py [--areas 30] [--subareas 20] [--ejecuciones 60]
+                                               [--prob-cambio 0.05] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comun import ContadorSentencias, configurar_logging, crear_engine  # noqa: E402
+from datos_sinteticos import AREAS  # noqa: E402
+
+class Reloj(datetime):
+    """
+    Reemplaza a datetime en los módulos de los jobs para simular ejecuciones en días distintos.
+    """
+    actual = None
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.actual
+
+
+def simular(args):
+    """
+    Datos de cada ejecución: lista de (momento, filas de áreas, {nombre_area: filas de subáreas}).
+    """
+    rnd = random.Random(2024)
+    nombres = [AREAS[i % len(AREAS)] if i < len(AREAS) else f"{AREAS[i % len(AREAS)]} {i}" for i in range(args.areas)]
+    salarios = {nombre: [rnd.randint(450, 3500) * 1000, rnd.randint(5, 5000)] for nombre in nombres}
+    subsalarios = {(nombre, j): [rnd.randint(450, 3500) * 1000, rnd.randint(5, 900)]
+                   for nombre in nombres for j in range(args.subareas)}
+    ejecuciones = []
+    inicio = datetime(2024, 1, 20, 6, 0)
+    for n in range(args.ejecuciones):
+        for valores in list(salarios.values()) + list(subsalarios.values()):
+            if rnd.random() < args.prob_cambio:
+                valores[0] += rnd.randint(-50, 50) * 1000
+                valores[1] += rnd.randint(1, 20)
+        areas = [{"nombre_area": nombre, "salario_promedio": s, "salarios_basados": b,
+                  "link_area": f"https://www.laborum.cl/salarios/area-{i}"}
+                 for i, (nombre, (s, b)) in enumerate(salarios.items())]
+        subareas = {nombre: [{"nombre_subarea": f"Subárea {i}-{j}", "salario_promedio": subsalarios[(nombre, j)][0],
+                              "salarios_basados": subsalarios[(nombre, j)][1]} for j in range(args.subareas)]
+                    for i, nombre in enumerate(nombres)}
+        ejecuciones.append((inicio + timedelta(days=n), areas, subareas))
+    return ejecuciones
+
+
+def correr(engine, ejecuciones, detectar):
+    from sqlalchemy import select
+    from jobs_common import metricas
+    from laborum_areas_job import areas_scrapper_v2 as areas
+    from laborum_subareas_job import subareas_scrapper_v2 as subareas
+
+    areas.DETECTAR_CAMBIOS = subareas.DETECTAR_CAMBIOS = detectar
+    areas.inicializar_bd(engine)
+    subareas.inicializar_bd(engine)
+    areas.crear_tablas()
+    subareas.crear_tablas()
+    metricas.iniciar("bench_cambios_laborum")
+
+    contador = ContadorSentencias(engine)
+    segundos = 0.0
+    ids_areas = {}
+    for momento, filas_areas, filas_subareas in ejecuciones:
+        Reloj.actual = momento
+        inicio = time.perf_counter()
+        areas.guardar_en_bd(filas_areas, engine, areas.session, areas.URL_SALARIOS)
+        if not ids_areas:
+            with engine.connect() as connection:
+                ids_areas = dict(connection.execute(select(areas.LaborumArea.nombre_area, areas.LaborumArea.id)).all())
+        for fila in filas_areas:
+            subdata = [dict(sub, id_area=ids_areas[fila["nombre_area"]]) for sub in filas_subareas[fila["nombre_area"]]]
+            subareas.guardar_subareas_en_bd(subdata, subareas.session, fila["link_area"])
+        segundos += time.perf_counter() - inicio
+    areas.session.close()
+    subareas.session.close()
+    contador.cerrar()
+    contadores = metricas.actual().resumen()["contadores"]
+    contadores["sentencias"] = contador.total
+    return segundos, contadores
+
+
+def filas_historial(engine, tabla):
+    from sqlalchemy import text
+
+    with engine.connect() as connection:
+        return connection.execute(text(f"SELECT COUNT(*) FROM {tabla}")).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la detección de cambios de los jobs de Laborum.")
+    parser.add_argument("--areas", type=int, default=30)
+    parser.add_argument("--subareas", type=int, default=20)
+    parser.add_argument("--ejecuciones", type=int, default=60)
+    parser.add_argument("--prob-cambio", type=float, default=0.05)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    from laborum_areas_job import areas_scrapper_v2 as areas
+    from laborum_subareas_job import subareas_scrapper_v2 as subareas
+
+    areas.datetime = subareas.datetime = Reloj
+    ejecuciones = simular(args)
+    resultado = {"areas": args.areas, "subareas_por_area": args.subareas, "ejecuciones": args.ejecuciones,
+                 "prob_cambio": args.prob_cambio}
+    with tempfile.TemporaryDirectory() as tmp:
+        configurar_logging(tmp)
+        for nombre, detectar in (("todo", False), ("solo_cambios", True)):
+            directorio = os.path.join(tmp, nombre)
+            os.makedirs(directorio)
+            engine = crear_engine(None, directorio)
+            segundos, contadores = correr(engine, ejecuciones, detectar)
+            resultado[nombre] = {
+                "segundos_guardar": round(segundos, 3),
+                "filas_areas": filas_historial(engine, "laborum_areas_links_2"),
+                "filas_subareas": filas_historial(engine, "laborum_subareas_links_2"),
+                "paginas_sin_cambios": contadores.get("paginas_sin_cambios", 0),
+                "sentencias_sql": contadores["sentencias"],
+            }
+            engine.dispose()
+
+    todo, cambios = resultado["todo"], resultado["solo_cambios"]
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"{args.ejecuciones} ejecuciones de {args.areas} áreas x {args.subareas} subáreas, "
+              f"probabilidad de cambio {args.prob_cambio}")
+        for nombre, datos in (("escribiendo todo", todo), ("solo cambios", cambios)):
+            print(f"  {nombre:17} {datos['filas_areas']:7} filas de áreas, {datos['filas_subareas']:7} de subáreas, "
+                  f"{datos['sentencias_sql']:7} sentencias, {datos['segundos_guardar']:6.2f} s guardando, "
+                  f"{datos['paginas_sin_cambios']} páginas sin cambios")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
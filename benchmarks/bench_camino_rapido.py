@@ -0,0 +1,168 @@
+# bench_camino_rapido.py
+
+"""
+Camino rápido sin navegador de los jobs de Laborum (jobs_common.feed).
+
+Se sirven los snapshots sintéticos de Laborum (HTML + el feed JSON que cada página pide con
+fetch()) desde un servidor local con --latencia-ms por respuesta. Luego:
+
+1. Descubrimiento: si Playwright puede lanzar Chromium, se corren scrape_data() y
+   scrape_subareas() de los jobs con el navegador, que registran el feed con
+   page.on('response') y miden el tiempo de navegador. Sin Chromium, se llama a
+   feed.descubrir() con las filas que extraería el DOM y las respuestas JSON de la página
+   (más una respuesta señuelo), como lo haría el Capturador.
+2. Camino rápido: scrape_data_http() y scrape_subareas_http() repiten los endpoints con una
+   sesión HTTP compartida.
+
+Que las filas del camino rápido sean las del DOM y que un cambio de esquema devuelva el job al
+navegador se verifica en tests/test_feed.py y tests/test_laborum_areas.py.
+
+Uso:
+    python benchmarks/bench_camino_rapido.py [--cards 30] [--paginas 30] [--subcards 20]
+                                             [--latencia-ms 80] [--sin-navegador] [--json]
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import comun  # noqa: E402
+import datos_sinteticos  # noqa: E402
+
+
+def servidor(directorio, latencia):
+    class Manejador(http.server.SimpleHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latencia)
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    instancia = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Manejador, directory=directorio))
+    threading.Thread(target=instancia.serve_forever, daemon=True).start()
+    return instancia
+
+
+def filas_dom_areas(url, cards):
+    """
+    Lo que scrape_data() extrae del DOM de la página de áreas.
+    """
+    return [
+        {"nombre_area": fila["nombre"], "salario_promedio": fila["salario"], "salarios_basados": fila["n"],
+         "link_area": urljoin(url, f"/salarios/{fila['slug']}")}
+        for fila in datos_sinteticos.filas_areas(cards)
+    ]
+
+
+def filas_dom_subareas(area, subcards):
+    return [
+        {"id_area": area, "nombre_subarea": fila["nombre"], "salario_promedio": fila["salario"],
+         "salarios_basados": fila["n"]}
+        for fila in datos_sinteticos.filas_subareas(subcards, area)
+    ]
+
+
+def descubrir_sin_navegador(sesion, base, url_areas, paginas, args):
+    """
+    Simula el descubrimiento del navegador con las respuestas JSON que recibiría cada página.
+    """
+    from jobs_common import feed
+
+    senuelo = ({"url": f"{base}/api/usuario", "metodo": "GET", "cuerpo": None, "cabeceras": {}},
+               {"usuario": None, "experimentos": [{"nombre": "nuevo-header", "activo": True}]})
+
+    def captura(ruta):
+        endpoint = {"url": f"{base}{ruta}", "metodo": "GET", "cuerpo": None, "cabeceras": {"accept": "application/json"}}
+        return endpoint, sesion.get(endpoint["url"]).json()
+
+    encontrados = feed.descubrir(
+        url_areas, [senuelo, captura("/api/salarios/areas.json")], filas_dom_areas(url_areas, args.cards),
+        "nombre_area", ("salario_promedio", "salarios_basados"), campos_enlace=("link_area",),
+    )
+    for area, pagina in enumerate(paginas):
+        encontrados &= feed.descubrir(
+            pagina, [senuelo, captura(f"/api/salarios/area-{area}.json")], filas_dom_subareas(area, args.subcards),
+            "nombre_subarea", ("salario_promedio", "salarios_basados"),
+        )
+    return encontrados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del camino rápido HTTP de los jobs de Laborum.")
+    parser.add_argument("--cards", type=int, default=30)
+    parser.add_argument("--paginas", type=int, default=30, help="Páginas de subáreas (una por área).")
+    parser.add_argument("--subcards", type=int, default=20)
+    parser.add_argument("--latencia-ms", type=float, default=80)
+    parser.add_argument("--sin-navegador", action="store_true", help="No usar Chromium aunque esté disponible.")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    from jobs_common import enlaces, feed
+    from laborum_areas_job import areas_scrapper_v2 as areas
+    from laborum_subareas_job import subareas_scrapper_v2 as subareas
+
+    tmp = tempfile.mkdtemp(prefix="bench_camino_rapido_")
+    comun.configurar_logging(tmp)
+    os.environ["LABORUM_FEED_CACHE"] = os.path.join(tmp, "laborum_feed.json")
+    rutas = datos_sinteticos.escribir_snapshots_laborum(tmp, args.cards, args.paginas, args.subcards)
+    instancia = servidor(tmp, args.latencia_ms / 1000)
+    base = f"http://127.0.0.1:{instancia.server_address[1]}"
+    url_areas = f"{base}/salarios/"
+    paginas = [f"{base}/{ruta}" for ruta in rutas]
+
+    resultado = {"cards": args.cards, "paginas_subareas": args.paginas, "latencia_ms": args.latencia_ms}
+    navegador = False
+    if not args.sin_navegador:
+        navegador, motivo = comun.chromium_disponible()
+        if not navegador:
+            resultado["navegador_omitido"] = motivo
+    try:
+        with enlaces.crear_sesion() as sesion:
+            # 1. Descubrimiento
+            inicio = time.perf_counter()
+            if navegador:
+                areas.scrape_data(url_areas)
+                for area, pagina in enumerate(paginas):
+                    subareas.scrape_subareas(area, pagina)
+            else:
+                descubrir_sin_navegador(sesion, base, url_areas, paginas, args)
+            resultado["descubrimiento"] = "navegador" if navegador else "simulado"
+            resultado["segundos_descubrimiento"] = round(time.perf_counter() - inicio, 3)
+            if len(feed.leer_cache()) != 1 + len(paginas):
+                raise RuntimeError("No se descubrieron los feeds de todas las páginas; no hay camino rápido que medir.")
+
+            # 2. Camino rápido
+            inicio = time.perf_counter()
+            areas.scrape_data_http(url_areas, sesion)
+            for area, pagina in enumerate(paginas):
+                subareas.scrape_subareas_http(area, pagina, sesion)
+            resultado["segundos_camino_rapido"] = round(time.perf_counter() - inicio, 3)
+    finally:
+        instancia.shutdown()
+        instancia.server_close()
+
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        paginas_totales = 1 + args.paginas
+        print(f"{paginas_totales} páginas ({args.cards} áreas, {args.paginas}x{args.subcards} subáreas), latencia {args.latencia_ms} ms")
+        if navegador:
+            print(f"  con navegador (descubre el feed): {resultado['segundos_descubrimiento']:.3f} s")
+        else:
+            print(f"  descubrimiento simulado (sin Chromium): {resultado['segundos_descubrimiento']:.3f} s")
+        print(f"  camino rápido HTTP:                {resultado['segundos_camino_rapido']:.3f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+# bench_cascada.py
+
+"""
+Cascada de red por página (jobs_common.cascada, NAVEGADOR_CASCADA): cuánto cuesta medir.
+
+1. Sin navegador (siempre): costo de resumen() y escribir() (con HAR) de una página sintética
+   con --solicitudes solicitudes.
+2. Con Chromium de Playwright (si está disponible): scrape_subareas() real sobre --paginas
+   páginas de los snapshots sintéticos, servidas desde un servidor local que demora
+   --lento-ms un script de la página. Se compara el tiempo por página con la cascada apagada
+   y encendida, y se informa qué solicitud quedó primera en el resumen de una página.
+
+El contenido del resumen y del HAR se verifica en tests/test_cascada.py.
+
+Uso:
+    python benchmarks/bench_cascada.py [--paginas 6] [--lento-ms 800] [--solicitudes 60] [--json]
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import comun  # noqa: E402
+import datos_sinteticos  # noqa: E402
+
+RECURSO_LENTO = "/static/lento.js"
+
+
+def sin_navegador(args, tmp):
+    from jobs_common import cascada
+
+    red = cascada.Cascada(None, "https://laborum.test/salarios/area-0/", activa=True)
+    tipos = ("script", "stylesheet", "image", "fetch", "font")
+    for i in range(args.solicitudes):
+        lenta = i == args.solicitudes // 2
+        timing = {"startTime": red.inicio * 1000 + i, "domainLookupStart": -1, "domainLookupEnd": -1,
+                  "connectStart": -1, "secureConnectionStart": -1, "connectEnd": -1,
+                  "requestStart": 1.0, "responseStart": 900.0 if lenta else 20.0 + i % 7,
+                  "responseEnd": 950.0 if lenta else 25.0 + i % 11}
+        red.solicitudes.append({"url": f"https://laborum.test/recurso-{i}", "metodo": "GET", "tipo": tipos[i % len(tipos)],
+                                "estado": 200, "bytes": 1000 + i, "inicio": timing["startTime"], "error": None,
+                                **cascada.fases(timing)})
+    red.marcar_selector(15)
+
+    inicio = time.perf_counter()
+    red.resumen()
+    segundos_resumen = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    red.escribir(os.path.join(tmp, "sin_navegador"), har=True)
+    segundos_escribir = time.perf_counter() - inicio
+    return {
+        "ms_resumen": round(segundos_resumen * 1000, 3),
+        "ms_escribir": round(segundos_escribir * 1000, 3),
+    }
+
+
+def servidor(directorio, lento):
+    class Manejador(http.server.SimpleHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == RECURSO_LENTO:
+                time.sleep(lento)
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    instancia = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Manejador, directory=directorio))
+    threading.Thread(target=instancia.serve_forever, daemon=True).start()
+    return instancia
+
+
+def con_navegador(args, tmp):
+    from jobs_common import cascada, metricas, navegador
+    from laborum_subareas_job import subareas_scrapper_v2 as subareas
+
+    rutas = datos_sinteticos.escribir_snapshots_laborum(tmp, 1, args.paginas, args.subcards)
+    os.makedirs(os.path.join(tmp, "static"), exist_ok=True)
+    with open(os.path.join(tmp, RECURSO_LENTO.lstrip("/")), "w", encoding="utf-8") as f:
+        f.write("window.__lento = true;\n")
+    for ruta in rutas:
+        pagina = os.path.join(tmp, ruta, "index.html")
+        with open(pagina, encoding="utf-8") as f:
+            contenido = f.read()
+        with open(pagina, "w", encoding="utf-8") as f:
+            f.write(contenido.replace("</head>", f'<script src="{RECURSO_LENTO}" defer></script></head>'))
+
+    instancia = servidor(tmp, args.lento_ms / 1000)
+    base = f"http://127.0.0.1:{instancia.server_address[1]}"
+    urls = [f"{base}/{ruta}" for ruta in rutas]
+    directorio = os.path.join(tmp, "red")
+    resultado = {}
+    try:
+        for variante, activa in (("apagada", False), ("encendida", True)):
+            cascada.ACTIVA, cascada.HAR, cascada.DIRECTORIO = activa, activa, directorio
+            metricas_variante = metricas.iniciar(f"bench_cascada_{variante}")
+            with navegador.compartido(headless=True):
+                for area, url in enumerate(urls):
+                    subareas.scrape_subareas(area, url)
+            scraping = metricas_variante.resumen()["etapas"].get("scraping", {"segundos": 0.0, "veces": 1})
+            resultado[f"segundos_por_pagina_{variante}"] = round(scraping["segundos"] / max(1, scraping["veces"]), 3)
+    finally:
+        cascada.ACTIVA = cascada.HAR = False
+        instancia.shutdown()
+        instancia.server_close()
+
+    with open(os.path.join(directorio, "cascadas.jsonl"), encoding="utf-8") as f:
+        resumenes = [json.loads(linea) for linea in f]
+    resultado["ejemplo"] = resumenes[0] if resumenes else None
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la cascada de red por página.")
+    parser.add_argument("--paginas", type=int, default=6)
+    parser.add_argument("--subcards", type=int, default=15)
+    parser.add_argument("--lento-ms", type=float, default=800)
+    parser.add_argument("--solicitudes", type=int, default=60)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_cascada_")
+    comun.configurar_logging(tmp)
+    os.environ["LABORUM_FEED_CACHE"] = os.path.join(tmp, "laborum_feed.json")
+    try:
+        resultado = {"sin_navegador": sin_navegador(args, tmp)}
+        disponible, motivo = comun.chromium_disponible()
+        resultado["con_navegador"] = con_navegador(args, tmp) if disponible else {"omitido": f"Chromium no disponible: {motivo}"}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    offline = resultado["sin_navegador"]
+    navegador = resultado["con_navegador"]
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"Sin navegador: {args.solicitudes} solicitudes, resumen {offline['ms_resumen']} ms, "
+              f"escritura con HAR {offline['ms_escribir']} ms")
+        if "omitido" in navegador:
+            print(f"Con navegador: {navegador['omitido']}")
+        else:
+            ejemplo = navegador["ejemplo"] or {"mas_lentas": [], "selector_ms": None}
+            mas_lenta = ejemplo["mas_lentas"][0]["url"] if ejemplo["mas_lentas"] else None
+            print(f"Con navegador: {args.paginas} páginas, s/página apagada {navegador['segundos_por_pagina_apagada']} "
+                  f"y encendida {navegador['segundos_por_pagina_encendida']}; en la primera página la más lenta fue "
+                  f"{mas_lenta} y el selector respondió en {ejemplo['selector_ms']} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
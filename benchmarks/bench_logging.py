@@ -0,0 +1,97 @@
+# bench_logging.py
+
+"""
+Costo del logging por mensaje en el hilo del job, con la configuración anterior y la actual.
+
+- anterior: logging.basicConfig con FileHandler + StreamHandler síncronos y formato de texto
+  (cada llamada formatea y escribe en disco y en consola antes de volver).
+- actual: jobs_common.logs (QueueHandler + QueueListener, JSON, rotación, agrupación).
+
+Se simula el patrón de process_csv y de los scrapers: N avisos por fila con la misma clave
+de agrupación más N mensajes de detalle en DEBUG. La consola se redirige a /dev/null.
+
+Uso:
+    python benchmarks/bench_logging.py [--n 50000] [--json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jobs_common import logs  # noqa: E402
+
+
+def registrar_filas(n):
+    """
+    Mismo patrón que los jobs: un aviso por fila mal formateada y un detalle por fila.
+    """
+    for i in range(n):
+        logging.warning(f"Fila {i} tiene 13 columnas en lugar de 12", extra={"agrupar": "fila_mal_formateada"})
+        logging.debug("Datos extraídos: %s", {"fila": i})
+
+
+def configurar_anterior(directorio):
+    raiz = logging.getLogger()
+    for handler in raiz.handlers[:]:
+        raiz.removeHandler(handler)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[
+            logging.FileHandler(os.path.join(directorio, "anterior.log")),
+            logging.StreamHandler(open(os.devnull, "w")),
+        ],
+        force=True,
+    )
+
+
+def medir(n, configurar):
+    with tempfile.TemporaryDirectory() as directorio:
+        configurar(directorio)
+        inicio = time.perf_counter()
+        registrar_filas(n)
+        en_el_hilo = time.perf_counter() - inicio
+        logs.cerrar_logging()
+        total = time.perf_counter() - inicio
+        tamano = sum(os.path.getsize(os.path.join(directorio, f)) for f in os.listdir(directorio))
+    return {
+        "us_por_mensaje": round(en_el_hilo / (2 * n) * 1e6, 2),
+        "segundos_en_el_hilo": round(en_el_hilo, 3),
+        "segundos_hasta_vaciar": round(total, 3),
+        "bytes_escritos": tamano,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo del logging por mensaje.")
+    parser.add_argument("--n", type=int, default=50_000, help="Filas simuladas (dos mensajes por fila).")
+    parser.add_argument("--json", action="store_true", help="Imprimir el resultado en JSON.")
+    args = parser.parse_args()
+
+    stderr = sys.stderr
+    sys.stderr = open(os.devnull, "w")
+    try:
+        anterior = medir(args.n, configurar_anterior)
+        actual = medir(args.n, lambda d: logs.configurar_logging("bench", d, "actual.log", consola=True))
+    finally:
+        sys.stderr = stderr
+
+    resultado = {"n": args.n, "anterior": anterior, "actual": actual}
+    if args.json:
+        print(json.dumps(resultado, indent=2))
+    else:
+        for nombre in ("anterior", "actual"):
+            r = resultado[nombre]
+            print(f"{nombre:<9} {r['us_por_mensaje']:>8} µs/mensaje  {r['segundos_en_el_hilo']:>7} s en el hilo  "
+                  f"{r['bytes_escritos']:>11} bytes escritos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# bench_memoria_navegador.py
+
+"""
+Memoria de Chromium con el perfil "estandar" (argumentos por defecto, viewport 1920x1080)
+frente al perfil "memoria" de jobs_common.navegador, para dimensionar --memory del job de
+subáreas y cuántas páginas caben abiertas a la vez en un contenedor.
+
+Para cada perfil se lanza el navegador con navegador.abrir() (el mismo lanzamiento que los jobs)
+y se abren hasta --paginas páginas de subáreas de los snapshots sintéticos, cada una en su
+contexto como scrape_subareas(), sin cerrarlas. Después de cada página se mide la suma de RSS
+de los procesos de Chromium (jobs_common.memoria) y, al final, el muestreo periódico del
+navegador deja su pico en las métricas. Se informa:
+
+- el RSS con 1 página y con todas, y los MB que agrega cada página adicional,
+- cuántas páginas simultáneas caben en --memoria-mb dejando --reserva-mb para Python y el resto,
+- los segundos por página (el perfil no debe hacer más lenta la carga),
+- cuántas cards encontró el XPath de scrape_subareas() por página con cada viewport.
+
+Requiere Chromium de Playwright; sin él se informa y se termina sin medir.
+
+Uso:
+    python benchmarks/bench_memoria_navegador.py [--paginas 8] [--subcards 40] [--memoria-mb 1024]
+                                                 [--reserva-mb 300] [--json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import comun  # noqa: E402
+import datos_sinteticos  # noqa: E402
+
+
+def medir_perfil(nombre, urls, args):
+    from jobs_common import memoria, metricas, navegador
+
+    os.environ["NAVEGADOR_PERFIL"] = nombre
+    navegador.PERFIL = navegador.Perfil.desde_entorno()
+    metricas_perfil = metricas.iniciar(f"bench_memoria_{nombre}")
+    rss_por_pagina = []
+    segundos = []
+    cards = []
+    with navegador.abrir(headless=True) as browser:
+        contextos = []
+        for url in urls:
+            inicio = time.perf_counter()
+            context = browser.new_context(viewport=navegador.PERFIL.viewport, locale="es-CL",
+                                          timezone_id="America/Santiago")
+            page = context.new_page()
+            page.goto(url, wait_until="networkidle")
+            cards.append(len(page.query_selector_all('xpath=//*[@id="root"]/div/div[2]/div/div/div')))
+            segundos.append(time.perf_counter() - inicio)
+            contextos.append(context)
+            rss, _ = memoria.rss_arbol()
+            rss_por_pagina.append(rss / 2**20)
+        navegador._muestreo.medir()
+        for context in contextos:
+            context.close()
+
+    contadores = metricas_perfil.resumen()["contadores"]
+    por_pagina = (rss_por_pagina[-1] - rss_por_pagina[0]) / max(1, len(rss_por_pagina) - 1)
+    disponible = args.memoria_mb - args.reserva_mb
+    base = rss_por_pagina[0] - por_pagina
+    return {
+        "argumentos": navegador.PERFIL.args,
+        "viewport": navegador.PERFIL.viewport,
+        "rss_1_pagina_mb": round(rss_por_pagina[0], 1),
+        "rss_todas_mb": round(rss_por_pagina[-1], 1),
+        "mb_por_pagina": round(por_pagina, 1),
+        "paginas_que_caben": int((disponible - base) / por_pagina) if por_pagina > 0 else None,
+        "rss_pico_muestreo_mb": contadores.get("navegador_rss_max_mb"),
+        "procesos_max": contadores.get("navegador_procesos_max"),
+        "segundos_por_pagina": round(sum(segundos) / len(segundos), 3),
+        "cards_min_por_pagina": min(cards),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria de Chromium por perfil de lanzamiento.")
+    parser.add_argument("--paginas", type=int, default=8, help="Páginas abiertas a la vez.")
+    parser.add_argument("--subcards", type=int, default=40)
+    parser.add_argument("--memoria-mb", type=float, default=1024, help="--memory del contenedor.")
+    parser.add_argument("--reserva-mb", type=float, default=300, help="MB para Python, pandas y el resto.")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    disponible, motivo = comun.chromium_disponible()
+    if not disponible:
+        print(f"Chromium no disponible: {motivo}")
+        return 0
+
+    tmp = tempfile.mkdtemp(prefix="bench_memoria_navegador_")
+    comun.configurar_logging(tmp)
+    perfil_original = os.environ.get("NAVEGADOR_PERFIL")
+    try:
+        rutas = datos_sinteticos.escribir_snapshots_laborum(tmp, 1, args.paginas, args.subcards)
+        with comun.servidor_local(tmp) as base:
+            urls = [f"{base}/{ruta}" for ruta in rutas]
+            resultado = {nombre: medir_perfil(nombre, urls, args) for nombre in ("estandar", "memoria")}
+    finally:
+        if perfil_original is None:
+            os.environ.pop("NAVEGADOR_PERFIL", None)
+        else:
+            os.environ["NAVEGADOR_PERFIL"] = perfil_original
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"{args.paginas} páginas de subáreas abiertas a la vez; contenedor de {args.memoria_mb:.0f} MB "
+              f"con {args.reserva_mb:.0f} MB de reserva")
+        print(f"{'perfil':10} {'RSS 1 pág':>10} {'RSS todas':>10} {'MB/pág':>7} {'caben':>6} {'pico':>7} "
+              f"{'procesos':>9} {'s/pág':>6} {'cards':>6}")
+        for nombre, datos in resultado.items():
+            print(f"{nombre:10} {datos['rss_1_pagina_mb']:10.1f} {datos['rss_todas_mb']:10.1f} "
+                  f"{datos['mb_por_pagina']:7.1f} {str(datos['paginas_que_caben']):>6} "
+                  f"{str(datos['rss_pico_muestreo_mb']):>7} {str(datos['procesos_max']):>9} "
+                  f"{datos['segundos_por_pagina']:6.3f} {datos['cards_min_por_pagina']:6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
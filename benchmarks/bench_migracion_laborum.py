@@ -0,0 +1,211 @@
+# bench_migracion_laborum.py
+
+"""
+Consultas de series de tiempo sobre el historial de Laborum antes y después de
+migraciones/laborum_tipos_nativos.py (tipos nativos + índices por área/subárea y mes).
+
+Se crean las tablas con el esquema anterior (executed_at como texto/fecha y salarios_basados
+como texto, sin índices) en un SQLite temporal (o en --db-url), se cargan --areas x
+--ejecuciones filas de áreas y --subareas x --ejecuciones-subarea filas de subáreas, se miden
+las consultas, se ejecuta la migración completa y se vuelven a medir. En SQLite también se
+muestra el plan. Que la migración conserve los datos se verifica en
+tests/test_migracion_laborum.py.
+
+Uso:
+    python benchmarks/bench_migracion_laborum.py [--areas 40] [--ejecuciones 2000]
+                                                 [--subareas 400] [--ejecuciones-subarea 200]
+                                                 [--db-url URL] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comun import RAIZ_REPO, configurar_logging, crear_engine  # noqa: E402
+
+sys.path.insert(0, os.path.join(RAIZ_REPO, "migraciones"))
+
+# Consultas de los dashboards: serie de un área/subárea por mes
+CONSULTAS = {
+    "serie_area": (
+        "SELECT month, salario_promedio, salarios_basados FROM laborum_areas_links_2 "
+        "WHERE area_id = :id AND month >= :desde ORDER BY month, executed_at"
+    ),
+    "ultima_ejecucion_por_mes_area": (
+        "SELECT month, MAX(executed_at) FROM laborum_areas_links_2 WHERE area_id = :id GROUP BY month"
+    ),
+    "promedio_mensual_subarea": (
+        "SELECT month, AVG(salario_promedio), SUM(salarios_basados) FROM laborum_subareas_links_2 "
+        "WHERE id_subarea = :id GROUP BY month"
+    ),
+}
+
+
+def esquema_anterior(metadata):
+    """
+    Tablas con los tipos y sin los índices que tenían antes de la migración.
+    """
+    from sqlalchemy import Column, Date, Integer, String, Table
+
+    Table("laborum_areas_links_2", metadata,
+          Column("id", Integer, primary_key=True, autoincrement=True),
+          Column("area_id", Integer, nullable=False),
+          Column("salario_promedio", Integer, nullable=False),
+          Column("salarios_basados", Integer, nullable=False),
+          Column("link_area", String(255), nullable=False),
+          Column("executed_at", String(255), nullable=False),
+          Column("month", Date, nullable=False))
+    Table("laborum_subareas_links_2", metadata,
+          Column("id", Integer, primary_key=True, autoincrement=True),
+          Column("id_subarea", Integer, nullable=False),
+          Column("salario_promedio", Integer, nullable=False),
+          Column("salarios_basados", String(100), nullable=False),
+          Column("executed_at", Date, nullable=False),
+          Column("month", Date, nullable=False))
+
+
+def cargar_historial(engine, metadata, args):
+    inicio = datetime(2020, 1, 1)
+    areas = metadata.tables["laborum_areas_links_2"]
+    subareas = metadata.tables["laborum_subareas_links_2"]
+    with engine.begin() as connection:
+        for ejecucion in range(args.ejecuciones):
+            momento = inicio + timedelta(hours=6 * ejecucion)
+            connection.execute(areas.insert(), [{
+                "area_id": i,
+                "salario_promedio": 800000 + i * 1000 + ejecucion,
+                "salarios_basados": 100 + i,
+                "link_area": f"https://www.laborum.cl/salarios/area-{i}",
+                "executed_at": momento.strftime("%Y-%m-%d %H:%M:%S"),
+                "month": momento.date(),
+            } for i in range(1, args.areas + 1)])
+        for ejecucion in range(args.ejecuciones_subarea):
+            momento = inicio + timedelta(days=2 * ejecucion)
+            connection.execute(subareas.insert(), [{
+                "id_subarea": i,
+                "salario_promedio": 700000 + i * 100 + ejecucion,
+                "salarios_basados": str(10 + i % 90),
+                "executed_at": momento.date(),
+                "month": momento.date(),
+            } for i in range(1, args.subareas + 1)])
+
+
+def normalizar(filas):
+    """
+    Convierte los resultados a texto comparable (fechas, decimales y números como cadenas).
+    """
+    normalizadas = []
+    for fila in filas:
+        valores = []
+        for valor in fila:
+            if isinstance(valor, float) or type(valor).__name__ == "Decimal":
+                valor = round(float(valor), 2)
+            valores.append(str(valor))
+        normalizadas.append(tuple(valores))
+    return normalizadas
+
+
+def medir_consultas(engine, args, repeticiones=5):
+    """
+    Mediana de segundos por consulta (recorriendo varias áreas/subáreas) y resultados normalizados.
+    """
+    from sqlalchemy import text
+
+    ids_areas = range(1, args.areas + 1, max(args.areas // 10, 1))
+    ids_subareas = range(1, args.subareas + 1, max(args.subareas // 10, 1))
+    desde = (datetime(2020, 1, 1) + timedelta(days=180)).date()
+
+    resultados = {}
+    with engine.connect() as connection:
+        for nombre, sql in CONSULTAS.items():
+            consulta = text(sql)
+            ids = ids_subareas if "subarea" in nombre else ids_areas
+            tiempos = []
+            for _ in range(repeticiones):
+                filas = []
+                inicio = time.perf_counter()
+                for id_ in ids:
+                    filas.extend(connection.execute(consulta, {"id": id_, "desde": desde}).all())
+                tiempos.append(time.perf_counter() - inicio)
+            plan = None
+            if engine.dialect.name == "sqlite":
+                plan = " | ".join(
+                    fila[-1] for fila in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"), {"id": 1, "desde": desde})
+                )
+            resultados[nombre] = {
+                "ms_por_consulta": round(statistics.median(tiempos) / len(ids) * 1000, 3),
+                "plan": plan,
+                "filas": normalizar(filas),
+            }
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de consultas antes y después de migrar el historial de Laborum.")
+    parser.add_argument("--areas", type=int, default=40)
+    parser.add_argument("--ejecuciones", type=int, default=2000, help="Ejecuciones históricas por área.")
+    parser.add_argument("--subareas", type=int, default=400)
+    parser.add_argument("--ejecuciones-subarea", type=int, default=200, help="Ejecuciones históricas por subárea.")
+    parser.add_argument("--tamano-lote", type=int, default=5000)
+    parser.add_argument("--db-url", help="URL de SQLAlchemy de la base de prueba (por defecto SQLite temporal).")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    from sqlalchemy import MetaData
+    import laborum_tipos_nativos
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configurar_logging(tmp)
+        engine = crear_engine(args.db_url, tmp)
+        metadata = MetaData()
+        esquema_anterior(metadata)
+        metadata.drop_all(engine)
+        metadata.create_all(engine)
+        cargar_historial(engine, metadata, args)
+
+        antes = medir_consultas(engine, args)
+        inicio = time.perf_counter()
+        laborum_tipos_nativos.migrar(engine, tamano_lote=args.tamano_lote, pausa=0)
+        segundos_migracion = time.perf_counter() - inicio
+        despues = medir_consultas(engine, args)
+        metadata.drop_all(engine)
+        engine.dispose()
+
+    resultado = {
+        "filas_areas": args.areas * args.ejecuciones,
+        "filas_subareas": args.subareas * args.ejecuciones_subarea,
+        "segundos_migracion": round(segundos_migracion, 2),
+        "consultas": {
+            nombre: {
+                "antes_ms": antes[nombre]["ms_por_consulta"],
+                "despues_ms": despues[nombre]["ms_por_consulta"],
+                "aceleracion": round(antes[nombre]["ms_por_consulta"] / max(despues[nombre]["ms_por_consulta"], 1e-6), 1),
+                "plan_antes": antes[nombre]["plan"],
+                "plan_despues": despues[nombre]["plan"],
+            }
+            for nombre in CONSULTAS
+        },
+    }
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"Historial: {resultado['filas_areas']} filas de áreas, {resultado['filas_subareas']} de subáreas; "
+          f"migración en {resultado['segundos_migracion']} s")
+    for nombre, datos in resultado["consultas"].items():
+        print(f"  {nombre:32s} {datos['antes_ms']:9.3f} ms -> {datos['despues_ms']:8.3f} ms  (x{datos['aceleracion']})")
+        if datos["plan_antes"]:
+            print(f"      antes:   {datos['plan_antes']}")
+            print(f"      después: {datos['plan_despues']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+# bench_orquestador.py
+
+"""
+Tiempo de punta a punta y segundos de contenedor de una ejecución diaria de los jobs:
+un contenedor por job (antes) frente al orquestador (orquestador/main.py) en secuencia y
+como grafo de dependencias.
+
+Los jobs se simulan con esperas de --escala segundos reales por segundo simulado, pero el
+orquestador es el real: ejecutar() arma las ramas, corre cada una en su hilo con un navegador
+compartido (jobs_common.navegador, con el lanzamiento simulado) y escribe el resumen combinado.
+Duraciones simuladas por defecto: áreas 40 s, subáreas 30 áreas x 8 s, graduated 600 s,
+enrolled 900 s, arranque de contenedor 20 s y de Chromium 1.5 s.
+
+Antes, cada contenedor paga su arranque y subáreas lanza un Chromium por área; subáreas no
+puede empezar antes de que áreas termine, así que el punta a punta supone el mejor caso de
+crons encadenados sin holgura. Con el orquestador hay un solo arranque y un solo Chromium
+para la rama de Laborum. El orden de las ramas, el resumen combinado y qué pasa cuando un job
+falla se verifican en tests/test_orquestador.py.
+
+Uso:
+    python benchmarks/bench_orquestador.py [--areas 30] [--segundos-area 8] [--arranque 20]
+                                           [--escala 0.002] [--json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import comun  # noqa: E402,F401  (agrega la raíz del repositorio a sys.path)
+
+
+def duraciones(args):
+    """
+    Segundos simulados de trabajo de cada job, sin arranques de contenedor ni de navegador.
+    """
+    return {
+        "laborum_areas": args.segundos_areas,
+        "laborum_subareas": args.areas * args.segundos_area,
+        "graduated": args.segundos_graduated,
+        "enrolled": args.segundos_enrolled,
+    }
+
+
+def lanzamientos_antes(args):
+    """
+    Chromium lanzados por cada job antes: uno en áreas y uno por área en subáreas.
+    """
+    return {"laborum_areas": 1, "laborum_subareas": args.areas, "graduated": 0, "enrolled": 0}
+
+
+def antes(args):
+    trabajo = duraciones(args)
+    lanzamientos = lanzamientos_antes(args)
+    por_job = {nombre: args.arranque + segundos + lanzamientos[nombre] * args.arranque_navegador
+               for nombre, segundos in trabajo.items()}
+    punta_a_punta = max(por_job["laborum_areas"] + por_job["laborum_subareas"], por_job["graduated"], por_job["enrolled"])
+    return {"punta_a_punta": round(punta_a_punta, 1), "segundos_contenedor": round(sum(por_job.values()), 1),
+            "contenedores": len(por_job), "navegadores": sum(lanzamientos.values())}
+
+
+class NavegadorSimulado:
+    def close(self):
+        pass
+
+
+def orquestador(args, secuencial):
+    from sqlalchemy import create_engine
+    from jobs_common import enlaces, metricas, navegador
+    from orquestador import main as orquestador_main
+
+    escala = args.escala
+    lanzados = []
+
+    def lanzar(playwright, headless):
+        with metricas.etapa("inicio_navegador"):
+            time.sleep(args.arranque_navegador * escala)
+        lanzados.append(1)
+        return NavegadorSimulado()
+
+    class PlaywrightSimulado:
+        def start(self):
+            return self
+
+        def stop(self):
+            pass
+
+    def job(nombre, segundos, paginas=0):
+        def ejecutar(recursos):
+            metricas.iniciar(nombre)
+            with recursos["engine"].connect():
+                pass
+            if paginas:
+                for _ in range(paginas):
+                    with navegador.abrir() as browser:
+                        assert browser is not None
+                    time.sleep(segundos / paginas * escala)
+            else:
+                time.sleep(segundos * escala)
+        return ejecutar
+
+    trabajo = duraciones(args)
+    nodos = (
+        orquestador_main.Nodo("laborum_areas", job("laborum_areas", trabajo["laborum_areas"], paginas=1)),
+        orquestador_main.Nodo("laborum_subareas", job("laborum_subareas", trabajo["laborum_subareas"], paginas=args.areas),
+                              depende_de=("laborum_areas",)),
+        orquestador_main.Nodo("graduated", job("graduated", trabajo["graduated"])),
+        orquestador_main.Nodo("enrolled", job("enrolled", trabajo["enrolled"])),
+    )
+
+    lanzar_original = navegador._lanzar
+    navegador._lanzar = lanzar
+    import playwright.sync_api as sync_api
+    sync_playwright_original = sync_api.sync_playwright
+    sync_api.sync_playwright = PlaywrightSimulado
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'orquestador.db')}")
+            ruta_json = os.path.join(tmp, "resumen.json")
+            with contextlib.closing(enlaces.crear_sesion()) as sesion:
+                inicio = time.perf_counter()
+                resultados = orquestador_main.ejecutar(
+                    [nodo.nombre for nodo in nodos], engine=engine, sesion=sesion, secuencial=secuencial,
+                    nodos=nodos, ruta_json=ruta_json,
+                )
+                real = time.perf_counter() - inicio
+            engine.dispose()
+            with open(ruta_json, encoding="utf-8") as f:
+                resumen = json.load(f)
+    finally:
+        navegador._lanzar = lanzar_original
+        sync_api.sync_playwright = sync_playwright_original
+
+    fallidos = [nombre for nombre, resultado in resultados.items() if resultado["estado"] != "ok"]
+    if fallidos:
+        raise RuntimeError(f"Jobs simulados que no terminaron bien: {fallidos}")
+    punta_a_punta = args.arranque + real / escala
+    return {
+        "punta_a_punta": round(punta_a_punta, 1),
+        "segundos_contenedor": round(punta_a_punta, 1),
+        "contenedores": 1,
+        "navegadores": len(lanzados),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del orquestador de jobs frente a un contenedor por job.")
+    parser.add_argument("--areas", type=int, default=30)
+    parser.add_argument("--segundos-area", type=float, default=8, help="Segundos simulados por área en subáreas.")
+    parser.add_argument("--segundos-areas", type=float, default=40)
+    parser.add_argument("--segundos-graduated", type=float, default=600)
+    parser.add_argument("--segundos-enrolled", type=float, default=900)
+    parser.add_argument("--arranque", type=float, default=20, help="Segundos simulados de arranque de un contenedor.")
+    parser.add_argument("--arranque-navegador", type=float, default=1.5)
+    parser.add_argument("--escala", type=float, default=0.002, help="Segundos reales por segundo simulado.")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    resultado = {
+        "antes": antes(args),
+        "orquestador_secuencial": orquestador(args, secuencial=True),
+        "orquestador_grafo": orquestador(args, secuencial=False),
+    }
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"{args.areas} áreas de subáreas, arranque de contenedor {args.arranque} s (segundos simulados)")
+        print(f"{'variante':24} {'punta a punta':>14} {'s-contenedor':>13} {'contenedores':>13} {'navegadores':>12}")
+        for variante, datos in resultado.items():
+            print(f"{variante:24} {datos['punta_a_punta']:14.1f} {datos['segundos_contenedor']:13.1f} "
+                  f"{datos['contenedores']:13} {datos['navegadores']:12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
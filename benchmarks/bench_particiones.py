@@ -0,0 +1,170 @@
+# bench_particiones.py
+
+"""
+Job de subáreas repartido entre N tareas (jobs_common.particiones), como un Cloud Run job con
+--tasks N: tiempo de punta a punta con 1, 2, 4... procesos.
+
+Se sirven los snapshots sintéticos de Laborum desde un servidor local con --latencia-ms por
+respuesta, se registran los feeds JSON de las páginas de subáreas (como en
+bench_camino_rapido.py) y se guardan las áreas con sus enlaces en un SQLite. Luego, para cada
+N, particiones.lanzar_locales() lanza N procesos que corren main() del job de subáreas con
+CLOUD_RUN_TASK_INDEX/CLOUD_RUN_TASK_COUNT, sobre una copia de esa base. Que cada área quede en
+exactamente una tarea se verifica en tests/test_particiones.py.
+
+Uso:
+    python benchmarks/bench_particiones.py [--areas 24] [--subcards 15] [--latencia-ms 300]
+                                           [--tareas 1,2,4] [--json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import comun  # noqa: E402
+import datos_sinteticos  # noqa: E402
+from bench_camino_rapido import filas_dom_subareas, servidor  # noqa: E402
+
+
+def crear_engine(ruta):
+    from sqlalchemy import create_engine
+
+    # Varias tareas escriben el mismo archivo: esperar el bloqueo de SQLite en lugar de fallar
+    return create_engine(f"sqlite:///{ruta}", connect_args={"timeout": 60})
+
+
+def trabajador(ruta_db, directorio_logs):
+    """
+    Una tarea: corre main() del job de subáreas sobre `ruta_db` (el proceso ya tiene
+    CLOUD_RUN_TASK_INDEX/CLOUD_RUN_TASK_COUNT en el entorno).
+    """
+    from jobs_common import logs
+    from laborum_subareas_job import subareas_scrapper_v2 as subareas
+
+    indice = os.getenv("CLOUD_RUN_TASK_INDEX", "0")
+    logs.configurar_logging("bench_particiones", directorio_logs, f"tarea-{indice}.log", consola=False, compartido=True)
+    engine = crear_engine(ruta_db)
+    subareas.main(engine_externo=engine)
+    engine.dispose()
+    return 0
+
+
+def preparar(tmp, base, paginas, args):
+    """
+    Base SQLite con las áreas y sus enlaces, y los feeds de las páginas de subáreas descubiertos.
+    """
+    from jobs_common import enlaces, feed
+    from laborum_areas_job import areas_scrapper_v2 as areas
+    from laborum_subareas_job import subareas_scrapper_v2 as subareas
+
+    ruta_db = os.path.join(tmp, "inicial.db")
+    engine = crear_engine(ruta_db)
+    areas.inicializar_bd(engine)
+    areas.crear_tablas()
+    filas = [{"nombre_area": fila["nombre"], "salario_promedio": fila["salario"], "salarios_basados": fila["n"],
+              "link_area": pagina}
+             for fila, pagina in zip(datos_sinteticos.filas_areas(args.areas), paginas)]
+    areas.guardar_en_bd(filas, engine, areas.session, f"{base}/salarios/")
+    areas.session.close()
+    subareas.inicializar_bd(engine)
+    subareas.crear_tablas()
+    subareas.session.close()
+    engine.dispose()
+
+    with enlaces.crear_sesion() as sesion:
+        for area, pagina in enumerate(paginas):
+            url_feed = f"{base}/api/salarios/area-{area}.json"
+            endpoint = {"url": url_feed, "metodo": "GET", "cuerpo": None, "cabeceras": {"accept": "application/json"}}
+            feed.descubrir(pagina, [(endpoint, sesion.get(url_feed).json())], filas_dom_subareas(area, args.subcards),
+                           "nombre_subarea", ("salario_promedio", "salarios_basados"))
+    return ruta_db
+
+
+def filas_subareas(ruta_db):
+    from sqlalchemy import text
+
+    engine = crear_engine(ruta_db)
+    with engine.connect() as connection:
+        filas = connection.execute(text(
+            "SELECT a.nombre_area, s.nombre_subarea, l.salario_promedio, l.salarios_basados "
+            "FROM laborum_subareas_links_2 l JOIN laborum_subareas s ON s.id = l.id_subarea "
+            "JOIN laborum_areas a ON a.id = s.id_area ORDER BY 1, 2"
+        )).all()
+    engine.dispose()
+    return [tuple(fila) for fila in filas]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del job de subáreas repartido entre tareas.")
+    parser.add_argument("--areas", type=int, default=24)
+    parser.add_argument("--subcards", type=int, default=15)
+    parser.add_argument("--latencia-ms", type=float, default=300)
+    parser.add_argument("--tareas", default="1,2,4", help="Cantidades de tareas a medir, separadas por coma.")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--trabajador", nargs=2, metavar=("DB", "LOGS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.trabajador:
+        return trabajador(*args.trabajador)
+
+    from jobs_common import particiones
+
+    tmp = tempfile.mkdtemp(prefix="bench_particiones_")
+    comun.configurar_logging(tmp)
+    os.environ["LABORUM_FEED_CACHE"] = os.path.join(tmp, "laborum_feed.json")
+    for variable in ("METRICS_SUMMARY_PATH", "METRICS_PROMETHEUS_TEXTFILE", "CLOUD_RUN_TASK_INDEX", "CLOUD_RUN_TASK_COUNT"):
+        os.environ.pop(variable, None)
+    rutas = datos_sinteticos.escribir_snapshots_laborum(tmp, 1, args.areas, args.subcards)
+    instancia = servidor(tmp, args.latencia_ms / 1000)
+    base = f"http://127.0.0.1:{instancia.server_address[1]}"
+
+    resultado = {"areas": args.areas, "subcards": args.subcards, "latencia_ms": args.latencia_ms, "tareas": {}}
+    try:
+        ruta_inicial = preparar(tmp, base, [f"{base}/{ruta}" for ruta in rutas], args)
+        for total in [int(valor) for valor in args.tareas.split(",") if valor.strip()]:
+            ruta_db = os.path.join(tmp, f"tareas-{total}.db")
+            shutil.copyfile(ruta_inicial, ruta_db)
+            comando = [sys.executable, os.path.abspath(__file__), "--trabajador", ruta_db, os.path.join(tmp, f"logs-{total}")]
+            inicio = time.perf_counter()
+            tareas = particiones.lanzar_locales(comando, total)
+            segundos = time.perf_counter() - inicio
+
+            asignadas = [tarea["resumen"]["contadores"].get("areas_asignadas", 0) if tarea["resumen"] else None
+                         for tarea in tareas]
+            if any(tarea["codigo"] for tarea in tareas):
+                raise RuntimeError(f"Con {total} tareas, alguna terminó con error: {[tarea['codigo'] for tarea in tareas]}")
+            datos = {
+                "segundos": round(segundos, 2),
+                "areas_por_tarea": asignadas,
+                "segundos_por_tarea": [tarea["resumen"]["duracion_segundos"] if tarea["resumen"] else None for tarea in tareas],
+                "segundos_http_por_tarea": [
+                    tarea["resumen"]["etapas"].get("scraping_http", {}).get("segundos") if tarea["resumen"] else None
+                    for tarea in tareas
+                ],
+                "filas_subareas": len(filas_subareas(ruta_db)),
+            }
+            resultado["tareas"][total] = datos
+    finally:
+        instancia.shutdown()
+        instancia.server_close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"{args.areas} áreas x {args.subcards} subáreas por HTTP, latencia {args.latencia_ms} ms")
+        print(f"{'tareas':>6} {'punta a punta':>14}  {'áreas por tarea':24} {'s por tarea (máx)':>18} {'s HTTP por tarea (máx)':>23}")
+        for total, datos in resultado["tareas"].items():
+            print(f"{total:6} {datos['segundos']:13.2f}s  {str(datos['areas_por_tarea']):24} "
+                  f"{max(datos['segundos_por_tarea']):18.2f} {max(datos['segundos_http_por_tarea']):23.2f}")
+        print(f"(CPU disponibles: {os.cpu_count()}; en Cloud Run cada tarea tiene las suyas)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
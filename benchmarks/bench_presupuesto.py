@@ -0,0 +1,202 @@
+# bench_presupuesto.py
+
+"""
+Cobertura del job de subáreas en varias ejecuciones diarias cuando no alcanza a recorrer todas
+las áreas antes del timeout de la tarea (--task-timeout de Cloud Run): orden fijo y muerte por
+timeout (antes) frente a orden por antigüedad con presupuesto de tiempo y cursor persistido
+(laborum_subarea_schedule, jobs_common.presupuesto).
+
+Se corre main() real del job sobre un SQLite con un reloj virtual: cada área "tarda" entre
+--min-area y --max-area segundos simulados (fijos por área), y una de cada --cada-falla áreas
+falla siempre tras --segundos-falla (Laborum no responde). El camino rápido está simulado: no
+hay red ni navegador. Antes, la tarea sigue hasta que el timeout la mata a mitad de un área;
+con presupuesto se detiene antes y las áreas que no alcanzó van primero al día siguiente.
+
+Por variante se informa cuántas áreas se refrescaron al menos una vez, el máximo de días
+seguidos sin refrescar un área y cuántas ejecuciones terminaron muertas por el timeout.
+
+Uso:
+    python benchmarks/bench_presupuesto.py [--areas 40] [--dias 10] [--timeout 900]
+                                           [--presupuesto 840] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import types
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import comun  # noqa: E402,F401  (agrega la raíz del repositorio a sys.path)
+from bench_camino_rapido import filas_dom_subareas  # noqa: E402
+
+INICIO = datetime(2026, 3, 1, 4, 0)
+
+
+class TareaTerminada(BaseException):
+    """
+    Cloud Run mata la tarea al cumplirse el timeout (no es un Exception: nada la atrapa).
+    """
+
+
+class Reloj:
+    def __init__(self):
+        self.segundos = 0.0
+
+    def monotonic(self):
+        return self.segundos
+
+    def ahora(self):
+        return INICIO + timedelta(seconds=self.segundos)
+
+
+def duraciones(args):
+    rnd = random.Random(46)
+    return {area: rnd.uniform(args.min_area, args.max_area) for area in range(1, args.areas + 1)}
+
+
+def simular(args, con_presupuesto, tmp):
+    import pandas as pd
+    from sqlalchemy import create_engine
+    from jobs_common import presupuesto
+    from laborum_subareas_job import subareas_scrapper_v2 as subareas
+
+    reloj = Reloj()
+    segundos_area = duraciones(args)
+    fallan = {area for area in segundos_area if area % args.cada_falla == 0}
+    refrescos = {area: [] for area in segundos_area}
+    plazo = {"fin": 0.0}
+    dia = {"actual": 0}
+
+    class FechaVirtual(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return reloj.ahora()
+
+    def avanzar(segundos):
+        if reloj.segundos + segundos > plazo["fin"]:
+            reloj.segundos = plazo["fin"]
+            raise TareaTerminada()
+        reloj.segundos += segundos
+
+    def scrape_areas_links(sesion=None, tarea=None):
+        return pd.DataFrame({"area_id": list(segundos_area), "link_area": [f"https://laborum.test/area-{area}"
+                                                                           for area in segundos_area]})
+
+    def scrape_subareas_http(area_id, link, sesion):
+        if area_id in fallan:
+            avanzar(args.segundos_falla)
+            return None
+        avanzar(segundos_area[area_id])
+        refrescos[area_id].append(dia["actual"])
+        return filas_dom_subareas(area_id, args.subcards)
+
+    originales = {nombre: getattr(subareas, nombre) for nombre in (
+        "scrape_areas_links", "scrape_subareas_http", "scrape_subareas", "ordenar_por_antiguedad",
+        "registrar_intento", "datetime", "time", "presupuesto", "CAMINO_RAPIDO", "PRESUPUESTO_SEGUNDOS",
+        "PRESUPUESTO_MARGEN_SEGUNDOS",
+    )}
+    subareas.scrape_areas_links = scrape_areas_links
+    subareas.scrape_subareas_http = scrape_subareas_http
+    subareas.scrape_subareas = lambda area_id, link, interruptor=None: None
+    subareas.datetime = FechaVirtual
+    subareas.time = types.SimpleNamespace(monotonic=reloj.monotonic)
+    subareas.presupuesto = types.SimpleNamespace(
+        Presupuesto=lambda segundos, margen: presupuesto.Presupuesto(segundos, margen, reloj=reloj.monotonic)
+    )
+    subareas.CAMINO_RAPIDO = True
+    subareas.PRESUPUESTO_SEGUNDOS = args.presupuesto if con_presupuesto else 0
+    subareas.PRESUPUESTO_MARGEN_SEGUNDOS = args.margen
+    if not con_presupuesto:
+        # Antes: las áreas en el orden de la consulta y sin cursor entre ejecuciones
+        subareas.ordenar_por_antiguedad = lambda df: df
+        subareas.registrar_intento = lambda area_id, resultado: None
+
+    ruta_db = os.path.join(tmp, f"{'presupuesto' if con_presupuesto else 'antes'}.db")
+    engine = create_engine(f"sqlite:///{ruta_db}")
+    muertas = 0
+    pendientes = []
+    try:
+        for numero in range(args.dias):
+            dia["actual"] = numero
+            reloj.segundos = numero * 86400.0
+            plazo["fin"] = reloj.segundos + args.timeout
+            try:
+                subareas.main(engine_externo=engine, sesion=object())
+            except TareaTerminada:
+                muertas += 1
+            subareas.session.close()
+            with open(os.environ["METRICS_SUMMARY_PATH"], encoding="utf-8") as f:
+                pendientes.append(json.load(f)["contadores"].get("areas_pendientes", 0))
+    finally:
+        for nombre, valor in originales.items():
+            setattr(subareas, nombre, valor)
+        engine.dispose()
+
+    def dias_sin_refrescar(dias):
+        marcas = [-1] + dias + [args.dias]
+        return max(siguiente - anterior - 1 for anterior, siguiente in zip(marcas, marcas[1:]))
+
+    sanas = [area for area in segundos_area if area not in fallan]
+    return {
+        "areas_refrescadas": sum(1 for area in sanas if refrescos[area]),
+        "areas_sanas": len(sanas),
+        "max_dias_sin_refrescar": max(dias_sin_refrescar(refrescos[area]) for area in sanas),
+        "refrescos": sum(len(dias) for dias in refrescos.values()),
+        "ejecuciones_muertas": muertas,
+        "areas_pendientes_por_dia": pendientes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del presupuesto de tiempo del job de subáreas.")
+    parser.add_argument("--areas", type=int, default=40)
+    parser.add_argument("--subcards", type=int, default=5)
+    parser.add_argument("--dias", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=900, help="--task-timeout de la tarea en segundos.")
+    parser.add_argument("--presupuesto", type=float, default=840, help="PRESUPUESTO_SEGUNDOS (ver deploy.py).")
+    parser.add_argument("--margen", type=float, default=15)
+    parser.add_argument("--min-area", type=float, default=15)
+    parser.add_argument("--max-area", type=float, default=45)
+    parser.add_argument("--cada-falla", type=int, default=9, help="Una de cada N áreas falla siempre.")
+    parser.add_argument("--segundos-falla", type=float, default=60)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    from jobs_common import logs
+
+    tmp = tempfile.mkdtemp(prefix="bench_presupuesto_")
+    logs.configurar_logging("bench_presupuesto", tmp, "benchmark.log", consola=False, compartido=True)
+    os.environ["METRICS_SUMMARY_PATH"] = os.path.join(tmp, "resumen.json")
+    for variable in ("METRICS_PROMETHEUS_TEXTFILE", "CLOUD_RUN_TASK_INDEX", "CLOUD_RUN_TASK_COUNT"):
+        os.environ.pop(variable, None)
+    try:
+        resultado = {
+            "antes": simular(args, con_presupuesto=False, tmp=tmp),
+            "presupuesto": simular(args, con_presupuesto=True, tmp=tmp),
+        }
+    finally:
+        logs.cerrar_logging()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    nuevo = resultado["presupuesto"]
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"{args.areas} áreas de {args.min_area:.0f}-{args.max_area:.0f} s, {args.dias} días, "
+              f"timeout {args.timeout:.0f} s, presupuesto {args.presupuesto:.0f} s (segundos simulados)")
+        print(f"{'variante':12} {'áreas refrescadas':>18} {'máx días sin refrescar':>23} {'refrescos':>10} {'muertas':>8}")
+        for variante, datos in resultado.items():
+            print(f"{variante:12} {datos['areas_refrescadas']:>9}/{datos['areas_sanas']:<8} "
+                  f"{datos['max_dias_sin_refrescar']:23} {datos['refrescos']:10} {datos['ejecuciones_muertas']:8}")
+        print(f"Áreas pendientes por día con presupuesto: {nuevo['areas_pendientes_por_dia']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# bench_reintentos.py
+
+"""
+Tiempo de una ejecución del job de subáreas con Laborum sano, degradado y caído: un intento
+por área con 60 s de goto + 60 s de networkidle (antes) frente a jobs_common.reintentos
+(timeouts crecientes, backoff con jitter y circuito de corte).
+
+Las cargas se simulan con un reloj virtual, así que el benchmark corre en milisegundos: una
+carga exitosa toma --segundos-carga y una fallida consume el timeout de goto y el de
+networkidle (el caso de la página que responde pero nunca termina de cargar). En el escenario
+degradado cada intento falla con probabilidad --prob-fallo.
+
+Uso:
+    python benchmarks/bench_reintentos.py [--areas 30] [--prob-fallo 0.3] [--segundos-carga 4]
+                                          [--umbral 3] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import comun  # noqa: E402,F401  (agrega la raíz del repositorio a sys.path)
+
+ESCENARIOS = {"sano": 0.0, "degradado": None, "caido": 1.0}
+
+
+class Reloj:
+    def __init__(self):
+        self.segundos = 0.0
+
+    def avanzar(self, segundos):
+        self.segundos += segundos
+
+
+def carga_simulada(reloj, rnd, prob_fallo, segundos_carga):
+    def cargar(timeout_ms):
+        if rnd.random() < prob_fallo:
+            reloj.avanzar(2 * timeout_ms / 1000)
+            raise TimeoutError(f"Timeout {timeout_ms}ms exceeded.")
+        reloj.avanzar(min(segundos_carga, timeout_ms / 1000))
+    return cargar
+
+
+def ejecutar_antes(areas, prob_fallo, segundos_carga, semilla):
+    reloj, rnd = Reloj(), random.Random(semilla)
+    cargar = carga_simulada(reloj, rnd, prob_fallo, segundos_carga)
+    exitosas = 0
+    for _ in range(areas):
+        try:
+            cargar(60000)
+            exitosas += 1
+        except TimeoutError:
+            pass
+    return {"segundos": round(reloj.segundos, 1), "areas_ok": exitosas, "areas_abortadas": 0}
+
+
+def ejecutar_con_reintentos(areas, prob_fallo, segundos_carga, semilla, umbral):
+    from jobs_common import reintentos
+
+    reloj, rnd = Reloj(), random.Random(semilla)
+    politica = reintentos.Politica(aleatorio=random.Random(semilla))
+    interruptor = reintentos.Interruptor(umbral)
+    cargar = carga_simulada(reloj, rnd, prob_fallo, segundos_carga)
+    exitosas = abortadas = 0
+    for posicion in range(areas):
+        if interruptor.abierto:
+            abortadas = areas - posicion
+            break
+        try:
+            reintentos.reintentar(cargar, politica, "carga simulada", interruptor, dormir=reloj.avanzar)
+            exitosas += 1
+        except TimeoutError:
+            pass
+    return {"segundos": round(reloj.segundos, 1), "areas_ok": exitosas, "areas_abortadas": abortadas,
+            "peor_caso_por_area": politica.peor_caso(cargas_por_intento=2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de reintentos y circuito de corte de las cargas de página.")
+    parser.add_argument("--areas", type=int, default=30)
+    parser.add_argument("--prob-fallo", type=float, default=0.3, help="Probabilidad de fallo por intento (degradado).")
+    parser.add_argument("--segundos-carga", type=float, default=4)
+    parser.add_argument("--umbral", type=int, default=3, help="Fallos seguidos que abren el circuito.")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    resultado = {"areas": args.areas, "escenarios": {}}
+    for nombre, prob_fallo in ESCENARIOS.items():
+        prob_fallo = args.prob_fallo if prob_fallo is None else prob_fallo
+        resultado["escenarios"][nombre] = {
+            "antes": ejecutar_antes(args.areas, prob_fallo, args.segundos_carga, 7),
+            "reintentos": ejecutar_con_reintentos(args.areas, prob_fallo, args.segundos_carga, 7, args.umbral),
+        }
+
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"{args.areas} áreas, carga exitosa de {args.segundos_carga} s, fallo por intento en degradado: {args.prob_fallo}")
+        print(f"{'escenario':10} {'variante':11} {'segundos':>9} {'áreas ok':>9} {'abortadas':>10}")
+        for nombre, variantes in resultado["escenarios"].items():
+            for variante, datos in variantes.items():
+                print(f"{nombre:10} {variante:11} {datos['segundos']:9.1f} {datos['areas_ok']:9} {datos['areas_abortadas']:10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+# bench_resumen_matriculas.py
+
+"""
+Resumen de matrículas del enrolled_job: costo de acumularlo durante la carga de chunks y
+consultas analíticas sobre registro_matriculas_1 frente a resumen_matriculas.
+
+Se carga un CSV sintético de --filas matrículas con cargar_csv_en_bd() (acumulando el
+resumen), se actualizan las tablas de resumen con titulados_carrera de ejemplo y se miden las
+consultas. Que el resumen sea igual a un GROUP BY sobre la tabla cruda se verifica en
+tests/test_resumen_matriculas.py.
+
+Uso:
+    python benchmarks/bench_resumen_matriculas.py [--filas 10000] [--db-url URL] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import datos_sinteticos  # noqa: E402
+from comun import configurar_logging, crear_engine, limpiar_tablas  # noqa: E402
+
+# Preguntas típicas de los dashboards, sobre la tabla cruda y sobre el resumen
+CONSULTAS = {
+    "por_area_y_region": (
+        "SELECT area_carrera_generica, region_sede, COUNT(*) FROM registro_matriculas_1 "
+        "WHERE year = :anno GROUP BY area_carrera_generica, region_sede",
+        "SELECT area_carrera_generica, region_sede, SUM(cantidad) FROM resumen_matriculas "
+        "WHERE anno = :anno GROUP BY area_carrera_generica, region_sede",
+    ),
+    "por_genero_y_tipo_institucion": (
+        "SELECT gen_alu, tipo_instituto, COUNT(*) FROM registro_matriculas_1 "
+        "WHERE year = :anno GROUP BY gen_alu, tipo_instituto",
+        "SELECT gen_alu, tipo_instituto, SUM(cantidad) FROM resumen_matriculas "
+        "WHERE anno = :anno GROUP BY gen_alu, tipo_instituto",
+    ),
+}
+
+
+def medir(funcion, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del resumen de matrículas.")
+    parser.add_argument("--filas", type=int, default=10000)
+    parser.add_argument("--db-url", help="URL de SQLAlchemy de la base de prueba (por defecto SQLite temporal).")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, text
+    from enrolled_job.matriculados_automatizacion import matriculados_linux as job
+    from graduated_job import main_linux as graduados
+    from jobs_common import metricas
+
+    anno = 2023
+    with tempfile.TemporaryDirectory() as tmp:
+        configurar_logging(tmp)
+        ruta_csv = datos_sinteticos.generar_matriculas_csv(os.path.join(tmp, "matriculas_2023.csv"), args.filas, anno)
+        engine = crear_engine(args.db_url, tmp)
+
+        metadata = MetaData()
+        tipos = {"year": Integer, "preprocessed_at": DateTime, "processed_at": DateTime}
+        Table(
+            "registro_matriculas_1", metadata,
+            Column("id_registro", Integer, primary_key=True, autoincrement=True),
+            *[Column(columna, tipos.get(columna, String(255))) for columna in job.COLUMNAS_DESTINO],
+        )
+        limpiar_tablas(engine, metadata)
+        job.definir_tablas_resumen()
+        limpiar_tablas(engine, job.tabla_resumen_matriculas.metadata)
+
+        # Titulados de la mitad de las carreras genéricas
+        graduados.inicializar_bd(engine)
+        limpiar_tablas(engine, graduados.Base.metadata)
+        with engine.begin() as connection:
+            for i, area in enumerate(datos_sinteticos.AREAS[::2], start=1):
+                connection.execute(text("INSERT INTO carreras (id, nombre, tipo) VALUES (:id, :nombre, 'Profesional')"),
+                                   {"id": i, "nombre": area})
+                connection.execute(text(
+                    "INSERT INTO titulados_carrera (id_carrera, cantidad_titulados, fecha_ejecucion, anno) "
+                    "VALUES (:id, :cantidad, :fecha, :anno)"
+                ), {"id": i, "cantidad": 100 * i, "fecha": datetime.now(), "anno": anno})
+
+        metricas.iniciar("benchmark")
+        columnas = job.get_table_columns(engine, "registro_matriculas_1")
+        conteos = Counter()
+        inicio = time.perf_counter()
+        filas = job.cargar_csv_en_bd(ruta_csv, engine, "registro_matriculas_1", columnas, anno, datetime.now(),
+                                     conteos=conteos)
+        segundos_carga = time.perf_counter() - inicio
+        segundos_acumular = metricas.actual().etapas["agregacion"]["segundos"]
+        inicio = time.perf_counter()
+        job.actualizar_resumenes(engine, anno, conteos)
+        segundos_actualizar = time.perf_counter() - inicio
+
+        resultados = {}
+        with engine.connect() as connection:
+            for nombre, (cruda, resumen) in CONSULTAS.items():
+                segundos_cruda, _ = medir(lambda: sorted(map(tuple, connection.execute(text(cruda), {"anno": anno}))))
+                segundos_resumen, _ = medir(lambda: sorted(map(tuple, connection.execute(text(resumen), {"anno": anno}))))
+                resultados[nombre] = {
+                    "cruda_ms": round(segundos_cruda * 1000, 3),
+                    "resumen_ms": round(segundos_resumen * 1000, 3),
+                    "aceleracion": round(segundos_cruda / segundos_resumen, 1),
+                }
+            titulados = connection.execute(text(
+                "SELECT COUNT(*), COUNT(titulados), SUM(matriculados) FROM resumen_matriculas_titulados WHERE anno = :anno"
+            ), {"anno": anno}).one()
+            filas_resumen = connection.execute(text("SELECT COUNT(*) FROM resumen_matriculas")).scalar()
+
+        graduados.session.close()
+        for metadata_prueba in (metadata, job.tabla_resumen_matriculas.metadata, graduados.Base.metadata):
+            metadata_prueba.drop_all(engine)
+        engine.dispose()
+
+    resultado = {
+        "filas": filas,
+        "filas_resumen": filas_resumen,
+        "carreras_con_titulados": f"{titulados[1]}/{titulados[0]}",
+        "segundos_carga": round(segundos_carga, 3),
+        "segundos_acumular_resumen": round(segundos_acumular, 3),
+        "porcentaje_carga_en_resumen": round(100 * segundos_acumular / segundos_carga, 2),
+        "segundos_actualizar_resumen": round(segundos_actualizar, 3),
+        "consultas": resultados,
+    }
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"{filas} matrículas -> {filas_resumen} filas de resumen "
+              f"({resultado['carreras_con_titulados']} carreras con titulados)")
+        print(f"Carga: {resultado['segundos_carga']} s, de los cuales acumular el resumen: "
+              f"{resultado['segundos_acumular_resumen']} s ({resultado['porcentaje_carga_en_resumen']} %); "
+              f"actualizar tablas de resumen: {resultado['segundos_actualizar_resumen']} s")
+        for nombre, datos in resultados.items():
+            print(f"  {nombre:32s} {datos['cruda_ms']:9.3f} ms -> {datos['resumen_ms']:8.3f} ms  (x{datos['aceleracion']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# bench_resumen_mensual.py
+
+"""
+Serie mensual de salarios por área: agregación sobre el historial (laborum_areas_links_2)
+frente a la lectura de laborum_area_monthly, y costo de mantener el resumen en cada ejecución.
+
+Se genera un historial sintético de --areas áreas x --ejecuciones ejecuciones (cada 6 horas)
+en un SQLite temporal (o en --db-url), crear_tablas() completa el resumen desde el historial
+y guardar_en_bd() simula una ejecución más, que recalcula solo el mes de cada área. Que el
+resumen incremental sea igual a recalcularlo completo se verifica en tests/test_resumen_mensual.py.
+
+Uso:
+    python benchmarks/bench_resumen_mensual.py [--areas 40] [--ejecuciones 2000] [--db-url URL] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comun import configurar_logging, crear_engine, limpiar_tablas  # noqa: E402
+
+# Lo que hacía la API en cada request: min/max/muestras por mes sobre las filas crudas
+CONSULTA_HISTORIAL = """
+    SELECT month, MIN(salario_promedio), MAX(salario_promedio), COUNT(*)
+    FROM laborum_areas_links_2 WHERE area_id = :id GROUP BY month
+"""
+CONSULTA_RESUMEN = """
+    SELECT month, salario_ultimo, salario_min, salario_max, muestras, variacion_salario
+    FROM laborum_area_monthly WHERE area_id = :id ORDER BY month
+"""
+
+
+def medir(funcion, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del resumen mensual de áreas de Laborum.")
+    parser.add_argument("--areas", type=int, default=40)
+    parser.add_argument("--ejecuciones", type=int, default=2000, help="Ejecuciones históricas por área.")
+    parser.add_argument("--db-url", help="URL de SQLAlchemy de la base de prueba (por defecto SQLite temporal).")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    from sqlalchemy import func, insert, select, text
+    from laborum_areas_job import areas_scrapper_v2 as areas
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configurar_logging(tmp)
+        engine = crear_engine(args.db_url, tmp)
+        areas.inicializar_bd(engine)
+        limpiar_tablas(engine, areas.Base.metadata)
+        areas.LaborumAreaMonthly.__table__.drop(engine)
+        areas.LaborumAreaLatestLink.__table__.drop(engine)
+
+        inicio = datetime(2020, 1, 1)
+        with engine.begin() as connection:
+            connection.execute(insert(areas.LaborumArea.__table__),
+                               [{"id": i, "nombre_area": f"Área {i}"} for i in range(1, args.areas + 1)])
+            for ejecucion in range(args.ejecuciones):
+                momento = inicio + timedelta(hours=6 * ejecucion)
+                connection.execute(insert(areas.LaborumAreaLink.__table__), [{
+                    "area_id": i,
+                    "salario_promedio": 800000 + i * 1000 + (ejecucion * 7919) % 5000,
+                    "salarios_basados": 100 + i,
+                    "link_area": f"https://www.laborum.cl/salarios/area-{i}",
+                    "executed_at": momento,
+                    "month": momento.date(),
+                } for i in range(1, args.areas + 1)])
+
+        segundos_completo, _ = medir(areas.crear_tablas, repeticiones=1)
+        datos = [{"nombre_area": f"Área {i}", "salario_promedio": 1, "salarios_basados": 1}
+                 for i in range(1, args.areas + 1)]
+        segundos_incremental, _ = medir(lambda: areas.guardar_en_bd(datos, engine, areas.session), repeticiones=1)
+
+        with engine.connect() as connection:
+            filas_resumen = connection.execute(select(func.count()).select_from(areas.LaborumAreaMonthly.__table__)).scalar()
+
+        ids = range(1, args.areas + 1)
+        with engine.connect() as connection:
+            historial, _ = medir(lambda: [connection.execute(text(CONSULTA_HISTORIAL), {"id": i}).all() for i in ids])
+            lectura, _ = medir(lambda: [connection.execute(text(CONSULTA_RESUMEN), {"id": i}).all() for i in ids])
+
+        areas.session.close()
+        limpiar_tablas(engine, areas.Base.metadata)
+        engine.dispose()
+
+    resultado = {
+        "filas_historial": args.areas * args.ejecuciones,
+        "filas_resumen": filas_resumen,
+        "ms_por_area_historial": round(historial / args.areas * 1000, 3),
+        "ms_por_area_resumen": round(lectura / args.areas * 1000, 3),
+        "aceleracion": round(historial / lectura, 1),
+        "segundos_resumen_completo": round(segundos_completo, 3),
+        "segundos_guardar_en_bd_incremental": round(segundos_incremental, 3),
+    }
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"Historial: {resultado['filas_historial']} filas; resumen: {resultado['filas_resumen']} filas")
+        print(f"Serie por área desde el historial: {resultado['ms_por_area_historial']:8.3f} ms")
+        print(f"Serie por área desde el resumen:   {resultado['ms_por_area_resumen']:8.3f} ms")
+        print(f"aceleración: x{resultado['aceleracion']}")
+        print(f"Resumen completo al crear la tabla: {resultado['segundos_resumen_completo']} s; "
+              f"guardar_en_bd con resumen incremental: {resultado['segundos_guardar_en_bd_incremental']} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
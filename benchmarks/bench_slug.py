@@ -0,0 +1,91 @@
+# bench_slug.py
+
+"""
+Slug de los nombres de áreas de Laborum: función reemplazar() anterior de los scrapers
+(diez re.sub por vocal acentuada y tres más) frente a jobs_common.slug.slugificar().
+
+Se mide cada función sobre el corpus de tests/fixtures/nombres_areas_laborum.json (nombres
+reales con tildes, ñ, ü, comas y " / "), con y sin memoización, y se listan los nombres que la
+función anterior convertía mal. Que slugificar() dé el slug de cada nombre del corpus se
+verifica en tests/test_slug.py.
+
+Uso:
+    python benchmarks/bench_slug.py [--repeticiones 2000] [--json]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comun import RAIZ_REPO  # noqa: E402
+
+
+def reemplazar_anterior(texto):
+    """
+    Copia de reemplazar() de areas_scrapper_v2.py antes de usar jobs_common.slug.
+    """
+    acentos = {
+        'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ú': 'u',
+        'Á': 'A', 'É': 'E', 'Í': 'I', 'Ó': 'O', 'Ú': 'U'
+    }
+    for acentuada, simple in acentos.items():
+        texto = re.sub(acentuada, simple, texto)
+    texto = re.sub(r',', '', texto)
+    texto = re.sub(r'\s+', '-', texto)
+    texto = re.sub(r'-/-', '-', texto)
+    return texto.lower()
+
+
+def medir(funcion, nombres, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for nombre in nombres:
+            funcion(nombre)
+    return (time.perf_counter() - inicio) / (repeticiones * len(nombres)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del slug de nombres de áreas de Laborum.")
+    parser.add_argument("--repeticiones", type=int, default=2000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    from jobs_common.slug import slugificar
+
+    with open(os.path.join(RAIZ_REPO, "tests", "fixtures", "nombres_areas_laborum.json"), encoding="utf-8") as f:
+        corpus = json.load(f)
+    nombres = [entrada["nombre"] for entrada in corpus]
+
+    anteriores_mal = [
+        f"{entrada['nombre']} -> {reemplazar_anterior(entrada['nombre'])}"
+        for entrada in corpus if reemplazar_anterior(entrada["nombre"]) != entrada["slug"]
+    ]
+
+    slugificar.cache_clear()
+    resultado = {
+        "nombres": len(nombres),
+        "mal_convertidos_por_reemplazar_anterior": anteriores_mal,
+        "us_por_nombre_anterior": round(medir(reemplazar_anterior, nombres, args.repeticiones), 3),
+        "us_por_nombre_sin_memoizar": round(medir(slugificar.__wrapped__, nombres, args.repeticiones), 3),
+        "us_por_nombre_memoizado": round(medir(slugificar, nombres, args.repeticiones), 3),
+    }
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"Corpus: {resultado['nombres']} nombres")
+        print(f"reemplazar() anterior convertía mal {len(anteriores_mal)}:")
+        for linea in anteriores_mal:
+            print(f"    {linea}")
+        print(f"reemplazar() anterior:    {resultado['us_por_nombre_anterior']:7.3f} µs/nombre")
+        print(f"slugificar sin memoizar:  {resultado['us_por_nombre_sin_memoizar']:7.3f} µs/nombre")
+        print(f"slugificar memoizado:     {resultado['us_por_nombre_memoizado']:7.3f} µs/nombre")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
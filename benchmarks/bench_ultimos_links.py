@@ -0,0 +1,107 @@
+# bench_ultimos_links.py
+
+"""
+Lectura de los últimos links por área: consulta con ROW_NUMBER() sobre todo el historial
+(laborum_areas_links_2) frente a la tabla laborum_area_latest_link que mantiene el job de áreas.
+
+Se genera un historial sintético de --areas áreas x --ejecuciones ejecuciones en un SQLite
+temporal (o en --db-url), se crea laborum_area_latest_link con crear_tablas() (que la completa
+desde el historial) y se simula una ejecución más con guardar_en_bd() antes de medir. Que ambas
+consultas retornen lo mismo se verifica en tests/test_laborum_areas.py.
+
+Uso:
+    python benchmarks/bench_ultimos_links.py [--areas 40] [--ejecuciones 5000] [--db-url URL] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comun import configurar_logging, crear_engine, limpiar_tablas  # noqa: E402
+
+
+def medir(funcion, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la lectura de últimos links por área.")
+    parser.add_argument("--areas", type=int, default=40)
+    parser.add_argument("--ejecuciones", type=int, default=5000, help="Ejecuciones históricas por área.")
+    parser.add_argument("--db-url", help="URL de SQLAlchemy de la base de prueba (por defecto SQLite temporal).")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    import pandas as pd
+    from sqlalchemy import insert
+    from laborum_areas_job import areas_scrapper_v2 as areas
+    from laborum_subareas_job import subareas_scrapper_v2 as subareas
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configurar_logging(tmp)
+        engine = crear_engine(args.db_url, tmp)
+        areas.inicializar_bd(engine)
+        limpiar_tablas(engine, areas.Base.metadata)
+        areas.LaborumAreaLatestLink.__table__.drop(engine)
+
+        # Historial sintético: una fila por área por ejecución
+        inicio = datetime(2020, 1, 1)
+        with engine.begin() as connection:
+            connection.execute(insert(areas.LaborumArea.__table__),
+                               [{"id": i, "nombre_area": f"Área {i}"} for i in range(1, args.areas + 1)])
+            for ejecucion in range(args.ejecuciones):
+                momento = inicio + timedelta(hours=6 * ejecucion)
+                connection.execute(insert(areas.LaborumAreaLink.__table__), [{
+                    "area_id": i,
+                    "salario_promedio": 800000 + i * 1000 + ejecucion,
+                    "salarios_basados": 100 + i,
+                    "link_area": f"https://www.laborum.cl/salarios/area-{i}?v={ejecucion}",
+                    "executed_at": momento,
+                    "month": momento.date(),
+                } for i in range(1, args.areas + 1)])
+
+        # Crea y completa laborum_area_latest_link; luego una ejecución más la actualiza
+        areas.crear_tablas()
+        areas.guardar_en_bd(
+            [{"nombre_area": f"Área {i}", "salario_promedio": 1, "salarios_basados": 1} for i in range(1, args.areas + 1, 2)],
+            engine, areas.session,
+        )
+
+        subareas.inicializar_bd(engine)
+        historial = lambda: pd.read_sql(subareas.CONSULTA_ULTIMOS_LINKS_HISTORIAL, engine)  # noqa: E731
+        tabla = lambda: pd.read_sql(subareas.CONSULTA_ULTIMOS_LINKS, engine)  # noqa: E731
+
+        segundos_historial, _ = medir(historial)
+        segundos_tabla, _ = medir(tabla)
+
+    resultado = {
+        "areas": args.areas,
+        "filas_historial": args.areas * args.ejecuciones,
+        "ms_historial": round(segundos_historial * 1000, 2),
+        "ms_tabla_ultimos": round(segundos_tabla * 1000, 2),
+        "aceleracion": round(segundos_historial / segundos_tabla, 1),
+    }
+    if args.json:
+        print(json.dumps(resultado, indent=2))
+    else:
+        print(f"{resultado['filas_historial']} filas de historial, {args.areas} áreas")
+        print(f"ROW_NUMBER() sobre el historial: {resultado['ms_historial']:>9} ms")
+        print(f"laborum_area_latest_link:        {resultado['ms_tabla_ultimos']:>9} ms")
+        print(f"aceleración: x{resultado['aceleracion']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
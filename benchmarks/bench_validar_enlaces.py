@@ -0,0 +1,92 @@
+# bench_validar_enlaces.py
+
+"""
+Validación HTTP de los enlaces de áreas antes de abrir el navegador (jobs_common.enlaces).
+
+Un servidor local responde 200 a /salarios/ok-N y 404 a /salarios/muerto-N, con
+--latencia-ms de espera por respuesta para simular la red hasta Laborum. Se validan --links
+enlaces (--fraccion-muertos de ellos muertos) en serie y en paralelo; qué enlaces se dan por
+muertos se verifica en tests/test_enlaces.py. Sin la validación cada enlace muerto costaba un goto del
+navegador de hasta 60 s (más 60 s de networkidle).
+
+Uso:
+    python benchmarks/bench_validar_enlaces.py [--links 40] [--fraccion-muertos 0.25]
+                                              [--latencia-ms 80] [--concurrencia 16] [--json]
+"""
+
+import argparse
+import http.server
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import comun  # noqa: E402,F401  (agrega la raíz del repositorio a sys.path)
+
+
+def servidor(latencia):
+    class Manejador(http.server.BaseHTTPRequestHandler):
+        def _responder(self, cuerpo):
+            time.sleep(latencia)
+            codigo = 200 if "/ok-" in self.path else 404
+            self.send_response(codigo)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            if cuerpo:
+                self.wfile.write(b"ok")
+
+        def do_HEAD(self):
+            self._responder(False)
+
+        def do_GET(self):
+            self._responder(True)
+
+        def log_message(self, *args):
+            pass
+
+    instancia = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+    threading.Thread(target=instancia.serve_forever, daemon=True).start()
+    return instancia
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la validación de enlaces antes del navegador.")
+    parser.add_argument("--links", type=int, default=40)
+    parser.add_argument("--fraccion-muertos", type=float, default=0.25)
+    parser.add_argument("--latencia-ms", type=float, default=80)
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    from jobs_common import enlaces
+
+    instancia = servidor(args.latencia_ms / 1000)
+    base = f"http://127.0.0.1:{instancia.server_address[1]}/salarios"
+    muertos = int(args.links * args.fraccion_muertos)
+    urls = [f"{base}/muerto-{i}" if i < muertos else f"{base}/ok-{i}" for i in range(args.links)]
+
+    resultado = {"links": args.links, "muertos": muertos, "latencia_ms": args.latencia_ms}
+    try:
+        for nombre, concurrencia in (("serie", 1), ("paralelo", args.concurrencia)):
+            inicio = time.perf_counter()
+            enlaces.validar_enlaces(urls, concurrencia=concurrencia)
+            resultado[f"segundos_{nombre}"] = round(time.perf_counter() - inicio, 3)
+    finally:
+        instancia.shutdown()
+        instancia.server_close()
+
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"{args.links} enlaces ({muertos} muertos), latencia {args.latencia_ms} ms")
+        print(f"  en serie:    {resultado['segundos_serie']:.3f} s")
+        print(f"  en paralelo: {resultado['segundos_paralelo']:.3f} s (concurrencia {args.concurrencia})")
+        print(f"  antes: hasta {muertos * 120} s de timeouts del navegador para los enlaces muertos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# comun.py
+
+"""
+Utilidades compartidas por los benchmarks offline: motor de base de datos de prueba,
+conteo de sentencias SQL, memoria pico y un servidor HTTP local para los snapshots HTML.
+"""
+
+import contextlib
+import functools
+import http.server
+import os
+import resource
+import sys
+import threading
+
+RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ_REPO not in sys.path:
+    sys.path.insert(0, RAIZ_REPO)
+
+DIRECTORIO_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def crear_engine(db_url, directorio_tmp):
+    """
+    Crea el motor de la base de datos de prueba. Sin db_url se usa un archivo SQLite nuevo
+    en directorio_tmp; con db_url (por ejemplo una MariaDB en docker) se usa esa base.
+    """
+    from sqlalchemy import create_engine
+
+    if not db_url:
+        db_url = f"sqlite:///{os.path.join(directorio_tmp, 'benchmark.db')}"
+    return create_engine(db_url)
+
+
+def limpiar_tablas(engine, metadata):
+    """
+    Elimina y vuelve a crear las tablas del benchmark para partir siempre de una base vacía.
+    """
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+
+class ContadorSentencias:
+    """
+    Cuenta las sentencias SQL que un engine envía a la base de datos (executemany cuenta 1).
+    """
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.total = 0
+        self.engine = engine
+        self._event = event
+        event.listen(engine, "before_cursor_execute", self._contar)
+
+    def _contar(self, *args, **kwargs):
+        self.total += 1
+
+    def reiniciar(self):
+        self.total = 0
+
+    def cerrar(self):
+        self._event.remove(self.engine, "before_cursor_execute", self._contar)
+
+
+def rss_pico_mb():
+    """
+    Memoria residente pico del proceso actual en MB (ru_maxrss está en KB en Linux).
+    """
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def configurar_logging(directorio_tmp):
+    """
+    Configura el logging igual que en producción (jobs_common.logs), pero solo hacia un
+    archivo para no ensuciar la salida del benchmark.
+    """
+    from jobs_common import logs
+
+    logs.configurar_logging("benchmark", directorio_tmp, "benchmark.log", consola=False)
+
+
+class _ManejadorSilencioso(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def servidor_local(directorio):
+    """
+    Sirve `directorio` por HTTP en un puerto libre de localhost y retorna la URL base.
+    """
+    manejador = functools.partial(_ManejadorSilencioso, directory=directorio)
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), manejador)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    try:
+        yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def chromium_disponible():
+    """
+    Retorna (True, None) si Playwright puede lanzar Chromium, o (False, motivo) si no.
+    """
+    try:
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            browser.close()
+        return True, None
+    except Exception as e:
+        return False, str(e).strip().splitlines()[0][:200]
@@ -0,0 +1,305 @@
+# datos_sinteticos.py
+
+"""
+Generadores de datos sintéticos para los benchmarks offline. Todo es determinista
+(semilla fija) para que dos ejecuciones midan exactamente el mismo trabajo.
+
+- CSV de titulados con el formato de mineduc (separador ';', columna area_carrera_generica_n
+  y una fracción de filas mal formateadas).
+- CSV de matrículas con los nombres de columna originales (las claves de MATRICULAS_RENAME).
+- RAR del CSV, solo si hay un binario `rar` en el PATH.
+- Snapshots HTML de Laborum con la misma estructura que recorren los XPath de los scrapers,
+  y el feed JSON que la página pide con fetch() (lo que descubre jobs_common.feed).
+- Respuestas de SerpAPI (google_news) con news_results.
+
+Uso:
+    python benchmarks/datos_sinteticos.py --salida /tmp/datos [--filas 100000] [--cards 30] [--noticias 500]
+"""
+
+import argparse
+import csv
+import html
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SEMILLA = 2024
+
+AREAS = [
+    "Administración de Empresas", "Ingeniería Comercial", "Contabilidad y Auditoría",
+    "Ingeniería Civil Industrial", "Ingeniería Civil Informática", "Derecho", "Psicología",
+    "Enfermería", "Medicina", "Odontología", "Kinesiología", "Pedagogía en Educación Básica",
+    "Pedagogía en Inglés", "Arquitectura", "Diseño Gráfico", "Periodismo", "Trabajo Social",
+    "Agronomía", "Técnico en Enfermería", "Técnico en Administración", "Analista Programador",
+    "Técnico en Construcción", "Técnico en Mecánica Automotriz", "Gastronomía",
+    "Técnico en Párvulos", "Ingeniería en Minas", "Geología", "Química y Farmacia",
+    "Nutrición y Dietética", "Tecnología Médica", "Comunicación Audiovisual", "Ingeniería Acuícola",
+]
+
+TIPOS_INSTITUCION = ("Universidades", "Institutos Profesionales", "Centros de Formación Técnica")
+
+REGIONES = [
+    "Región Metropolitana", "Región de Valparaíso", "Región del Biobío", "Región de La Araucanía",
+    "Región de Los Lagos", "Región de Antofagasta", "Región de Ñuble", "Región de Coquimbo",
+]
+
+COLUMNAS_TITULADOS = [
+    "cat_periodo", "codigo_unico", "mrun", "gen_alu", "rango_edad", "tipo_inst_1", "nomb_inst",
+    "nomb_sede", "nomb_carrera", "region_sede", "area_carrera_generica_n", "nivel_carrera_2",
+]
+
+
+def _aleatorio():
+    return random.Random(SEMILLA)
+
+
+def generar_titulados_csv(ruta, filas, anno=2023, fraccion_mal_formateadas=0.001):
+    """
+    Escribe un CSV de titulados con `filas` registros; una fracción tiene una columna extra
+    para ejercitar la detección de filas mal formateadas de process_csv.
+    """
+    rnd = _aleatorio()
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f, delimiter=";")
+        escritor.writerow(COLUMNAS_TITULADOS)
+        for i in range(filas):
+            area = rnd.choice(AREAS)
+            fila = [
+                anno, f"I{rnd.randint(1, 150)}S{rnd.randint(1, 20)}C{rnd.randint(1, 300)}", 100000 + i,
+                rnd.choice(("1", "2")), rnd.choice(("15 a 19 años", "20 a 24 años", "25 a 29 años", "30 a 34 años")),
+                rnd.choice(("Universidades", "Institutos Profesionales", "Centros de Formación Técnica")),
+                f"Institución {rnd.randint(1, 150)}", f"Sede {rnd.randint(1, 20)}", area.upper(),
+                rnd.choice(REGIONES), area, rnd.choice(("Pregrado", "Posgrado", "Postítulo")),
+            ]
+            if rnd.random() < fraccion_mal_formateadas:
+                fila.append("columna extra")
+            escritor.writerow(fila)
+    return ruta
+
+
+def generar_matriculas_csv(ruta, filas, anno=2023):
+    """
+    Escribe un CSV de matrículas con las columnas originales de mineduc.
+    """
+    from enrolled_job.matriculados_automatizacion.matriculados_linux import MATRICULAS_RENAME
+
+    rnd = _aleatorio()
+    columnas = list(MATRICULAS_RENAME)
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f, delimiter=";")
+        escritor.writerow(columnas)
+        for i in range(filas):
+            area = rnd.choice(AREAS)
+            valores = {
+                "cat_periodo": anno,
+                "id": i + 1,
+                "mrun": 200000 + i,
+                "gen_alu": rnd.choice(("1", "2")),
+                "tipo_inst_1": rnd.choice(TIPOS_INSTITUCION),
+                "fec_nac_alu": f"{rnd.randint(1970, 2006)}{rnd.randint(1, 12):02d}",
+                "nomb_inst": f"Institución {rnd.randint(1, 150)}",
+                "nomb_carrera": area.upper(),
+                "region_sede": rnd.choice(REGIONES),
+                "area_carrera_generica": area,
+                "valor_matricula": rnd.randint(100000, 400000),
+                "valor_arancel": rnd.randint(1000000, 7000000),
+            }
+            escritor.writerow([valores.get(columna, f"{columna[:6]}{rnd.randint(1, 40)}") for columna in columnas])
+    return ruta
+
+
+def generar_rar(ruta_csv, ruta_rar):
+    """
+    Comprime el CSV en un .rar con el binario `rar`. Retorna la ruta o None si no está instalado.
+    """
+    rar = shutil.which("rar")
+    if rar is None:
+        return None
+    subprocess.run([rar, "a", "-ep", "-idq", ruta_rar, ruta_csv], check=True)
+    return ruta_rar
+
+
+def _salario(valor):
+    return f"$ {valor:,}".replace(",", ".")
+
+
+def _pedir_feed(ruta_feed):
+    # Como la aplicación React: los datos llegan por fetch() después de cargar el HTML
+    return f'<script>fetch("{ruta_feed}").then(function (r) {{ return r.json(); }});</script>'
+
+
+def filas_areas(cards):
+    """
+    Datos de la página de áreas: lista de {"slug", "nombre", "salario", "n"}.
+    """
+    rnd = _aleatorio()
+    filas = []
+    for i in range(cards):
+        nombre = AREAS[i % len(AREAS)] if i < len(AREAS) else f"{AREAS[i % len(AREAS)]} {i}"
+        salario = rnd.randint(450, 3500) * 1000
+        filas.append({"slug": i, "nombre": nombre, "salario": salario, "n": rnd.randint(5, 5000)})
+    return filas
+
+
+def filas_subareas(subcards, area=0):
+    """
+    Datos de la página de un área: lista de {"nombre", "salario", "n"}.
+    """
+    rnd = random.Random(SEMILLA + area)
+    filas = []
+    for i in range(subcards):
+        salario = rnd.randint(450, 3500) * 1000
+        filas.append({"nombre": f"Subárea {area}-{i}", "salario": salario, "n": rnd.randint(5, 900)})
+    return filas
+
+
+def generar_html_areas(cards, ruta_feed=None):
+    """
+    Página de áreas: cada card vive en //*[@id="root"]/div/div[3]/div/div/div/div y contiene
+    el nombre (clase dkXIm), "Media salarial" + valor y "Basado en N salarios".
+    """
+    tarjetas = []
+    for fila in filas_areas(cards):
+        tarjetas.append(
+            '<div><a href="/salarios/{slug}"><div class="sc-dkXIm">{nombre}</div></a>'
+            '<div><div>Media salarial</div><div>{salario}</div></div>'
+            '<div>Basado en {n} salarios</div></div>'.format(
+                slug=fila["slug"], nombre=html.escape(fila["nombre"]), salario=_salario(fila["salario"]), n=fila["n"]
+            )
+        )
+    return (
+        '<!DOCTYPE html><html lang="es"><head><meta charset="utf-8"><title>Salarios</title></head><body>'
+        '<header>Laborum</header><div id="root"><div><div>nav</div><div>filtros</div>'
+        '<div><div><div><div>' + "".join(tarjetas) + '</div></div></div></div>'
+        '</div></div>' + (_pedir_feed(ruta_feed) if ruta_feed else '') + '</body></html>'
+    )
+
+
+def generar_html_subareas(subcards, area=0, ruta_feed=None):
+    """
+    Página de un área: cada subcard vive en //*[@id="root"]/div/div[2]/div/div/div con el
+    nombre en ./div/div[1], el salario en ./div/div[2]/div/div[2] y la cantidad en ./div/div[2]/div/div[3].
+    """
+    tarjetas = []
+    for fila in filas_subareas(subcards, area):
+        tarjetas.append(
+            '<div><div><div>{nombre}</div><div><div><div>Media salarial</div><div>{salario}</div>'
+            '<div>Basado en {n} salarios</div></div></div></div></div>'.format(
+                nombre=html.escape(fila["nombre"]), salario=_salario(fila["salario"]), n=fila["n"]
+            )
+        )
+    return (
+        '<!DOCTYPE html><html lang="es"><head><meta charset="utf-8"><title>Subáreas</title></head><body>'
+        '<header>Laborum</header><div id="root"><div><div>nav</div>'
+        '<div><div><div>' + "".join(tarjetas) + '</div></div></div>'
+        '</div></div>' + (_pedir_feed(ruta_feed) if ruta_feed else '') + '</body></html>'
+    )
+
+
+def generar_feed_areas(cards):
+    """
+    JSON que la página de áreas pide por fetch(): otra forma y otros nombres que el DOM.
+    """
+    return {
+        "meta": {"total": cards, "moneda": "CLP"},
+        "data": {"areas": [
+            {"id": fila["slug"], "name": fila["nombre"], "url": f"/salarios/{fila['slug']}",
+             "salary": {"average": fila["salario"], "samples": fila["n"]}}
+            for fila in filas_areas(cards)
+        ]},
+    }
+
+
+def generar_feed_subareas(subcards, area=0):
+    """
+    JSON que la página de un área pide por fetch().
+    """
+    return {
+        "area": area,
+        "items": [
+            {"title": fila["nombre"], "avgSalary": float(fila["salario"]), "count": str(fila["n"])}
+            for fila in filas_subareas(subcards, area)
+        ],
+    }
+
+
+def escribir_snapshots_laborum(directorio, cards, paginas_subareas, subcards):
+    """
+    Escribe salarios/index.html (áreas) y salarios/area-N/index.html (subáreas) en `directorio`,
+    con sus feeds JSON en api/salarios/. Retorna la lista de rutas relativas de las páginas de subáreas.
+    """
+    os.makedirs(os.path.join(directorio, "salarios"), exist_ok=True)
+    os.makedirs(os.path.join(directorio, "api", "salarios"), exist_ok=True)
+    with open(os.path.join(directorio, "salarios", "index.html"), "w", encoding="utf-8") as f:
+        f.write(generar_html_areas(cards, "/api/salarios/areas.json"))
+    with open(os.path.join(directorio, "api", "salarios", "areas.json"), "w", encoding="utf-8") as f:
+        json.dump(generar_feed_areas(cards), f, ensure_ascii=False)
+
+    rutas = []
+    for area in range(paginas_subareas):
+        relativa = f"salarios/area-{area}/"
+        os.makedirs(os.path.join(directorio, relativa), exist_ok=True)
+        with open(os.path.join(directorio, relativa, "index.html"), "w", encoding="utf-8") as f:
+            f.write(generar_html_subareas(subcards, area, f"/api/salarios/area-{area}.json"))
+        with open(os.path.join(directorio, "api", "salarios", f"area-{area}.json"), "w", encoding="utf-8") as f:
+            json.dump(generar_feed_subareas(subcards, area), f, ensure_ascii=False)
+        rutas.append(relativa)
+    return rutas
+
+
+def generar_respuesta_serpapi(noticias, prefijo="https://www.ejemplo.cl/noticias"):
+    """
+    Respuesta de google_news con `noticias` resultados y una mezcla de formatos de fecha.
+    """
+    rnd = _aleatorio()
+    fechas = ("hace 3 horas", "hace 1 día", "hace 2 semanas", "3 hours ago", "ayer", "03-02-2024",
+              "3 de marzo de 2024", "Mar 3, 2024", "hace 5 min", "la semana pasada")
+    resultados = []
+    for i in range(noticias):
+        area = rnd.choice(AREAS)
+        resultados.append({
+            "position": i + 1,
+            "title": f"{area}: nueva medición de empleabilidad ({i})",
+            "link": f"{prefijo}/{i}?utm_source=google",
+            "snippet": f"Resumen sintético de la noticia {i} sobre {area}.",
+            "date": fechas[i % len(fechas)],
+            "thumbnail": f"{prefijo}/img/{i}.jpg",
+        })
+    return {"search_metadata": {"status": "Success"}, "news_results": resultados}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera los datos sintéticos de los benchmarks.")
+    parser.add_argument("--salida", required=True, help="Directorio de salida.")
+    parser.add_argument("--filas", type=int, default=100_000, help="Filas de los CSV de titulados y matrículas.")
+    parser.add_argument("--cards", type=int, default=30, help="Cards de la página de áreas.")
+    parser.add_argument("--paginas", type=int, default=5, help="Páginas de subáreas.")
+    parser.add_argument("--subcards", type=int, default=20, help="Subcards por página de subáreas.")
+    parser.add_argument("--noticias", type=int, default=500, help="Resultados de la respuesta de SerpAPI.")
+    parser.add_argument("--rar", action="store_true", help="Comprimir además los CSV en .rar (requiere `rar`).")
+    args = parser.parse_args()
+
+    os.makedirs(args.salida, exist_ok=True)
+    titulados = generar_titulados_csv(os.path.join(args.salida, "titulados_2023.csv"), args.filas)
+    matriculas = generar_matriculas_csv(os.path.join(args.salida, "matriculas_2023.csv"), args.filas)
+    escribir_snapshots_laborum(os.path.join(args.salida, "laborum"), args.cards, args.paginas, args.subcards)
+    with open(os.path.join(args.salida, "serpapi.json"), "w", encoding="utf-8") as f:
+        json.dump(generar_respuesta_serpapi(args.noticias), f, ensure_ascii=False)
+
+    if args.rar:
+        for ruta_csv in (titulados, matriculas):
+            if generar_rar(ruta_csv, ruta_csv[:-4] + ".rar") is None:
+                print("No se encontró el binario `rar`; se omiten los .rar.", file=sys.stderr)
+                break
+
+    print(f"Datos sintéticos escritos en {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# startup_importtime.py
+
+"""
+Mide el tiempo de arranque de cada job hasta el punto en que se llama a main().
+
+Para cada punto de entrada se ejecuta un intérprete nuevo con `python -X importtime`
+que solo importa el módulo del job (sin ejecutar main()). Se reporta:
+
+- el tiempo total del proceso (arranque del intérprete + import del módulo),
+- el tiempo acumulado del import del módulo según -X importtime,
+- los imports más pesados, para detectar dependencias que vuelvan a cargarse al inicio.
+
+Uso:
+    python benchmarks/startup_importtime.py [--repeticiones 5] [--presupuesto-ms 300] [--json]
+
+Termina con código 1 si algún job supera el presupuesto.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulo importable desde la raíz del repositorio para cada punto de entrada
+JOBS = {
+    "news_job": "news_job.main",
+    "graduated_job": "graduated_job.main_linux",
+    "enrolled_job": "enrolled_job.matriculados_automatizacion.matriculados_linux",
+    "laborum_areas_job": "laborum_areas_job.areas_scrapper_v2",
+    "laborum_subareas_job": "laborum_subareas_job.subareas_scrapper_v2",
+}
+
+# Formato de cada línea: "import time:  self [us] | cumulative | imported package"
+PATRON_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def medir_import(modulo):
+    """
+    Ejecuta un intérprete nuevo que importa el módulo y retorna
+    (segundos de pared, líneas de -X importtime parseadas).
+    """
+    inicio = time.perf_counter()
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=RAIZ_REPO,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    duracion = time.perf_counter() - inicio
+    if resultado.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}: {resultado.stderr.strip()[-300:]}")
+
+    imports = []
+    for linea in resultado.stderr.splitlines():
+        match = PATRON_IMPORTTIME.match(linea)
+        if match:
+            imports.append({
+                "modulo": match.group(4),
+                "propio_us": int(match.group(1)),
+                "acumulado_us": int(match.group(2)),
+                "nivel": len(match.group(3)) // 2,
+            })
+    return duracion, imports
+
+
+def perfilar_job(nombre, modulo, repeticiones, modulos_interprete):
+    """
+    Mide un job varias veces y resume la mediana de cada métrica.
+    modulos_interprete son los módulos que el intérprete carga siempre (site, encodings...).
+    """
+    paredes = []
+    acumulados = []
+    ultimo_perfil = []
+    for _ in range(repeticiones):
+        pared, imports = medir_import(modulo)
+        paredes.append(pared)
+        propio = next((i for i in imports if i["modulo"] == modulo), None)
+        acumulados.append(propio["acumulado_us"] if propio else 0)
+        ultimo_perfil = imports
+
+    # Imports directos del módulo del job más costosos
+    mas_pesados = sorted(
+        (i for i in ultimo_perfil if i["nivel"] == 1 and i["modulo"] not in modulos_interprete),
+        key=lambda i: i["acumulado_us"],
+        reverse=True,
+    )[:8]
+
+    return {
+        "job": nombre,
+        "modulo": modulo,
+        "pared_ms": round(statistics.median(paredes) * 1000, 1),
+        "import_modulo_ms": round(statistics.median(acumulados) / 1000, 1),
+        "imports_mas_pesados": [
+            {"modulo": i["modulo"], "acumulado_ms": round(i["acumulado_us"] / 1000, 1)}
+            for i in mas_pesados
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque (-X importtime) de los jobs.")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Ejecuciones por job; se reporta la mediana.")
+    parser.add_argument("--presupuesto-ms", type=float, default=300.0, help="Tiempo máximo permitido hasta main().")
+    parser.add_argument("--json", action="store_true", help="Imprimir el resultado completo en JSON.")
+    args = parser.parse_args()
+
+    _, imports_base = medir_import("sys")
+    modulos_interprete = {i["modulo"] for i in imports_base}
+    resultados = [
+        perfilar_job(nombre, modulo, args.repeticiones, modulos_interprete)
+        for nombre, modulo in JOBS.items()
+    ]
+    excedidos = [r for r in resultados if r["pared_ms"] > args.presupuesto_ms]
+
+    if args.json:
+        print(json.dumps({"presupuesto_ms": args.presupuesto_ms, "jobs": resultados}, indent=2, ensure_ascii=False))
+    else:
+        print(f"{'job':<22} {'pared (ms)':>11} {'import (ms)':>12}  imports más pesados")
+        for r in resultados:
+            pesados = ", ".join(f"{i['modulo']}={i['acumulado_ms']}" for i in r["imports_mas_pesados"][:3])
+            print(f"{r['job']:<22} {r['pared_ms']:>11} {r['import_modulo_ms']:>12}  {pesados}")
+        print(f"Presupuesto: {args.presupuesto_ms} ms hasta main()")
+
+    if excedidos:
+        nombres = ", ".join(r["job"] for r in excedidos)
+        print(f"Jobs que superan el presupuesto: {nombres}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
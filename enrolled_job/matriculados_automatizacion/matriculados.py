@@ -1,20 +1,15 @@
 # main.py
 
 import os
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
-import rarfile
 from io import BytesIO, StringIO
-import pyunpack
-from patoolib import extract_archive
-from sqlalchemy import create_engine, text
-import pandas as pd
 import tempfile
 import subprocess
-from dotenv import load_dotenv
 import logging
 
+# Heavy dependencies are imported inside main() so that loading the module is
+# instant and has no side effects.
+
 def setup_logging():
     """
     Configures the logging system.
@@ -41,6 +36,15 @@ def main():
     setup_logging()
     logging.info("Script main.py started.")
 
+    import requests
+    from bs4 import BeautifulSoup
+    import rarfile
+    import pyunpack
+    from patoolib import extract_archive
+    from sqlalchemy import create_engine, text
+    import pandas as pd
+    from dotenv import load_dotenv
+
     try:
         # Load environment variables from .env file
         load_dotenv()
@@ -1,42 +1,39 @@
 # main_optimized.py
 
 import os
-import requests
-from bs4 import BeautifulSoup
+import sys
+from collections import Counter
 from datetime import datetime
 import subprocess
-from sqlalchemy import create_engine, text, inspect
-from sqlalchemy.exc import SQLAlchemyError  # Importar excepción específica
-import pandas as pd
 import tempfile
-from dotenv import load_dotenv
 import logging
 
+# jobs_common vive en la raíz del repositorio
+RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if RAIZ_REPO not in sys.path:
+    sys.path.insert(0, RAIZ_REPO)
+
+from jobs_common import logs, metricas
+
+# requests, BeautifulSoup, pandas, SQLAlchemy y dotenv se importan dentro de las funciones
+# para que cargar el módulo sea inmediato y no tenga efectos secundarios.
+
 def setup_logging():
     """
     Configura el sistema de logging.
     """
     log_directory = "/home/ubuntu/Vocational_Insight_Jobs/logs"
     log_filename = "enrolled_job_logs.log"
-    log_path = os.path.join(log_directory, log_filename)
-
-    # Crear directorio de logs si no existe
-    os.makedirs(log_directory, exist_ok=True)
-
-    # Configuración básica de logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(message)s",
-        handlers=[
-            logging.FileHandler(log_path),
-            logging.StreamHandler()  # Opcional: también loguear en consola
-        ]
-    )
+
+    # JSON por línea, escritura en segundo plano y rotación por tamaño (ver jobs_common/logs.py)
+    logs.configurar_logging("enrolled_job", log_directory, log_filename)
 
 def get_table_columns(engine, table_name):
     """
     Obtiene la lista de columnas existentes en una tabla de la base de datos.
     """
+    from sqlalchemy import inspect
+
     inspector = inspect(engine)
     try:
         columns_info = inspector.get_columns(table_name)
@@ -48,11 +45,295 @@ def get_table_columns(engine, table_name):
         logging.error(f"Fallo al obtener columnas de la tabla '{table_name}': {error_message}")
         return []
 
-def main():
+# Diccionario para renombrar columnas
+MATRICULAS_RENAME = {
+    "cat_periodo": "periodo",
+    "id": "id_matricula",
+    "codigo_unico": "codigo_unico",
+    "mrun": "mrun",
+    "gen_alu": "gen_alu",
+    "fec_nac_alu": "fec_nac_alumno",
+    "rango_edad": "rango_edad",
+    "anio_ing_carr_ori": "anio_ing_carr_ori",
+    "sem_ing_carr_ori": "sem_ing_carr_ori",
+    "anio_ing_carr_act": "anio_ing_carr_act",
+    "sem_ing_carr_act": "sem_ing_carr_act",
+    "tipo_inst_1": "tipo_instituto",
+    "tipo_inst_2": "tipo_inst_2",
+    "tipo_inst_3": "tipo_inst_3",
+    "cod_inst": "cod_institucion",
+    "nomb_inst": "institución",
+    "cod_sede": "cod_sede",
+    "nomb_sede": "nombre_sede",
+    "cod_carrera": "cod_carrera",
+    "nomb_carrera": "carrera",
+    "modalidad": "modalidad",
+    "jornada": "jornada",
+    "version": "version",
+    "tipo_plan_carr": "tipo_plan_carr",
+    "dur_estudio_carr": "dur_egreso_carrera",
+    "dur_proceso_tit": "dur_titulacion",
+    "dur_total_carr": "dur_carrera",
+    "region_sede": "region_sede",
+    "provincia_sede": "provincia_sede",
+    "comuna_sede": "comuna_sede",
+    "nivel_global": "grado_academico",
+    "nivel_carrera_1": "nivel_carrera_det",
+    "nivel_carrera_2": "nivel_carrera",
+    "requisito_ingreso": "requisito_ingreso",
+    "vigencia_carrera": "vigencia_carrera",
+    "formato_valores": "formato_valores",
+    "valor_matricula": "valor_matricula",
+    "valor_arancel": "valor_mensualidad",
+    "codigo_demre": "codigo_demre",
+    "area_conocimiento": "area_conocimiento",
+    "cine_f_97_area": "area_carrera",
+    "cine_f_97_subarea": "subarea_carrera",
+    "area_carrera_generica": "area_carrera_generica",
+    "cine_f_13_area": "area_profesion",
+    "cine_f_13_subarea": "subarea_carrera_2",
+    "acreditada_carr": "acreditación_carrera",
+    "acreditada_inst": "acreditación_institucion",
+    "acre_inst_desde_hasta": "acre_inst_desde_hasta",
+    "acre_inst_anio": "año_acreditacion",
+    "costo_proceso_titulacion": "costo_p_titulacion",
+    "costo_obtencion_titulo_diploma": "costo_diploma",
+    "forma_ingreso": "forma_ingreso"
+}
+
+# Columnas de destino en la tabla de matrículas (después de renombrar)
+COLUMNAS_DESTINO = [
+    'periodo', 'id_matricula', 'codigo_unico', 'mrun', 'gen_alu', 'fec_nac_alumno', 
+    'rango_edad', 'anio_ing_carr_ori', 'sem_ing_carr_ori', 'anio_ing_carr_act',
+    'sem_ing_carr_act', 'tipo_instituto', 'tipo_inst_2', 'tipo_inst_3', 'cod_institucion', 
+    'institución', 'cod_sede', 'nombre_sede', 'cod_carrera', 'carrera', 'modalidad', 'jornada', 'version',
+    'tipo_plan_carr', 'dur_egreso_carrera', 'dur_titulacion', 'dur_carrera', 'region_sede', 'provincia_sede', 
+    'comuna_sede', 'grado_academico', 'nivel_carrera_det', 'nivel_carrera', 'requisito_ingreso', 'vigencia_carrera', 
+    'formato_valores', 'valor_matricula', 'valor_mensualidad', 'codigo_demre', 'area_conocimiento', 'area_carrera', 
+    'subarea_carrera', 'area_carrera_generica', 'area_profesion', 'subarea_carrera_2', 'acreditación_carrera', 
+    'acreditación_institucion', 'acre_inst_desde_hasta', 'año_acreditacion', 'costo_p_titulacion', 'costo_diploma',
+    'forma_ingreso', 'year', 'preprocessed_at', 'processed_at'
+]
+
+# Dimensiones del resumen de matrículas (nombres después de renombrar). La tabla de resumen
+# tiene una fila por año y combinación de dimensiones con la cantidad de matrículas.
+DIMENSIONES_RESUMEN = ['area_carrera_generica', 'region_sede', 'gen_alu', 'tipo_instituto']
+
+# Tablas de resumen (se definen en definir_tablas_resumen, con SQLAlchemy importado de forma diferida)
+tabla_resumen_matriculas = None
+tabla_resumen_titulados = None
+
+def definir_tablas_resumen():
+    """
+    Define las tablas de resumen:
+    - resumen_matriculas: (anno, area_carrera_generica, region_sede, gen_alu, tipo_instituto) -> cantidad
+    - resumen_matriculas_titulados: (anno, area_carrera_generica) -> matriculados y titulados del
+      mismo año (de titulados_carrera, que carga el graduated_job)
+    """
+    global tabla_resumen_matriculas, tabla_resumen_titulados
+    if tabla_resumen_matriculas is not None:
+        return
+
+    from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table
+
+    metadata = MetaData()
+    tabla_resumen_matriculas = Table(
+        'resumen_matriculas', metadata,
+        Column('id', Integer, primary_key=True, autoincrement=True),
+        Column('anno', Integer, nullable=False),
+        Column('area_carrera_generica', String(255)),
+        Column('region_sede', String(100)),
+        Column('gen_alu', String(10)),
+        Column('tipo_instituto', String(100)),
+        Column('cantidad', Integer, nullable=False),
+        Column('actualizado_at', DateTime, nullable=False),
+        Index('ix_resumen_matriculas_anno_area', 'anno', 'area_carrera_generica'),
+    )
+    tabla_resumen_titulados = Table(
+        'resumen_matriculas_titulados', metadata,
+        Column('id', Integer, primary_key=True, autoincrement=True),
+        Column('anno', Integer, nullable=False),
+        Column('area_carrera_generica', String(255)),
+        Column('matriculados', Integer, nullable=False),
+        Column('titulados', Integer, nullable=True),
+        Column('actualizado_at', DateTime, nullable=False),
+        Index('ix_resumen_matriculas_titulados_anno_area', 'anno', 'area_carrera_generica'),
+    )
+
+def acumular_resumen(chunk, conteos):
+    """
+    Suma al Counter `conteos` las matrículas del chunk (ya renombrado) por combinación de
+    DIMENSIONES_RESUMEN. Los valores vacíos quedan como None.
+    """
+    import pandas as pd
+
+    dimensiones = chunk.reindex(columns=DIMENSIONES_RESUMEN)
+    for clave, cantidad in dimensiones.groupby(DIMENSIONES_RESUMEN, dropna=False, sort=False).size().items():
+        conteos[tuple(None if pd.isna(valor) else valor for valor in clave)] += int(cantidad)
+
+def titulados_por_area(connection, year):
+    """
+    Titulados del año por carrera genérica, desde titulados_carrera y carreras. Si una carrera
+    tiene varias cargas para el año se usa la última. Retorna {} si las tablas no existen.
+    """
+    from sqlalchemy import inspect, text
+
+    inspector = inspect(connection)
+    if not (inspector.has_table('titulados_carrera') and inspector.has_table('carreras')):
+        return {}
+    consulta = text("""
+        SELECT c.nombre, t.cantidad_titulados
+        FROM titulados_carrera t
+        JOIN carreras c ON c.id = t.id_carrera
+        WHERE t.anno = :anno
+          AND t.id = (SELECT MAX(t2.id) FROM titulados_carrera t2
+                      WHERE t2.id_carrera = t.id_carrera AND t2.anno = t.anno)
+    """)
+    return dict(connection.execute(consulta, {"anno": year}).all())
+
+def actualizar_resumenes(engine, year, conteos):
+    """
+    Reemplaza las filas del año `year` en las tablas de resumen con los conteos acumulados
+    durante la carga, en una sola transacción. Los demás años no se tocan.
+    """
+    definir_tablas_resumen()
+    tabla_resumen_matriculas.metadata.create_all(engine, checkfirst=True)
+
+    actualizado_at = datetime.now()
+    filas = [
+        dict(zip(DIMENSIONES_RESUMEN, clave), anno=year, cantidad=cantidad, actualizado_at=actualizado_at)
+        for clave, cantidad in conteos.items()
+    ]
+    matriculados = Counter()
+    for clave, cantidad in conteos.items():
+        matriculados[clave[0]] += cantidad
+
+    with metricas.etapa("agregacion"), engine.begin() as connection:
+        titulados = titulados_por_area(connection, year)
+        connection.execute(tabla_resumen_matriculas.delete().where(tabla_resumen_matriculas.c.anno == year))
+        connection.execute(tabla_resumen_titulados.delete().where(tabla_resumen_titulados.c.anno == year))
+        if filas:
+            connection.execute(tabla_resumen_matriculas.insert(), filas)
+            connection.execute(tabla_resumen_titulados.insert(), [
+                {"anno": year, "area_carrera_generica": area, "matriculados": cantidad,
+                 "titulados": titulados.get(area), "actualizado_at": actualizado_at}
+                for area, cantidad in matriculados.items()
+            ])
+    logging.info(
+        f"Resumen de matrículas {year} actualizado: {len(filas)} combinaciones, {len(matriculados)} carreras genéricas "
+        f"({sum(1 for area in matriculados if area in titulados)} con titulados)."
+    )
+
+def extract_data():
+    """
+    Extrae enlaces de archivos .rar de la página especificada, identifica el año,
+    y retorna una lista de diccionarios con la información extraída.
+    """
+    import requests
+    from bs4 import BeautifulSoup
+
+    url = "https://datosabiertos.mineduc.cl/matricula-en-educacion-superior/"
+    try:
+        response = requests.get(url, timeout=30)
+        logging.info(f"Accediendo a la URL: {url}")
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Fallo en la petición HTTP: {e}")
+        return []
+
+    data = []
+
+    soup = BeautifulSoup(response.content, "html.parser")
+    links = soup.find_all('a', href=True)
+    logging.info(f"Se encontraron {len(links)} enlaces en la página.")
+
+    for link in links:
+        href = link['href']
+        if href.endswith('.rar'):
+            # Extraer el año del nombre del archivo .rar
+            year = ''.join(filter(str.isdigit, href))
+            if len(year) >= 4:
+                year = int(year[:4])  # Tomar los primeros 4 dígitos como año
+                data.append({
+                    'year': year,
+                    'url': href,
+                    'preprocessed_at': datetime.now()
+                })
+
+    logging.info(f"Se encontraron {len(data)} archivos .rar para procesar.")
+    return data
+
+def cargar_csv_en_bd(csv_file_path, engine, target_table, table_columns, year, preprocessed_at, chunksize=2000,
+                     conteos=None):
+    """
+    Lee el CSV de matrículas en chunks, renombra y filtra las columnas, e inserta cada chunk
+    en la tabla de destino. Retorna la cantidad de filas insertadas.
+    Si se entrega un Counter en `conteos`, se le suman las matrículas de cada chunk insertado
+    por DIMENSIONES_RESUMEN (ver acumular_resumen), sin volver a leer la tabla.
+    """
+    import pandas as pd
+    from sqlalchemy.exc import SQLAlchemyError
+
+    # Filtrar las columnas que realmente existen en la tabla
+    existing_columns = [col for col in COLUMNAS_DESTINO if col in table_columns]
+    missing_columns = set(COLUMNAS_DESTINO) - set(existing_columns)
+    if missing_columns:
+        logging.warning(f"Faltan columnas en la tabla '{target_table}': {', '.join(missing_columns)}")
+
+    filas_insertadas = 0
+    chunks_insertados = 0
+    # Leer y procesar el CSV en chunks; la lectura de cada chunk cuenta como parseo
+    lector = pd.read_csv(csv_file_path, sep=';', encoding='utf-8', chunksize=chunksize, dtype=str)
+    while True:
+        with metricas.etapa("parseo"):
+            chunk = next(lector, None)
+            if chunk is None:
+                break
+
+            # Añadir columnas adicionales
+            chunk['year'] = year
+            chunk['preprocessed_at'] = preprocessed_at
+            chunk['processed_at'] = datetime.now()
+
+            # Renombrar columnas
+            chunk.rename(columns=MATRICULAS_RENAME, inplace=True)
+
+            df2 = chunk[existing_columns]
+        metricas.sumar("filas_parseadas", len(df2))
+
+        # Insertar el chunk en la base de datos
+        try:
+            with metricas.etapa("carga_bd"):
+                df2.to_sql(target_table, con=engine, if_exists='append', index=False, method='multi', chunksize=500)
+            filas_insertadas += len(df2)
+            metricas.sumar("filas_insertadas", len(df2))
+            chunks_insertados += 1
+            if conteos is not None:
+                with metricas.etapa("agregacion"):
+                    acumular_resumen(chunk, conteos)
+            logging.debug("Chunk de tamaño %s insertado exitosamente en la base de datos.", len(df2))
+        except SQLAlchemyError as e:
+            # Registrar solo el mensaje de error sin las filas
+            error_message = str(e)[:300]
+            logging.error(f"Fallo al insertar chunk en la base de datos: {error_message}")
+    logging.info(f"{filas_insertadas} filas insertadas en '{target_table}' en {chunks_insertados} chunks.")
+    return filas_insertadas
+
+def main(engine_externo=None):
+    """
+    engine_externo permite al orquestador compartir su pool de conexiones; si no se entrega,
+    el engine se crea con las variables de entorno DB_*.
+    """
     # Configurar logging
     setup_logging()
+    metricas.iniciar("enrolled_job")
     logging.info("Script main_optimized.py iniciado.")
 
+    import requests
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.exc import SQLAlchemyError  # Importar excepción específica
+    from dotenv import load_dotenv
+
     try:
         # Cargar variables de entorno desde .env
         load_dotenv()
@@ -66,18 +347,21 @@ def main():
         DB_NAME = os.getenv("DB_NAME")
         WINRAR_PATH = os.getenv("WINRAR_PATH", "C:\\Program Files\\WinRAR\\WinRAR.exe")
 
-        # Verificar que todas las variables de entorno necesarias estén presentes
-        if not all([DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME]):
-            logging.error("Faltan variables de entorno requeridas para la configuración de la base de datos.")
-            return
+        if engine_externo is not None:
+            engine = engine_externo
+        else:
+            # Verificar que todas las variables de entorno necesarias estén presentes
+            if not all([DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME]):
+                logging.error("Faltan variables de entorno requeridas para la configuración de la base de datos.")
+                return
 
-        # Definir el URI de conexión a MariaDB
-        DB_URI = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-        logging.info("URI de conexión a la base de datos construido.")
+            # Definir el URI de conexión a MariaDB
+            DB_URI = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+            logging.info("URI de conexión a la base de datos construido.")
 
-        # Crear el engine de la base de datos
-        engine = create_engine(DB_URI)
-        logging.info("Engine de la base de datos creado exitosamente.")
+            # Crear el engine de la base de datos
+            engine = create_engine(DB_URI)
+            logging.info("Engine de la base de datos creado exitosamente.")
 
         # Obtener las columnas existentes en la tabla de destino
         target_table = 'registro_matriculas_1'
@@ -86,98 +370,6 @@ def main():
             logging.error(f"No se pudo obtener las columnas de la tabla '{target_table}'. Abortando el script.")
             return
 
-        # Diccionario para renombrar columnas
-        matriculas_rename = {
-            "cat_periodo": "periodo",
-            "id": "id_matricula",
-            "codigo_unico": "codigo_unico",
-            "mrun": "mrun",
-            "gen_alu": "gen_alu",
-            "fec_nac_alu": "fec_nac_alumno",
-            "rango_edad": "rango_edad",
-            "anio_ing_carr_ori": "anio_ing_carr_ori",
-            "sem_ing_carr_ori": "sem_ing_carr_ori",
-            "anio_ing_carr_act": "anio_ing_carr_act",
-            "sem_ing_carr_act": "sem_ing_carr_act",
-            "tipo_inst_1": "tipo_instituto",
-            "tipo_inst_2": "tipo_inst_2",
-            "tipo_inst_3": "tipo_inst_3",
-            "cod_inst": "cod_institucion",
-            "nomb_inst": "institución",
-            "cod_sede": "cod_sede",
-            "nomb_sede": "nombre_sede",
-            "cod_carrera": "cod_carrera",
-            "nomb_carrera": "carrera",
-            "modalidad": "modalidad",
-            "jornada": "jornada",
-            "version": "version",
-            "tipo_plan_carr": "tipo_plan_carr",
-            "dur_estudio_carr": "dur_egreso_carrera",
-            "dur_proceso_tit": "dur_titulacion",
-            "dur_total_carr": "dur_carrera",
-            "region_sede": "region_sede",
-            "provincia_sede": "provincia_sede",
-            "comuna_sede": "comuna_sede",
-            "nivel_global": "grado_academico",
-            "nivel_carrera_1": "nivel_carrera_det",
-            "nivel_carrera_2": "nivel_carrera",
-            "requisito_ingreso": "requisito_ingreso",
-            "vigencia_carrera": "vigencia_carrera",
-            "formato_valores": "formato_valores",
-            "valor_matricula": "valor_matricula",
-            "valor_arancel": "valor_mensualidad",
-            "codigo_demre": "codigo_demre",
-            "area_conocimiento": "area_conocimiento",
-            "cine_f_97_area": "area_carrera",
-            "cine_f_97_subarea": "subarea_carrera",
-            "area_carrera_generica": "area_carrera_generica",
-            "cine_f_13_area": "area_profesion",
-            "cine_f_13_subarea": "subarea_carrera_2",
-            "acreditada_carr": "acreditación_carrera",
-            "acreditada_inst": "acreditación_institucion",
-            "acre_inst_desde_hasta": "acre_inst_desde_hasta",
-            "acre_inst_anio": "año_acreditacion",
-            "costo_proceso_titulacion": "costo_p_titulacion",
-            "costo_obtencion_titulo_diploma": "costo_diploma",
-            "forma_ingreso": "forma_ingreso"
-        }
-
-        def extract_data():
-            """
-            Extrae enlaces de archivos .rar de la página especificada, identifica el año,
-            y retorna una lista de diccionarios con la información extraída.
-            """
-            url = "https://datosabiertos.mineduc.cl/matricula-en-educacion-superior/"
-            try:
-                response = requests.get(url, timeout=30)
-                logging.info(f"Accediendo a la URL: {url}")
-                response.raise_for_status()
-            except requests.exceptions.RequestException as e:
-                logging.error(f"Fallo en la petición HTTP: {e}")
-                return []
-
-            data = []
-
-            soup = BeautifulSoup(response.content, "html.parser")
-            links = soup.find_all('a', href=True)
-            logging.info(f"Se encontraron {len(links)} enlaces en la página.")
-
-            for link in links:
-                href = link['href']
-                if href.endswith('.rar'):
-                    # Extraer el año del nombre del archivo .rar
-                    year = ''.join(filter(str.isdigit, href))
-                    if len(year) >= 4:
-                        year = int(year[:4])  # Tomar los primeros 4 dígitos como año
-                        data.append({
-                            'year': year,
-                            'url': href,
-                            'preprocessed_at': datetime.now()
-                        })
-
-            logging.info(f"Se encontraron {len(data)} archivos .rar para procesar.")
-            return data
-
         # Extraer datos
         data = extract_data()
 
@@ -194,12 +386,13 @@ def main():
 
             # Descargar el archivo .rar
             try:
-                with requests.get(url, stream=True, timeout=60) as response:
+                with metricas.etapa("descarga"), requests.get(url, stream=True, timeout=60) as response:
                     response.raise_for_status()
                     with tempfile.NamedTemporaryFile(delete=False, suffix='.rar') as tmp_rar:
                         for chunk in response.iter_content(chunk_size=8192):
                             if chunk:
                                 tmp_rar.write(chunk)
+                                metricas.sumar("bytes_descargados", len(chunk))
                 rar_file_path = tmp_rar.name
                 logging.info(f"Descargado y guardado archivo temporal {rar_file_path}.")
             except requests.exceptions.RequestException as e:
@@ -218,8 +411,9 @@ def main():
                         os.remove(rar_file_path)
                         continue
 
-                    subprocess.run([WINRAR_PATH, 'x', '-y', rar_file_path, extract_dir],
-                                   check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                    with metricas.etapa("extraccion"):
+                        subprocess.run([WINRAR_PATH, 'x', '-y', rar_file_path, extract_dir],
+                                       check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
                     logging.info(f"Archivo {rar_file_path} descomprimido exitosamente en {extract_dir}.")
                 except subprocess.CalledProcessError as e:
                     error_message = e.stderr.decode().strip()[:300]
@@ -266,55 +460,24 @@ def main():
                     else:
                         logging.info(f"Procesando nuevo archivo: {csv_files[0]}")
 
-                # Procesar el archivo CSV en chunks
+                # Procesar el archivo CSV en chunks, acumulando el resumen del año en la misma pasada
+                conteos = Counter()
                 try:
-                    # Leer y procesar el CSV en chunks
-                    chunksize = 2000  # Puedes ajustar este valor según tus necesidades
-                    for chunk in pd.read_csv(csv_file_path, sep=';', encoding='utf-8', chunksize=chunksize, dtype=str):
-                        # Añadir columnas adicionales
-                        chunk['year'] = year
-                        chunk['preprocessed_at'] = item["preprocessed_at"]
-                        chunk['processed_at'] = datetime.now()
-
-                        # Renombrar columnas
-                        chunk.rename(columns=matriculas_rename, inplace=True)
-
-                        # Seleccionar las columnas necesarias que existen en la tabla
-                        desired_columns = [
-                            'periodo', 'id_matricula', 'codigo_unico', 'mrun', 'gen_alu', 'fec_nac_alumno', 
-                            'rango_edad', 'anio_ing_carr_ori', 'sem_ing_carr_ori', 'anio_ing_carr_act',
-                            'sem_ing_carr_act', 'tipo_instituto', 'tipo_inst_2', 'tipo_inst_3', 'cod_institucion', 
-                            'institución', 'cod_sede', 'nombre_sede', 'cod_carrera', 'carrera', 'modalidad', 'jornada', 'version',
-                            'tipo_plan_carr', 'dur_egreso_carrera', 'dur_titulacion', 'dur_carrera', 'region_sede', 'provincia_sede', 
-                            'comuna_sede', 'grado_academico', 'nivel_carrera_det', 'nivel_carrera', 'requisito_ingreso', 'vigencia_carrera', 
-                            'formato_valores', 'valor_matricula', 'valor_mensualidad', 'codigo_demre', 'area_conocimiento', 'area_carrera', 
-                            'subarea_carrera', 'area_carrera_generica', 'area_profesion', 'subarea_carrera_2', 'acreditación_carrera', 
-                            'acreditación_institucion', 'acre_inst_desde_hasta', 'año_acreditacion', 'costo_p_titulacion', 'costo_diploma',
-                            'forma_ingreso', 'year', 'preprocessed_at', 'processed_at'
-                        ]
-
-                        # Filtrar las columnas que realmente existen en la tabla
-                        existing_columns = [col for col in desired_columns if col in table_columns]
-                        missing_columns = set(desired_columns) - set(existing_columns)
-                        if missing_columns:
-                            logging.warning(f"Faltan columnas en la tabla '{target_table}': {', '.join(missing_columns)}")
-                        
-                        df2 = chunk[existing_columns]
-
-                        # Insertar el chunk en la base de datos
-                        try:
-                            df2.to_sql(target_table, con=engine, if_exists='append', index=False, method='multi', chunksize=500)
-                            logging.info(f"Chunk de tamaño {len(df2)} insertado exitosamente en la base de datos.")
-                        except SQLAlchemyError as e:
-                            # Registrar solo el mensaje de error sin las filas
-                            error_message = str(e)[:300]
-                            logging.error(f"Fallo al insertar chunk en la base de datos: {error_message}")
+                    cargar_csv_en_bd(csv_file_path, engine, target_table, table_columns, year, item["preprocessed_at"],
+                                     conteos=conteos)
                 except Exception as e:
                     error_message = str(e)[:300]
                     logging.error(f"Fallo al procesar el archivo CSV {csv_files[0]}: {error_message}")
                     os.remove(rar_file_path)
                     continue
 
+                # Un fallo del resumen no impide registrar el archivo: las filas ya están cargadas
+                try:
+                    actualizar_resumenes(engine, year, conteos)
+                except Exception as e:
+                    error_message = str(e)[:300]
+                    logging.error(f"Fallo al actualizar el resumen de matrículas {year}: {error_message}")
+
                 # Registrar el archivo procesado en jobs_log
                 with engine.begin() as connection:
                     exec_date = datetime.now()
@@ -345,6 +508,8 @@ def main():
         # Registrar solo los primeros 300 caracteres del error crítico
         error_message = str(e)[:300]
         logging.critical(f"Error crítico en el script: {error_message}", exc_info=False)
+    finally:
+        metricas.emitir_resumen()
 
     logging.info("Script main_optimized.py finalizó su ejecución.")
 
@@ -3,18 +3,21 @@
 import os
 import re
 import logging
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
-import pandas as pd
 import subprocess
-from dotenv import load_dotenv
 import shutil
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, inspect
-from sqlalchemy.orm import sessionmaker, declarative_base
+import sys
 
-# Cargar variables de entorno desde el archivo .env
-load_dotenv()
+# jobs_common vive en la raíz del repositorio
+RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ_REPO not in sys.path:
+    sys.path.insert(0, RAIZ_REPO)
+
+from jobs_common import db, logs, metricas
+
+# Las dependencias pesadas (requests, BeautifulSoup, pandas, SQLAlchemy) se importan
+# dentro de las funciones que las usan, de modo que importar el módulo no conecta a la
+# base de datos ni crea directorios: todo ocurre a partir de main().
 
 # Configuración del logging
 def setup_logging():
@@ -23,59 +26,118 @@ def setup_logging():
     """
     log_directory = os.getenv("LOG_DIRECTORY", "logs")
     log_filename = os.getenv("LOG_FILENAME", "enrolled_job_logs.log")
-    log_path = os.path.join(log_directory, log_filename)
-
-    # Crear directorio de logs si no existe
-    os.makedirs(log_directory, exist_ok=True)
-
-    # Configuración básica de logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(message)s",
-        handlers=[
-            logging.FileHandler(log_path),
-            logging.StreamHandler()  # Opcional: también loguear en consola
-        ]
-    )
 
-# Configurar logging
-setup_logging()
-
-# Leer variables de entorno
-DB_USER = os.getenv("DB_USER")
-DB_PASS = os.getenv("DB_PASS")
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT", "3306")
-DB_NAME = os.getenv("DB_NAME")
-UNRAR_PATH = os.getenv("UNRAR_PATH")  # Renombrado para reflejar uso en Linux
-DOWNLOAD_DIR = os.getenv("DOWNLOAD_DIR", os.getcwd())
-EXTRACT_DIR = os.getenv("EXTRACT_DIR", os.path.join(DOWNLOAD_DIR, "extracted"))
-OUTPUT_CSV = os.getenv("OUTPUT_CSV", os.path.join(DOWNLOAD_DIR, "processed_data.csv"))
-
-# Configurar SQLAlchemy
-DATABASE_URI = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-engine = create_engine(DATABASE_URI)
-Session = sessionmaker(bind=engine)
-session = Session()
-Base = declarative_base()
-
-# Definir las clases ORM para carreras y titulados_carrera
-class Carrera(Base):
-    __tablename__ = 'carreras'
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    nombre = Column(String(255), unique=True, nullable=False)
-    tipo = Column(String(50), nullable=False)
-
-class TituladoCarrera(Base):
-    __tablename__ = 'titulados_carrera'
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    id_carrera = Column(Integer, ForeignKey('carreras.id'), nullable=False)
-    cantidad_titulados = Column(Integer, nullable=False)
-    fecha_ejecucion = Column(DateTime, nullable=False)
-    anno = Column(Integer, nullable=False)
+    # JSON por línea, escritura en segundo plano y rotación por tamaño (ver jobs_common/logs.py)
+    logs.configurar_logging("graduated_job", log_directory, log_filename)
+
+# Variables de entorno (se completan en cargar_configuracion())
+DB_USER = None
+DB_PASS = None
+DB_HOST = None
+DB_PORT = None
+DB_NAME = None
+UNRAR_PATH = None
+DOWNLOAD_DIR = None
+EXTRACT_DIR = None
+OUTPUT_CSV = None
+DATABASE_URI = None
+
+def cargar_configuracion():
+    """
+    Carga el archivo .env y lee las variables de entorno del job.
+    """
+    global DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME, UNRAR_PATH
+    global DOWNLOAD_DIR, EXTRACT_DIR, OUTPUT_CSV, DATABASE_URI
+    from dotenv import load_dotenv
+
+    # Cargar variables de entorno desde el archivo .env
+    load_dotenv()
+
+    # Leer variables de entorno
+    DB_USER = os.getenv("DB_USER")
+    DB_PASS = os.getenv("DB_PASS")
+    DB_HOST = os.getenv("DB_HOST")
+    DB_PORT = os.getenv("DB_PORT", "3306")
+    DB_NAME = os.getenv("DB_NAME")
+    UNRAR_PATH = os.getenv("UNRAR_PATH")  # Renombrado para reflejar uso en Linux
+    DOWNLOAD_DIR = os.getenv("DOWNLOAD_DIR", os.getcwd())
+    EXTRACT_DIR = os.getenv("EXTRACT_DIR", os.path.join(DOWNLOAD_DIR, "extracted"))
+    OUTPUT_CSV = os.getenv("OUTPUT_CSV", os.path.join(DOWNLOAD_DIR, "processed_data.csv"))
+
+    DATABASE_URI = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# Objetos de SQLAlchemy (se crean en inicializar_bd())
+engine = None
+Session = None
+session = None
+Base = None
+Carrera = None
+TituladoCarrera = None
+TituladoCarreraStaging = None
+
+def definir_modelos():
+    """
+    Define las clases ORM para carreras y titulados_carrera.
+    """
+    global Base, Carrera, TituladoCarrera, TituladoCarreraStaging
+    if Base is not None:
+        return
+
+    from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+    from sqlalchemy.orm import declarative_base
+
+    Base = declarative_base()
+
+    # Definir las clases ORM para carreras y titulados_carrera
+    class Carrera(Base):
+        __tablename__ = 'carreras'
+        id = Column(Integer, primary_key=True, autoincrement=True)
+        nombre = Column(String(255), unique=True, nullable=False)
+        tipo = Column(String(50), nullable=False)
+
+    class TituladoCarrera(Base):
+        __tablename__ = 'titulados_carrera'
+        id = Column(Integer, primary_key=True, autoincrement=True)
+        id_carrera = Column(Integer, ForeignKey('carreras.id'), nullable=False)
+        cantidad_titulados = Column(Integer, nullable=False)
+        fecha_ejecucion = Column(DateTime, nullable=False)
+        anno = Column(Integer, nullable=False)
+
+        # Una fila por carrera y año: las cargas se escriben con upsert
+        __table_args__ = (
+            UniqueConstraint('id_carrera', 'anno', name='uq_titulados_carrera_carrera_anno'),
+        )
+
+    # Tabla de paso para --reload-year: se carga completa y luego reemplaza el año en una transacción
+    class TituladoCarreraStaging(Base):
+        __tablename__ = 'titulados_carrera_staging'
+        id = Column(Integer, primary_key=True, autoincrement=True)
+        id_carrera = Column(Integer, nullable=False)
+        cantidad_titulados = Column(Integer, nullable=False)
+        fecha_ejecucion = Column(DateTime, nullable=False)
+        anno = Column(Integer, nullable=False)
+
+def inicializar_bd(engine_externo=None):
+    """
+    Configura SQLAlchemy: motor, fábrica de sesiones y sesión del job.
+    Si se entrega engine_externo se usa ese motor en lugar de crear uno nuevo.
+    """
+    global engine, Session, session
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    definir_modelos()
+    if engine_externo is not None:
+        engine = engine_externo
+    elif engine is None:
+        engine = create_engine(DATABASE_URI)
+    Session = sessionmaker(bind=engine)
+    session = Session()
 
 # Crear las tablas si no existen
 def crear_tablas():
+    from sqlalchemy import inspect
+
     inspector = inspect(engine)
     if not inspector.has_table('carreras'):
         Carrera.__table__.create(engine)
@@ -88,6 +150,56 @@ def crear_tablas():
         logging.info("Tabla 'titulados_carrera' creada exitosamente.")
     else:
         logging.info("Tabla 'titulados_carrera' ya existe.")
+        asegurar_clave_unica(inspector)
+
+    if not inspector.has_table('titulados_carrera_staging'):
+        TituladoCarreraStaging.__table__.create(engine)
+        logging.info("Tabla 'titulados_carrera_staging' creada exitosamente.")
+
+def asegurar_clave_unica(inspector):
+    """
+    Agrega la clave única (id_carrera, anno) a una tabla titulados_carrera creada antes de que
+    existiera. Antes se escribía una fila por CSV, así que un año armado con varios CSV del mismo
+    archivo tiene varias filas parciales por carrera: se funden en una (la de mayor id) con la suma
+    de sus cantidades, de modo que no se pierde ningún titulado.
+    """
+    from sqlalchemy import delete, func, select, text, update
+
+    nombre = 'uq_titulados_carrera_carrera_anno'
+    existentes = {indice['name'] for indice in inspector.get_indexes('titulados_carrera')}
+    existentes |= {restriccion['name'] for restriccion in inspector.get_unique_constraints('titulados_carrera')}
+    if nombre in existentes:
+        return
+
+    tabla = TituladoCarrera.__table__
+    fundidas_por_anno = {}
+    with engine.begin() as connection:
+        grupos = connection.execute(
+            select(tabla.c.id_carrera, tabla.c.anno, func.max(tabla.c.id),
+                   func.sum(tabla.c.cantidad_titulados), func.count())
+            .group_by(tabla.c.id_carrera, tabla.c.anno)
+            .having(func.count() > 1)
+        ).all()
+        for id_carrera, anno, id_conservado, total, filas in grupos:
+            connection.execute(
+                update(tabla).where(tabla.c.id == id_conservado).values(cantidad_titulados=total)
+            )
+            connection.execute(
+                delete(tabla).where(
+                    tabla.c.id_carrera == id_carrera,
+                    tabla.c.anno == anno,
+                    tabla.c.id != id_conservado,
+                )
+            )
+            fundidas_por_anno[anno] = fundidas_por_anno.get(anno, 0) + filas - 1
+        connection.execute(text(f"CREATE UNIQUE INDEX {nombre} ON titulados_carrera (id_carrera, anno)"))
+
+    for anno in sorted(fundidas_por_anno):
+        logging.info(f"Año {anno}: {fundidas_por_anno[anno]} filas parciales sumadas en la fila de su carrera y eliminadas.")
+    logging.info(
+        f"Clave única (id_carrera, anno) agregada a 'titulados_carrera'; "
+        f"{sum(fundidas_por_anno.values())} filas repetidas fundidas."
+    )
 
 # Obtener los años ya procesados
 def obtener_annos_existentes():
@@ -104,10 +216,13 @@ def obtener_annos_existentes():
         return set()
 
 # Descargar y procesar un archivo .rar
-def descargar_procesar_eliminar(href, anno):
+def descargar_procesar_eliminar(href, anno, recargar=False):
     """
     Descarga, extrae, procesa y elimina un archivo .rar.
+    Con recargar=True los titulados del año reemplazan a los existentes (ver reemplazar_anno).
     """
+    import requests
+
     # Descargar el archivo .rar
     file_url = href if href.startswith("http") else f"https://datosabiertos.mineduc.cl{href}"
     file_name = os.path.basename(file_url)
@@ -115,19 +230,21 @@ def descargar_procesar_eliminar(href, anno):
     
     try:
         logging.info(f"Descargando el archivo: {file_name}")
-        with requests.get(file_url, stream=True) as r:
+        with metricas.etapa("descarga"), requests.get(file_url, stream=True) as r:
             r.raise_for_status()
             with open(rar_path, 'wb') as f:
                 for chunk in r.iter_content(chunk_size=8192):
                     if chunk:  # Filtrar contenido vacío
                         f.write(chunk)
+                        metricas.sumar("bytes_descargados", len(chunk))
         logging.info(f"Archivo '{file_name}' descargado exitosamente en '{rar_path}'.")
     except requests.exceptions.RequestException as e:
         logging.error(f"Error al descargar el archivo '{file_name}': {e}")
         return False
 
     # Extraer el archivo .rar
-    extraction_success = extract_rar(rar_path, EXTRACT_DIR)
+    with metricas.etapa("extraccion"):
+        extraction_success = extract_rar(rar_path, EXTRACT_DIR)
     if not extraction_success:
         logging.error(f"No se pudo extraer el archivo '{file_name}'. Eliminando el archivo .rar.")
         try:
@@ -148,13 +265,10 @@ def descargar_procesar_eliminar(href, anno):
             logging.error(f"Error al eliminar el archivo '{rar_path}': {e}")
         return False
 
-    # Procesar cada archivo CSV encontrado
-    for csv_path in csv_paths:
-        processing_success = process_csv(csv_path, OUTPUT_CSV, anno)
-        if not processing_success:
-            logging.error(f"Hubo errores durante el procesamiento del archivo '{csv_path}'.")
-            # Decidir si continuar con otros CSVs o no
-            continue
+    # Procesar los archivos CSV encontrados: los titulados del año se escriben una sola vez
+    processing_success = process_csvs(csv_paths, OUTPUT_CSV, anno, recargar)
+    if not processing_success:
+        logging.error(f"Hubo errores durante el procesamiento de los CSV de '{file_name}'.")
 
     logging.info(f"Procesamiento completado para el archivo '{file_name}'.")
 
@@ -236,15 +350,49 @@ def find_csv(extract_dir):
         logging.warning("No se encontraron archivos .csv en el directorio de extracción.")
     return csv_files
 
-def process_csv(csv_path, output_csv, year):
+def guardar_titulados(filas):
+    """
+    Inserta o actualiza los titulados del año por (id_carrera, anno) en una sola transacción:
+    repetir una carga no duplica filas.
+    """
+    db.upsert(session, TituladoCarrera.__table__, filas, ['id_carrera', 'anno'])
+    session.commit()
+
+def reemplazar_anno(year, filas):
+    """
+    Reemplaza todos los titulados del año `year` por `filas`. Las filas se cargan primero en
+    titulados_carrera_staging; luego, en una sola transacción, se borra el año en
+    titulados_carrera y se copia desde staging. Las carreras que ya no aparecen desaparecen
+    del año, y si algo falla el año queda como estaba.
+    """
+    from sqlalchemy import delete, insert, select
+
+    staging = TituladoCarreraStaging.__table__
+    destino = TituladoCarrera.__table__
+    columnas = ['id_carrera', 'cantidad_titulados', 'fecha_ejecucion', 'anno']
+
+    session.execute(delete(staging).where(staging.c.anno == year))
+    session.execute(insert(staging), filas)
+    session.commit()
+
+    session.execute(delete(destino).where(destino.c.anno == year))
+    session.execute(insert(destino).from_select(
+        columnas, select(*[staging.c[columna] for columna in columnas]).where(staging.c.anno == year)
+    ))
+    session.execute(delete(staging).where(staging.c.anno == year))
+    session.commit()
+
+def contar_titulados(csv_path):
     """
-    Procesa el archivo CSV según las especificaciones y guarda el resultado en output_csv.
-    Agrega una nueva columna que indica si la carrera es técnica o profesional.
-    Inserta los datos en la base de datos.
+    Lee un CSV de titulados y cuenta los titulados por carrera genérica, indicando si la
+    carrera es técnica o profesional: {carrera: {'Cantidad': n, 'Tipo': tipo}}.
+    Retorna None si el archivo no se puede procesar.
     """
+    import pandas as pd
+
     if not os.path.exists(csv_path):
         logging.error(f"El archivo CSV '{csv_path}' no existe.")
-        return False
+        return None
 
     # Nombre dinámico basado en el archivo descargado
     filename = os.path.basename(csv_path)
@@ -252,11 +400,13 @@ def process_csv(csv_path, output_csv, year):
 
     # 1. Leer el archivo CSV en modo básico, evitando que pandas procese líneas problemáticas
     try:
-        df = pd.read_csv(csv_path, delimiter=';', encoding='utf-8', skip_blank_lines=False, engine='python', on_bad_lines='skip')
+        with metricas.etapa("parseo"):
+            df = pd.read_csv(csv_path, delimiter=';', encoding='utf-8', skip_blank_lines=False, engine='python', on_bad_lines='skip')
+        metricas.sumar("filas_parseadas", df.shape[0])
         logging.info(f"Archivo cargado correctamente con {df.shape[0]} filas y {df.shape[1]} columnas.")
     except Exception as e:
         logging.error(f"Error cargando el archivo: {e}")
-        return False
+        return None
 
     # 2. Verificar si hay filas completamente vacías
     filas_vacias = df.isnull().all(axis=1).sum()
@@ -272,7 +422,10 @@ def process_csv(csv_path, output_csv, year):
         for i, row in enumerate(reader, start=1):
             if len(row) != expected_columns:
                 mal_formateadas.append(i)
-                logging.warning(f"Fila {i} tiene {len(row)} columnas en lugar de {expected_columns}")
+                logging.warning(
+                    f"Fila {i} tiene {len(row)} columnas en lugar de {expected_columns}",
+                    extra={"agrupar": "fila_mal_formateada"},
+                )
 
     if mal_formateadas:
         logging.info(f"Total de filas mal formateadas: {len(mal_formateadas)}")
@@ -287,7 +440,7 @@ def process_csv(csv_path, output_csv, year):
     # Verificar si la columna 'area_carrera_generica_n' existe
     if 'area_carrera_generica_n' not in df.columns:
         logging.error(f"La columna 'area_carrera_generica_n' no existe en el archivo '{filename}'.")
-        return False
+        return None
 
     # Obtener todas las carreras únicas
     carreras_unicas = df['area_carrera_generica_n'].dropna().unique()
@@ -307,44 +460,86 @@ def process_csv(csv_path, output_csv, year):
             'Cantidad': cant_titulados,
             'Tipo': tipo_carrera
         }
-        logging.info(f"Total de titulados en {carrera}: {cant_titulados} ({tipo_carrera})")
+        logging.debug("Total de titulados en %s: %s (%s)", carrera, cant_titulados, tipo_carrera)
+    logging.info(f"Titulados contados para {len(cant_titulados_por_carrera)} carreras.")
+
+    return cant_titulados_por_carrera
+
+def process_csvs(csv_paths, output_csv, year, recargar=False):
+    """
+    Procesa los CSV de titulados de un archivo del año `year`, suma los titulados por carrera
+    de todos ellos y guarda el resultado en output_csv. Agrega una nueva columna que indica si
+    la carrera es técnica o profesional.
+    Inserta los datos en la base de datos una sola vez por año: con upsert por
+    (id_carrera, anno), o reemplazando el año completo si recargar=True. Si algún CSV no se
+    puede procesar, el año no se escribe.
+    """
+    import pandas as pd
+
+    cant_titulados_por_carrera = {}
+    for csv_path in csv_paths:
+        conteos = contar_titulados(csv_path)
+        if conteos is None:
+            logging.error(f"No se guardan los titulados de {year}: hubo errores al procesar '{csv_path}'.")
+            return False
+        for carrera, info in conteos.items():
+            acumulado = cant_titulados_por_carrera.setdefault(carrera, {'Cantidad': 0, 'Tipo': info['Tipo']})
+            acumulado['Cantidad'] += info['Cantidad']
+    if len(csv_paths) > 1:
+        logging.info(f"Titulados de {len(csv_paths)} archivos CSV sumados para {len(cant_titulados_por_carrera)} carreras.")
 
     # Insertar o actualizar las carreras en la base de datos
-    for carrera, info in cant_titulados_por_carrera.items():
+    filas_titulados = []
+    fecha_ejecucion = datetime.now()
+    with metricas.etapa("carga_bd"):
+        for carrera, info in cant_titulados_por_carrera.items():
+            try:
+                # Verificar si la carrera ya existe
+                carrera_existente = session.query(Carrera).filter_by(nombre=carrera).first()
+                if not carrera_existente:
+                    # Insertar nueva carrera
+                    nueva_carrera = Carrera(nombre=carrera, tipo=info['Tipo'])
+                    session.add(nueva_carrera)
+                    session.commit()
+                    logging.debug("Carrera '%s' insertada en la base de datos.", carrera)
+                    id_carrera = nueva_carrera.id
+                else:
+                    logging.debug("Carrera '%s' ya existe en la base de datos.", carrera)
+                    id_carrera = carrera_existente.id
+
+                filas_titulados.append({
+                    'id_carrera': id_carrera,
+                    'cantidad_titulados': info['Cantidad'],
+                    'fecha_ejecucion': fecha_ejecucion,
+                    'anno': year,
+                })
+            except Exception as e:
+                session.rollback()
+                logging.error(f"Error al insertar datos para la carrera '{carrera}': {e}")
+                continue
+
+        # El año se escribe completo o no se escribe: si faltó una carrera se reintenta en la próxima ejecución
+        if len(filas_titulados) != len(cant_titulados_por_carrera):
+            logging.error(
+                f"No se guardan los titulados de {year}: fallaron "
+                f"{len(cant_titulados_por_carrera) - len(filas_titulados)} carreras."
+            )
+            return False
+
         try:
-            # Verificar si la carrera ya existe
-            carrera_existente = session.query(Carrera).filter_by(nombre=carrera).first()
-            if not carrera_existente:
-                # Insertar nueva carrera
-                nueva_carrera = Carrera(nombre=carrera, tipo=info['Tipo'])
-                session.add(nueva_carrera)
-                session.commit()
-                logging.info(f"Carrera '{carrera}' insertada en la base de datos.")
-                id_carrera = nueva_carrera.id
+            if recargar:
+                reemplazar_anno(year, filas_titulados)
             else:
-                logging.info(f"Carrera '{carrera}' ya existe en la base de datos.")
-                id_carrera = carrera_existente.id
-
-            # Insertar en titulados_carrera
-            titulados_entry = TituladoCarrera(
-                id_carrera=id_carrera,
-                cantidad_titulados=info['Cantidad'],
-                fecha_ejecucion=datetime.now(),
-                anno=year
+                guardar_titulados(filas_titulados)
+            metricas.sumar("filas_insertadas", len(filas_titulados))
+            logging.info(
+                f"{len(filas_titulados)} filas de titulados de {year} "
+                f"{'reemplazadas' if recargar else 'guardadas'} en 'titulados_carrera'."
             )
-            session.add(titulados_entry)
         except Exception as e:
             session.rollback()
-            logging.error(f"Error al insertar datos para la carrera '{carrera}': {e}")
-            continue
-
-    try:
-        session.commit()
-        logging.info(f"Datos de titulados insertados exitosamente en 'titulados_carrera'.")
-    except Exception as e:
-        session.rollback()
-        logging.error(f"Error al insertar datos en 'titulados_carrera': {e}")
-        return False
+            logging.error(f"Error al insertar datos en 'titulados_carrera': {e}")
+            return False
 
     # Crear un DataFrame con los resultados para el CSV final
     df_resultados = pd.DataFrame([
@@ -362,11 +557,21 @@ def process_csv(csv_path, output_csv, year):
 
     return True
 
-def extract_and_download_files(annos_existentes, num_files=1):
+def process_csv(csv_path, output_csv, year, recargar=False):
+    """
+    Procesa un solo CSV de titulados (ver process_csvs).
+    """
+    return process_csvs([csv_path], output_csv, year, recargar)
+
+def extract_and_download_files(annos_existentes, num_files=1, anno_recarga=None):
     """
     Extrae los enlaces de archivos .rar de la página especificada y retorna una lista de enlaces
     que no han sido procesados previamente (basado en 'anno').
+    Con anno_recarga solo se retorna el archivo de ese año, aunque ya haya sido procesado.
     """
+    import requests
+    from bs4 import BeautifulSoup
+
     url = "https://datosabiertos.mineduc.cl/titulados-en-educacion-superior/"
     try:
         response = requests.get(url, timeout=30)
@@ -393,7 +598,11 @@ def extract_and_download_files(annos_existentes, num_files=1):
         year_match = re.search(r'(\d{4})', file_name)
         if year_match:
             anno = int(year_match.group(1))
-            if anno not in annos_existentes:
+            if anno_recarga is not None:
+                if anno == anno_recarga:
+                    rar_links_filtrados.append((href, anno))
+                    logging.info(f"RAR '{file_name}' con año {anno} será recargado.")
+            elif anno not in annos_existentes:
                 rar_links_filtrados.append((href, anno))
                 logging.info(f"RAR '{file_name}' con año {anno} será procesado.")
             else:
@@ -414,41 +623,54 @@ def extract_and_download_files(annos_existentes, num_files=1):
 
     return data
 
-def main(num_files=1):
+def main(num_files=1, reload_year=None, engine_externo=None):
     """
     Coordina la ejecución de la descarga, extracción y procesamiento de archivos .rar.
+    Con reload_year se vuelve a procesar solo ese año y sus titulados reemplazan a los existentes.
+    engine_externo permite al orquestador compartir su pool de conexiones.
     """
-    # Crear tablas si no existen
-    crear_tablas()
-
-    # Obtener los años ya procesados
-    annos_existentes = obtener_annos_existentes()
-
-    # Paso 1: Obtener los archivos .rar a procesar
-    rar_links = extract_and_download_files(annos_existentes, num_files)
-    if not rar_links:
-        logging.error("No hay archivos .rar disponibles para procesar. Terminando el script.")
-        return
-
-    # Procesar cada archivo .rar uno a la vez
-    for rar in rar_links:
-        href = rar['href']
-        anno = rar['anno']
-        logging.info(f"Inicio del procesamiento para el año {anno}.")
+    # Configurar logging, variables de entorno y base de datos
+    setup_logging()
+    metricas.iniciar("graduated_job")
+    cargar_configuracion()
+    inicializar_bd(engine_externo)
 
-        # Descargar, extraer, procesar y eliminar el archivo .rar
-        success = descargar_procesar_eliminar(href, anno)
-        if not success:
-            logging.error(f"Fallo en el procesamiento para el año {anno}. Continuando con el siguiente archivo.")
-            continue
-
-    logging.info("Todos los archivos han sido procesados.")
+    try:
+        # Crear tablas si no existen
+        crear_tablas()
+
+        # Obtener los años ya procesados
+        annos_existentes = obtener_annos_existentes()
+
+        # Paso 1: Obtener los archivos .rar a procesar
+        rar_links = extract_and_download_files(annos_existentes, num_files, reload_year)
+        if not rar_links:
+            logging.error("No hay archivos .rar disponibles para procesar. Terminando el script.")
+            return
+
+        # Procesar cada archivo .rar uno a la vez
+        for rar in rar_links:
+            href = rar['href']
+            anno = rar['anno']
+            logging.info(f"Inicio del procesamiento para el año {anno}.")
+
+            # Descargar, extraer, procesar y eliminar el archivo .rar
+            success = descargar_procesar_eliminar(href, anno, recargar=reload_year is not None)
+            if not success:
+                logging.error(f"Fallo en el procesamiento para el año {anno}. Continuando con el siguiente archivo.")
+                continue
+
+        logging.info("Todos los archivos han sido procesados.")
+    finally:
+        metricas.emitir_resumen()
 
 if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Descargar, extraer y procesar archivos .rar de datosabiertos.mineduc.cl.")
     parser.add_argument('--num-files', type=int, default=1, help='Número de archivos .rar a descargar y procesar.')
+    parser.add_argument('--reload-year', type=int, default=None,
+                        help='Vuelve a procesar el año indicado y reemplaza sus titulados en una sola transacción.')
     args = parser.parse_args()
 
-    main(num_files=args.num_files)
\ No newline at end of file
+    main(num_files=args.num_files, reload_year=args.reload_year)
\ No newline at end of file
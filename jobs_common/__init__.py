@@ -0,0 +1,6 @@
+"""
+Utilidades compartidas por los jobs de Vocational Insight.
+
+Los jobs importan este paquete desde la raíz del repositorio; en las imágenes Docker
+se copia junto al script del job.
+"""
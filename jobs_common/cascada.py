@@ -0,0 +1,205 @@
+# cascada.py
+
+"""
+Cascada de red por página de Playwright: tiempos y tamaño de cada solicitud, para saber qué
+recurso de Laborum hace lenta una carga cuando el scraping se degrada (hasta ahora solo quedaba
+"Timeout al cargar la página").
+
+Con NAVEGADOR_CASCADA=true, Cascada(page, url) escucha los eventos requestfinished y
+requestfailed de la página y, por solicitud, guarda el tipo de recurso, el estado, los bytes
+recibidos y las fases de request.timing:
+
+- dns_ms: resolución del nombre,
+- conexion_ms: conexión TCP (incluye TLS) y tls_ms: la parte TLS,
+- ttfb_ms: desde que se envía la solicitud hasta el primer byte de la respuesta,
+- descarga_ms: desde el primer hasta el último byte,
+- total_ms: desde que la página pide el recurso hasta el último byte.
+
+Las fases que no ocurrieron (conexión reutilizada, caché) quedan en None. Al cerrarse la página
+se escribe un resumen compacto (solicitudes, fallidas, bytes por tipo, tiempo hasta el selector
+marcado con marcar_selector() y las NAVEGADOR_CASCADA_TOP solicitudes más lentas) en el log y
+como una línea de cascadas.jsonl en NAVEGADOR_CASCADA_DIR (por defecto <LOG_DIRECTORY>/red).
+Con NAVEGADOR_HAR=true además se escribe un HAR 1.2 por página (sin cabeceras ni contenido)
+que se abre en las DevTools de Chromium o en cualquier visor de HAR.
+
+Sin NAVEGADOR_CASCADA la clase no escucha nada y sus métodos no hacen nada.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+ACTIVA = os.getenv("NAVEGADOR_CASCADA", "False").lower() == "true"
+HAR = os.getenv("NAVEGADOR_HAR", "False").lower() == "true"
+DIRECTORIO = os.getenv("NAVEGADOR_CASCADA_DIR") or os.path.join(os.getenv("LOG_DIRECTORY", "/app/logs"), "red")
+TOP = int(os.getenv("NAVEGADOR_CASCADA_TOP", "5"))
+
+_lock_archivo = threading.Lock()
+
+
+def _fase(desde, hasta):
+    if desde is None or hasta is None or desde < 0 or hasta < 0:
+        return None
+    return round(hasta - desde, 1)
+
+
+def fases(timing):
+    """
+    Fases en milisegundos a partir de request.timing de Playwright (valores relativos a
+    startTime, -1 si no ocurrieron).
+    """
+    return {
+        "dns_ms": _fase(timing.get("domainLookupStart"), timing.get("domainLookupEnd")),
+        "conexion_ms": _fase(timing.get("connectStart"), timing.get("connectEnd")),
+        "tls_ms": _fase(timing.get("secureConnectionStart"), timing.get("connectEnd")),
+        "ttfb_ms": _fase(timing.get("requestStart"), timing.get("responseStart")),
+        "descarga_ms": _fase(timing.get("responseStart"), timing.get("responseEnd")),
+        "total_ms": _fase(0, timing.get("responseEnd")),
+    }
+
+
+class Cascada:
+    """
+    Solicitudes de una página y su resumen. `pagina` es la URL (o nombre) con que se reporta.
+    """
+    def __init__(self, page, pagina, activa=None):
+        self.pagina = pagina
+        self.activa = ACTIVA if activa is None else activa
+        self.solicitudes = []
+        self.inicio = time.time()
+        self.selector_ms = None
+        self.elementos = None
+        self._escrita = False
+        if self.activa and page is not None:
+            page.on("requestfinished", self._terminada)
+            page.on("requestfailed", self._fallida)
+            page.on("close", lambda _: self.escribir())
+
+    def _terminada(self, request):
+        self._registrar(request)
+
+    def _fallida(self, request):
+        self._registrar(request, request.failure or "fallida")
+
+    def _registrar(self, request, error=None):
+        timing = request.timing or {}
+        try:
+            tamanos = request.sizes()
+            recibidos = tamanos.get("responseBodySize", 0) + tamanos.get("responseHeadersSize", 0)
+        except Exception:
+            recibidos = None
+        try:
+            respuesta = request.response()
+            estado = respuesta.status if respuesta is not None else None
+        except Exception:
+            estado = None
+        self.solicitudes.append({
+            "url": request.url,
+            "metodo": request.method,
+            "tipo": request.resource_type,
+            "estado": estado,
+            "bytes": recibidos,
+            "inicio": timing.get("startTime"),
+            "error": error,
+            **fases(timing),
+        })
+
+    def marcar_selector(self, elementos=None):
+        """
+        Registra que el selector de los datos ya respondió (tiempo desde que se creó la Cascada).
+        """
+        if self.activa:
+            self.selector_ms = round((time.time() - self.inicio) * 1000)
+            self.elementos = elementos
+
+    def resumen(self, top=None):
+        top = TOP if top is None else top
+        por_tipo = {}
+        for solicitud in self.solicitudes:
+            tipo = por_tipo.setdefault(solicitud["tipo"], {"solicitudes": 0, "bytes": 0})
+            tipo["solicitudes"] += 1
+            tipo["bytes"] += solicitud["bytes"] or 0
+        lentas = sorted(self.solicitudes, key=lambda solicitud: solicitud["total_ms"] or 0, reverse=True)[:top]
+        return {
+            "pagina": self.pagina,
+            "inicio": datetime.fromtimestamp(self.inicio).isoformat(timespec="seconds"),
+            "solicitudes": len(self.solicitudes),
+            "fallidas": sum(1 for solicitud in self.solicitudes if solicitud["error"]),
+            "bytes": sum(tipo["bytes"] for tipo in por_tipo.values()),
+            "por_tipo": por_tipo,
+            "selector_ms": self.selector_ms,
+            "elementos": self.elementos,
+            "mas_lentas": [
+                {clave: solicitud[clave] for clave in ("url", "tipo", "estado", "bytes", "total_ms", "dns_ms",
+                                                       "conexion_ms", "ttfb_ms", "descarga_ms", "error")}
+                for solicitud in lentas
+            ],
+        }
+
+    def har(self):
+        """
+        HAR 1.2 mínimo de la página: tiempos y tamaños, sin cabeceras ni contenido.
+        """
+        entradas = []
+        for solicitud in self.solicitudes:
+            inicio = solicitud["inicio"] / 1000 if solicitud["inicio"] else self.inicio
+            espera = solicitud["ttfb_ms"]
+            entradas.append({
+                "startedDateTime": datetime.fromtimestamp(inicio, timezone.utc).isoformat(timespec="milliseconds"),
+                "time": solicitud["total_ms"] if solicitud["total_ms"] is not None else 0,
+                "request": {"method": solicitud["metodo"], "url": solicitud["url"], "httpVersion": "",
+                            "cookies": [], "headers": [], "queryString": [], "headersSize": -1, "bodySize": -1},
+                "response": {"status": solicitud["estado"] or 0, "statusText": solicitud["error"] or "",
+                             "httpVersion": "", "cookies": [], "headers": [], "redirectURL": "",
+                             "content": {"size": solicitud["bytes"] if solicitud["bytes"] is not None else -1,
+                                         "mimeType": ""},
+                             "headersSize": -1, "bodySize": solicitud["bytes"] if solicitud["bytes"] is not None else -1},
+                "cache": {},
+                "timings": {
+                    "blocked": -1,
+                    "dns": solicitud["dns_ms"] if solicitud["dns_ms"] is not None else -1,
+                    "connect": solicitud["conexion_ms"] if solicitud["conexion_ms"] is not None else -1,
+                    "ssl": solicitud["tls_ms"] if solicitud["tls_ms"] is not None else -1,
+                    "send": 0,
+                    "wait": espera if espera is not None else -1,
+                    "receive": solicitud["descarga_ms"] if solicitud["descarga_ms"] is not None else -1,
+                },
+                "_resourceType": solicitud["tipo"],
+            })
+        return {"log": {"version": "1.2", "creator": {"name": "vocational_insight_jobs", "version": "1"},
+                        "pages": [], "entries": entradas}}
+
+    def escribir(self, directorio=None, har=None):
+        """
+        Registra el resumen en el log y lo agrega a cascadas.jsonl; con `har` escribe también el
+        HAR de la página. Solo la primera llamada escribe. Retorna el resumen.
+        """
+        if not self.activa or self._escrita:
+            return None
+        self._escrita = True
+        directorio = DIRECTORIO if directorio is None else directorio
+        har = HAR if har is None else har
+        resumen = self.resumen()
+        lentas = ", ".join(f"{solicitud['tipo']} {solicitud['total_ms']} ms {solicitud['url'][-60:]}"
+                           for solicitud in resumen["mas_lentas"][:3])
+        logging.info(
+            f"Red de {self.pagina}: {resumen['solicitudes']} solicitudes ({resumen['fallidas']} fallidas), "
+            f"{resumen['bytes'] / 1024:.0f} KB, selector en {resumen['selector_ms']} ms; más lentas: {lentas}",
+            extra={"cascada": resumen},
+        )
+        try:
+            os.makedirs(directorio, exist_ok=True)
+            with _lock_archivo, open(os.path.join(directorio, "cascadas.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(resumen, ensure_ascii=False) + "\n")
+            if har:
+                nombre = re.sub(r"[^a-zA-Z0-9]+", "_", self.pagina).strip("_")[-80:]
+                ruta = os.path.join(directorio, f"{nombre}-{int(self.inicio)}.har")
+                with open(ruta, "w", encoding="utf-8") as f:
+                    json.dump(self.har(), f, ensure_ascii=False)
+        except OSError as e:
+            logging.warning(f"No se pudo escribir la cascada de red de {self.pagina}: {e}")
+        return resumen
@@ -0,0 +1,54 @@
+# db.py
+
+"""
+Ayudas de SQL compartidas por los jobs que deben funcionar igual en MariaDB/MySQL
+(producción) y en SQLite (benchmarks).
+"""
+
+
+def dialecto(conexion):
+    """
+    Nombre del dialecto de una conexión, sesión o engine ('mysql', 'sqlite', ...).
+    """
+    bind = conexion.get_bind() if hasattr(conexion, "get_bind") else conexion
+    return bind.dialect.name
+
+
+def sentencia_upsert(tabla, nombre_dialecto, claves, actualizar):
+    """
+    INSERT que actualiza las columnas `actualizar` cuando ya existe una fila con las mismas
+    `claves` (clave primaria o índice único):
+    ON DUPLICATE KEY UPDATE en MariaDB/MySQL y ON CONFLICT DO UPDATE en SQLite/PostgreSQL.
+    Los valores se pasan al ejecutar: conexion.execute(sentencia, filas). Con otro dialecto
+    lanza ValueError.
+    """
+    if nombre_dialecto in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+
+        sentencia = insert(tabla)
+        return sentencia.on_duplicate_key_update({columna: sentencia.inserted[columna] for columna in actualizar})
+
+    if nombre_dialecto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif nombre_dialecto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise ValueError(f"Upsert no soportado para el dialecto '{nombre_dialecto}'.")
+
+    sentencia = insert(tabla)
+    return sentencia.on_conflict_do_update(
+        index_elements=list(claves),
+        set_={columna: sentencia.excluded[columna] for columna in actualizar},
+    )
+
+
+def upsert(conexion, tabla, filas, claves, actualizar=None):
+    """
+    Inserta o actualiza `filas` (lista de diccionarios) en `tabla` con una sola sentencia.
+    Por defecto se actualizan todas las columnas de la fila que no son parte de la clave.
+    """
+    if not filas:
+        return
+    if actualizar is None:
+        actualizar = [columna for columna in filas[0] if columna not in claves]
+    conexion.execute(sentencia_upsert(tabla, dialecto(conexion), claves, actualizar), filas)
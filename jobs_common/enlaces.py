@@ -0,0 +1,78 @@
+# enlaces.py
+
+"""
+Validación de URL con HTTP antes de abrir el navegador.
+
+Cargar con Playwright una URL que no existe cuesta un goto completo (hasta el timeout);
+un HEAD cuesta milisegundos. validar_enlaces() consulta todas las URL en paralelo con una
+sesión de requests compartida y retorna el código de estado de cada una. Solo 404 y 410 se
+consideran enlaces muertos: un 403 (protección anti bots) o un error de red no demuestran
+que la página no exista, y en ese caso el job la intenta igual con el navegador.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+CODIGOS_MUERTOS = (404, 410)
+
+# Servidores que responden a HEAD con estos códigos se vuelven a consultar con GET
+CODIGOS_SIN_HEAD = (403, 405, 501)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/114.0.5735.110 Safari/537.36"
+)
+
+
+def crear_sesion(conexiones=16):
+    """
+    Sesión de requests con un pool de `conexiones` conexiones por host.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    sesion = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=conexiones, pool_maxsize=conexiones)
+    sesion.mount("http://", adaptador)
+    sesion.mount("https://", adaptador)
+    sesion.headers["User-Agent"] = USER_AGENT
+    return sesion
+
+
+def estado_enlace(sesion, url, timeout=5):
+    """
+    Código de estado HTTP de `url` (siguiendo redirecciones), o None si no hubo respuesta.
+    """
+    import requests
+
+    try:
+        respuesta = sesion.head(url, allow_redirects=True, timeout=timeout)
+        if respuesta.status_code in CODIGOS_SIN_HEAD:
+            with sesion.get(url, allow_redirects=True, timeout=timeout, stream=True) as respuesta:
+                pass
+        return respuesta.status_code
+    except requests.RequestException as e:
+        logging.debug("Sin respuesta de %s: %s", url, e)
+        return None
+
+
+def enlace_muerto(estado):
+    return estado in CODIGOS_MUERTOS
+
+
+def validar_enlaces(urls, concurrencia=16, timeout=5, sesion=None):
+    """
+    Consulta las URL en paralelo y retorna {url: código de estado o None}.
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    propia = sesion is None
+    sesion = sesion or crear_sesion(concurrencia)
+    try:
+        with ThreadPoolExecutor(max_workers=min(concurrencia, len(urls))) as ejecutor:
+            estados = ejecutor.map(lambda url: estado_enlace(sesion, url, timeout), urls)
+            return dict(zip(urls, estados))
+    finally:
+        if propia:
+            sesion.close()
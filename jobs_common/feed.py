@@ -0,0 +1,299 @@
+# feed.py
+
+"""
+Camino rápido sin navegador para los scrapers de Laborum.
+
+La página de salarios es una aplicación React que obtiene los datos por XHR/fetch en JSON.
+El flujo es:
+
+1. Descubrimiento (con navegador): el scraper registra las respuestas JSON con
+   page.on('response'), extrae las filas del DOM como siempre y llama a descubrir(). Se
+   busca en cada JSON una lista de objetos cuyos valores coinciden con las filas del DOM
+   (nombre, salario, cantidad) y se guarda en el caché el endpoint (URL, método, cuerpo y
+   cabeceras) y el esquema: la ruta a la lista y la clave JSON de cada campo. Los enlaces
+   (p. ej. el href de la card) se buscan aparte y son opcionales.
+2. Camino rápido (sin navegador): obtener_filas() repite el request con una sesión HTTP
+   compartida y extrae las filas con el esquema guardado. Si el request falla o el JSON ya
+   no tiene esa forma, lanza EsquemaCambiado y el job vuelve al navegador, que descubre de nuevo.
+
+El caché es un archivo JSON (LABORUM_FEED_CACHE) con una entrada por URL de página.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from urllib.parse import urljoin
+
+CACHE_POR_DEFECTO = "/app/logs/laborum_feed.json"
+
+# Cabeceras del request original que se repiten en el camino rápido
+CABECERAS_REPETIDAS = ("accept", "accept-language", "content-type", "referer")
+
+# Fracción mínima de filas del DOM que debe encontrarse en el JSON para aceptar un esquema
+COINCIDENCIA_MINIMA = 0.8
+
+_lock = threading.Lock()
+
+
+class EsquemaCambiado(Exception):
+    """
+    El endpoint no respondió o su JSON ya no tiene la forma descubierta.
+    """
+
+
+def ruta_cache():
+    return os.getenv("LABORUM_FEED_CACHE", CACHE_POR_DEFECTO)
+
+
+def leer_cache(ruta=None):
+    try:
+        with open(ruta or ruta_cache(), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _escribir_cache(cache, ruta):
+    # Archivo temporal y os.replace: un job que lee a la vez nunca ve un JSON a medias
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(temporal, ruta)
+
+
+def guardar_en_cache(pagina, entrada, ruta=None):
+    """
+    Guarda (o reemplaza) la entrada de `pagina` en el caché. Seguro entre hilos del mismo proceso.
+    """
+    ruta = ruta or ruta_cache()
+    with _lock:
+        cache = leer_cache(ruta)
+        cache[pagina] = entrada
+        _escribir_cache(cache, ruta)
+
+
+def olvidar(pagina, ruta=None):
+    ruta = ruta or ruta_cache()
+    with _lock:
+        cache = leer_cache(ruta)
+        if cache.pop(pagina, None) is not None:
+            _escribir_cache(cache, ruta)
+
+
+def _aplanar(objeto, prefijo=""):
+    """
+    {"a": {"b": 1}} -> {"a.b": 1}. Las listas no se recorren.
+    """
+    plano = {}
+    for clave, valor in objeto.items():
+        nombre = f"{prefijo}{clave}"
+        if isinstance(valor, dict):
+            plano.update(_aplanar(valor, f"{nombre}."))
+        else:
+            plano[nombre] = valor
+    return plano
+
+
+def _listas_de_objetos(valor, ruta=()):
+    """
+    Recorre el JSON y entrega (ruta, lista) por cada lista cuyos elementos son objetos.
+    """
+    if isinstance(valor, dict):
+        for clave, hijo in valor.items():
+            yield from _listas_de_objetos(hijo, ruta + (clave,))
+    elif isinstance(valor, list):
+        if valor and all(isinstance(elemento, dict) for elemento in valor):
+            yield ruta, valor
+        for indice, hijo in enumerate(valor):
+            if isinstance(hijo, (dict, list)):
+                yield from _listas_de_objetos(hijo, ruta + (indice,))
+
+
+def _entero(valor):
+    """
+    1234567, 1234567.0 o "$1.234.567" -> 1234567; None si no es un número.
+    """
+    if isinstance(valor, bool) or valor is None:
+        return None
+    if isinstance(valor, (int, float)):
+        return int(round(valor))
+    digitos = re.sub(r"[^\d]", "", str(valor))
+    return int(digitos) if digitos else None
+
+
+def _texto(valor):
+    return valor.strip().casefold() if isinstance(valor, str) else None
+
+
+def _clave_enlace(pares, campo, pagina):
+    """
+    Clave JSON cuyo valor, resuelto contra `pagina`, es el enlace `campo` de las filas del DOM.
+    """
+    candidatas = {}
+    for plano, fila in pares:
+        if not fila.get(campo):
+            continue
+        for clave, valor in plano.items():
+            if isinstance(valor, str) and valor and urljoin(pagina, valor) == fila[campo]:
+                candidatas[clave] = candidatas.get(clave, 0) + 1
+    aceptadas = [clave for clave, veces in candidatas.items() if veces >= COINCIDENCIA_MINIMA * len(pares)]
+    return max(aceptadas, key=candidatas.get) if aceptadas else None
+
+
+def buscar_esquema(payload, filas, campo_nombre, campos_numericos, campos_enlace=(), pagina=""):
+    """
+    Busca en `payload` la lista de objetos que corresponde a `filas` (diccionarios extraídos
+    del DOM). Retorna {"ruta": [...], "claves": {campo: clave JSON}, "enlaces": {...}} o None.
+    """
+    por_nombre = {_texto(fila[campo_nombre]): fila for fila in filas}
+    mejor = None
+    for ruta, lista in _listas_de_objetos(payload):
+        planos = [_aplanar(elemento) for elemento in lista]
+        # Clave del nombre: la que más valores coincide con nombres del DOM
+        conteo_nombres = {}
+        for plano in planos:
+            for clave, valor in plano.items():
+                if _texto(valor) in por_nombre:
+                    conteo_nombres[clave] = conteo_nombres.get(clave, 0) + 1
+        if not conteo_nombres:
+            continue
+        clave_nombre = max(conteo_nombres, key=conteo_nombres.get)
+        pares = [(plano, por_nombre[_texto(plano.get(clave_nombre))])
+                 for plano in planos if _texto(plano.get(clave_nombre)) in por_nombre]
+        if len(pares) < COINCIDENCIA_MINIMA * len(filas):
+            continue
+
+        claves = {campo_nombre: clave_nombre}
+        for campo in campos_numericos:
+            candidatas = {}
+            for plano, fila in pares:
+                for clave, valor in plano.items():
+                    if clave != clave_nombre and _entero(valor) == fila[campo]:
+                        candidatas[clave] = candidatas.get(clave, 0) + 1
+            aceptadas = [clave for clave, veces in candidatas.items() if veces >= COINCIDENCIA_MINIMA * len(pares)]
+            if not aceptadas:
+                break
+            claves[campo] = max(aceptadas, key=candidatas.get)
+        else:
+            if mejor is None or len(pares) > mejor[0]:
+                enlaces = {campo: _clave_enlace(pares, campo, pagina) for campo in campos_enlace}
+                esquema = {"ruta": list(ruta), "claves": claves,
+                           "enlaces": {campo: clave for campo, clave in enlaces.items() if clave}}
+                mejor = (len(pares), esquema)
+    return mejor[1] if mejor else None
+
+
+def extraer_filas(payload, esquema, campo_nombre, pagina=""):
+    """
+    Aplica `esquema` a `payload` y retorna las filas. Lanza EsquemaCambiado si la ruta o las
+    claves ya no existen o los valores no tienen el tipo esperado. Un enlace que falta queda
+    en None (el job usa el slug).
+    """
+    lista = payload
+    try:
+        for paso in esquema["ruta"]:
+            lista = lista[paso]
+    except (KeyError, IndexError, TypeError):
+        raise EsquemaCambiado(f"La ruta {esquema['ruta']} ya no existe en el JSON.")
+    if not isinstance(lista, list) or not all(isinstance(elemento, dict) for elemento in lista):
+        raise EsquemaCambiado(f"La ruta {esquema['ruta']} ya no es una lista de objetos.")
+
+    filas = []
+    for elemento in lista:
+        plano = _aplanar(elemento)
+        fila = {}
+        for campo, clave in esquema["claves"].items():
+            if clave not in plano:
+                raise EsquemaCambiado(f"Falta la clave '{clave}' ({campo}) en el JSON.")
+            valor = plano[clave]
+            fila[campo] = valor.strip() if campo == campo_nombre and isinstance(valor, str) else _entero(valor)
+            if fila[campo] in (None, ""):
+                raise EsquemaCambiado(f"Valor inválido en la clave '{clave}' ({campo}): {valor!r}")
+        for campo, clave in esquema.get("enlaces", {}).items():
+            valor = plano.get(clave)
+            fila[campo] = urljoin(pagina, valor) if isinstance(valor, str) and valor else None
+        filas.append(fila)
+    if not filas:
+        raise EsquemaCambiado("El JSON no trae filas.")
+    return filas
+
+
+class Capturador:
+    """
+    Registra las respuestas JSON de XHR/fetch de una página de Playwright:
+        capturador = Capturador(page)   # antes de page.goto
+        ...
+        capturas = capturador.respuestas()
+    """
+    def __init__(self, page):
+        self._respuestas = []
+        page.on("response", self._registrar)
+
+    def _registrar(self, response):
+        request = response.request
+        if request.resource_type in ("xhr", "fetch") and "json" in (response.headers.get("content-type") or ""):
+            self._respuestas.append(response)
+
+    def respuestas(self):
+        """
+        Lista de (endpoint, payload). El cuerpo se lee aquí y no en el evento, mientras la página sigue abierta.
+        """
+        capturas = []
+        for response in self._respuestas:
+            try:
+                payload = response.json()
+            except Exception as e:
+                logging.debug("No se pudo leer el JSON de %s: %s", response.url, e)
+                continue
+            request = response.request
+            cabeceras = {clave: valor for clave, valor in request.headers.items() if clave.lower() in CABECERAS_REPETIDAS}
+            endpoint = {"url": response.url, "metodo": request.method, "cuerpo": request.post_data, "cabeceras": cabeceras}
+            capturas.append((endpoint, payload))
+        return capturas
+
+
+def descubrir(pagina, capturas, filas, campo_nombre, campos_numericos, campos_enlace=(), ruta=None):
+    """
+    Busca entre las capturas el JSON que contiene `filas` y guarda endpoint y esquema en el
+    caché para `pagina`. Retorna True si lo encontró.
+    """
+    if not filas:
+        return False
+    for endpoint, payload in capturas:
+        esquema = buscar_esquema(payload, filas, campo_nombre, campos_numericos, campos_enlace, pagina)
+        if esquema is not None:
+            guardar_en_cache(pagina, {"endpoint": endpoint, "esquema": esquema}, ruta)
+            logging.info(f"Feed JSON descubierto para {pagina}: {endpoint['metodo']} {endpoint['url']}")
+            return True
+    logging.info(f"No se encontró un feed JSON con los datos de {pagina} ({len(capturas)} respuestas JSON).")
+    return False
+
+
+def obtener_filas(pagina, sesion, campo_nombre, timeout=15, ruta=None):
+    """
+    Camino rápido: repite el request guardado para `pagina` y retorna sus filas. Retorna None
+    si no hay nada descubierto; lanza EsquemaCambiado si el request o el esquema fallan, y en
+    ese caso borra la entrada para que el navegador la descubra de nuevo.
+    """
+    entrada = leer_cache(ruta).get(pagina)
+    if entrada is None:
+        return None
+    endpoint = entrada["endpoint"]
+    try:
+        respuesta = sesion.request(
+            endpoint["metodo"], endpoint["url"], data=endpoint.get("cuerpo"),
+            headers=endpoint.get("cabeceras") or {}, timeout=timeout,
+        )
+        respuesta.raise_for_status()
+        payload = respuesta.json()
+    except Exception as e:
+        olvidar(pagina, ruta)
+        raise EsquemaCambiado(f"El endpoint {endpoint['url']} falló: {e}")
+    try:
+        return extraer_filas(payload, entrada["esquema"], campo_nombre, pagina)
+    except EsquemaCambiado:
+        olvidar(pagina, ruta)
+        raise
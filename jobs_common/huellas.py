@@ -0,0 +1,106 @@
+# huellas.py
+
+"""
+Detección de cambios en las páginas de Laborum, para no repetir en el historial filas que no cambiaron.
+
+Dos niveles:
+
+- Página: calcular() obtiene un SHA-256 de las filas extraídas (sin importar el orden de las
+  cards). La tabla de huellas guarda por URL la huella, la fecha de la última escritura
+  (written_at) y la de la última verificación (executed_at). Si la huella no cambió y ya se
+  escribió este mes, pagina_sin_cambios() es verdadero y el job solo actualiza executed_at.
+- Fila: en una página que cambió, fila_cambiada() decide por área o subárea si se escribe:
+  cuando cambia (salario, cantidad), o cuando todavía no tiene fila en el mes en curso.
+
+Así el historial tiene una fila por entidad y mes como mínimo, y una más por cada cambio. El
+resumen mensual sigue completo y la serie se reconstruye tomando para cada fecha la última
+fila anterior; el executed_at de la huella indica hasta cuándo se verificó.
+"""
+
+import hashlib
+import json
+
+from jobs_common import db
+from jobs_common.resumen_mensual import mes_de
+
+
+def calcular(filas, campos):
+    """
+    Huella (hex de 64 caracteres) de los valores de `campos` en `filas`, independiente del orden.
+    """
+    valores = sorted(json.dumps([fila.get(campo) for campo in campos], ensure_ascii=False, default=str) for fila in filas)
+    return hashlib.sha256("\n".join(valores).encode("utf-8")).hexdigest()
+
+
+def pagina_sin_cambios(conexion, tabla, pagina, huella, ahora):
+    """
+    True si la última huella guardada de `pagina` es `huella` y se escribió en el mes de `ahora`.
+    """
+    from sqlalchemy import select
+
+    fila = conexion.execute(
+        select(tabla.c.huella, tabla.c.written_at).where(tabla.c.pagina == pagina)
+    ).first()
+    return fila is not None and fila.huella == huella and mes_de(fila.written_at) == mes_de(ahora)
+
+
+def registrar(conexion, tabla, pagina, huella, filas, ahora, escrita):
+    """
+    Guarda la huella de `pagina`. Con escrita=False (página sin cambios) solo se actualiza la
+    fecha de verificación y se conserva la de la última escritura.
+    """
+    from sqlalchemy import update
+
+    if escrita:
+        db.upsert(conexion, tabla, [{
+            "pagina": pagina, "huella": huella, "filas": filas, "written_at": ahora, "executed_at": ahora,
+        }], ["pagina"])
+    else:
+        conexion.execute(update(tabla).where(tabla.c.pagina == pagina).values(executed_at=ahora))
+
+
+def _como(guardado, valor):
+    """
+    `guardado` convertido al tipo de `valor` cuando la columna todavía tiene el tipo anterior
+    (salarios_basados VARCHAR antes de migraciones/laborum_tipos_nativos.py: '12' frente a 12).
+    Si no se puede convertir se retorna tal cual.
+    """
+    if guardado is None or valor is None or isinstance(guardado, type(valor)):
+        return guardado
+    try:
+        return type(valor)(guardado)
+    except (TypeError, ValueError):
+        return guardado
+
+
+def fila_cambiada(ultima, valores, ahora):
+    """
+    True si hay que escribir una fila con `valores` (diccionario), dada la `ultima` fila
+    guardada de la misma entidad (diccionario con esas claves y `month`, o None).
+    """
+    if ultima is None or mes_de(ultima["month"]) != mes_de(ahora):
+        return True
+    return any(_como(ultima[campo], valor) != valor for campo, valor in valores.items())
+
+
+def ultimas_filas(conexion, historial, clave, valores, campos):
+    """
+    Última fila (mayor id) del historial de cada valor de `clave` en `valores`:
+    {valor: {campo: ..., "month": ...}}.
+    """
+    from sqlalchemy import func, select
+
+    valores = sorted(set(valores))
+    if not valores:
+        return {}
+    columnas = historial.c
+    ultimos_ids = (
+        select(func.max(columnas.id).label("id"))
+        .where(columnas[clave].in_(valores))
+        .group_by(columnas[clave])
+        .subquery()
+    )
+    consulta = select(columnas[clave], columnas.month, *[columnas[campo] for campo in campos]).join(
+        ultimos_ids, columnas.id == ultimos_ids.c.id
+    )
+    return {fila[0]: dict(fila._mapping) for fila in conexion.execute(consulta)}
@@ -0,0 +1,201 @@
+# logs.py
+
+"""
+Logging estructurado (JSON por línea) con escritura en segundo plano para los jobs.
+
+- El logger raíz tiene un único QueueHandler: registrar un mensaje solo lo encola, y un
+  QueueListener en otro hilo lo formatea y lo escribe en el archivo y en la consola.
+- El archivo rota por tamaño (LOG_MAX_BYTES, LOG_BACKUP_COUNT).
+- Los mensajes que se repiten por fila o por card se agrupan: se pasa
+  extra={"agrupar": "<clave>"} y solo se escriben los primeros LOG_MUESTRAS_REPETIDOS de
+  cada clave; al cerrar se registra cuántos se omitieron.
+
+Uso:
+    from jobs_common import logs
+    logs.configurar_logging("graduated_job", "/app/logs", "graduated_job.log")
+    logging.warning(f"Fila {i} mal formateada", extra={"agrupar": "fila_mal_formateada"})
+
+Cuando el orquestador corre varios jobs en un proceso, configura el logging una vez con
+compartido=True (las llamadas de los jobs se ignoran) y cada hilo llama a asignar_job() para
+que sus registros lleven el nombre de su job.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime
+
+# Atributos estándar de LogRecord; el resto (los de extra=...) se copian al JSON
+_ATRIBUTOS_ESTANDAR = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+FORMATO_TEXTO = "%(asctime)s [%(levelname)s] %(message)s"
+
+
+class FormateadorJSON(logging.Formatter):
+    """
+    Formatea cada registro como un objeto JSON en una línea.
+    """
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+
+    def format(self, record):
+        entrada = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "job": getattr(record, "_job", None) or self.job,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_ESTANDAR and not clave.startswith("_"):
+                entrada[clave] = valor
+        if record.exc_info:
+            entrada["excepcion"] = self.formatException(record.exc_info)
+        return json.dumps(entrada, ensure_ascii=False, default=str)
+
+
+class ColaConExcepcion(logging.handlers.QueueHandler):
+    """
+    QueueHandler que deja el traceback en record.excepcion: QueueHandler.prepare() lo agrega al
+    mensaje y borra exc_info antes de encolar, y FormateadorJSON lo quiere en su propio campo.
+    """
+    _formateador = logging.Formatter()
+
+    def prepare(self, record):
+        if record.exc_info:
+            record.excepcion = self._formateador.formatException(record.exc_info)
+            record.exc_info = None
+            record.exc_text = None
+        return super().prepare(record)
+
+
+class FiltroRepetidos(logging.Filter):
+    """
+    Deja pasar los primeros `muestras` registros de cada clave extra["agrupar"] y cuenta el resto.
+    Los registros sin clave pasan siempre.
+    """
+    def __init__(self, muestras):
+        super().__init__()
+        self.muestras = muestras
+        self.vistos = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        clave = getattr(record, "agrupar", None)
+        if clave is None:
+            return True
+        with self._lock:
+            vistos = self.vistos.get(clave, 0) + 1
+            self.vistos[clave] = vistos
+        return vistos <= self.muestras
+
+    def omitidos(self):
+        with self._lock:
+            return {clave: vistos - self.muestras for clave, vistos in self.vistos.items() if vistos > self.muestras}
+
+
+class FiltroJob(logging.Filter):
+    """
+    Anota en cada registro el job del hilo que lo emitió (ver asignar_job).
+    """
+    def filter(self, record):
+        job = getattr(_hilo, "job", None)
+        if job is not None:
+            record._job = job
+        return True
+
+
+# Estado del logging configurado en este proceso
+_listener = None
+_filtro = None
+_compartido = False
+_hilo = threading.local()
+
+
+def asignar_job(job):
+    """
+    Nombre de job con el que se registran los mensajes de este hilo (None para volver al del proceso).
+    """
+    _hilo.job = job
+
+
+def configurar_logging(job, directorio, archivo, nivel=logging.INFO, consola=True, compartido=False):
+    """
+    Configura el logger raíz del proceso: cola en memoria, escritura en segundo plano,
+    rotación por tamaño y agrupación de mensajes repetidos. Si ya estaba configurado, lo
+    reemplaza (vaciando antes la cola anterior), salvo que se haya configurado con
+    compartido=True: en ese caso la llamada se ignora hasta cerrar_logging().
+
+    LOG_FORMAT=texto conserva el formato de texto anterior en lugar de JSON.
+    """
+    global _listener, _filtro, _compartido
+    if _compartido and _listener is not None:
+        return
+    cerrar_logging()
+    _compartido = compartido
+
+    os.makedirs(directorio, exist_ok=True)
+    if os.getenv("LOG_FORMAT", "json").lower() == "texto":
+        formateador = logging.Formatter(FORMATO_TEXTO)
+        clase_cola = logging.handlers.QueueHandler
+    else:
+        formateador = FormateadorJSON(job)
+        clase_cola = ColaConExcepcion
+
+    handlers = [
+        logging.handlers.RotatingFileHandler(
+            os.path.join(directorio, archivo),
+            maxBytes=int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024)),
+            backupCount=int(os.getenv("LOG_BACKUP_COUNT", 5)),
+            encoding="utf-8",
+        )
+    ]
+    if consola:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formateador)
+
+    cola = queue.SimpleQueue()
+    handler_cola = clase_cola(cola)
+    _filtro = FiltroRepetidos(int(os.getenv("LOG_MUESTRAS_REPETIDOS", 5)))
+    handler_cola.addFilter(_filtro)
+    handler_cola.addFilter(FiltroJob())
+
+    raiz = logging.getLogger()
+    for handler in raiz.handlers[:]:
+        raiz.removeHandler(handler)
+        handler.close()
+    raiz.addHandler(handler_cola)
+    raiz.setLevel(nivel)
+
+    _listener = logging.handlers.QueueListener(cola, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def cerrar_logging():
+    """
+    Registra el resumen de mensajes agrupados y espera a que el hilo escritor vacíe la cola.
+    Se llama automáticamente al terminar el proceso.
+    """
+    global _listener, _filtro, _compartido
+    _compartido = False
+    if _listener is None:
+        return
+    for clave, omitidos in sorted(_filtro.omitidos().items()):
+        logging.info(
+            f"Se omitieron {omitidos} mensajes repetidos de '{clave}' (se registraron los primeros {_filtro.muestras}).",
+            extra={"omitidos": omitidos, "clave_agrupada": clave},
+        )
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _filtro = None
+
+
+atexit.register(cerrar_logging)
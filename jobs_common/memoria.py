@@ -0,0 +1,84 @@
+# memoria.py
+
+"""
+Memoria residente (RSS) de un árbol de procesos y del contenedor, leída de /proc y del cgroup.
+
+Chromium corre en varios procesos (navegador, GPU, red, un renderer por sitio) hijos del driver
+de Playwright, que a su vez es hijo del proceso del job: la memoria del navegador es la suma de
+los descendientes del job, sin el driver. La suma de RSS cuenta una vez por proceso las páginas
+compartidas, así que es una cota superior; el total del contenedor (memory.current del cgroup,
+lo que Cloud Run compara con --memory) es el número exacto para dimensionar.
+
+Solo funciona en Linux; en otros sistemas disponible() es False y no se muestrea.
+"""
+
+import os
+
+_TAMANO_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# memory.current en cgroup v2 (Cloud Run, Docker recientes) o usage_in_bytes en v1
+RUTAS_CGROUP = ("/sys/fs/cgroup/memory.current", "/sys/fs/cgroup/memory/memory.usage_in_bytes")
+
+
+def disponible():
+    return os.path.isdir("/proc/self")
+
+
+def procesos():
+    """
+    {pid: (ppid, nombre, rss en bytes)} de todos los procesos visibles.
+    """
+    resultado = {}
+    for entrada in os.listdir("/proc"):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entrada}/stat", encoding="utf-8", errors="replace") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # El nombre va entre paréntesis y puede tener espacios: los campos siguen al último ")"
+        nombre = stat[stat.index("(") + 1:stat.rindex(")")]
+        campos = stat[stat.rindex(")") + 2:].split()
+        resultado[int(entrada)] = (int(campos[1]), nombre, int(campos[21]) * _TAMANO_PAGINA)
+    return resultado
+
+
+def descendientes(pid, tabla=None):
+    """
+    Procesos descendientes de `pid` (sin incluirlo), como {pid: (ppid, nombre, rss)}.
+    """
+    tabla = procesos() if tabla is None else tabla
+    hijos = {}
+    for proceso, (padre, _, _) in tabla.items():
+        hijos.setdefault(padre, []).append(proceso)
+    resultado = {}
+    pendientes = list(hijos.get(pid, []))
+    while pendientes:
+        proceso = pendientes.pop()
+        resultado[proceso] = tabla[proceso]
+        pendientes.extend(hijos.get(proceso, []))
+    return resultado
+
+
+def rss_arbol(pid=None, excluir=("node",)):
+    """
+    (bytes, procesos) de los descendientes de `pid` (por defecto este proceso) cuyo nombre no
+    está en `excluir` (por defecto el driver de Playwright).
+    """
+    arbol = descendientes(os.getpid() if pid is None else pid)
+    incluidos = [rss for _, nombre, rss in arbol.values() if nombre not in excluir]
+    return sum(incluidos), len(incluidos)
+
+
+def contenedor():
+    """
+    Bytes de memoria del cgroup del proceso, o None fuera de un contenedor.
+    """
+    for ruta in RUTAS_CGROUP:
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            continue
+    return None
@@ -0,0 +1,273 @@
+# metricas.py
+
+"""
+Temporizador de etapas y contadores de una ejecución de un job.
+
+Uso típico dentro de un job:
+
+    from jobs_common import metricas
+
+    metricas.iniciar("graduated_job")
+    with metricas.etapa("descarga"):
+        ...
+        metricas.sumar("bytes_descargados", len(chunk))
+    metricas.emitir_resumen()
+
+Al final de la ejecución emitir_resumen() registra un resumen JSON en el log y, si están
+definidas, lo escribe en METRICS_SUMMARY_PATH y en un textfile de Prometheus
+(METRICS_PROMETHEUS_TEXTFILE, para el textfile collector de node_exporter).
+
+Cuando varios jobs corren en hilos del mismo proceso (orquestador/), cada hilo que llama a
+iniciar() tiene sus propias métricas; los hilos que un job crea para trabajar en paralelo
+las heredan con `with metricas.usar(m):`.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+# Etapas y contadores que usan los jobs (otros nombres también son válidos)
+ETAPAS = ("descarga", "extraccion", "parseo", "carga_bd", "agregacion", "scraping")
+CONTADORES = ("bytes_descargados", "filas_parseadas", "filas_insertadas", "paginas_scrapeadas")
+
+
+class Metricas:
+    """
+    Acumula segundos por etapa y contadores de una ejecución. Es seguro usarla desde varios hilos.
+    """
+    def __init__(self, job):
+        self.job = job
+        self.inicio = time.time()
+        self._inicio_monotonico = time.perf_counter()
+        self.etapas = {}
+        self.contadores = {}
+        # Etiquetas adicionales de la ejecución (p. ej. la tarea de un Cloud Run job particionado)
+        self.etiquetas = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def etapa(self, nombre):
+        """
+        Context manager que suma el tiempo transcurrido a la etapa `nombre`, incluso si hay excepción.
+        """
+        inicio = time.perf_counter()
+        try:
+            yield self
+        finally:
+            duracion = time.perf_counter() - inicio
+            with self._lock:
+                etapa = self.etapas.setdefault(nombre, {"segundos": 0.0, "veces": 0})
+                etapa["segundos"] += duracion
+                etapa["veces"] += 1
+
+    def sumar(self, nombre, cantidad=1):
+        with self._lock:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    def maximo(self, nombre, valor):
+        """
+        Guarda en el contador `nombre` el mayor valor visto (p. ej. memoria pico).
+        """
+        with self._lock:
+            self.contadores[nombre] = max(self.contadores.get(nombre, valor), valor)
+
+    def resumen(self):
+        """
+        Retorna el resumen de la ejecución como diccionario serializable a JSON.
+        """
+        with self._lock:
+            etapas = {
+                nombre: {"segundos": round(datos["segundos"], 3), "veces": datos["veces"]}
+                for nombre, datos in self.etapas.items()
+            }
+            contadores = dict(self.contadores)
+
+        # Throughput de las etapas que tienen un contador asociado
+        tasas = {}
+        for etapa, contador, clave in (
+            ("descarga", "bytes_descargados", "bytes_por_segundo_descarga"),
+            ("parseo", "filas_parseadas", "filas_por_segundo_parseo"),
+            ("carga_bd", "filas_insertadas", "filas_por_segundo_carga_bd"),
+            ("scraping", "paginas_scrapeadas", "paginas_por_segundo_scraping"),
+        ):
+            segundos = etapas.get(etapa, {}).get("segundos")
+            if segundos and contador in contadores:
+                tasas[clave] = round(contadores[contador] / segundos, 2)
+        if contadores.get("respuestas_navegador"):
+            tasas["proporcion_aciertos_cache"] = round(
+                contadores.get("cache_aciertos", 0) / contadores["respuestas_navegador"], 3
+            )
+
+        resumen = {
+            "job": self.job,
+            "inicio": datetime.fromtimestamp(self.inicio).isoformat(timespec="seconds"),
+            "duracion_segundos": round(time.perf_counter() - self._inicio_monotonico, 3),
+            "etapas": etapas,
+            "contadores": contadores,
+            "tasas": tasas,
+        }
+        if self.etiquetas:
+            resumen["etiquetas"] = dict(self.etiquetas)
+        return resumen
+
+
+def _nombre_prometheus(texto):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", texto).lower()
+
+
+def _valor_etiqueta(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def formato_prometheus(resumen, prefijo="vocational_jobs"):
+    """
+    Convierte un resumen al formato de exposición de texto de Prometheus.
+    """
+    etiquetas = {"job": resumen["job"], **resumen.get("etiquetas", {})}
+    job = ",".join(f'{_nombre_prometheus(clave)}="{_valor_etiqueta(valor)}"' for clave, valor in etiquetas.items())
+    lineas = [
+        f"# TYPE {prefijo}_duracion_segundos gauge",
+        f'{prefijo}_duracion_segundos{{{job}}} {resumen["duracion_segundos"]}',
+        f"# TYPE {prefijo}_ultima_ejecucion_timestamp_segundos gauge",
+        f'{prefijo}_ultima_ejecucion_timestamp_segundos{{{job}}} {int(time.time())}',
+    ]
+    if resumen["etapas"]:
+        lineas.append(f"# TYPE {prefijo}_etapa_segundos gauge")
+        for nombre, datos in sorted(resumen["etapas"].items()):
+            lineas.append(f'{prefijo}_etapa_segundos{{{job},etapa="{_nombre_prometheus(nombre)}"}} {datos["segundos"]}')
+    for nombre, valor in sorted(resumen["contadores"].items()):
+        metrica = f"{prefijo}_{_nombre_prometheus(nombre)}"
+        lineas.append(f"# TYPE {metrica} gauge")
+        lineas.append(f'{metrica}{{{job}}} {valor}')
+    return "\n".join(lineas) + "\n"
+
+
+def formato_prometheus_varios(resumenes, prefijo="vocational_jobs"):
+    """
+    Un textfile de Prometheus con los resúmenes de varios jobs: las muestras de cada métrica
+    quedan juntas bajo una sola línea # TYPE.
+    """
+    muestras = {}
+    for resumen in resumenes:
+        metrica = None
+        for linea in formato_prometheus(resumen, prefijo).splitlines():
+            if linea.startswith("# TYPE "):
+                metrica = linea
+                muestras.setdefault(metrica, [])
+            else:
+                muestras[metrica].append(linea)
+    return "".join(f"{tipo}\n" + "".join(f"{linea}\n" for linea in lineas) for tipo, lineas in muestras.items())
+
+
+def _escribir_atomico(ruta, contenido):
+    """
+    Escribe en un archivo temporal y lo renombra, para que nadie lea un archivo a medio escribir.
+    """
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    os.makedirs(directorio, exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(contenido)
+    os.replace(temporal, ruta)
+
+
+# Métricas de la ejecución en curso: las del hilo si iniciar() o usar() las fijaron, si no
+# las últimas iniciadas en el proceso
+_actual = Metricas("job")
+_hilo = threading.local()
+
+
+def iniciar(job):
+    """
+    Reinicia las métricas para una nueva ejecución del job `job` y las retorna.
+    """
+    global _actual
+    _actual = Metricas(job)
+    _hilo.actual = _actual
+    return _actual
+
+
+def actual():
+    return getattr(_hilo, "actual", None) or _actual
+
+
+@contextlib.contextmanager
+def usar(metricas):
+    """
+    Fija `metricas` como las del hilo actual mientras dura el bloque.
+    """
+    anterior = getattr(_hilo, "actual", None)
+    _hilo.actual = metricas
+    try:
+        yield metricas
+    finally:
+        _hilo.actual = anterior
+
+
+def etapa(nombre):
+    return actual().etapa(nombre)
+
+
+def maximo(nombre, valor):
+    actual().maximo(nombre, valor)
+
+
+def etiquetar(**etiquetas):
+    """
+    Agrega etiquetas al resumen de la ejecución en curso (y a las series de Prometheus).
+    """
+    actual().etiquetas.update({clave: str(valor) for clave, valor in etiquetas.items()})
+
+
+def sumar(nombre, cantidad=1):
+    actual().sumar(nombre, cantidad)
+
+
+def emitir_resumen(ruta_json=None, ruta_prometheus=None, registrar=None):
+    """
+    Registra el resumen JSON de la ejecución en el log y lo escribe en ruta_json y en el
+    textfile de Prometheus (por defecto METRICS_SUMMARY_PATH y METRICS_PROMETHEUS_TEXTFILE).
+    `registrar` reemplaza a logging.info (por ejemplo print, en jobs sin logging configurado).
+    Un error al escribir los archivos se registra pero no interrumpe el job.
+    """
+    registrar = registrar or logging.info
+    resumen = actual().resumen()
+    registrar(f"Resumen de la ejecución: {json.dumps(resumen, ensure_ascii=False)}")
+
+    ruta_json = ruta_json or os.getenv("METRICS_SUMMARY_PATH")
+    ruta_prometheus = ruta_prometheus or os.getenv("METRICS_PROMETHEUS_TEXTFILE")
+    try:
+        if ruta_json:
+            _escribir_atomico(ruta_json, json.dumps(resumen, ensure_ascii=False, indent=2) + "\n")
+        if ruta_prometheus:
+            _escribir_atomico(ruta_prometheus, formato_prometheus(resumen))
+    except OSError as e:
+        registrar(f"No se pudo escribir el resumen de métricas: {e}")
+    return resumen
+
+
+def emitir_resumenes(resumenes, extra=None, ruta_json=None, ruta_prometheus=None, registrar=None):
+    """
+    Como emitir_resumen(), para varios jobs que corrieron en el mismo proceso: el JSON tiene la
+    lista de resúmenes en "jobs" (más las claves de `extra`) y el textfile de Prometheus las
+    métricas de todos.
+    """
+    registrar = registrar or logging.info
+    contenido = dict(extra or {}, jobs=resumenes)
+    registrar(f"Resumen de la ejecución: {json.dumps(contenido, ensure_ascii=False)}")
+
+    ruta_json = ruta_json or os.getenv("METRICS_SUMMARY_PATH")
+    ruta_prometheus = ruta_prometheus or os.getenv("METRICS_PROMETHEUS_TEXTFILE")
+    try:
+        if ruta_json:
+            _escribir_atomico(ruta_json, json.dumps(contenido, ensure_ascii=False, indent=2) + "\n")
+        if ruta_prometheus:
+            _escribir_atomico(ruta_prometheus, formato_prometheus_varios(resumenes))
+    except OSError as e:
+        registrar(f"No se pudo escribir el resumen de métricas: {e}")
+    return contenido
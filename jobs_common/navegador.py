@@ -0,0 +1,427 @@
+# navegador.py
+
+"""
+Navegador Chromium de Playwright compartido entre las páginas (y los jobs) de un mismo hilo.
+
+Antes cada llamada a scrape_data() o scrape_subareas() iniciaba Playwright y lanzaba su propio
+Chromium: el job de subáreas pagaba un arranque de navegador por área, y el de áreas otro más.
+Ahora los jobs piden el navegador con abrir():
+
+- Dentro de un bloque `with navegador.compartido():` se entrega siempre el mismo navegador.
+  Se lanza recién cuando una página lo pide (si todo sale por el camino rápido HTTP no se
+  lanza) y se cierra al salir del bloque.
+- Fuera de ese bloque abrir() lanza un navegador propio y lo cierra al terminar, como antes.
+
+Cada página usa su propio contexto (cookies y caché aisladas), que el job cierra al terminar.
+La API síncrona de Playwright no se puede usar desde otro hilo que el que la inició, por eso
+el navegador compartido es por hilo: el orquestador corre áreas y subáreas en el mismo hilo.
+
+Chromium se lanza con el perfil PERFIL (NAVEGADOR_PERFIL):
+
+- "estandar" (por defecto): los argumentos por defecto de Playwright y viewport de 1920x1080,
+  el mismo lanzamiento con el que se escribieron los XPath de los scrapers.
+- "memoria" (opcional): para el contenedor de 1 GiB de Cloud Run. Memoria compartida fuera
+  de /dev/shm (64 MB en Docker), sin GPU, extensiones ni servicios en segundo plano, a lo más
+  NAVEGADOR_RENDERERS procesos renderer y sin un proceso por sitio, y viewport de 1366x768.
+  Cambia el layout con que se renderiza Laborum: activarlo solo después de comprobar que los
+  selectores siguen encontrando las cards (benchmarks/bench_memoria_navegador.py compara ambos).
+
+NAVEGADOR_VIEWPORT ("1280x800") cambia el viewport de cualquiera de los dos. Mientras haya un
+navegador abierto, cada NAVEGADOR_MUESTREO_SEGUNDOS (0 lo desactiva) se mide la memoria de los
+procesos de Chromium y del contenedor (jobs_common.memoria); los picos quedan en el resumen de
+métricas como navegador_rss_max_mb, navegador_procesos_max y contenedor_memoria_max_mb.
+
+Con NAVEGADOR_CACHE_DIR el navegador es un contexto persistente (launch_persistent_context)
+con el perfil en ese directorio, y la caché HTTP de Chromium guarda en disco los bundles JS,
+CSS y fuentes de Laborum entre páginas y entre ejecuciones (en Cloud Run el directorio debe
+ser un volumen montado; si no, la caché dura solo la ejecución y ocupa memoria):
+
+- NAVEGADOR_CACHE_MB (200) limita la caché (--disk-cache-size); si el perfil completo ocupa
+  más del doble se descarta al lanzar.
+- El perfil se guarda en perfil-v<NAVEGADOR_CACHE_VERSION>-pw<versión de Playwright>: subir
+  NAVEGADOR_CACHE_VERSION (o actualizar Playwright) invalida la caché y los perfiles viejos se
+  borran. Cada tarea de un Cloud Run job particionado usa su propio perfil.
+- Solo se conserva la caché: las cookies se borran al lanzar.
+- abrir() entrega un NavegadorConCache: su new_context() es una vista del contexto único
+  cuyo close() cierra solo sus páginas, así que los jobs lo usan igual que un Browser.
+- Cada página cuenta sus respuestas, los aciertos de caché y los bytes recibidos por la red
+  (respuestas_navegador, cache_aciertos, bytes_red_navegador y proporcion_aciertos_cache).
+
+Si no se puede abrir el perfil (p. ej. otro Chromium lo tiene abierto) se lanza un navegador
+sin caché.
+
+Uso:
+    with navegador.compartido():
+        for link in links:
+            with navegador.abrir() as browser:
+                if browser is None:
+                    continue
+                context = browser.new_context(**navegador.opciones_contexto())
+                ...
+                context.close()
+"""
+
+import contextlib
+import logging
+import os
+import shutil
+import threading
+
+from jobs_common import memoria, metricas, particiones
+
+_hilo = threading.local()
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/114.0.5735.110 Safari/537.36"
+)
+
+# Caché HTTP en disco entre ejecuciones (sin NAVEGADOR_CACHE_DIR no hay perfil persistente)
+CACHE_DIR = os.getenv("NAVEGADOR_CACHE_DIR")
+CACHE_MB = float(os.getenv("NAVEGADOR_CACHE_MB", "200"))
+CACHE_VERSION = os.getenv("NAVEGADOR_CACHE_VERSION", "1")
+
+# Argumentos del perfil "memoria" (el límite de renderers se agrega según NAVEGADOR_RENDERERS)
+ARGS_MEMORIA = (
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-features=site-per-process,Translate,MediaRouter,OptimizationHints",
+    "--mute-audio",
+    "--no-first-run",
+)
+
+
+class Perfil:
+    """
+    Argumentos de lanzamiento de Chromium y viewport de los contextos de las páginas.
+    """
+    def __init__(self, nombre, args=(), viewport=None):
+        self.nombre = nombre
+        self.args = list(args)
+        self.viewport = viewport or {"width": 1920, "height": 1080}
+
+    @classmethod
+    def desde_entorno(cls):
+        nombre = os.getenv("NAVEGADOR_PERFIL", "estandar").lower()
+        if nombre == "estandar":
+            perfil = cls(nombre)
+        elif nombre == "memoria":
+            renderers = int(os.getenv("NAVEGADOR_RENDERERS", "2"))
+            perfil = cls(nombre, ARGS_MEMORIA + (f"--renderer-process-limit={renderers}",),
+                         {"width": 1366, "height": 768})
+        else:
+            raise ValueError(f"Perfil de navegador desconocido: {nombre} (usar 'estandar' o 'memoria').")
+        viewport = os.getenv("NAVEGADOR_VIEWPORT")
+        if viewport:
+            ancho, alto = viewport.lower().split("x")
+            perfil.viewport = {"width": int(ancho), "height": int(alto)}
+        return perfil
+
+
+PERFIL = Perfil.desde_entorno()
+
+
+def opciones_contexto():
+    """
+    Opciones de los contextos de las páginas de Laborum: user agent de escritorio, viewport del
+    perfil y configuración regional en español de Chile con la zona horaria de Santiago.
+    """
+    return {
+        "user_agent": USER_AGENT,
+        "viewport": PERFIL.viewport,
+        "locale": "es-CL",
+        "timezone_id": "America/Santiago",
+    }
+
+
+def _tamano(directorio):
+    total = 0
+    for raiz, _, archivos in os.walk(directorio):
+        for archivo in archivos:
+            try:
+                total += os.path.getsize(os.path.join(raiz, archivo))
+            except OSError:
+                pass
+    return total
+
+
+def preparar_cache(raiz, version=None, limite_mb=None):
+    """
+    Retorna el directorio del perfil persistente para esta versión de la caché, después de
+    borrar los perfiles de otras versiones y el actual si ocupa más del doble del límite.
+    """
+    from importlib.metadata import version as version_paquete
+
+    version = CACHE_VERSION if version is None else version
+    limite_mb = CACHE_MB if limite_mb is None else limite_mb
+    vigente = f"perfil-v{version}-pw{version_paquete('playwright')}"
+    tarea = particiones.Tarea.desde_entorno()
+    directorio = os.path.join(raiz, vigente + (f"-tarea{tarea.indice}" if tarea.particionada else ""))
+
+    os.makedirs(raiz, exist_ok=True)
+    for entrada in os.listdir(raiz):
+        if entrada.startswith("perfil-") and not entrada.startswith(vigente):
+            logging.info(f"Se borra el perfil del navegador de otra versión de la caché: {entrada}")
+            shutil.rmtree(os.path.join(raiz, entrada), ignore_errors=True)
+    if os.path.isdir(directorio) and _tamano(directorio) > 2 * limite_mb * 2**20:
+        logging.warning(f"El perfil {directorio} supera {2 * limite_mb:.0f} MB; se descarta la caché.")
+        shutil.rmtree(directorio, ignore_errors=True)
+    return directorio
+
+
+def contabilizar_cache(page):
+    """
+    Cuenta las respuestas de la página, las servidas desde la caché y los bytes que llegaron
+    por la red, con los eventos Network de CDP (Playwright no expone si una respuesta vino de
+    la caché HTTP).
+    """
+    metricas_job = metricas.actual()
+    try:
+        cdp = page.context.new_cdp_session(page)
+        cdp.send("Network.enable")
+    except Exception as e:
+        logging.debug("No se pudo contabilizar la caché de la página: %s", e)
+        return
+
+    def respuesta(evento):
+        metricas_job.sumar("respuestas_navegador")
+        if evento["response"].get("fromDiskCache"):
+            metricas_job.sumar("cache_aciertos")
+
+    def terminada(evento):
+        metricas_job.sumar("bytes_red_navegador", int(evento.get("encodedDataLength", 0)))
+
+    cdp.on("Network.responseReceived", respuesta)
+    cdp.on("Network.loadingFinished", terminada)
+
+
+class _VistaContexto:
+    """
+    Lo que los jobs usan como contexto de una página sobre el contexto persistente: close()
+    cierra solo las páginas abiertas con esta vista.
+    """
+    def __init__(self, contexto):
+        self._contexto = contexto
+        self._paginas = []
+
+    def new_page(self):
+        page = self._contexto.new_page()
+        self._paginas.append(page)
+        contabilizar_cache(page)
+        return page
+
+    def close(self):
+        for page in self._paginas:
+            if not page.is_closed():
+                page.close()
+        self._paginas = []
+
+    def __getattr__(self, nombre):
+        return getattr(self._contexto, nombre)
+
+
+class NavegadorConCache:
+    """
+    Contexto persistente con la interfaz de Browser que usan los jobs. Las opciones de contexto
+    se fijan al lanzar (opciones_contexto()), por eso new_context() ignora las suyas.
+    """
+    def __init__(self, contexto, directorio):
+        self.contexto = contexto
+        self.directorio = directorio
+
+    def new_context(self, **opciones):
+        return _VistaContexto(self.contexto)
+
+    def close(self):
+        self.contexto.close()
+
+
+def _lanzar_con_cache(playwright, headless):
+    directorio = preparar_cache(CACHE_DIR)
+    try:
+        contexto = playwright.chromium.launch_persistent_context(
+            directorio, headless=headless, args=PERFIL.args + [f"--disk-cache-size={int(CACHE_MB * 2**20)}"],
+            **opciones_contexto()
+        )
+    except Exception as e:
+        logging.warning(f"No se pudo abrir el perfil con caché {directorio}; se lanza un navegador sin caché: {e}")
+        return None
+    contexto.clear_cookies()
+    logging.info(f"Caché HTTP del navegador en {directorio} ({_tamano(directorio) / 2**20:.1f} MB).")
+    return NavegadorConCache(contexto, directorio)
+
+
+class _Muestreo:
+    """
+    Hilo que cada `intervalo` segundos mide la memoria de los navegadores del proceso y guarda
+    los picos en las métricas de los jobs que tienen un navegador abierto.
+    """
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self._metricas = []
+        self._lock = threading.Lock()
+        self._parar = None
+
+    @property
+    def activo(self):
+        return self.intervalo > 0 and memoria.disponible()
+
+    def agregar(self, metricas_job):
+        with self._lock:
+            self._metricas.append(metricas_job)
+            if self._parar is None:
+                self._parar = threading.Event()
+                threading.Thread(target=self._correr, args=(self._parar,), name="muestreo-memoria", daemon=True).start()
+        self.medir()
+
+    def quitar(self, metricas_job):
+        self.medir()
+        with self._lock:
+            self._metricas.remove(metricas_job)
+            if not self._metricas:
+                self._parar.set()
+                self._parar = None
+
+    def _correr(self, parar):
+        while not parar.wait(self.intervalo):
+            self.medir()
+
+    def medir(self):
+        try:
+            rss, procesos = memoria.rss_arbol()
+            contenedor = memoria.contenedor()
+        except Exception as e:
+            logging.debug("No se pudo medir la memoria del navegador: %s", e)
+            return
+        with self._lock:
+            destinos = list(self._metricas)
+        for metricas_job in destinos:
+            metricas_job.sumar("muestras_memoria")
+            if procesos:
+                metricas_job.maximo("navegador_rss_max_mb", round(rss / 2**20, 1))
+                metricas_job.maximo("navegador_procesos_max", procesos)
+            if contenedor is not None:
+                metricas_job.maximo("contenedor_memoria_max_mb", round(contenedor / 2**20, 1))
+
+
+_muestreo = _Muestreo(float(os.getenv("NAVEGADOR_MUESTREO_SEGUNDOS", "2")))
+
+
+@contextlib.contextmanager
+def _muestrear():
+    """
+    Mide la memoria mientras dura el bloque, para las métricas del job de este hilo.
+    """
+    if not _muestreo.activo:
+        yield
+        return
+    metricas_job = metricas.actual()
+    _muestreo.agregar(metricas_job)
+    try:
+        yield
+    finally:
+        _muestreo.quitar(metricas_job)
+
+
+class _Compartido:
+    """
+    Playwright y navegador del bloque compartido(), lanzados en el primer uso.
+    """
+    def __init__(self, headless):
+        self.headless = headless
+        self._playwright = None
+        self._metricas = None
+        self.browser = None
+
+    def obtener(self):
+        if self.browser is None:
+            from playwright.sync_api import sync_playwright
+
+            self._playwright = sync_playwright().start()
+            try:
+                self.browser = _lanzar(self._playwright, self.headless)
+            except Exception:
+                self.cerrar()
+                raise
+            if _muestreo.activo:
+                self._metricas = metricas.actual()
+                _muestreo.agregar(self._metricas)
+        return self.browser
+
+    def cerrar(self):
+        if self._metricas is not None:
+            _muestreo.quitar(self._metricas)
+            self._metricas = None
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except Exception as e:
+                logging.warning(f"No se pudo cerrar el navegador compartido: {e}")
+            self.browser = None
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+
+def _lanzar(playwright, headless):
+    with metricas.etapa("inicio_navegador"):
+        browser = _lanzar_con_cache(playwright, headless) if CACHE_DIR else None
+        if browser is None:
+            browser = playwright.chromium.launch(headless=headless, args=PERFIL.args)
+    metricas.sumar("navegadores_lanzados")
+    logging.info(f"Chromium lanzado con el perfil '{PERFIL.nombre}' ({len(PERFIL.args)} argumentos).")
+    return browser
+
+
+@contextlib.contextmanager
+def compartido(headless=True):
+    """
+    Mientras dura el bloque, abrir() entrega en este hilo un único navegador. Los bloques
+    anidados reutilizan el del bloque exterior.
+    """
+    if getattr(_hilo, "compartido", None) is not None:
+        yield
+        return
+    _hilo.compartido = _Compartido(headless)
+    try:
+        yield
+    finally:
+        _hilo.compartido.cerrar()
+        _hilo.compartido = None
+
+
+@contextlib.contextmanager
+def abrir(headless=True):
+    """
+    Entrega un navegador: el compartido del hilo si hay uno, si no uno propio que se cierra al
+    salir. Si no se puede lanzar registra el error y entrega None.
+    """
+    actual = getattr(_hilo, "compartido", None)
+    if actual is not None:
+        try:
+            browser = actual.obtener()
+        except Exception as e:
+            logging.error(f"Error al iniciar el navegador: {e}")
+            browser = None
+        yield browser
+        return
+
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        try:
+            browser = _lanzar(p, headless)
+        except Exception as e:
+            logging.error(f"Error al iniciar el navegador: {e}")
+            yield None
+            return
+        try:
+            with _muestrear():
+                yield browser
+        finally:
+            browser.close()
@@ -0,0 +1,94 @@
+# particiones.py
+
+"""
+Reparto determinista del trabajo de un job entre las tareas de un Cloud Run job.
+
+Cloud Run define en cada tarea CLOUD_RUN_TASK_INDEX (desde 0) y CLOUD_RUN_TASK_COUNT. Con N
+tareas, cada una procesa solo las claves (p. ej. area_id) cuya cubeta es su índice:
+
+- claves enteras: clave % N, que con ids autoincrementales reparte en partes casi iguales;
+- otras claves: CRC32 del texto % N (estable entre procesos, a diferencia de hash()).
+
+La asignación depende solo de la clave y de N, no del orden de la consulta ni de qué otras
+claves existan, así que una clave cae siempre en la misma tarea mientras N no cambie.
+Fuera de Cloud Run se pueden usar TASK_INDEX/TASK_COUNT; sin ninguna, hay una sola tarea.
+
+lanzar_locales() prueba el reparto en una máquina: lanza N procesos del job con esas
+variables, como lo haría Cloud Run, y junta el resumen de métricas de cada uno.
+"""
+
+import json
+import numbers
+import os
+import subprocess
+import tempfile
+import zlib
+
+VARIABLES = (("CLOUD_RUN_TASK_INDEX", "CLOUD_RUN_TASK_COUNT"), ("TASK_INDEX", "TASK_COUNT"))
+
+
+class Tarea:
+    """
+    Índice (desde 0) y total de tareas de la ejecución.
+    """
+    def __init__(self, indice=0, total=1):
+        if total < 1 or not 0 <= indice < total:
+            raise ValueError(f"Tarea inválida: índice {indice} de {total}.")
+        self.indice = indice
+        self.total = total
+
+    @classmethod
+    def desde_entorno(cls):
+        for variable_indice, variable_total in VARIABLES:
+            if os.getenv(variable_total):
+                return cls(int(os.getenv(variable_indice, 0)), int(os.getenv(variable_total)))
+        return cls()
+
+    @property
+    def particionada(self):
+        return self.total > 1
+
+    def cubeta(self, clave):
+        if isinstance(clave, numbers.Integral):
+            return int(clave) % self.total
+        return zlib.crc32(str(clave).encode("utf-8")) % self.total
+
+    def asignada(self, clave):
+        return self.cubeta(clave) == self.indice
+
+    def __str__(self):
+        return f"{self.indice + 1}/{self.total}"
+
+
+def _ruta_tarea(ruta, indice):
+    raiz, extension = os.path.splitext(ruta)
+    return f"{raiz}.tarea-{indice}{extension}"
+
+
+def lanzar_locales(comando, total):
+    """
+    Lanza `total` procesos de `comando` en paralelo, cada uno con CLOUD_RUN_TASK_INDEX y
+    CLOUD_RUN_TASK_COUNT, y espera a que terminen. Cada proceso escribe su resumen de métricas
+    en su propio archivo (METRICS_SUMMARY_PATH y METRICS_PROMETHEUS_TEXTFILE con sufijo
+    .tarea-<índice>, o un temporal). Retorna por tarea {"tarea", "codigo", "resumen"}.
+    """
+    with tempfile.TemporaryDirectory(prefix="tareas_") as tmp:
+        base = os.getenv("METRICS_SUMMARY_PATH") or os.path.join(tmp, "resumen.json")
+        procesos = []
+        for indice in range(total):
+            entorno = dict(os.environ, CLOUD_RUN_TASK_INDEX=str(indice), CLOUD_RUN_TASK_COUNT=str(total),
+                           METRICS_SUMMARY_PATH=_ruta_tarea(base, indice))
+            if os.getenv("METRICS_PROMETHEUS_TEXTFILE"):
+                entorno["METRICS_PROMETHEUS_TEXTFILE"] = _ruta_tarea(os.getenv("METRICS_PROMETHEUS_TEXTFILE"), indice)
+            procesos.append((indice, entorno["METRICS_SUMMARY_PATH"], subprocess.Popen(comando, env=entorno)))
+
+        resultados = []
+        for indice, ruta, proceso in procesos:
+            codigo = proceso.wait()
+            try:
+                with open(ruta, encoding="utf-8") as f:
+                    resumen = json.load(f)
+            except (OSError, ValueError):
+                resumen = None
+            resultados.append({"tarea": indice, "codigo": codigo, "resumen": resumen})
+        return resultados
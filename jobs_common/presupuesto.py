@@ -0,0 +1,46 @@
+# presupuesto.py
+
+"""
+Presupuesto de tiempo de una ejecución, para terminar limpio antes del timeout de la tarea.
+
+Cloud Run mata la tarea al cumplirse --task-timeout: lo que estaba a medio escribir se pierde
+y no se emite el resumen. Con un Presupuesto el job pregunta antes de cada unidad de trabajo
+(p. ej. un área) si alcanza a terminarla: la estimación es la unidad más lenta vista hasta
+ahora más un margen para cerrar (commit, resumen de métricas). Si no alcanza, el job se
+detiene y deja las unidades restantes para la próxima ejecución.
+
+Un presupuesto de 0 segundos no tiene límite.
+"""
+
+import time
+
+
+class Presupuesto:
+    def __init__(self, segundos=0, margen=15, reloj=time.monotonic):
+        self.segundos = segundos
+        self.margen = margen
+        self._reloj = reloj
+        self.inicio = reloj()
+        self.mas_lenta = 0.0
+
+    @property
+    def limitado(self):
+        return self.segundos > 0
+
+    def transcurrido(self):
+        return self._reloj() - self.inicio
+
+    def restante(self):
+        return self.segundos - self.transcurrido() if self.limitado else float("inf")
+
+    def alcanza(self):
+        """
+        True si queda tiempo para otra unidad tan lenta como la más lenta vista, más el margen.
+        """
+        return self.restante() >= self.mas_lenta + self.margen
+
+    def registrar(self, segundos):
+        """
+        Registra la duración de una unidad terminada.
+        """
+        self.mas_lenta = max(self.mas_lenta, segundos)
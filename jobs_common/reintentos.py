@@ -0,0 +1,128 @@
+# reintentos.py
+
+"""
+Reintentos con backoff exponencial y circuito de corte para las cargas de página de Playwright.
+
+Antes cada page.goto tenía 60 s de timeout (más 60 s de networkidle) y un solo intento: con
+Laborum degradado, el job de subáreas gastaba 120 s por área hasta agotar el timeout de la
+tarea de Cloud Run. Ahora:
+
+- Politica: timeouts crecientes por intento (el primero corto, porque una página sana carga
+  en pocos segundos) y entre intentos una espera aleatoria entre 0 y base * factor**n
+  ("full jitter"), con tope `espera_maxima`.
+- Interruptor: cuenta las páginas que fallaron en todos sus intentos; tras `umbral` fallos
+  seguidos se abre y el job aborta las páginas restantes en lugar de seguir esperando.
+
+Con ambas cosas el peor caso es acotado: Politica.peor_caso() segundos por página y a lo más
+`umbral` páginas fallidas seguidas.
+"""
+
+import logging
+import os
+import random
+import time
+
+
+class CircuitoAbierto(Exception):
+    """
+    Se alcanzó el máximo de fallos consecutivos; no se deben intentar más páginas.
+    """
+
+
+class Politica:
+    """
+    timeouts_ms: timeout de cada intento (su largo es la cantidad de intentos).
+    """
+    def __init__(self, timeouts_ms=(10000, 20000, 40000), espera_base=1.0, factor=2.0, espera_maxima=15.0,
+                 aleatorio=None):
+        self.timeouts_ms = tuple(timeouts_ms)
+        self.espera_base = espera_base
+        self.factor = factor
+        self.espera_maxima = espera_maxima
+        self._aleatorio = aleatorio or random.Random()
+
+    @classmethod
+    def desde_entorno(cls, prefijo="GOTO"):
+        """
+        Lee <prefijo>_TIMEOUTS_MS ("10000,20000,40000") y <prefijo>_ESPERA_BASE de las variables de entorno.
+        """
+        politica = cls()
+        timeouts = os.getenv(f"{prefijo}_TIMEOUTS_MS")
+        if timeouts:
+            politica.timeouts_ms = tuple(int(valor) for valor in timeouts.split(",") if valor.strip())
+        politica.espera_base = float(os.getenv(f"{prefijo}_ESPERA_BASE", politica.espera_base))
+        return politica
+
+    @property
+    def intentos(self):
+        return len(self.timeouts_ms)
+
+    def espera(self, intento):
+        """
+        Segundos a esperar después del intento número `intento` (desde 1) fallido.
+        """
+        tope = min(self.espera_maxima, self.espera_base * self.factor ** (intento - 1))
+        return self._aleatorio.uniform(0, tope)
+
+    def peor_caso(self, cargas_por_intento=1):
+        """
+        Segundos máximos que puede tomar una página: todos los timeouts (por cada espera de
+        carga del intento, p. ej. goto y networkidle) más las esperas máximas.
+        """
+        esperas = sum(min(self.espera_maxima, self.espera_base * self.factor ** n) for n in range(self.intentos - 1))
+        return cargas_por_intento * sum(self.timeouts_ms) / 1000 + esperas
+
+
+class Interruptor:
+    """
+    Circuito de corte por fallos consecutivos, compartido por las páginas de una ejecución.
+    """
+    def __init__(self, umbral=3):
+        self.umbral = umbral
+        self.fallos_consecutivos = 0
+
+    @property
+    def abierto(self):
+        return self.umbral > 0 and self.fallos_consecutivos >= self.umbral
+
+    def registrar_exito(self):
+        self.fallos_consecutivos = 0
+
+    def registrar_fallo(self):
+        self.fallos_consecutivos += 1
+
+    def verificar(self):
+        if self.abierto:
+            raise CircuitoAbierto(f"{self.fallos_consecutivos} páginas fallidas seguidas.")
+
+
+def reintentar(funcion, politica, descripcion, interruptor=None, dormir=time.sleep):
+    """
+    Llama a funcion(timeout_ms) hasta que no lance excepción, con los timeouts y esperas de
+    `politica`. Si todos los intentos fallan registra el fallo en `interruptor` y relanza la
+    última excepción. Lanza CircuitoAbierto sin intentar si el interruptor ya está abierto.
+    """
+    from jobs_common import metricas
+
+    if interruptor is not None:
+        interruptor.verificar()
+    for intento, timeout_ms in enumerate(politica.timeouts_ms, start=1):
+        try:
+            resultado = funcion(timeout_ms)
+        except Exception as e:
+            if intento == politica.intentos:
+                if interruptor is not None:
+                    interruptor.registrar_fallo()
+                raise
+            espera = politica.espera(intento)
+            logging.warning(
+                f"Intento {intento}/{politica.intentos} de {descripcion} falló ({timeout_ms} ms): "
+                f"{str(e).splitlines()[0] if str(e) else type(e).__name__}. Reintentando en {espera:.1f} s.",
+                extra={"agrupar": "reintento"},
+            )
+            metricas.sumar("reintentos")
+            dormir(espera)
+        else:
+            if interruptor is not None:
+                interruptor.registrar_exito()
+            return resultado
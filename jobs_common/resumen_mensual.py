@@ -0,0 +1,131 @@
+# resumen_mensual.py
+
+"""
+Resumen mensual de salarios de Laborum (una fila por área o subárea y mes).
+
+Las tablas de historial guardan una fila por ejecución; su columna `month` es en realidad el
+día de la ejecución. Las tablas de resumen tienen como clave (clave, mes), donde el mes es el
+primer día del mes calendario, y guardan:
+    salario_ultimo, salarios_basados_ultimo, executed_at   de la última ejecución del mes
+    salario_min, salario_max, muestras                     sobre las ejecuciones del mes
+    variacion_salario   salario_ultimo menos el del mes calendario anterior (NULL si no hay)
+
+Cada job llama a recalcular() con las particiones que acaba de escribir, dentro de la misma
+transacción. Solo se leen las filas del historial de esas particiones (índice por clave y
+mes), y se corrige la variación del mes siguiente si ya existía.
+"""
+
+from datetime import date
+
+from jobs_common import db
+
+
+def mes_de(fecha):
+    """
+    Primer día del mes de `fecha` (date o datetime).
+    """
+    return date(fecha.year, fecha.month, 1)
+
+
+def mes_anterior(mes):
+    return date(mes.year - 1, 12, 1) if mes.month == 1 else date(mes.year, mes.month - 1, 1)
+
+
+def mes_siguiente(mes):
+    return date(mes.year + 1, 1, 1) if mes.month == 12 else date(mes.year, mes.month + 1, 1)
+
+
+def _salarios_ultimos(conexion, resumen, clave, particiones):
+    """
+    salario_ultimo de las particiones (clave, mes) que ya están en la tabla de resumen.
+    """
+    from sqlalchemy import select
+
+    if not particiones:
+        return {}
+    columnas = resumen.c
+    consulta = select(columnas[clave], columnas.month, columnas.salario_ultimo).where(
+        columnas[clave].in_(sorted({valor for valor, _ in particiones})),
+        columnas.month.in_(sorted({mes for _, mes in particiones})),
+    )
+    salarios = {}
+    for valor, mes, salario in conexion.execute(consulta):
+        particion = (valor, mes_de(mes))
+        if particion in particiones:
+            salarios[particion] = salario
+    return salarios
+
+
+def recalcular(conexion, historial, resumen, clave, particiones=None):
+    """
+    Recalcula en `resumen` las particiones (valor de `clave`, fecha) indicadas a partir de
+    `historial` (objetos Table). Con particiones=None se recalcula todo el historial, para
+    completar la tabla la primera vez. `conexion` puede ser una sesión o una conexión.
+    Retorna la cantidad de particiones escritas.
+    """
+    from sqlalchemy import bindparam, select, update
+
+    columnas = historial.c
+    consulta = select(
+        columnas[clave], columnas.month, columnas.executed_at, columnas.id,
+        columnas.salario_promedio, columnas.salarios_basados,
+    )
+    if particiones is not None:
+        particiones = {(valor, mes_de(fecha)) for valor, fecha in particiones}
+        if not particiones:
+            return 0
+        meses = [mes for _, mes in particiones]
+        consulta = consulta.where(
+            columnas[clave].in_(sorted({valor for valor, _ in particiones})),
+            columnas.month >= min(meses),
+            columnas.month < mes_siguiente(max(meses)),
+        )
+
+    agregados = {}
+    for valor, dia, executed_at, id_, salario, basados in conexion.execute(consulta):
+        particion = (valor, mes_de(dia))
+        if particiones is not None and particion not in particiones:
+            continue
+        actual = agregados.get(particion)
+        if actual is None:
+            agregados[particion] = actual = {
+                clave: valor, "month": particion[1], "salario_min": salario, "salario_max": salario,
+                "muestras": 0, "_orden": None,
+            }
+        actual["salario_min"] = min(actual["salario_min"], salario)
+        actual["salario_max"] = max(actual["salario_max"], salario)
+        actual["muestras"] += 1
+        if actual["_orden"] is None or (executed_at, id_) > actual["_orden"]:
+            actual["_orden"] = (executed_at, id_)
+            actual["salario_ultimo"] = salario
+            actual["salarios_basados_ultimo"] = int(basados)
+            actual["executed_at"] = executed_at
+    if not agregados:
+        return 0
+
+    # Variación contra el mes anterior: del mismo lote o de lo ya resumido
+    salarios = {particion: datos["salario_ultimo"] for particion, datos in agregados.items()}
+    anteriores = {(valor, mes_anterior(mes)) for valor, mes in agregados} - salarios.keys()
+    salarios.update(_salarios_ultimos(conexion, resumen, clave, anteriores))
+    filas = []
+    for (valor, mes), datos in agregados.items():
+        anterior = salarios.get((valor, mes_anterior(mes)))
+        datos["variacion_salario"] = datos["salario_ultimo"] - anterior if anterior is not None else None
+        del datos["_orden"]
+        filas.append(datos)
+    db.upsert(conexion, resumen, filas, [clave, "month"])
+
+    # Si se recalculó un mes pasado, el mes siguiente ya resumido cambia su variación
+    siguientes = {(valor, mes_siguiente(mes)) for valor, mes in agregados} - agregados.keys()
+    cambios = [
+        {"b_clave": valor, "b_month": mes, "b_variacion": salario - salarios[(valor, mes_anterior(mes))]}
+        for (valor, mes), salario in _salarios_ultimos(conexion, resumen, clave, siguientes).items()
+    ]
+    if cambios:
+        conexion.execute(
+            update(resumen)
+            .where(resumen.c[clave] == bindparam("b_clave"), resumen.c.month == bindparam("b_month"))
+            .values(variacion_salario=bindparam("b_variacion")),
+            cambios,
+        )
+    return len(filas)
@@ -0,0 +1,33 @@
+# slug.py
+
+"""
+Slug de los nombres de áreas y subáreas de Laborum, tal como aparecen en las URL de
+https://www.laborum.cl/salarios/<slug>.
+
+    slugificar("Administración, Contabilidad y Finanzas") -> "administracion-contabilidad-y-finanzas"
+    slugificar("Diseño / Lingüística")                    -> "diseno-linguistica"
+
+La normalización NFKD separa cada letra de su tilde, diéresis o virgulilla (á, ü, ñ, ...) y
+una sola tabla de str.translate elimina esas marcas y las comas. Los espacios se vuelven un
+guion, y " / " también. Los resultados se memorizan por nombre: los jobs arman el mismo
+link para cada área en cada ejecución.
+"""
+
+import functools
+import re
+import unicodedata
+
+# Marcas diacríticas combinantes (U+0300 a U+036F) y comas se eliminan
+_TABLA = str.maketrans({**{codigo: None for codigo in range(0x300, 0x370)}, ",": None})
+
+# Espacios, o una barra rodeada de espacios, se reemplazan por un guion
+_SEPARADORES = re.compile(r"\s+/\s+|\s+")
+
+
+@functools.lru_cache(maxsize=4096)
+def slugificar(texto):
+    """
+    Convierte un nombre de área o subárea en el slug de su URL en Laborum.
+    """
+    texto = unicodedata.normalize("NFKD", texto.strip()).translate(_TABLA)
+    return _SEPARADORES.sub("-", texto).lower()
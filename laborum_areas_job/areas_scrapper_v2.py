@@ -2,14 +2,23 @@
 
 import os
 import re
+import sys
 import logging
-import pandas as pd
 from datetime import datetime
+from urllib.parse import urljoin
 # from dotenv import load_dotenv  # Elimina esta línea si no usarás .env
-from sqlalchemy import create_engine, Column, Integer, String, Date, ForeignKey, inspect
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.exc import IntegrityError
-from playwright.sync_api import sync_playwright
+
+# jobs_common vive en la raíz del repositorio (en la imagen Docker se copia junto al script)
+RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ_REPO not in sys.path:
+    sys.path.insert(0, RAIZ_REPO)
+
+from jobs_common import cascada, db, enlaces, feed, huellas, logs, metricas, navegador, reintentos, resumen_mensual
+from jobs_common.slug import slugificar
+
+# SQLAlchemy y Playwright se importan dentro de las funciones que los usan: importar
+# este módulo no crea el directorio de logs ni el engine, y el contenedor llega a
+# main() sin pagar la carga de esas librerías.
 
 # Definir la función para configurar logging
 def setup_logging():
@@ -18,23 +27,9 @@ def setup_logging():
     """
     log_directory = "/app/logs"  # Asegúrate de que esta ruta exista o se cree
     log_filename = "laborum_areas.log"
-    log_path = os.path.join(log_directory, log_filename)
-
-    # Crear directorio de logs si no existe
-    os.makedirs(log_directory, exist_ok=True)
 
-    # Configuración básica de logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(message)s",
-        handlers=[
-            logging.FileHandler(log_path),
-            logging.StreamHandler()  # Opcional: también loguear en consola
-        ]
-    )
-
-# Configurar logging
-setup_logging()
+    # JSON por línea, escritura en segundo plano y rotación por tamaño (ver jobs_common/logs.py)
+    logs.configurar_logging("laborum_areas_job", log_directory, log_filename)
 
 # Cargar variables de entorno (ya no es necesario cargar .env)
 # load_dotenv()
@@ -44,32 +39,121 @@ DB_PASS = os.getenv("DB_PASS")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT", "3306")
 DB_NAME = os.getenv("DB_NAME")
+# Camino rápido: repetir con HTTP el feed JSON descubierto en la última ejecución con navegador
+# (CAMINO_RAPIDO=false fuerza el navegador)
+CAMINO_RAPIDO = os.getenv("CAMINO_RAPIDO", "True").lower() == "true"
+# Solo escribir las áreas que cambiaron (DETECTAR_CAMBIOS=false escribe todas, como antes)
+DETECTAR_CAMBIOS = os.getenv("DETECTAR_CAMBIOS", "True").lower() == "true"
+
+URL_SALARIOS = "https://www.laborum.cl/salarios"
+
+# Timeouts por intento de la carga de la página (GOTO_TIMEOUTS_MS) y backoff entre intentos
+POLITICA_GOTO = reintentos.Politica.desde_entorno()
 
-# Configurar SQLAlchemy
 DATABASE_URI = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-engine = create_engine(DATABASE_URI)
-Session = sessionmaker(bind=engine)
-session = Session()
-Base = declarative_base()
-
-# Definir las clases ORM
-class LaborumArea(Base):
-    __tablename__ = 'laborum_areas'
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    nombre_area = Column(String(255), unique=True, nullable=False)
-
-class LaborumAreaLink(Base):
-    __tablename__ = 'laborum_areas_links_2'
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    area_id = Column(Integer, ForeignKey('laborum_areas.id'), nullable=False)
-    salario_promedio = Column(Integer, nullable=False)
-    salarios_basados = Column(Integer, nullable=False)
-    link_area = Column(String(255), nullable=False)
-    executed_at = Column(String(255), nullable=False)
-    month = Column(Date, nullable=False)
+
+# Objetos de SQLAlchemy (se crean en inicializar_bd())
+engine = None
+Session = None
+session = None
+Base = None
+LaborumArea = None
+LaborumAreaLink = None
+LaborumAreaLatestLink = None
+LaborumAreaMonthly = None
+LaborumPageFingerprint = None
+
+def definir_modelos():
+    """
+    Define la base declarativa y las clases ORM del job.
+    """
+    global Base, LaborumArea, LaborumAreaLink, LaborumAreaLatestLink, LaborumAreaMonthly, LaborumPageFingerprint
+    if Base is not None:
+        return
+
+    from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index
+    from sqlalchemy.orm import declarative_base
+
+    Base = declarative_base()
+
+    # Definir las clases ORM
+    class LaborumArea(Base):
+        __tablename__ = 'laborum_areas'
+        id = Column(Integer, primary_key=True, autoincrement=True)
+        nombre_area = Column(String(255), unique=True, nullable=False)
+
+    class LaborumAreaLink(Base):
+        __tablename__ = 'laborum_areas_links_2'
+        id = Column(Integer, primary_key=True, autoincrement=True)
+        area_id = Column(Integer, ForeignKey('laborum_areas.id'), nullable=False)
+        salario_promedio = Column(Integer, nullable=False)
+        salarios_basados = Column(Integer, nullable=False)
+        link_area = Column(String(255), nullable=False)
+        executed_at = Column(DateTime, nullable=False)
+        month = Column(Date, nullable=False)
+
+        # Índice de las consultas por área y mes (creado en bases existentes por
+        # migraciones/laborum_tipos_nativos.py)
+        __table_args__ = (
+            Index('ix_laborum_areas_links_2_area_month', 'area_id', 'month', 'executed_at', 'salario_promedio', 'salarios_basados'),
+        )
+
+    # Último link de cada área (una fila por área), mantenido por guardar_en_bd en la misma
+    # transacción que el historial. El job de subáreas lo lee en lugar de recorrer el historial.
+    class LaborumAreaLatestLink(Base):
+        __tablename__ = 'laborum_area_latest_link'
+        area_id = Column(Integer, ForeignKey('laborum_areas.id'), primary_key=True)
+        salario_promedio = Column(Integer, nullable=False)
+        salarios_basados = Column(Integer, nullable=False)
+        link_area = Column(String(255), nullable=False)
+        executed_at = Column(DateTime, nullable=False)
+        month = Column(Date, nullable=False)
+
+    # Resumen por área y mes calendario (month = primer día del mes), mantenido por
+    # guardar_en_bd con jobs_common.resumen_mensual
+    class LaborumAreaMonthly(Base):
+        __tablename__ = 'laborum_area_monthly'
+        area_id = Column(Integer, ForeignKey('laborum_areas.id'), primary_key=True)
+        month = Column(Date, primary_key=True)
+        salario_ultimo = Column(Integer, nullable=False)
+        salario_min = Column(Integer, nullable=False)
+        salario_max = Column(Integer, nullable=False)
+        salarios_basados_ultimo = Column(Integer, nullable=False)
+        muestras = Column(Integer, nullable=False)
+        variacion_salario = Column(Integer, nullable=True)
+        executed_at = Column(DateTime, nullable=False)
+
+    # Huella de cada página scrapeada (compartida con el job de subáreas), ver jobs_common/huellas.py
+    class LaborumPageFingerprint(Base):
+        __tablename__ = 'laborum_page_fingerprint'
+        pagina = Column(String(255), primary_key=True)
+        huella = Column(String(64), nullable=False)
+        filas = Column(Integer, nullable=False)
+        written_at = Column(DateTime, nullable=False)
+        executed_at = Column(DateTime, nullable=False)
+
+# Configurar SQLAlchemy
+def inicializar_bd(engine_externo=None):
+    """
+    Crea el engine, la fábrica de sesiones y la sesión del job.
+    Si se entrega engine_externo se usa ese motor en lugar de crear uno nuevo.
+    """
+    global engine, Session, session
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    definir_modelos()
+    if engine_externo is not None:
+        engine = engine_externo
+    elif engine is None:
+        engine = create_engine(DATABASE_URI)
+    Session = sessionmaker(bind=engine)
+    session = Session()
 
 # Crear las tablas si no existen
 def crear_tablas():
+    from sqlalchemy import inspect
+
     inspector = inspect(engine)
     if not inspector.has_table('laborum_areas'):
         LaborumArea.__table__.create(engine)
@@ -83,50 +167,86 @@ def crear_tablas():
     else:
         logging.info("Tabla 'laborum_areas_links_2' ya existe.")
 
-# Función para reemplazar caracteres
-def reemplazar(texto):
+    if not inspector.has_table('laborum_area_latest_link'):
+        LaborumAreaLatestLink.__table__.create(engine)
+        logging.info("Tabla 'laborum_area_latest_link' creada exitosamente.")
+        sembrar_ultimos_links()
+    else:
+        logging.info("Tabla 'laborum_area_latest_link' ya existe.")
+
+    if not inspector.has_table('laborum_area_monthly'):
+        LaborumAreaMonthly.__table__.create(engine)
+        with engine.begin() as connection:
+            particiones = resumen_mensual.recalcular(
+                connection, LaborumAreaLink.__table__, LaborumAreaMonthly.__table__, "area_id"
+            )
+        logging.info(f"Tabla 'laborum_area_monthly' creada y completada desde el historial con {particiones} meses.")
+    else:
+        logging.info("Tabla 'laborum_area_monthly' ya existe.")
+
+    if not inspector.has_table('laborum_page_fingerprint'):
+        LaborumPageFingerprint.__table__.create(engine)
+        logging.info("Tabla 'laborum_page_fingerprint' creada exitosamente.")
+    else:
+        logging.info("Tabla 'laborum_page_fingerprint' ya existe.")
+
+def sembrar_ultimos_links():
     """
-    Reemplaza vocales con acentos por sus equivalentes sin acentos,
-    elimina comas y reemplaza espacios por guiones.
+    Completa laborum_area_latest_link a partir del historial existente. Solo se necesita una
+    vez, al crear la tabla: desde entonces guardar_en_bd la mantiene al día.
     """
-    acentos = {
-        'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ú': 'u',
-        'Á': 'A', 'É': 'E', 'Í': 'I', 'Ó': 'O', 'Ú': 'U'
-    }
-    for acentuada, simple in acentos.items():
-        texto = re.sub(acentuada, simple, texto)
-    texto = re.sub(r',', '', texto)
-    texto = re.sub(r'\s+', '-', texto)
-    texto = re.sub(r'-/-', '-', texto)
-    
-    return texto.lower()
+    from sqlalchemy import text
+
+    consulta = text("""
+        INSERT INTO laborum_area_latest_link
+            (area_id, salario_promedio, salarios_basados, link_area, executed_at, month)
+        SELECT area_id, salario_promedio, salarios_basados, link_area, executed_at, month
+        FROM (
+            SELECT
+                area_id, salario_promedio, salarios_basados, link_area, executed_at, month,
+                ROW_NUMBER() OVER (PARTITION BY area_id ORDER BY executed_at DESC, id DESC) AS rn
+            FROM laborum_areas_links_2
+        ) ultimos
+        WHERE rn = 1
+    """)
+    with engine.begin() as connection:
+        filas = connection.execute(consulta).rowcount
+    logging.info(f"Tabla 'laborum_area_latest_link' completada desde el historial con {filas} áreas.")
+
+# Slug del nombre de un área en la URL de Laborum (compartido con el job de subáreas)
+reemplazar = slugificar
 
 def scrape_data(url):
     """
     Scrapea los datos de salarios desde la página especificada.
     """
     logging.info(f"Iniciando scraping de {url}")
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) " \
-                       "AppleWebKit/537.36 (KHTML, like Gecko) " \
-                       "Chrome/114.0.5735.110 Safari/537.36",
-            viewport={"width": 1920, "height": 1080},
-            locale='es-CL',  # Configuración regional en español de Chile
-            timezone_id='America/Santiago'  # Zona horaria de Santiago
-        )
+    with navegador.abrir(headless=True) as browser:
+        if browser is None:
+            return []
+        # User agent de escritorio, viewport del perfil de lanzamiento y configuración regional de Chile
+        context = browser.new_context(**navegador.opciones_contexto())
         page = context.new_page()
+        # Respuestas JSON de la página, para descubrir el feed del camino rápido
+        capturador = feed.Capturador(page)
+        # Tiempos de red por solicitud con NAVEGADOR_CASCADA (se escriben al cerrar la página)
+        red = cascada.Cascada(page, url)
+
+        def cargar(timeout_ms):
+            page.goto(url, timeout=timeout_ms)
+            page.wait_for_load_state('networkidle', timeout=timeout_ms)
+
         try:
-            page.goto(url, timeout=60000)
-            page.wait_for_load_state('networkidle', timeout=60000)
+            with metricas.etapa("scraping"):
+                reintentos.reintentar(cargar, POLITICA_GOTO, f"la carga de {url}")
+            metricas.sumar("paginas_scrapeadas")
             
             # Tomar una captura de pantalla para depuración (Opcional)
             # page.screenshot(path="page_screenshot.png")
             # logging.info("Captura de pantalla tomada: page_screenshot.png")
         except Exception as e:
             logging.error(f"Error al cargar la página {url}: {e}")
-            browser.close()
+            context.close()
             return []
         
         # Opcional: Ocultar el header si interfiere con la visualización
@@ -144,10 +264,11 @@ def scrape_data(url):
         # XPath del contenedor de las cards: //*[@id="root"]/div/div[3]/div/div/div/div
         # Cada card está en un div hijo dentro del contenedor
         cards = page.query_selector_all('xpath=//*[@id="root"]/div/div[3]/div/div/div/div')
+        red.marcar_selector(len(cards))
         
         if not cards:
             logging.error("No se encontraron cards con el selector proporcionado.")
-            browser.close()
+            context.close()
             return []
         
         logging.info(f"Encontradas {len(cards)} cards. Extrayendo datos...")
@@ -169,85 +290,206 @@ def scrape_data(url):
                 
                 # Limpiar el salario promedio
                 salario_promedio = re.sub(r'[^\d]', '', media_salarial) if media_salarial else None
+
+                # Enlace real de la card (la card está dentro de un <a> o lo contiene)
+                enlace_element = card.query_selector('xpath=ancestor-or-self::a[@href] | .//a[@href]')
+                href = enlace_element.get_attribute('href') if enlace_element else None
                 
                 if nombre_area and salario_promedio and salarios_basados:
                     data.append({
                         "nombre_area": nombre_area,
                         "salario_promedio": int(salario_promedio),
-                        "salarios_basados": int(salarios_basados)
+                        "salarios_basados": int(salarios_basados),
+                        "link_area": urljoin(url, href) if href else None,
                     })
-                    logging.info(f"Datos extraídos: {data[-1]}")
+                    logging.debug("Datos extraídos: %s", data[-1])
                 else:
-                    logging.warning(f"Datos incompletos en la card {idx}: {nombre_area}, {media_salarial}, {salarios_basados}")
+                    logging.warning(
+                        f"Datos incompletos en la card {idx}: {nombre_area}, {media_salarial}, {salarios_basados}",
+                        extra={"agrupar": "card_incompleta"},
+                    )
             except Exception as e:
                 logging.error(f"Error al extraer datos de la card {idx}: {e}")
+
+        try:
+            feed.descubrir(url, capturador.respuestas(), data, "nombre_area",
+                           ("salario_promedio", "salarios_basados"), campos_enlace=("link_area",))
+        except Exception as e:
+            logging.warning(f"No se pudo descubrir el feed JSON de {url}: {e}")
         
-        browser.close()
+        context.close()
+        metricas.sumar("filas_parseadas", len(data))
         return data
 
-def guardar_en_bd(data, engine, session):
+def scrape_data_http(url, sesion):
     """
-    Guarda los datos extraídos en la base de datos MariaDB.
+    Camino rápido: obtiene las áreas del feed JSON descubierto, sin navegador. Retorna None
+    si no hay feed descubierto o si cambió, y en ese caso se usa scrape_data().
     """
+    try:
+        with metricas.etapa("scraping_http"):
+            data = feed.obtener_filas(url, sesion, "nombre_area")
+    except feed.EsquemaCambiado as e:
+        logging.warning(f"El feed JSON de {url} cambió, se usa el navegador: {e}", extra={"agrupar": "feed_cambiado"})
+        metricas.sumar("feeds_cambiados")
+        return None
+    if data is None:
+        logging.info(f"No hay feed JSON descubierto para {url}; se usa el navegador.")
+        return None
+    logging.info(f"Camino rápido: {len(data)} áreas obtenidas por HTTP desde el feed JSON.")
+    metricas.sumar("paginas_http")
+    metricas.sumar("filas_parseadas", len(data))
+    return data
+
+# Campos de las cards que forman la huella de la página de áreas
+CAMPOS_HUELLA = ("nombre_area", "salario_promedio", "salarios_basados", "link_area")
+
+def guardar_en_bd(data, engine, session, pagina=URL_SALARIOS):
+    """
+    Guarda los datos extraídos en la base de datos MariaDB. Si la página no cambió desde la
+    última ejecución del mes no se escribe nada; si cambió, solo las áreas cuyo salario,
+    cantidad o enlace cambió (ver jobs_common/huellas.py).
+    Si la escritura falla se deshace la transacción y se relanza el error.
+    """
+    from sqlalchemy.exc import IntegrityError
+
     logging.info("Guardando datos en la base de datos")
-    
-    for entry in data:
-        nombre_area = entry['nombre_area']
+
+    ahora = datetime.now().replace(microsecond=0)
+    huella = huellas.calcular(data, CAMPOS_HUELLA)
+    tabla_huellas = LaborumPageFingerprint.__table__
+    if DETECTAR_CAMBIOS and huellas.pagina_sin_cambios(session, tabla_huellas, pagina, huella, ahora):
+        huellas.registrar(session, tabla_huellas, pagina, huella, len(data), ahora, escrita=False)
+        session.commit()
+        metricas.sumar("paginas_sin_cambios")
+        metricas.sumar("filas_sin_cambios", len(data))
+        logging.info(f"La página {pagina} no cambió desde la última ejecución; no se escriben filas.")
+        return
+
+    # Último valor guardado de cada área, para escribir solo las que cambiaron
+    ultimos_guardados = {}
+    if DETECTAR_CAMBIOS:
+        ultimos_guardados = {
+            fila.area_id: {"salario_promedio": fila.salario_promedio, "salarios_basados": fila.salarios_basados,
+                           "link_area": fila.link_area, "month": fila.month}
+            for fila in session.query(LaborumAreaLatestLink)
+        }
+
+    links_agregados = 0
+    sin_cambios = 0
+    ultimos_links = {}
+    with metricas.etapa("carga_bd"):
+        # Áreas existentes en una sola consulta; la consulta por nombre queda para las que no
+        # coinciden exactamente (la base compara sin distinguir mayúsculas)
+        areas_existentes = {area.nombre_area: area for area in session.query(LaborumArea)}
+        for entry in data:
+            nombre_area = entry['nombre_area']
         
-        # Verificar si el área ya existe
-        area = session.query(LaborumArea).filter_by(nombre_area=nombre_area).first()
-        if not area:
-            # Insertar nueva área
-            nueva_area = LaborumArea(nombre_area=nombre_area)
-            session.add(nueva_area)
-            try:
-                session.commit()
-                logging.info(f"Área '{nombre_area}' insertada exitosamente.")
-                area = nueva_area  # Asignar el objeto recién insertado a 'area'
-            except IntegrityError:
-                session.rollback()
-                area = session.query(LaborumArea).filter_by(nombre_area=nombre_area).first()
-                if not area:
-                    logging.error(f"Error al insertar el área '{nombre_area}'.")
-                    continue
-        else:
-            logging.info(f"Área '{nombre_area}' ya existe.")
+            # Verificar si el área ya existe
+            area = areas_existentes.get(nombre_area) or session.query(LaborumArea).filter_by(nombre_area=nombre_area).first()
+            if not area:
+                # Insertar nueva área
+                nueva_area = LaborumArea(nombre_area=nombre_area)
+                session.add(nueva_area)
+                try:
+                    session.commit()
+                    logging.info(f"Área '{nombre_area}' insertada exitosamente.")
+                    area = nueva_area  # Asignar el objeto recién insertado a 'area'
+                except IntegrityError:
+                    session.rollback()
+                    area = session.query(LaborumArea).filter_by(nombre_area=nombre_area).first()
+                    if not area:
+                        logging.error(f"Error al insertar el área '{nombre_area}'.")
+                        continue
+            else:
+                logging.debug("Área '%s' ya existe.", nombre_area)
         
-        # Ahora, insertar en laborum_areas_links_2
-        link_area = f"https://www.laborum.cl/salarios/{reemplazar(nombre_area)}"
-        month_current = datetime.now().date()
-        executed_at_current = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            # Ahora, insertar en laborum_areas_links_2. Se usa el enlace de la card; el slug
+            # armado a partir del nombre queda solo para cards sin enlace
+            link_area = entry.get('link_area') or f"https://www.laborum.cl/salarios/{reemplazar(nombre_area)}"
+            month_current = ahora.date()
+            ejecucion = ahora
+
+            valores = {"salario_promedio": entry['salario_promedio'], "salarios_basados": entry['salarios_basados'],
+                       "link_area": link_area}
+            if DETECTAR_CAMBIOS and not huellas.fila_cambiada(ultimos_guardados.get(area.id), valores, ahora):
+                sin_cambios += 1
+                continue
         
-        nuevo_link = LaborumAreaLink(
-            area_id=area.id,  # Ahora 'area' está correctamente asignado
-            salario_promedio=entry['salario_promedio'],
-            salarios_basados=entry['salarios_basados'],
-            link_area=link_area,
-            executed_at=executed_at_current,
-            month=month_current
-        )
-        session.add(nuevo_link)
+            nuevo_link = LaborumAreaLink(
+                area_id=area.id,  # Ahora 'area' está correctamente asignado
+                salario_promedio=entry['salario_promedio'],
+                salarios_basados=entry['salarios_basados'],
+                link_area=link_area,
+                executed_at=ejecucion,
+                month=month_current
+            )
+            session.add(nuevo_link)
+            links_agregados += 1
+            ultimos_links[area.id] = {
+                "area_id": area.id,
+                "salario_promedio": entry['salario_promedio'],
+                "salarios_basados": entry['salarios_basados'],
+                "link_area": link_area,
+                "executed_at": ejecucion,
+                "month": month_current,
+            }
     
+        try:
+            # Último link y resumen mensual por área, en la misma transacción que el historial
+            db.upsert(session, LaborumAreaLatestLink.__table__, list(ultimos_links.values()), ["area_id"])
+            session.flush()
+            particiones = resumen_mensual.recalcular(
+                session, LaborumAreaLink.__table__, LaborumAreaMonthly.__table__, "area_id",
+                [(fila["area_id"], fila["month"]) for fila in ultimos_links.values()],
+            )
+            huellas.registrar(session, tabla_huellas, pagina, huella, len(data), ahora, escrita=True)
+            session.commit()
+            metricas.sumar("particiones_resumidas", particiones)
+            metricas.sumar("filas_insertadas", links_agregados)
+            metricas.sumar("filas_sin_cambios", sin_cambios)
+            logging.info(
+                f"{links_agregados} registros insertados exitosamente en 'laborum_areas_links_2' ({sin_cambios} áreas sin cambios)."
+            )
+        except Exception as e:
+            session.rollback()
+            logging.error(f"Error al insertar datos en 'laborum_areas_links_2': {e}")
+            raise
+
+def main(engine_externo=None, sesion=None):
+    """
+    engine_externo y sesion (HTTP) permiten al orquestador compartir el pool de conexiones y
+    la sesión con los otros jobs; si no se entregan, el job crea los suyos.
+    Lanza una excepción si no se extraen datos o no se pueden guardar, para que el orquestador
+    no corra subáreas sobre los enlaces de la ejecución anterior.
+    """
+    # Configurar logging y base de datos
+    setup_logging()
+    metricas.iniciar("laborum_areas_job")
+    inicializar_bd(engine_externo)
+
     try:
-        session.commit()
-        logging.info("Todos los datos fueron insertados exitosamente en 'laborum_areas_links_2'.")
-    except Exception as e:
-        session.rollback()
-        logging.error(f"Error al insertar datos en 'laborum_areas_links_2': {e}")
-
-def main():
-    # Crear tablas si no existen
-    crear_tablas()
-    
-    url = "https://www.laborum.cl/salarios"
-    data = scrape_data(url)
-    
-    if not data:
-        logging.error("No se extrajeron datos. Terminando el script.")
-        return
-    
-    # Guardar los datos en la base de datos
-    guardar_en_bd(data, engine, session)
+        # Crear tablas si no existen
+        crear_tablas()
+
+        url = URL_SALARIOS
+        data = None
+        if CAMINO_RAPIDO:
+            if sesion is None:
+                with enlaces.crear_sesion() as sesion_propia:
+                    data = scrape_data_http(url, sesion_propia)
+            else:
+                data = scrape_data_http(url, sesion)
+        if not data:
+            data = scrape_data(url)
+
+        if not data:
+            raise RuntimeError(f"No se extrajeron datos de {url}.")
+
+        # Guardar los datos en la base de datos
+        guardar_en_bd(data, engine, session, url)
+    finally:
+        metricas.emitir_resumen()
 
 if __name__ == "__main__":
     main()
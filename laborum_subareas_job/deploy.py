@@ -9,9 +9,16 @@ image = "gcr.io/vocational-insight-api/laborum-scraper-subareas:latest"
 region = "southamerica-east1"
 memory = "1024Mi"
 timeout = "900s"
+# Tareas en paralelo: cada una scrapea las áreas con area_id % tasks == CLOUD_RUN_TASK_INDEX
+tasks = int(os.getenv("SUBAREAS_TASKS", "4"))
+# Cada tarea deja de empezar áreas antes del timeout; las que no alcanzó van primero la próxima vez
+presupuesto = int(timeout.rstrip("s")) - 60
 
 # Construir los comandos Docker y gcloud
-os.system(f"docker build -t {image} .")
+# El contexto de build es la raíz del repositorio para incluir jobs_common
+job_dir = os.path.dirname(os.path.abspath(__file__))
+repo_dir = os.path.dirname(job_dir)
+os.system(f"docker build -f {os.path.join(job_dir, 'Dockerfile')} -t {image} {repo_dir}")
 os.system(f"docker push {image}")
 
 env_vars = (
@@ -20,7 +27,8 @@ env_vars = (
     f"DB_HOST={os.getenv('DB_HOST')},"
     f"DB_PORT={os.getenv('DB_PORT')},"
     f"DB_NAME={os.getenv('DB_NAME')},"
-    f"PLAYWRIGHT_HEADLESS={os.getenv('PLAYWRIGHT_HEADLESS')}"
+    f"PLAYWRIGHT_HEADLESS={os.getenv('PLAYWRIGHT_HEADLESS')},"
+    f"PRESUPUESTO_SEGUNDOS={presupuesto}"
 )
 
 os.system(
@@ -29,5 +37,7 @@ os.system(
     f"--region {region} "
     f"--set-env-vars \"{env_vars}\" "
     f"--memory {memory} "
-    f"--task-timeout {timeout}"
+    f"--task-timeout {timeout} "
+    f"--tasks {tasks} "
+    f"--parallelism {tasks}"
 )
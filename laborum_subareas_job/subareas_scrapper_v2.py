@@ -2,13 +2,22 @@
 
 import os
 import re
+import sys
+import time
 import logging
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Date, ForeignKey, inspect
-from sqlalchemy.orm import sessionmaker, declarative_base, relationship
-from sqlalchemy.exc import IntegrityError
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-import pandas as pd
+
+# jobs_common vive en la raíz del repositorio (en la imagen Docker se copia junto al script)
+RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ_REPO not in sys.path:
+    sys.path.insert(0, RAIZ_REPO)
+
+from jobs_common import cascada, db, enlaces, feed, huellas, logs, metricas, navegador, particiones, presupuesto, reintentos, resumen_mensual
+from jobs_common.slug import slugificar
+
+# SQLAlchemy, Playwright y pandas se importan dentro de las funciones que los usan:
+# importar este módulo no crea el directorio de logs ni el engine, y el contenedor
+# llega a main() sin pagar la carga de esas librerías.
 
 # Definir la función para configurar logging
 def setup_logging():
@@ -17,23 +26,9 @@ def setup_logging():
     """
     log_directory = "/app/logs"  # Ruta ajustada para el contenedor Docker
     log_filename = "laborum_subareas.log"
-    log_path = os.path.join(log_directory, log_filename)
-
-    # Crear directorio de logs si no existe
-    os.makedirs(log_directory, exist_ok=True)
-
-    # Configuración básica de logging
-    logging.basicConfig(
-        level=logging.INFO,  # Cambia a DEBUG para más detalles
-        format="%(asctime)s [%(levelname)s] %(message)s",
-        handlers=[
-            logging.FileHandler(log_path),
-            logging.StreamHandler()  # Opcional: también loguear en consola
-        ]
-    )
 
-# Configurar logging
-setup_logging()
+    # JSON por línea, escritura en segundo plano y rotación por tamaño (ver jobs_common/logs.py)
+    logs.configurar_logging("laborum_subareas_job", log_directory, log_filename)
 
 # Cargar variables de entorno
 DB_USER = os.getenv("DB_USER")
@@ -42,58 +37,158 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT", "3306")
 DB_NAME = os.getenv("DB_NAME")
 PLAYWRIGHT_HEADLESS = os.getenv("PLAYWRIGHT_HEADLESS", "True").lower() == "true"
+# Validación HTTP de los enlaces antes de abrir el navegador (VALIDAR_LINKS=false la desactiva)
+VALIDAR_LINKS = os.getenv("VALIDAR_LINKS", "True").lower() == "true"
+# Camino rápido: repetir con HTTP el feed JSON descubierto en la última ejecución con navegador
+# (CAMINO_RAPIDO=false fuerza el navegador)
+CAMINO_RAPIDO = os.getenv("CAMINO_RAPIDO", "True").lower() == "true"
+# Solo escribir las subáreas que cambiaron (DETECTAR_CAMBIOS=false escribe todas, como antes)
+DETECTAR_CAMBIOS = os.getenv("DETECTAR_CAMBIOS", "True").lower() == "true"
+# Timeouts por intento de la carga de cada página (GOTO_TIMEOUTS_MS) y backoff entre intentos
+POLITICA_GOTO = reintentos.Politica.desde_entorno()
+# Áreas fallidas seguidas tras las que se abortan las restantes (0 desactiva el circuito)
+CIRCUITO_FALLOS = int(os.getenv("CIRCUITO_FALLOS", "3"))
+# Tarea de esta ejecución en un Cloud Run job con varias tareas (CLOUD_RUN_TASK_INDEX/COUNT):
+# cada tarea scrapea solo sus áreas (ver jobs_common/particiones.py)
+TAREA = particiones.Tarea.desde_entorno()
+# Segundos de la ejecución (0 sin límite): el job deja de empezar áreas cuando la más lenta vista
+# más PRESUPUESTO_MARGEN_SEGUNDOS ya no alcanza, y las restantes van primero en la próxima ejecución
+PRESUPUESTO_SEGUNDOS = float(os.getenv("PRESUPUESTO_SEGUNDOS", "0"))
+PRESUPUESTO_MARGEN_SEGUNDOS = float(os.getenv("PRESUPUESTO_MARGEN_SEGUNDOS", "15"))
 
-# Configurar SQLAlchemy
 DATABASE_URI = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-engine = create_engine(DATABASE_URI)
-Session = sessionmaker(bind=engine)
-session = Session()
-Base = declarative_base()
-
-# Definir las clases ORM para áreas (Importadas)
-class LaborumArea(Base):
-    __tablename__ = 'laborum_areas'
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    nombre_area = Column(String(255), unique=True, nullable=False)
-    links = relationship("LaborumAreaLink", back_populates="area")
-    subareas = relationship("LaborumSubarea", back_populates="area")
-
-class LaborumAreaLink(Base):
-    __tablename__ = 'laborum_areas_links_2'
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    area_id = Column(Integer, ForeignKey('laborum_areas.id'), nullable=False)
-    salario_promedio = Column(Integer, nullable=False)
-    salarios_basados = Column(Integer, nullable=False)
-    link_area = Column(String(255), nullable=False)
-    executed_at = Column(String(255), nullable=False)
-    month = Column(Date, nullable=False)
-    
-    area = relationship("LaborumArea", back_populates="links")
-
-# Definir las clases ORM para subáreas
-class LaborumSubarea(Base):
-    __tablename__ = 'laborum_subareas'
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    id_area = Column(Integer, ForeignKey('laborum_areas.id'), nullable=False)
-    nombre_subarea = Column(String(100), nullable=False)
-    created_at = Column(Date, default=datetime.utcnow)
-    
-    area = relationship("LaborumArea", back_populates="subareas")
-    links = relationship("LaborumSubareaLink", back_populates="subarea")
-
-class LaborumSubareaLink(Base):
-    __tablename__ = 'laborum_subareas_links_2'
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    id_subarea = Column(Integer, ForeignKey('laborum_subareas.id'), nullable=False)
-    salario_promedio = Column(Integer, nullable=False)
-    salarios_basados = Column(String(100), nullable=False)
-    executed_at = Column(Date, nullable=False)
-    month = Column(Date, nullable=False)
-    
-    subarea = relationship("LaborumSubarea", back_populates="links")
+
+# Objetos de SQLAlchemy (se crean en inicializar_bd())
+engine = None
+Session = None
+session = None
+Base = None
+LaborumArea = None
+LaborumAreaLink = None
+LaborumSubarea = None
+LaborumSubareaLink = None
+LaborumSubareaMonthly = None
+LaborumPageFingerprint = None
+LaborumSubareaSchedule = None
+
+def definir_modelos():
+    """
+    Define la base declarativa y las clases ORM de áreas y subáreas.
+    """
+    global Base, LaborumArea, LaborumAreaLink, LaborumSubarea, LaborumSubareaLink, LaborumSubareaMonthly, \
+        LaborumPageFingerprint, LaborumSubareaSchedule
+    if Base is not None:
+        return
+
+    from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index
+    from sqlalchemy.orm import declarative_base, relationship
+
+    Base = declarative_base()
+
+    # Definir las clases ORM para áreas (Importadas)
+    class LaborumArea(Base):
+        __tablename__ = 'laborum_areas'
+        id = Column(Integer, primary_key=True, autoincrement=True)
+        nombre_area = Column(String(255), unique=True, nullable=False)
+        links = relationship("LaborumAreaLink", back_populates="area")
+        subareas = relationship("LaborumSubarea", back_populates="area")
+
+    class LaborumAreaLink(Base):
+        __tablename__ = 'laborum_areas_links_2'
+        id = Column(Integer, primary_key=True, autoincrement=True)
+        area_id = Column(Integer, ForeignKey('laborum_areas.id'), nullable=False)
+        salario_promedio = Column(Integer, nullable=False)
+        salarios_basados = Column(Integer, nullable=False)
+        link_area = Column(String(255), nullable=False)
+        executed_at = Column(DateTime, nullable=False)
+        month = Column(Date, nullable=False)
+
+        # Índice de las consultas por área y mes (creado en bases existentes por
+        # migraciones/laborum_tipos_nativos.py)
+        __table_args__ = (
+            Index('ix_laborum_areas_links_2_area_month', 'area_id', 'month', 'executed_at', 'salario_promedio', 'salarios_basados'),
+        )
+
+        area = relationship("LaborumArea", back_populates="links")
+
+    # Definir las clases ORM para subáreas
+    class LaborumSubarea(Base):
+        __tablename__ = 'laborum_subareas'
+        id = Column(Integer, primary_key=True, autoincrement=True)
+        id_area = Column(Integer, ForeignKey('laborum_areas.id'), nullable=False)
+        nombre_subarea = Column(String(100), nullable=False)
+        created_at = Column(Date, default=datetime.utcnow)
+
+        area = relationship("LaborumArea", back_populates="subareas")
+        links = relationship("LaborumSubareaLink", back_populates="subarea")
+
+    class LaborumSubareaLink(Base):
+        __tablename__ = 'laborum_subareas_links_2'
+        id = Column(Integer, primary_key=True, autoincrement=True)
+        id_subarea = Column(Integer, ForeignKey('laborum_subareas.id'), nullable=False)
+        salario_promedio = Column(Integer, nullable=False)
+        salarios_basados = Column(Integer, nullable=False)
+        executed_at = Column(DateTime, nullable=False)
+        month = Column(Date, nullable=False)
+
+        __table_args__ = (
+            Index('ix_laborum_subareas_links_2_subarea_month', 'id_subarea', 'month', 'executed_at', 'salario_promedio', 'salarios_basados'),
+        )
+
+        subarea = relationship("LaborumSubarea", back_populates="links")
+
+    # Resumen por subárea y mes calendario (month = primer día del mes), mantenido por
+    # guardar_subareas_en_bd con jobs_common.resumen_mensual
+    class LaborumSubareaMonthly(Base):
+        __tablename__ = 'laborum_subarea_monthly'
+        id_subarea = Column(Integer, ForeignKey('laborum_subareas.id'), primary_key=True)
+        month = Column(Date, primary_key=True)
+        salario_ultimo = Column(Integer, nullable=False)
+        salario_min = Column(Integer, nullable=False)
+        salario_max = Column(Integer, nullable=False)
+        salarios_basados_ultimo = Column(Integer, nullable=False)
+        muestras = Column(Integer, nullable=False)
+        variacion_salario = Column(Integer, nullable=True)
+        executed_at = Column(DateTime, nullable=False)
+
+    # Huella de cada página scrapeada (compartida con el job de áreas), ver jobs_common/huellas.py
+    class LaborumPageFingerprint(Base):
+        __tablename__ = 'laborum_page_fingerprint'
+        pagina = Column(String(255), primary_key=True)
+        huella = Column(String(64), nullable=False)
+        filas = Column(Integer, nullable=False)
+        written_at = Column(DateTime, nullable=False)
+        executed_at = Column(DateTime, nullable=False)
+
+    # Último intento de scrapear cada área (el cursor entre ejecuciones, ver ordenar_por_antiguedad)
+    class LaborumSubareaSchedule(Base):
+        __tablename__ = 'laborum_subarea_schedule'
+        area_id = Column(Integer, ForeignKey('laborum_areas.id'), primary_key=True)
+        attempted_at = Column(DateTime, nullable=False)
+        resultado = Column(String(20), nullable=False)
+
+# Configurar SQLAlchemy
+def inicializar_bd(engine_externo=None):
+    """
+    Crea el engine, la fábrica de sesiones y la sesión del job.
+    Si se entrega engine_externo se usa ese motor en lugar de crear uno nuevo.
+    """
+    global engine, Session, session
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    definir_modelos()
+    if engine_externo is not None:
+        engine = engine_externo
+    elif engine is None:
+        engine = create_engine(DATABASE_URI)
+    Session = sessionmaker(bind=engine)
+    session = Session()
 
 # Crear las tablas si no existen
 def crear_tablas():
+    from sqlalchemy import inspect
+
     inspector = inspect(engine)
     if not inspector.has_table('laborum_subareas'):
         LaborumSubarea.__table__.create(engine)
@@ -107,27 +202,37 @@ def crear_tablas():
     else:
         logging.info("Tabla 'laborum_subareas_links_2' ya existe.")
 
-# Función para reemplazar caracteres
-def reemplazar(texto):
-    """
-    Reemplaza vocales con acentos por sus equivalentes sin acentos,
-    elimina comas y reemplaza espacios por guiones.
-    """
-    acentos = {
-        'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ú': 'u',
-        'Á': 'A', 'É': 'E', 'Í': 'I', 'Ó': 'O', 'Ú': 'U'
-    }
-    for acentuada, simple in acentos.items():
-        texto = re.sub(acentuada, simple, texto)
-    texto = re.sub(r',', '', texto)
-    texto = re.sub(r'\s+', '-', texto)
-    return texto.lower()
+    if not inspector.has_table('laborum_subarea_monthly'):
+        LaborumSubareaMonthly.__table__.create(engine)
+        with engine.begin() as connection:
+            particiones = resumen_mensual.recalcular(
+                connection, LaborumSubareaLink.__table__, LaborumSubareaMonthly.__table__, "id_subarea"
+            )
+        logging.info(f"Tabla 'laborum_subarea_monthly' creada y completada desde el historial con {particiones} meses.")
+    else:
+        logging.info("Tabla 'laborum_subarea_monthly' ya existe.")
 
-def obtener_ultimos_links():
-    """
-    Obtiene los últimos enlaces para cada área usando la consulta proporcionada.
-    """
-    query = """
+    if not inspector.has_table('laborum_page_fingerprint'):
+        LaborumPageFingerprint.__table__.create(engine)
+        logging.info("Tabla 'laborum_page_fingerprint' creada exitosamente.")
+    else:
+        logging.info("Tabla 'laborum_page_fingerprint' ya existe.")
+
+    if not inspector.has_table('laborum_subarea_schedule'):
+        LaborumSubareaSchedule.__table__.create(engine)
+        logging.info("Tabla 'laborum_subarea_schedule' creada exitosamente.")
+    else:
+        logging.info("Tabla 'laborum_subarea_schedule' ya existe.")
+
+# Slug del nombre de un área en la URL de Laborum (compartido con el job de áreas)
+reemplazar = slugificar
+
+# Último link de cada área, mantenido por el job de áreas: una fila por área
+CONSULTA_ULTIMOS_LINKS = "SELECT area_id, link_area FROM laborum_area_latest_link"
+
+# Consulta anterior sobre todo el historial, solo para bases donde el job de áreas aún no
+# creó laborum_area_latest_link
+CONSULTA_ULTIMOS_LINKS_HISTORIAL = """
     WITH RankedAreas AS (
         SELECT 
             area_id, 
@@ -144,7 +249,21 @@ def obtener_ultimos_links():
         RankedAreas
     WHERE 
         rn = 1;
+"""
+
+def obtener_ultimos_links():
+    """
+    Obtiene el último enlace de cada área desde laborum_area_latest_link (O(áreas)).
+    Si la tabla todavía no existe se usa la consulta sobre el historial completo.
     """
+    import pandas as pd
+    from sqlalchemy import inspect
+
+    if inspect(engine).has_table('laborum_area_latest_link'):
+        query = CONSULTA_ULTIMOS_LINKS
+    else:
+        logging.warning("No existe 'laborum_area_latest_link' (la crea el job de áreas); se recorre el historial.")
+        query = CONSULTA_ULTIMOS_LINKS_HISTORIAL
     try:
         df = pd.read_sql(query, engine)
         logging.info(f"Obtenidos {len(df)} enlaces recientes para las áreas.")
@@ -153,37 +272,41 @@ def obtener_ultimos_links():
         logging.error(f"Error al ejecutar la consulta SQL: {e}")
         return pd.DataFrame()
 
-def scrape_subareas(area_id, link):
+def scrape_subareas(area_id, link, interruptor=None):
     """
-    Scrapea los datos de subáreas desde la página de la área especificada.
+    Scrapea los datos de subáreas desde la página de la área especificada. Las cargas fallidas
+    se reintentan según POLITICA_GOTO y, si todos los intentos fallan, se registran en `interruptor`.
     """
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
     logging.info(f"Scrapeando subáreas para area_id={area_id} desde {link}")
-    with sync_playwright() as p:
-        try:
-            browser = p.chromium.launch(headless=PLAYWRIGHT_HEADLESS)
-        except Exception as e:
-            logging.error(f"Error al iniciar el navegador: {e}")
+    with navegador.abrir(headless=PLAYWRIGHT_HEADLESS) as browser:
+        if browser is None:
             return []
         
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) " \
-                       "AppleWebKit/537.36 (KHTML, like Gecko) " \
-                       "Chrome/114.0.5735.110 Safari/537.36",
-            viewport={"width": 1920, "height": 1080},
-            locale='es-CL',  # Configuración regional en español de Chile
-            timezone_id='America/Santiago'  # Zona horaria de Santiago
-        )
+        # User agent de escritorio, viewport del perfil de lanzamiento y configuración regional de Chile
+        context = browser.new_context(**navegador.opciones_contexto())
         page = context.new_page()
+        # Respuestas JSON de la página, para descubrir el feed del camino rápido
+        capturador = feed.Capturador(page)
+        # Tiempos de red por solicitud con NAVEGADOR_CASCADA (se escriben al cerrar la página)
+        red = cascada.Cascada(page, link)
+
+        def cargar(timeout_ms):
+            page.goto(link, timeout=timeout_ms)
+            page.wait_for_load_state('networkidle', timeout=timeout_ms)
+
         try:
-            page.goto(link, timeout=60000)
-            page.wait_for_load_state('networkidle', timeout=60000)
+            with metricas.etapa("scraping"):
+                reintentos.reintentar(cargar, POLITICA_GOTO, f"la carga de area_id={area_id}", interruptor)
+            metricas.sumar("paginas_scrapeadas")
         except PlaywrightTimeoutError:
             logging.error(f"Timeout al cargar la página {link}")
-            browser.close()
+            context.close()
             return []
         except Exception as e:
             logging.error(f"Error al cargar la página {link}: {e}")
-            browser.close()
+            context.close()
             return []
         
         # Tomar una captura de pantalla para depuración
@@ -208,10 +331,11 @@ def scrape_subareas(area_id, link):
         # Seleccionar todas las subcards usando los nuevos XPaths
         # Selector de todas las subcards: //*[@id="root"]/div/div[2]/div/div/div
         subcards = page.query_selector_all('xpath=//*[@id="root"]/div/div[2]/div/div/div')
+        red.marcar_selector(len(subcards))
         
         if not subcards:
             logging.error(f"No se encontraron subáreas en el enlace {link}.")
-            browser.close()
+            context.close()
             return []
         
         logging.info(f"Encontradas {len(subcards)} subáreas en la área_id={area_id}. Extrayendo datos...")
@@ -222,20 +346,20 @@ def scrape_subareas(area_id, link):
                 # Selector relativo: ./div/div[1]
                 nombre_subarea_element = subcard.query_selector('xpath=./div/div[1]')
                 nombre_subarea = nombre_subarea_element.inner_text().strip() if nombre_subarea_element else None
-                logging.debug(f"Subcard {idx} - Nombre Subárea: {nombre_subarea}")
+                logging.debug("Subcard %s - Nombre Subárea: %s", idx, nombre_subarea)
 
                 # Extraer la media salarial de la subárea
                 # Selector relativo: ./div/div[2]/div/div[2]
                 media_salarial_element = subcard.query_selector('xpath=./div/div[2]/div/div[2]')
                 media_salarial = media_salarial_element.inner_text().strip() if media_salarial_element else None
-                logging.debug(f"Subcard {idx} - Media Salarial: {media_salarial}")
+                logging.debug("Subcard %s - Media Salarial: %s", idx, media_salarial)
 
                 # Extraer la cantidad de salarios pretendidos para la subárea
                 # Selector relativo: ./div/div[2]/div/div[3]
                 salarios_basados_element = subcard.query_selector('xpath=./div/div[2]/div/div[3]')
                 salarios_basados_text = salarios_basados_element.inner_text().strip() if salarios_basados_element else None
                 salarios_basados = re.findall(r'\d+', salarios_basados_text)[0] if salarios_basados_text else None
-                logging.debug(f"Subcard {idx} - Salarios Basados: {salarios_basados}")
+                logging.debug("Subcard %s - Salarios Basados: %s", idx, salarios_basados)
 
                 # Limpiar el salario promedio
                 salario_promedio = re.sub(r'[^\d]', '', media_salarial) if media_salarial else None
@@ -247,98 +371,387 @@ def scrape_subareas(area_id, link):
                         "salario_promedio": int(salario_promedio),
                         "salarios_basados": int(salarios_basados)
                     })
-                    logging.info(f"Subdatos extraídos: {subdata[-1]}")
+                    logging.debug("Subdatos extraídos: %s", subdata[-1])
                 else:
-                    logging.warning(f"Datos incompletos en la subcard {idx} de area_id={area_id}: {nombre_subarea}, {media_salarial}, {salarios_basados}")
+                    logging.warning(
+                        f"Datos incompletos en la subcard {idx} de area_id={area_id}: {nombre_subarea}, {media_salarial}, {salarios_basados}",
+                        extra={"agrupar": "subcard_incompleta"},
+                    )
             except Exception as e:
                 logging.error(f"Error al extraer datos de la subcard {idx} de area_id={area_id}: {e}")
+
+        try:
+            feed.descubrir(link, capturador.respuestas(), subdata, "nombre_subarea",
+                           ("salario_promedio", "salarios_basados"))
+        except Exception as e:
+            logging.warning(f"No se pudo descubrir el feed JSON de {link}: {e}")
         
-        browser.close()
+        context.close()
+        metricas.sumar("filas_parseadas", len(subdata))
         return subdata
 
-def guardar_subareas_en_bd(subdata, session):
+def scrape_subareas_http(area_id, link, sesion):
     """
-    Guarda los datos de subáreas extraídos en la base de datos.
+    Camino rápido: obtiene las subáreas del feed JSON descubierto para `link`, sin navegador.
+    Retorna None si no hay feed descubierto o si cambió, y en ese caso se usa scrape_subareas().
     """
+    try:
+        with metricas.etapa("scraping_http"):
+            filas = feed.obtener_filas(link, sesion, "nombre_subarea")
+    except feed.EsquemaCambiado as e:
+        logging.warning(
+            f"El feed JSON de area_id={area_id} cambió, se usa el navegador: {e}", extra={"agrupar": "feed_cambiado"}
+        )
+        metricas.sumar("feeds_cambiados")
+        return None
+    if filas is None:
+        logging.debug("No hay feed JSON descubierto para %s; se usa el navegador.", link)
+        return None
+    logging.info(f"Camino rápido: {len(filas)} subáreas de area_id={area_id} obtenidas por HTTP.")
+    metricas.sumar("paginas_http")
+    metricas.sumar("filas_parseadas", len(filas))
+    return [dict(fila, id_area=area_id) for fila in filas]
+
+# Campos de las subcards que forman la huella de la página de un área
+CAMPOS_HUELLA = ("nombre_subarea", "salario_promedio", "salarios_basados")
+
+def guardar_subareas_en_bd(subdata, session, pagina=None):
+    """
+    Guarda los datos de subáreas extraídos en la base de datos. Con `pagina` (el link del área)
+    no se escribe nada si la página no cambió desde la última ejecución del mes; si cambió, solo
+    las subáreas cuyo salario o cantidad cambió (ver jobs_common/huellas.py).
+    """
+    from sqlalchemy.exc import IntegrityError
+
     logging.info("Guardando subáreas en la base de datos")
-    
-    for entry in subdata:
-        nombre_subarea = entry['nombre_subarea']
-        id_area = entry['id_area']
-        
-        # Verificar si la subárea ya existe dentro del área
-        subarea = session.query(LaborumSubarea).filter_by(nombre_subarea=nombre_subarea, id_area=id_area).first()
-        if not subarea:
-            # Insertar nueva subárea
-            nueva_subarea = LaborumSubarea(nombre_subarea=nombre_subarea, id_area=id_area)
-            session.add(nueva_subarea)
-            try:
-                session.commit()
-                logging.info(f"Subárea '{nombre_subarea}' insertada exitosamente en area_id={id_area}.")
-                subarea = nueva_subarea  # Asignar el objeto recién insertado a 'subarea'
-            except IntegrityError:
-                session.rollback()
-                subarea = session.query(LaborumSubarea).filter_by(nombre_subarea=nombre_subarea, id_area=id_area).first()
-                if not subarea:
-                    logging.error(f"Error al insertar la subárea '{nombre_subarea}' en area_id={id_area}.")
-                    continue
-        else:
-            logging.info(f"Subárea '{nombre_subarea}' ya existe en area_id={id_area}.")
+
+    ahora = datetime.now().replace(microsecond=0)
+    detectar = DETECTAR_CAMBIOS and pagina is not None
+    huella = huellas.calcular(subdata, CAMPOS_HUELLA)
+    tabla_huellas = LaborumPageFingerprint.__table__
+    if detectar and huellas.pagina_sin_cambios(session, tabla_huellas, pagina, huella, ahora):
+        huellas.registrar(session, tabla_huellas, pagina, huella, len(subdata), ahora, escrita=False)
+        session.commit()
+        metricas.sumar("paginas_sin_cambios")
+        metricas.sumar("filas_sin_cambios", len(subdata))
+        logging.info(f"La página {pagina} no cambió desde la última ejecución; no se escriben subáreas.")
+        return
+
+    links_agregados = 0
+    sin_cambios = 0
+    particiones = set()
+    resueltas = []
+    with metricas.etapa("carga_bd"):
+        # Subáreas existentes de las áreas de la página en una sola consulta; la consulta por
+        # nombre queda para las que no coinciden exactamente (la base compara sin distinguir mayúsculas)
+        subareas_existentes = {
+            (subarea.nombre_subarea, subarea.id_area): subarea
+            for subarea in session.query(LaborumSubarea).filter(
+                LaborumSubarea.id_area.in_(sorted({entry['id_area'] for entry in subdata}))
+            )
+        }
+        for entry in subdata:
+            nombre_subarea = entry['nombre_subarea']
+            id_area = entry['id_area']
         
-        # Insertar en laborum_subareas_links_2
-        month_current = datetime.now().date()
-        executed_at_current = datetime.now()
+            # Verificar si la subárea ya existe dentro del área
+            subarea = subareas_existentes.get((nombre_subarea, id_area)) or \
+                session.query(LaborumSubarea).filter_by(nombre_subarea=nombre_subarea, id_area=id_area).first()
+            if not subarea:
+                # Insertar nueva subárea
+                nueva_subarea = LaborumSubarea(nombre_subarea=nombre_subarea, id_area=id_area)
+                session.add(nueva_subarea)
+                try:
+                    session.commit()
+                    logging.info(f"Subárea '{nombre_subarea}' insertada exitosamente en area_id={id_area}.")
+                    subarea = nueva_subarea  # Asignar el objeto recién insertado a 'subarea'
+                except IntegrityError:
+                    session.rollback()
+                    subarea = session.query(LaborumSubarea).filter_by(nombre_subarea=nombre_subarea, id_area=id_area).first()
+                    if not subarea:
+                        logging.error(f"Error al insertar la subárea '{nombre_subarea}' en area_id={id_area}.")
+                        continue
+            else:
+                logging.debug("Subárea '%s' ya existe en area_id=%s.", nombre_subarea, id_area)
+            resueltas.append((subarea.id, entry))
+
+        # Último valor guardado de cada subárea, en una sola consulta, para escribir solo las que cambiaron
+        ultimos_guardados = {}
+        if detectar:
+            ultimos_guardados = huellas.ultimas_filas(
+                session, LaborumSubareaLink.__table__, "id_subarea",
+                [id_subarea for id_subarea, _ in resueltas], ("salario_promedio", "salarios_basados"),
+            )
+
+        for id_subarea, entry in resueltas:
+            valores = {"salario_promedio": entry['salario_promedio'], "salarios_basados": entry['salarios_basados']}
+            if detectar and not huellas.fila_cambiada(ultimos_guardados.get(id_subarea), valores, ahora):
+                sin_cambios += 1
+                continue
+
+            # Insertar en laborum_subareas_links_2
+            month_current = ahora.date()
+            executed_at_current = ahora
         
-        nuevo_sublink = LaborumSubareaLink(
-            id_subarea=subarea.id,
-            salario_promedio=entry['salario_promedio'],
-            salarios_basados=str(entry['salarios_basados']),
-            executed_at=executed_at_current,
-            month=month_current
-        )
-        session.add(nuevo_sublink)
+            nuevo_sublink = LaborumSubareaLink(
+                id_subarea=id_subarea,
+                salario_promedio=entry['salario_promedio'],
+                salarios_basados=entry['salarios_basados'],
+                executed_at=executed_at_current,
+                month=month_current
+            )
+            session.add(nuevo_sublink)
+            links_agregados += 1
+            particiones.add((id_subarea, month_current))
     
+        try:
+            # Resumen mensual de las subáreas escritas, en la misma transacción que el historial
+            session.flush()
+            resumidas = resumen_mensual.recalcular(
+                session, LaborumSubareaLink.__table__, LaborumSubareaMonthly.__table__, "id_subarea", particiones
+            )
+            if pagina is not None:
+                huellas.registrar(session, tabla_huellas, pagina, huella, len(subdata), ahora, escrita=True)
+            session.commit()
+            metricas.sumar("particiones_resumidas", resumidas)
+            metricas.sumar("filas_insertadas", links_agregados)
+            metricas.sumar("filas_sin_cambios", sin_cambios)
+            logging.info(
+                f"{links_agregados} registros insertados exitosamente en 'laborum_subareas_links_2' ({sin_cambios} subáreas sin cambios)."
+            )
+        except Exception as e:
+            session.rollback()
+            logging.error(f"Error al insertar datos en 'laborum_subareas_links_2': {e}")
+
+def descartar_links_muertos(ultimos_links_df, sesion=None):
+    """
+    Consulta todos los enlaces en paralelo con HEAD/GET y descarta los que responden 404/410,
+    para no pagar un goto completo del navegador por cada uno.
+    """
+    with metricas.etapa("validacion_links"):
+        estados = enlaces.validar_enlaces(ultimos_links_df['link_area'].tolist(), sesion=sesion)
+    muertos = ultimos_links_df['link_area'].map(lambda link: enlaces.enlace_muerto(estados.get(link)))
+    for _, row in ultimos_links_df[muertos].iterrows():
+        logging.warning(
+            f"Enlace de area_id={row['area_id']} responde {estados[row['link_area']]}; se omite: {row['link_area']}",
+            extra={"agrupar": "link_muerto"},
+        )
+    sin_respuesta = sum(1 for estado in estados.values() if estado is None)
+    logging.info(
+        f"Enlaces validados: {len(estados)}, descartados: {int(muertos.sum())}, sin respuesta (se intentan igual): {sin_respuesta}."
+    )
+    metricas.sumar("links_descartados", int(muertos.sum()))
+    return ultimos_links_df[~muertos]
+
+def ordenar_por_antiguedad(ultimos_links_df):
+    """
+    Ordena las áreas de la menos a la más recientemente refrescada. La fecha de un área es la
+    mayor entre su última fila escrita (executed_at de laborum_subarea_monthly, el mismo de
+    laborum_subareas_links_2 sin recorrer el historial), la última verificación de su página
+    sin cambios (laborum_page_fingerprint) y su último intento terminado (laborum_subarea_schedule).
+    Las áreas nunca intentadas van primero; los empates se ordenan por area_id.
+
+    Un intento que quedó 'en_curso' (la tarea murió por timeout a mitad del área) no cuenta
+    como refresco: el área conserva su antigüedad y se retoma primero.
+
+    Contar el intento hace que un área que falla siempre no quede primera en todas las
+    ejecuciones: con k áreas por ejecución, cada área se intenta dentro de ceil(áreas / k).
+    """
+    from sqlalchemy import func, select
+
+    if ultimos_links_df.empty:
+        return ultimos_links_df
+    mensual = LaborumSubareaMonthly.__table__
+    subareas = LaborumSubarea.__table__
+    paginas = LaborumPageFingerprint.__table__
+    agenda = LaborumSubareaSchedule.__table__
+    with engine.connect() as connection:
+        escritas = dict(connection.execute(
+            select(subareas.c.id_area, func.max(mensual.c.executed_at))
+            .join(subareas, subareas.c.id == mensual.c.id_subarea)
+            .group_by(subareas.c.id_area)
+        ).all())
+        verificadas = dict(connection.execute(
+            select(paginas.c.pagina, paginas.c.executed_at)
+            .where(paginas.c.pagina.in_(ultimos_links_df['link_area'].tolist()))
+        ).all())
+        intentadas = dict(connection.execute(
+            select(agenda.c.area_id, agenda.c.attempted_at).where(agenda.c.resultado != "en_curso")
+        ).all())
+
+    def refrescada(row):
+        fechas = [escritas.get(row['area_id']), verificadas.get(row['link_area']), intentadas.get(row['area_id'])]
+        fechas = [fecha for fecha in fechas if fecha is not None]
+        return max(fechas) if fechas else datetime.min
+
+    ordenados = ultimos_links_df.assign(refrescada_at=ultimos_links_df.apply(refrescada, axis=1))
+    ordenados = ordenados.sort_values(['refrescada_at', 'area_id'], kind='stable')
+    nunca = int((ordenados['refrescada_at'] == datetime.min).sum())
+    logging.info(
+        f"Áreas ordenadas por antigüedad: {nunca} nunca intentadas; la más antigua refrescada el "
+        f"{ordenados['refrescada_at'].iloc[0] if not nunca else 'nunca'}."
+    )
+    return ordenados
+
+def registrar_intento(area_id, resultado):
+    """
+    Guarda el intento de scrapear un área apenas ocurre, para que una tarea detenida por
+    timeout no pierda lo avanzado.
+    """
     try:
-        session.commit()
-        logging.info("Todos los subdatos fueron insertados exitosamente en 'laborum_subareas_links_2'.")
+        with engine.begin() as connection:
+            db.upsert(connection, LaborumSubareaSchedule.__table__,
+                      [{"area_id": int(area_id), "attempted_at": datetime.now().replace(microsecond=0), "resultado": resultado}], ["area_id"])
     except Exception as e:
-        session.rollback()
-        logging.error(f"Error al insertar datos en 'laborum_subareas_links_2': {e}")
+        logging.warning(f"No se pudo registrar el intento de area_id={area_id}: {e}")
+
+def particionar_links(ultimos_links_df, tarea):
+    """
+    Deja solo las áreas asignadas a `tarea` (por area_id, así el reparto no depende del orden
+    de la consulta).
+    """
+    if not tarea.particionada or ultimos_links_df.empty:
+        return ultimos_links_df
+    asignadas = ultimos_links_df['area_id'].map(tarea.asignada)
+    logging.info(f"Tarea {tarea}: {int(asignadas.sum())} de {len(ultimos_links_df)} áreas asignadas.")
+    return ultimos_links_df[asignadas]
 
-def scrape_areas_links():
+def scrape_areas_links(sesion=None, tarea=None):
     """
-    Esta función obtiene los enlaces más recientes por área para scrapear subáreas.
+    Esta función obtiene los enlaces más recientes por área para scrapear subáreas
+    (solo los de `tarea` si el job corre particionado).
     """
     logging.info("Obteniendo los últimos enlaces por área para scrapear subáreas.")
     ultimos_links_df = obtener_ultimos_links()
+    if tarea is not None:
+        ultimos_links_df = particionar_links(ultimos_links_df, tarea)
+    if VALIDAR_LINKS and not ultimos_links_df.empty:
+        ultimos_links_df = descartar_links_muertos(ultimos_links_df, sesion)
     return ultimos_links_df
 
-def main():
-    # Crear tablas si no existen
-    crear_tablas()
-    
-    # Paso 1: Obtener los últimos enlaces por área
-    ultimos_links_df = scrape_areas_links()
-    
-    if ultimos_links_df.empty:
-        logging.error("No se obtuvieron enlaces recientes para las áreas. Terminando el script.")
-        return
-    
-    # Paso 2: Iterar sobre cada enlace y scrapeo de subáreas
-    for index, row in ultimos_links_df.iterrows():
-        area_id = row['area_id']
-        link_area = row['link_area']
-        
-        subdata = scrape_subareas(area_id, link_area)
-        
-        if subdata:
-            guardar_subareas_en_bd(subdata, session)
-        else:
-            logging.warning(f"No se extrajeron subáreas para area_id={area_id} desde {link_area}.")
-    
-    logging.info("Proceso de scraping de subáreas completado exitosamente.")
+def main(engine_externo=None, sesion=None):
+    """
+    engine_externo y sesion (HTTP) permiten al orquestador compartir el pool de conexiones y
+    la sesión con los otros jobs; si no se entregan, el job crea los suyos.
+    """
+    # Configurar logging y base de datos
+    setup_logging()
+    metricas.iniciar("laborum_subareas_job")
+    tiempo = presupuesto.Presupuesto(PRESUPUESTO_SEGUNDOS, PRESUPUESTO_MARGEN_SEGUNDOS)
+    if TAREA.particionada:
+        metricas.etiquetar(tarea=TAREA.indice, tareas=TAREA.total)
+    inicializar_bd(engine_externo)
+    sesion_propia = sesion is None
+    if sesion_propia:
+        sesion = enlaces.crear_sesion()
+
+    try:
+        # Crear tablas si no existen
+        crear_tablas()
+
+        # Paso 1: Obtener los últimos enlaces por área
+        ultimos_links_df = scrape_areas_links(sesion, TAREA)
+        metricas.sumar("areas_asignadas", len(ultimos_links_df))
+
+        if ultimos_links_df.empty:
+            logging.error("No se obtuvieron enlaces recientes para las áreas. Terminando el script.")
+            return
+
+        # Paso 2: Iterar sobre cada enlace, de la menos a la más recientemente refrescada, y
+        # scrapeo de subáreas (por HTTP si hay feed descubierto) mientras alcance el presupuesto
+        ultimos_links_df = ordenar_por_antiguedad(ultimos_links_df)
+        interruptor = reintentos.Interruptor(CIRCUITO_FALLOS)
+        logging.info(
+            f"Peor caso por área con navegador: {POLITICA_GOTO.peor_caso(cargas_por_intento=2):.0f} s "
+            f"({POLITICA_GOTO.intentos} intentos); se abortan las áreas restantes tras {CIRCUITO_FALLOS} fallos seguidos."
+        )
+        # Un solo navegador para todas las áreas, lanzado solo si alguna no sale por HTTP
+        with navegador.compartido(PLAYWRIGHT_HEADLESS):
+            for posicion, (index, row) in enumerate(ultimos_links_df.iterrows()):
+                area_id = row['area_id']
+                link_area = row['link_area']
+
+                if interruptor.abierto:
+                    restantes = len(ultimos_links_df) - posicion
+                    logging.error(
+                        f"Circuito abierto tras {interruptor.fallos_consecutivos} áreas fallidas seguidas; "
+                        f"se abortan las {restantes} áreas restantes."
+                    )
+                    metricas.sumar("areas_abortadas", restantes)
+                    break
+
+                if not tiempo.alcanza():
+                    restantes = len(ultimos_links_df) - posicion
+                    logging.warning(
+                        f"Quedan {tiempo.restante():.0f} s del presupuesto y el área más lenta tomó "
+                        f"{tiempo.mas_lenta:.0f} s; las {restantes} áreas restantes quedan para la próxima ejecución."
+                    )
+                    metricas.sumar("areas_pendientes", restantes)
+                    break
+
+                inicio_area = time.monotonic()
+                registrar_intento(area_id, "en_curso")
+                subdata = scrape_subareas_http(area_id, link_area, sesion) if CAMINO_RAPIDO else None
+                if subdata:
+                    interruptor.registrar_exito()
+                else:
+                    subdata = scrape_subareas(area_id, link_area, interruptor)
+
+                if subdata:
+                    guardar_subareas_en_bd(subdata, session, link_area)
+                    metricas.sumar("areas_con_subareas")
+                else:
+                    logging.warning(f"No se extrajeron subáreas para area_id={area_id} desde {link_area}.")
+                    metricas.sumar("areas_sin_subareas")
+                registrar_intento(area_id, "ok" if subdata else "sin_subareas")
+                tiempo.registrar(time.monotonic() - inicio_area)
+
+        logging.info("Proceso de scraping de subáreas completado exitosamente.")
+    finally:
+        if sesion_propia:
+            sesion.close()
+        reportar_tarea(TAREA, metricas.actual().resumen()["contadores"])
+        metricas.emitir_resumen()
+
+def reportar_tarea(tarea, contadores):
+    """
+    Resultado de la tarea, para comparar las tareas de un Cloud Run job particionado.
+    """
+    logging.info(
+        f"Tarea {tarea}: {contadores.get('areas_asignadas', 0)} áreas asignadas, "
+        f"{contadores.get('areas_con_subareas', 0)} con subáreas, {contadores.get('areas_sin_subareas', 0)} sin subáreas, "
+        f"{contadores.get('areas_abortadas', 0)} abortadas, {contadores.get('areas_pendientes', 0)} pendientes por presupuesto.",
+        extra={"tarea": tarea.indice, "tareas": tarea.total},
+    )
+
+def ejecutar_tareas_locales(total):
+    """
+    Modo de prueba local del reparto: corre el job en `total` procesos con
+    CLOUD_RUN_TASK_INDEX/CLOUD_RUN_TASK_COUNT, como un Cloud Run job con `total` tareas,
+    y registra el resultado de cada una. Retorna el mayor código de salida.
+    """
+    setup_logging()
+    inicio = time.perf_counter()
+    resultados = particiones.lanzar_locales([sys.executable, os.path.abspath(__file__)], total)
+    for resultado in resultados:
+        resumen = resultado["resumen"] or {}
+        logging.info(
+            f"Tarea {resultado['tarea'] + 1}/{total}: código de salida {resultado['codigo']}, "
+            f"{resumen.get('duracion_segundos', '?')} s, contadores {resumen.get('contadores', {})}."
+        )
+    logging.info(f"{total} tareas locales terminadas en {time.perf_counter() - inicio:.1f} s.")
+    return max(resultado["codigo"] for resultado in resultados)
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scrapea las subáreas de Laborum de los últimos enlaces por área.")
+    parser.add_argument('--tareas-locales', type=int, default=None,
+                        help='Lanza N procesos con CLOUD_RUN_TASK_INDEX/COUNT, como un Cloud Run job con N tareas.')
+    args = parser.parse_args()
+
+    if args.tareas_locales:
+        sys.exit(ejecutar_tareas_locales(args.tareas_locales))
     main()
 
 
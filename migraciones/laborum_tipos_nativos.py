@@ -0,0 +1,359 @@
+# laborum_tipos_nativos.py
+
+"""
+Migración de las tablas de historial de Laborum a tipos nativos, con índices para las
+consultas "por área/subárea por mes".
+
+Columnas que se convierten:
+- laborum_areas_links_2.executed_at       VARCHAR(255) -> DATETIME
+- laborum_subareas_links_2.executed_at    DATE         -> DATETIME
+- laborum_subareas_links_2.salarios_basados VARCHAR(100) -> INT
+
+Índices que se crean (cubren mes, fecha de ejecución, salario y cantidad):
+- ix_laborum_areas_links_2_area_month        (area_id, month, executed_at, salario_promedio, salarios_basados)
+- ix_laborum_subareas_links_2_subarea_month  (id_subarea, month, executed_at, salario_promedio, salarios_basados)
+
+Para no bloquear las tablas se hace en fases (expandir, completar, intercambiar):
+
+1. preparar:  agrega una columna <columna>_nuevo nullable con el tipo nativo
+              (ALGORITHM=INSTANT o INPLACE/LOCK=NONE en MariaDB).
+2. backfill:  completa <columna>_nuevo por rangos de id, un lote por transacción, con una
+              pausa entre lotes para no acaparar el I/O ni generar lag de replicación.
+3. cambiar:   completa por lotes las filas insertadas durante el backfill y luego, con la tabla
+              bloqueada para escritura (LOCK TABLES ... WRITE en MariaDB, una transacción en
+              SQLite), completa las últimas, verifica que no quede ninguna y, en un solo ALTER,
+              renombra la columna antigua a <columna>_anterior (nullable) y la nueva a <columna>.
+              Los inserts de los jobs esperan al intercambio en vez de quedar con <columna>_nuevo
+              en NULL. En SQLite la columna antigua se elimina, porque no se puede volver nullable.
+4. indices:   crea los índices en línea (ALGORITHM=INPLACE, LOCK=NONE).
+5. limpiar:   elimina las columnas <columna>_anterior. Es opcional y no forma parte de "todo":
+              se ejecuta cuando ya no se necesite volver atrás.
+
+Salvo el intercambio de "cambiar", si MariaDB no puede ejecutar una DDL sin bloqueo, la
+migración se detiene con un error en lugar de bloquear la tabla. Cada fase es idempotente; se
+puede repetir o retomar. Como "cambiar" bloquea las escrituras mientras dura el ALTER, conviene
+correrla fuera de la ventana de los jobs de Laborum.
+
+La migración completa ("todo") se corre antes de desplegar la versión de los jobs de Laborum
+cuyos modelos usan Integer/DateTime para estas columnas.
+
+Uso:
+    python migraciones/laborum_tipos_nativos.py [--fase todo|preparar|backfill|cambiar|indices|limpiar]
+                                                [--tamano-lote 5000] [--pausa 0.05] [--db-url URL]
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import time
+
+CONVERSIONES = [
+    {
+        "tabla": "laborum_areas_links_2",
+        "columna": "executed_at",
+        "tipo": "DATETIME",
+        "tipo_anterior": "VARCHAR(255)",
+        "expresion": {"mysql": "STR_TO_DATE(executed_at, :formato)", "sqlite": "datetime(executed_at)"},
+    },
+    {
+        "tabla": "laborum_subareas_links_2",
+        "columna": "executed_at",
+        "tipo": "DATETIME",
+        "tipo_anterior": "DATE",
+        "expresion": {"mysql": "CAST(executed_at AS DATETIME)", "sqlite": "datetime(executed_at)"},
+    },
+    {
+        "tabla": "laborum_subareas_links_2",
+        "columna": "salarios_basados",
+        "tipo": "INT",
+        "tipo_anterior": "VARCHAR(100)",
+        "expresion": {"mysql": "CAST(salarios_basados AS SIGNED)", "sqlite": "CAST(salarios_basados AS INTEGER)"},
+    },
+]
+
+INDICES = [
+    ("laborum_areas_links_2", "ix_laborum_areas_links_2_area_month",
+     ["area_id", "month", "executed_at", "salario_promedio", "salarios_basados"]),
+    ("laborum_subareas_links_2", "ix_laborum_subareas_links_2_subarea_month",
+     ["id_subarea", "month", "executed_at", "salario_promedio", "salarios_basados"]),
+]
+
+# Formato con el que el job de áreas guardaba executed_at como texto
+FORMATO_EXECUTED_AT = "%Y-%m-%d %H:%i:%s"
+
+FASES = ("preparar", "backfill", "cambiar", "indices", "limpiar")
+
+
+def url_desde_entorno():
+    """
+    URI de MariaDB a partir de las mismas variables de entorno que usan los jobs.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return (
+        f"mysql+pymysql://{os.getenv('DB_USER')}:{os.getenv('DB_PASS')}@{os.getenv('DB_HOST')}:"
+        f"{os.getenv('DB_PORT', '3306')}/{os.getenv('DB_NAME')}"
+    )
+
+
+def _columnas(engine, tabla):
+    from sqlalchemy import inspect
+
+    return {columna["name"]: columna for columna in inspect(engine).get_columns(tabla)}
+
+
+def _es_nativa(columna, tipo):
+    """
+    True si la columna ya tiene el tipo de destino.
+    """
+    nombre = type(columna["type"]).__name__.upper()
+    if tipo == "DATETIME":
+        return nombre in ("DATETIME", "TIMESTAMP")
+    return nombre in ("INTEGER", "INT", "BIGINT")
+
+
+def _pendiente(engine, conversion):
+    """
+    True si la conversión todavía no se completó (la columna no tiene el tipo nativo).
+    """
+    columnas = _columnas(engine, conversion["tabla"])
+    return not _es_nativa(columnas[conversion["columna"]], conversion["tipo"])
+
+
+def ejecutar_ddl_en_linea(engine, sentencia, connection=None):
+    """
+    Ejecuta una DDL sin bloquear la tabla. En MariaDB/MySQL se intenta ALGORITHM=INSTANT y luego
+    ALGORITHM=INPLACE, LOCK=NONE; si ninguno es posible se lanza el error en lugar de copiar la tabla.
+    Con `connection` (que ya tiene la tabla bloqueada, ver _tabla_bloqueada) se ejecuta en esa
+    conexión y sin LOCK=NONE.
+    """
+    from sqlalchemy import text
+    from sqlalchemy.exc import DBAPIError
+
+    if engine.dialect.name != "mysql":
+        if connection is not None:
+            connection.execute(text(sentencia))
+            return
+        with engine.begin() as connection:
+            connection.execute(text(sentencia))
+        return
+
+    algoritmos = ("ALGORITHM=INSTANT", "ALGORITHM=INPLACE, LOCK=NONE")
+    if connection is not None:
+        algoritmos = ("ALGORITHM=INSTANT", "ALGORITHM=INPLACE")
+    ultimo_error = None
+    for algoritmo in algoritmos:
+        try:
+            if connection is not None:
+                connection.execute(text(f"{sentencia}, {algoritmo}"))
+            else:
+                with engine.begin() as conexion_ddl:
+                    conexion_ddl.execute(text(f"{sentencia}, {algoritmo}"))
+            logging.info(f"DDL ejecutada con {algoritmo}: {sentencia}")
+            return
+        except DBAPIError as e:
+            ultimo_error = e
+    raise RuntimeError(f"No se puede ejecutar sin copiar la tabla: {sentencia}: {ultimo_error}")
+
+
+@contextlib.contextmanager
+def _tabla_bloqueada(engine, tabla):
+    """
+    Conexión que tiene `tabla` bloqueada para escritura mientras dura el bloque: en MariaDB con
+    LOCK TABLES ... WRITE (en autocommit, cada sentencia se confirma al ejecutarse); en SQLite
+    con una transacción, que toma el candado de escritura en la primera sentencia que modifica.
+    Los inserts de otras conexiones esperan a que termine el bloque.
+    """
+    from sqlalchemy import text
+
+    if engine.dialect.name != "mysql":
+        with engine.begin() as connection:
+            yield connection
+        return
+
+    with engine.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT")
+        connection.execute(text(f"LOCK TABLES {tabla} WRITE"))
+        try:
+            yield connection
+        finally:
+            connection.execute(text("UNLOCK TABLES"))
+
+
+def preparar(engine):
+    for conversion in CONVERSIONES:
+        tabla, columna = conversion["tabla"], conversion["columna"]
+        if not _pendiente(engine, conversion):
+            logging.info(f"{tabla}.{columna} ya es {conversion['tipo']}.")
+            continue
+        if f"{columna}_nuevo" in _columnas(engine, tabla):
+            logging.info(f"{tabla}.{columna}_nuevo ya existe.")
+            continue
+        ejecutar_ddl_en_linea(engine, f"ALTER TABLE {tabla} ADD COLUMN {columna}_nuevo {conversion['tipo']} NULL")
+        logging.info(f"Columna {tabla}.{columna}_nuevo agregada.")
+
+
+def _actualizar(conversion, nombre_dialecto, por_rango=True):
+    """
+    UPDATE que completa <columna>_nuevo en las filas que falten (entre :desde y :hasta si
+    `por_rango`) y sus parámetros fijos.
+    """
+    from sqlalchemy import text
+
+    tabla, columna = conversion["tabla"], conversion["columna"]
+    expresion = conversion["expresion"]["sqlite" if nombre_dialecto == "sqlite" else "mysql"]
+    parametros = {"formato": FORMATO_EXECUTED_AT} if ":formato" in expresion else {}
+    rango = "id >= :desde AND id < :hasta AND " if por_rango else ""
+    return text(
+        f"UPDATE {tabla} SET {columna}_nuevo = {expresion} "
+        f"WHERE {rango}{columna}_nuevo IS NULL AND {columna} IS NOT NULL"
+    ), parametros
+
+
+def _completar(engine, conversion, tamano_lote, pausa):
+    """
+    Completa <columna>_nuevo por rangos de id. Retorna la cantidad de filas actualizadas.
+    """
+    from sqlalchemy import text
+
+    tabla = conversion["tabla"]
+    with engine.connect() as connection:
+        minimo, maximo = connection.execute(text(f"SELECT MIN(id), MAX(id) FROM {tabla}")).one()
+    if minimo is None:
+        return 0
+
+    actualizar, parametros = _actualizar(conversion, engine.dialect.name)
+    total = 0
+    for desde in range(minimo, maximo + 1, tamano_lote):
+        with engine.begin() as connection:
+            total += connection.execute(actualizar, dict(parametros, desde=desde, hasta=desde + tamano_lote)).rowcount
+        if pausa:
+            time.sleep(pausa)
+    return total
+
+
+def backfill(engine, tamano_lote=5000, pausa=0.05):
+    for conversion in CONVERSIONES:
+        tabla, columna = conversion["tabla"], conversion["columna"]
+        if not _pendiente(engine, conversion) or f"{columna}_nuevo" not in _columnas(engine, tabla):
+            continue
+        inicio = time.perf_counter()
+        filas = _completar(engine, conversion, tamano_lote, pausa)
+        logging.info(f"{tabla}.{columna}_nuevo: {filas} filas completadas en {time.perf_counter() - inicio:.1f} s.")
+
+
+def cambiar(engine, tamano_lote=5000):
+    from sqlalchemy import text
+
+    for conversion in CONVERSIONES:
+        tabla, columna = conversion["tabla"], conversion["columna"]
+        if not _pendiente(engine, conversion):
+            continue
+        if f"{columna}_nuevo" not in _columnas(engine, tabla):
+            raise RuntimeError(f"Falta {tabla}.{columna}_nuevo; ejecutar antes las fases preparar y backfill.")
+
+        # Filas insertadas por los jobs durante el backfill, por lotes y sin bloquear
+        _completar(engine, conversion, tamano_lote, pausa=0)
+
+        # Las que lleguen después se completan con la tabla bloqueada, en la misma conexión que
+        # intercambia las columnas: ningún insert queda entre la verificación y el NOT NULL
+        actualizar, parametros = _actualizar(conversion, engine.dialect.name, por_rango=False)
+        with _tabla_bloqueada(engine, tabla) as connection:
+            connection.execute(actualizar, parametros)
+            sin_convertir = connection.execute(text(
+                f"SELECT COUNT(*) FROM {tabla} WHERE {columna}_nuevo IS NULL AND {columna} IS NOT NULL"
+            )).scalar()
+            if sin_convertir:
+                raise RuntimeError(
+                    f"{sin_convertir} filas de {tabla}.{columna} no se pudieron convertir a {conversion['tipo']}."
+                )
+
+            if engine.dialect.name == "mysql":
+                ejecutar_ddl_en_linea(
+                    engine,
+                    f"ALTER TABLE {tabla} "
+                    f"CHANGE COLUMN {columna} {columna}_anterior {conversion['tipo_anterior']} NULL, "
+                    f"CHANGE COLUMN {columna}_nuevo {columna} {conversion['tipo']} NOT NULL",
+                    connection,
+                )
+            else:
+                # SQLite no puede volver nullable la columna antigua: se elimina
+                connection.execute(text(f"ALTER TABLE {tabla} RENAME COLUMN {columna} TO {columna}_anterior"))
+                connection.execute(text(f"ALTER TABLE {tabla} RENAME COLUMN {columna}_nuevo TO {columna}"))
+                connection.execute(text(f"ALTER TABLE {tabla} DROP COLUMN {columna}_anterior"))
+        logging.info(f"{tabla}.{columna} ahora es {conversion['tipo']}.")
+
+
+def indices(engine):
+    from sqlalchemy import inspect
+
+    for tabla, nombre, columnas in INDICES:
+        existentes = {indice["name"] for indice in inspect(engine).get_indexes(tabla)}
+        if nombre in existentes:
+            logging.info(f"Índice {nombre} ya existe.")
+            continue
+        inicio = time.perf_counter()
+        if engine.dialect.name == "mysql":
+            sentencia = f"ALTER TABLE {tabla} ADD INDEX {nombre} ({', '.join(columnas)})"
+        else:
+            sentencia = f"CREATE INDEX {nombre} ON {tabla} ({', '.join(columnas)})"
+        ejecutar_ddl_en_linea(engine, sentencia)
+        logging.info(f"Índice {nombre} creado en {time.perf_counter() - inicio:.1f} s.")
+
+
+def limpiar(engine):
+    for conversion in CONVERSIONES:
+        tabla, columna = conversion["tabla"], conversion["columna"]
+        if f"{columna}_anterior" in _columnas(engine, tabla):
+            ejecutar_ddl_en_linea(engine, f"ALTER TABLE {tabla} DROP COLUMN {columna}_anterior")
+            logging.info(f"Columna {tabla}.{columna}_anterior eliminada.")
+
+
+def migrar(engine, fases=("preparar", "backfill", "cambiar", "indices"), tamano_lote=5000, pausa=0.05):
+    """
+    Ejecuta las fases indicadas en orden.
+    """
+    for fase in FASES:
+        if fase not in fases:
+            continue
+        logging.info(f"Fase '{fase}'.")
+        if fase == "preparar":
+            preparar(engine)
+        elif fase == "backfill":
+            backfill(engine, tamano_lote, pausa)
+        elif fase == "cambiar":
+            cambiar(engine, tamano_lote)
+        elif fase == "indices":
+            indices(engine)
+        elif fase == "limpiar":
+            limpiar(engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte las tablas de historial de Laborum a tipos nativos.")
+    parser.add_argument("--fase", choices=("todo",) + FASES, default="todo",
+                        help="Fase a ejecutar; 'todo' ejecuta preparar, backfill, cambiar e indices.")
+    parser.add_argument("--tamano-lote", type=int, default=5000, help="Filas por lote del backfill.")
+    parser.add_argument("--pausa", type=float, default=0.05, help="Segundos de pausa entre lotes.")
+    parser.add_argument("--db-url", help="URL de SQLAlchemy (por defecto se arma con DB_USER, DB_PASS, ...).")
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    engine = create_engine(args.db_url or url_desde_entorno())
+    fases = ("preparar", "backfill", "cambiar", "indices") if args.fase == "todo" else (args.fase,)
+    try:
+        migrar(engine, fases, args.tamano_lote, args.pausa)
+    except RuntimeError as e:
+        logging.error(str(e))
+        return 1
+    logging.info("Migración terminada.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+# noticias_link_hash.py
+
+"""
+Migración de la tabla 'noticias' a la clave única por link normalizado.
+
+El job de noticias identifica cada noticia por link_hash, el SHA-256 del link normalizado
+(news_job.main.normalizar_link: sin parámetros utm_*, sin "/" final y con el host en
+minúsculas), con el índice único ux_noticias_link_hash. En una tabla anterior, filas que eran
+distintas pueden tener el mismo link normalizado: esta migración las reporta y las aparta
+antes de crear el índice, en lugar de borrarlas durante un scrapeo.
+
+Fases:
+
+1. preparar:    agrega la columna link_hash (VARCHAR(64) NULL).
+2. backfill:    calcula link_hash por lotes en las filas que no lo tienen.
+3. reportar:    solo registra en el log cada grupo de noticias con el mismo link normalizado
+                (la que se conserva y las que se apartarían). No modifica nada y no forma
+                parte de "todo": sirve para revisar los grupos antes de apartarlos.
+4. duplicados:  registra los grupos igual que "reportar" y, en una transacción, copia a
+                'noticias_duplicadas' cada noticia repetida (con id_noticia_conservada, la más
+                antigua del grupo, que queda en 'noticias') y la elimina de 'noticias'.
+5. indice:      completa link_hash en las filas insertadas entretanto, verifica que no queden
+                duplicados y crea ux_noticias_link_hash en línea (ALGORITHM=INPLACE, LOCK=NONE).
+
+Cada fase es idempotente. Se corre una vez, antes de desplegar la versión del job que exige
+el índice. Las noticias apartadas siguen en 'noticias_duplicadas' para revisarlas o
+restaurarlas a mano.
+
+Uso:
+    python migraciones/noticias_link_hash.py [--fase todo|preparar|backfill|reportar|duplicados|indice]
+                                             [--tamano-lote 1000] [--db-url URL]
+"""
+
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime
+
+# news_job y las otras migraciones viven en la raíz del repositorio
+RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ_REPO not in sys.path:
+    sys.path.insert(0, RAIZ_REPO)
+
+from migraciones.laborum_tipos_nativos import ejecutar_ddl_en_linea, url_desde_entorno
+from news_job.main import hash_link
+
+INDICE = "ux_noticias_link_hash"
+TABLA_DUPLICADAS = "noticias_duplicadas"
+
+FASES = ("preparar", "backfill", "reportar", "duplicados", "indice")
+
+# Noticias repetidas: cada una con la más antigua de su link_hash, que es la que se conserva
+REPETIDAS = """
+    SELECT n.id_noticia, p.id_noticia_conservada
+    FROM noticias n
+    JOIN (
+        SELECT link_hash, MIN(id_noticia) AS id_noticia_conservada
+        FROM noticias
+        WHERE link_hash IS NOT NULL
+        GROUP BY link_hash
+        HAVING COUNT(*) > 1
+    ) p ON p.link_hash = n.link_hash
+    WHERE n.id_noticia <> p.id_noticia_conservada
+"""
+
+
+def _columnas(engine):
+    from sqlalchemy import inspect
+
+    return {columna["name"] for columna in inspect(engine).get_columns("noticias")}
+
+
+def _indices(engine):
+    from sqlalchemy import inspect
+
+    return {indice["name"] for indice in inspect(engine).get_indexes("noticias")}
+
+
+def tabla_duplicadas():
+    """
+    Tabla donde quedan las noticias apartadas: las columnas de 'noticias' más la noticia que
+    se conservó en su lugar y el momento en que se apartó.
+    """
+    from sqlalchemy import Column, Date, DateTime, Integer, MetaData, String, Table, Text
+
+    return Table(
+        TABLA_DUPLICADAS, MetaData(),
+        Column("id_noticia", Integer, primary_key=True, autoincrement=False),
+        Column("id_noticia_conservada", Integer, nullable=False),
+        Column("titulo", String(255), nullable=False),
+        Column("contenido", Text),
+        Column("fecha_publicacion", Date),
+        Column("link_noticia", String(255)),
+        Column("imagen_noticia", String(255)),
+        Column("link_hash", String(64), nullable=False),
+        Column("apartada_en", DateTime, nullable=False),
+    )
+
+
+def preparar(engine):
+    if "link_hash" in _columnas(engine):
+        logging.info("La columna noticias.link_hash ya existe.")
+        return
+    ejecutar_ddl_en_linea(engine, "ALTER TABLE noticias ADD COLUMN link_hash VARCHAR(64) NULL")
+    logging.info("Columna noticias.link_hash agregada.")
+
+
+def backfill(engine, tamano_lote=1000):
+    """
+    Calcula link_hash (en Python, sobre el link normalizado) en las filas que no lo tienen.
+    Retorna la cantidad de filas completadas.
+    """
+    from sqlalchemy import text
+
+    if "link_hash" not in _columnas(engine):
+        raise RuntimeError("Falta noticias.link_hash; ejecutar antes la fase preparar.")
+
+    completadas = 0
+    while True:
+        with engine.begin() as connection:
+            filas = connection.execute(
+                text("SELECT id_noticia, link_noticia FROM noticias WHERE link_hash IS NULL LIMIT :limite"),
+                {"limite": tamano_lote}
+            ).all()
+            if not filas:
+                break
+            connection.execute(
+                text("UPDATE noticias SET link_hash = :link_hash WHERE id_noticia = :id_noticia"),
+                [{"id_noticia": id_noticia, "link_hash": hash_link(link or str(id_noticia))} for id_noticia, link in filas]
+            )
+        completadas += len(filas)
+    logging.info(f"link_hash calculado para {completadas} noticias.")
+    return completadas
+
+
+def reportar(engine, connection=None):
+    """
+    Registra cada grupo de noticias con el mismo link normalizado: la que se conserva y las
+    repetidas. Retorna {id_noticia repetida: id_noticia conservada}.
+    """
+    from sqlalchemy import bindparam, text
+
+    if connection is None:
+        with engine.connect() as connection:
+            return reportar(engine, connection)
+
+    repetidas = dict(connection.execute(text(REPETIDAS)).all())
+    if not repetidas:
+        logging.info("No hay noticias con el mismo link normalizado.")
+        return repetidas
+
+    links = dict(connection.execute(
+        text("SELECT id_noticia, link_noticia FROM noticias WHERE id_noticia IN :ids")
+        .bindparams(bindparam("ids", expanding=True)),
+        {"ids": sorted(set(repetidas) | set(repetidas.values()))}
+    ).all())
+    grupos = {}
+    for id_noticia, id_conservada in sorted(repetidas.items()):
+        grupos.setdefault(id_conservada, []).append(id_noticia)
+    for id_conservada, ids in sorted(grupos.items()):
+        logging.info(
+            f"Se conserva la noticia {id_conservada} ({links[id_conservada]}); repetidas: "
+            + ", ".join(f"{id_noticia} ({links[id_noticia]})" for id_noticia in ids)
+        )
+    logging.info(f"{len(repetidas)} noticias repetidas en {len(grupos)} grupos.")
+    return repetidas
+
+
+def duplicados(engine):
+    """
+    Copia las noticias repetidas a 'noticias_duplicadas' y las elimina de 'noticias', en una
+    sola transacción. Retorna la cantidad de noticias apartadas.
+    """
+    from sqlalchemy import inspect, text
+
+    tabla = tabla_duplicadas()
+    if not inspect(engine).has_table(TABLA_DUPLICADAS):
+        tabla.create(engine)
+        logging.info(f"Tabla '{TABLA_DUPLICADAS}' creada.")
+
+    with engine.begin() as connection:
+        repetidas = reportar(engine, connection)
+        if not repetidas:
+            return 0
+        connection.execute(text(f"""
+            INSERT INTO {TABLA_DUPLICADAS} (id_noticia, id_noticia_conservada, titulo, contenido, fecha_publicacion,
+                                            link_noticia, imagen_noticia, link_hash, apartada_en)
+            SELECT n.id_noticia, r.id_noticia_conservada, n.titulo, n.contenido, n.fecha_publicacion,
+                   n.link_noticia, n.imagen_noticia, n.link_hash, :ahora
+            FROM noticias n
+            JOIN ({REPETIDAS}) r ON r.id_noticia = n.id_noticia
+        """), {"ahora": datetime.now().replace(microsecond=0)})
+        apartadas = connection.execute(text(f"""
+            DELETE FROM noticias
+            WHERE id_noticia IN (SELECT id_noticia FROM ({REPETIDAS}) AS r)
+        """)).rowcount
+    logging.info(f"{apartadas} noticias repetidas apartadas en '{TABLA_DUPLICADAS}'.")
+    return apartadas
+
+
+def indice(engine, tamano_lote=1000):
+    from sqlalchemy import text
+
+    if INDICE in _indices(engine):
+        logging.info(f"Índice {INDICE} ya existe.")
+        return
+
+    # Filas insertadas por una versión anterior del job mientras corría la migración
+    backfill(engine, tamano_lote)
+    with engine.connect() as connection:
+        repetidas = connection.execute(text(f"SELECT COUNT(*) FROM ({REPETIDAS}) r")).scalar()
+    if repetidas:
+        raise RuntimeError(f"Quedan {repetidas} noticias repetidas; ejecutar de nuevo la fase duplicados.")
+
+    if engine.dialect.name == "mysql":
+        sentencia = f"ALTER TABLE noticias ADD UNIQUE INDEX {INDICE} (link_hash)"
+    else:
+        sentencia = f"CREATE UNIQUE INDEX {INDICE} ON noticias (link_hash)"
+    ejecutar_ddl_en_linea(engine, sentencia)
+    logging.info(f"Índice único {INDICE} creado.")
+
+
+def migrar(engine, fases=("preparar", "backfill", "duplicados", "indice"), tamano_lote=1000):
+    """
+    Ejecuta las fases indicadas en orden.
+    """
+    for fase in FASES:
+        if fase not in fases:
+            continue
+        logging.info(f"Fase '{fase}'.")
+        if fase == "preparar":
+            preparar(engine)
+        elif fase == "backfill":
+            backfill(engine, tamano_lote)
+        elif fase == "reportar":
+            reportar(engine)
+        elif fase == "duplicados":
+            duplicados(engine)
+        elif fase == "indice":
+            indice(engine, tamano_lote)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agrega la clave única por link normalizado a la tabla de noticias.")
+    parser.add_argument("--fase", choices=("todo",) + FASES, default="todo",
+                        help="Fase a ejecutar; 'todo' ejecuta preparar, backfill, duplicados e indice.")
+    parser.add_argument("--tamano-lote", type=int, default=1000, help="Filas por lote del backfill.")
+    parser.add_argument("--db-url", help="URL de SQLAlchemy (por defecto se arma con DB_USER, DB_PASS, ...).")
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    engine = create_engine(args.db_url or url_desde_entorno())
+    fases = ("preparar", "backfill", "duplicados", "indice") if args.fase == "todo" else (args.fase,)
+    try:
+        migrar(engine, fases, args.tamano_lote)
+    except RuntimeError as e:
+        logging.error(str(e))
+        return 1
+    logging.info("Migración terminada.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
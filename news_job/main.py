@@ -1,164 +1,616 @@
 import os
 import re
+import sys
+import json
+import time
+import logging
+import hashlib
+import threading
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine, Column, Integer, String, Text, Date
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import IntegrityError
-from serpapi import search
-from dotenv import load_dotenv  # Importar dotenv para cargar variables de entorno
-
-# Cargar variables de entorno desde un archivo .env
-load_dotenv()
-
-# Definición de la base declarativa
-Base = declarative_base()
-
-# Modelo Noticias
-class Noticias(Base):
-    __tablename__ = 'noticias'
-    
-    id_noticia = Column(Integer, primary_key=True)
-    titulo = Column(String(255), nullable=False)
-    contenido = Column(Text)
-    fecha_publicacion = Column(Date)
-    link_noticia = Column(String(255))
-    imagen_noticia = Column(String(255))
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# jobs_common vive en la raíz del repositorio
+RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ_REPO not in sys.path:
+    sys.path.insert(0, RAIZ_REPO)
+
+from jobs_common import logs, metricas
+
+# Las dependencias pesadas (SQLAlchemy, serpapi, dotenv) se importan dentro de las
+# funciones que las usan: importar este módulo no abre conexiones ni consume créditos
+# de SerpAPI, y el arranque del job hasta main() se mantiene corto.
+
+# Modelos ORM (se definen en definir_modelos() la primera vez que se necesitan)
+Base = None
+Noticias = None
+
+def definir_modelos():
+    """
+    Define la base declarativa y el modelo Noticias.
+    """
+    global Base, Noticias
+    if Base is not None:
+        return
+
+    from sqlalchemy import Column, Integer, String, Text, Date, Index
+    from sqlalchemy.orm import declarative_base
+
+    # Definición de la base declarativa
+    Base = declarative_base()
+
+    # Modelo Noticias
+    class Noticias(Base):
+        __tablename__ = 'noticias'
+
+        id_noticia = Column(Integer, primary_key=True)
+        titulo = Column(String(255), nullable=False)
+        contenido = Column(Text)
+        fecha_publicacion = Column(Date)
+        link_noticia = Column(String(255))
+        imagen_noticia = Column(String(255))
+        # SHA-256 del link normalizado: permite deduplicar con un índice único de largo fijo
+        link_hash = Column(String(64))
+
+        __table_args__ = (
+            Index('ux_noticias_link_hash', 'link_hash', unique=True),
+        )
+
+# Unidades de las fechas relativas ("hace 3 h", "2 days ago") en español e inglés
+UNIDADES_FECHA = {}
+for _delta, _nombres in (
+    (timedelta(seconds=1), ("s", "seg", "segs", "segundo", "segundos", "sec", "secs", "second", "seconds")),
+    (timedelta(minutes=1), ("m", "min", "mins", "minuto", "minutos", "minute", "minutes")),
+    (timedelta(hours=1), ("h", "hr", "hrs", "hora", "horas", "hour", "hours")),
+    (timedelta(days=1), ("d", "día", "días", "dia", "dias", "day", "days")),
+    (timedelta(days=7), ("sem", "semana", "semanas", "w", "wk", "wks", "week", "weeks")),
+    (timedelta(days=30), ("mes", "meses", "month", "months", "mo", "mos")),
+    (timedelta(days=365), ("año", "años", "ano", "anos", "a", "year", "years", "yr", "yrs", "y")),
+):
+    UNIDADES_FECHA.update(dict.fromkeys(_nombres, _delta))
+
+# Palabras que reemplazan al número ("hace un día", "an hour ago")
+CANTIDADES_PALABRA = {"un": 1, "una": 1, "uno": 1, "a": 1, "an": 1, "one": 1}
+
+# Días de desplazamiento de las fechas con nombre
+DIAS_NOMBRADOS = {"hoy": 0, "today": 0, "ayer": 1, "yesterday": 1, "anteayer": 2, "antier": 2}
+
+# Meses abreviados y completos (español e inglés) para fechas absolutas como "3 mar 2024"
+MESES = {}
+for _numero, _nombres in enumerate((
+    ("ene", "enero", "jan", "january"),
+    ("feb", "febrero", "february"),
+    ("mar", "marzo", "march"),
+    ("abr", "abril", "apr", "april"),
+    ("may", "mayo"),
+    ("jun", "junio", "june"),
+    ("jul", "julio", "july"),
+    ("ago", "agosto", "aug", "august"),
+    ("sep", "sept", "set", "septiembre", "setiembre", "september"),
+    ("oct", "octubre", "october"),
+    ("nov", "noviembre", "november"),
+    ("dic", "diciembre", "dec", "december"),
+), start=1):
+    MESES.update(dict.fromkeys(_nombres, _numero))
+
+# Una sola expresión compilada para todos los formatos conocidos
+PATRON_FECHA = re.compile(r"""
+    ^\s*(?:
+        hace\s+(?P<n_es>\d+|\w+)\s*(?P<u_es>[^\W\d_]+)\.?                           # hace 3 horas / hace 3 h / hace un día
+      | (?P<n_en>\d+|\w+)\s*(?P<u_en>[^\W\d_]+)\.?\s+ago                           # 3 hours ago / an hour ago / 5m ago
+      | (?P<nombrado>hoy|today|ayer|yesterday|anteayer|antier)                      # ayer / yesterday
+      | (?P<d_num>\d{1,2})[-/.](?P<m_num>\d{1,2})[-/.](?P<a_num>\d{4})              # 03-02-2024 / 03/02/2024
+      | (?P<d_txt>\d{1,2})\s+(?:de\s+)?(?P<m_txt>[^\W\d_]+)\.?,?\s+(?:de\s+)?(?P<a_txt>\d{4})  # 3 mar 2024 / 3 de marzo de 2024
+      | (?P<m_en>[^\W\d_]+)\.?\s+(?P<d_en>\d{1,2}),?\s+(?P<a_en>\d{4})               # Mar 3, 2024
+    )\s*$
+""", re.IGNORECASE | re.VERBOSE)
+
+def _cantidad(texto):
+    return int(texto) if texto.isdigit() else CANTIDADES_PALABRA.get(texto)
 
 # Función para calcular la fecha
-def calcular_fecha(date):
-    posted_day = None
+def calcular_fecha(date, referencia=None):
+    """
+    Convierte la fecha de una noticia de SerpAPI ("hace 3 horas", "2 days ago", "ayer",
+    "03-02-2024", "3 mar 2024"...) en un datetime. Las fechas relativas se calculan contra
+    `referencia`, que conviene fijar una vez por lote. Retorna None si el formato no se reconoce.
+    """
+    if not date:
+        return None
+    match = PATRON_FECHA.match(date)
+    if not match:
+        return None
+
+    referencia = referencia or datetime.now()
+    grupos = match.groupdict()
     try:
-        posted_day = datetime.strptime(date, "%d-%m-%Y").strftime("%Y-%m-%d %H:%M:%S")
-        return posted_day
+        for numero, unidad in (("n_es", "u_es"), ("n_en", "u_en")):
+            if grupos[numero] is not None:
+                cantidad = _cantidad(grupos[numero].lower())
+                delta = UNIDADES_FECHA.get(grupos[unidad].lower())
+                if cantidad is None or delta is None:
+                    return None
+                return referencia - cantidad * delta
+
+        if grupos["nombrado"] is not None:
+            dias = DIAS_NOMBRADOS[grupos["nombrado"].lower()]
+            return (referencia - timedelta(days=dias)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+        if grupos["d_num"] is not None:
+            return datetime(int(grupos["a_num"]), int(grupos["m_num"]), int(grupos["d_num"]))
+
+        for dia, mes, anno in (("d_txt", "m_txt", "a_txt"), ("d_en", "m_en", "a_en")):
+            if grupos[dia] is not None:
+                numero_mes = MESES.get(grupos[mes].lower())
+                if numero_mes is None:
+                    return None
+                return datetime(int(grupos[anno]), numero_mes, int(grupos[dia]))
     except ValueError:
-        pass
+        # Fecha con valores fuera de rango (por ejemplo 31-02-2024)
+        return None
+    return None
 
-    days_match = re.match(r'hace (\d+) días?', date)
-    hours_match = re.match(r'hace (\d+) horas?', date)
-    minutes_match = re.match(r'hace (\d+) mins?', date)
-    seconds_match = re.match(r'hace (\d+) segundos?', date)
-    
-    weeks_match = re.match(r'hace (\d+) semanas?', date)
-    weeks_match = re.match(r'hace (\d+) semana?', date) if weeks_match == None else weeks_match
+# Configuración de la base de datos (se completa en cargar_configuracion())
+DB_USER = None
+DB_PASS = None
+DB_HOST = None
+DB_PORT = None
+DB_NAME = None
+DB_URI = None
 
-    months_match = re.match(r'hace (\d+) meses?', date)
-    months_match = re.match(r'hace (\d+) mes?', date) if months_match == None else months_match
+# SerpAPI y caché en disco de sus respuestas (se completan en cargar_configuracion())
+SERPAPI_API_KEY = None
+NEWS_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "serpapi")
+NEWS_CACHE_TTL = 6 * 60 * 60  # Segundos durante los que una respuesta guardada se considera vigente
+NEWS_RATE_LIMIT = 2.0  # Llamadas por segundo permitidas por api_key
+NEWS_WORKERS = 8  # Consultas que se descargan en paralelo
+NEWS_QUERIES = []  # Consultas configuradas por entorno (NEWS_QUERIES separadas por ';')
+NEWS_QUERY_TEMPLATE = "{} chile"  # Plantilla para las consultas generadas desde la base de datos
 
-    try:
-        if months_match:
-            meses = int(months_match.group(1))
-            posted_day = datetime.now() - timedelta(days=30 * meses)
-        elif weeks_match:
-            weeks = int(weeks_match.group(1))
-            posted_day = datetime.now() - timedelta(days= 7 * weeks)
-        elif days_match:
-            dias = int(days_match.group(1))
-            posted_day = datetime.now() - timedelta(days=dias)
-        elif hours_match:
-            horas = int(hours_match.group(1))
-            posted_day = datetime.now() - timedelta(hours=horas)
-        elif minutes_match:
-            minutos = int(minutes_match.group(1))
-            posted_day = datetime.now() - timedelta(minutes=minutos)
-        elif seconds_match:
-            segundos = int(seconds_match.group(1))
-            posted_day = datetime.now() - timedelta(seconds=segundos)
-    except ValueError as e:
-        print(f"Error al convertir a entero: {e}")
-
-    return posted_day.strftime("%Y-%m-%d %H:%M:%S") if isinstance(posted_day, datetime) else None
-
-# Configuración de la base de datos
-DB_USER = os.getenv("DB_USER")
-DB_PASS = os.getenv("DB_PASS")
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
-DB_NAME = os.getenv("DB_NAME")
-
-# Definir la URI de conexión a la base de datos MariaDB
-DB_URI = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-
-# Crear el motor de la base de datos
-engine = create_engine(DB_URI)
-
-# Crear una clase de sesión
-Session = sessionmaker(bind=engine)
-
-# Parámetros para la búsqueda
-params = {
-    "api_key": "da620831d593de36baafbfefca7e05e8e3d898aaa6176e58f3b0771c668b7b1f",
+# Motor de la base de datos (se crea en inicializar_bd())
+engine = None
+
+def setup_logging():
+    """
+    Configura el sistema de logging.
+    """
+    log_directory = os.getenv("LOG_DIRECTORY", "logs")
+    log_filename = os.getenv("LOG_FILENAME", "news_job.log")
+
+    # JSON por línea, escritura en segundo plano y rotación por tamaño (ver jobs_common/logs.py)
+    logs.configurar_logging("news_job", log_directory, log_filename)
+
+def cargar_configuracion():
+    """
+    Carga las variables de entorno (incluido el archivo .env) y arma la URI de la base de datos.
+    """
+    global DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME, DB_URI
+    global SERPAPI_API_KEY, NEWS_CACHE_DIR, NEWS_CACHE_TTL
+    global NEWS_RATE_LIMIT, NEWS_WORKERS, NEWS_QUERIES, NEWS_QUERY_TEMPLATE
+    from dotenv import load_dotenv  # Importar dotenv para cargar variables de entorno
+
+    # Cargar variables de entorno desde un archivo .env
+    load_dotenv()
+
+    DB_USER = os.getenv("DB_USER")
+    DB_PASS = os.getenv("DB_PASS")
+    DB_HOST = os.getenv("DB_HOST")
+    DB_PORT = os.getenv("DB_PORT")
+    DB_NAME = os.getenv("DB_NAME")
+
+    # Definir la URI de conexión a la base de datos MariaDB
+    DB_URI = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+    SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY")
+    NEWS_CACHE_DIR = os.getenv("NEWS_CACHE_DIR", NEWS_CACHE_DIR)
+    NEWS_CACHE_TTL = int(os.getenv("NEWS_CACHE_TTL", NEWS_CACHE_TTL))
+    NEWS_RATE_LIMIT = float(os.getenv("NEWS_RATE_LIMIT", NEWS_RATE_LIMIT))
+    NEWS_WORKERS = int(os.getenv("NEWS_WORKERS", NEWS_WORKERS))
+    NEWS_QUERIES = [q.strip() for q in os.getenv("NEWS_QUERIES", "").split(";") if q.strip()]
+    NEWS_QUERY_TEMPLATE = os.getenv("NEWS_QUERY_TEMPLATE", NEWS_QUERY_TEMPLATE)
+
+def inicializar_bd(engine_externo=None):
+    """
+    Crea el motor de la base de datos.
+    Si se entrega engine_externo se usa ese motor en lugar de crear uno nuevo.
+    """
+    global engine
+    from sqlalchemy import create_engine
+
+    definir_modelos()
+    if engine_externo is not None:
+        engine = engine_externo
+    elif engine is None:
+        # Crear el motor de la base de datos
+        engine = create_engine(DB_URI)
+
+# Parámetros para la búsqueda (la consulta y la api_key se agregan en fetch_news)
+PARAMS_BASE = {
     "engine": "google",
-    "q": "educacion superior en chile",
     "location": "Chile",
     "google_domain": "google.cl",
     "gl": "cl",
     "hl": "es",
     "tbm": "nws",
-    "num": "50"
 }
 
-search_instance = search(params)
-results = search_instance.as_dict()
+QUERY_POR_DEFECTO = "educacion superior en chile"  # Se usa si no hay otras consultas configuradas
 
-def almacenar_noticias_en_db(results):
-    noticias_agregadas = 0
-    noticias_existentes = 0
+def ruta_cache(params, cache_dir=None):
+    """
+    Retorna la ruta del archivo de caché para unos parámetros de búsqueda.
+    La clave es un hash de los parámetros sin la api_key, así cambiar de clave no invalida la caché.
+    """
+    sin_credenciales = {k: v for k, v in params.items() if k != "api_key"}
+    clave = hashlib.sha256(json.dumps(sin_credenciales, sort_keys=True).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir or NEWS_CACHE_DIR, f"{clave}.json")
+
+def leer_cache(ruta, ttl=None):
+    """
+    Lee una respuesta guardada. Retorna None si no existe, está corrupta o es más antigua que ttl.
+    Con ttl=None se acepta cualquier antigüedad.
+    """
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            entrada = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if ttl is not None and time.time() - entrada.get("guardado_en", 0) > ttl:
+        return None
+    return entrada.get("respuesta")
+
+def escribir_cache(ruta, params, respuesta):
+    """
+    Guarda una respuesta en disco de forma atómica (archivo temporal + rename).
+    """
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    entrada = {
+        "guardado_en": time.time(),
+        "params": {k: v for k, v in params.items() if k != "api_key"},
+        "respuesta": respuesta,
+    }
+    ruta_tmp = f"{ruta}.{os.getpid()}.tmp"
+    with open(ruta_tmp, "w", encoding="utf-8") as f:
+        json.dump(entrada, f, ensure_ascii=False)
+    os.replace(ruta_tmp, ruta)
+
+class LimitadorTasa:
+    """
+    Limita las llamadas a una tasa máxima (llamadas por segundo), compartida entre hilos.
+    Cada llamada a esperar() reserva el siguiente turno libre y duerme hasta que llegue.
+    """
+    def __init__(self, por_segundo):
+        self.intervalo = 1.0 / por_segundo if por_segundo > 0 else 0.0
+        self.siguiente = 0.0
+        self.lock = threading.Lock()
 
-    # Crear una nueva sesión
-    session = Session()
+    def esperar(self):
+        with self.lock:
+            ahora = time.monotonic()
+            turno = max(ahora, self.siguiente)
+            self.siguiente = turno + self.intervalo
+        if turno > ahora:
+            time.sleep(turno - ahora)
 
-    noticias_a_insertar = []  # Lista para las noticias a insertar en batch
+# Un limitador por api_key: la cuota de SerpAPI es por clave
+_limitadores = {}
+_limitadores_lock = threading.Lock()
 
-    for result in results["news_results"]:
-        result["posted_day"] = calcular_fecha(result["date"])
+def limitador_para(api_key):
+    with _limitadores_lock:
+        if api_key not in _limitadores:
+            _limitadores[api_key] = LimitadorTasa(NEWS_RATE_LIMIT)
+        return _limitadores[api_key]
 
-        titulo = result["title"]
-        contenido = result.get("snippet", "") 
-        link_noticia = result["link"]
-        imagen_noticia = result.get("thumbnail", "") 
-        fecha_publicacion = result["posted_day"]
+def buscar_noticias(params):
+    """
+    Ejecuta la búsqueda en SerpAPI y retorna la respuesta como diccionario.
+    """
+    from serpapi import search
 
-        #print(f"Procesando noticia: {titulo}, fecha: {fecha_publicacion}, link: {link_noticia}")
+    search_instance = search(params)
+    return search_instance.as_dict()
 
-        # Verificar si la noticia con esa URL ya existe
-        noticia_existente = session.query(Noticias).filter_by(link_noticia=link_noticia).first()
+def fetch_news(query, num=50, start=0, api_key=None, cache_dir=None, ttl=None, solo_cache=False):
+    """
+    Obtiene noticias de Google News (SerpAPI) para una consulta, usando la caché en disco.
 
-        if noticia_existente:
-            noticias_existentes += 1
-            print(f"La noticia con el link {link_noticia} ya existe, se omite.")
+    Si existe una respuesta guardada para los mismos parámetros con menos de `ttl` segundos
+    se retorna sin llamar a la API. Con solo_cache=True nunca se usa la red: se retorna lo
+    que haya en caché sin importar su antigüedad, o una respuesta vacía.
+    """
+    params = dict(PARAMS_BASE, q=query, num=str(num))
+    if start:
+        params["start"] = str(start)
+
+    ruta = ruta_cache(params, cache_dir)
+    respuesta = leer_cache(ruta, None if solo_cache else (NEWS_CACHE_TTL if ttl is None else ttl))
+    if respuesta is not None:
+        logging.info(f"Respuesta de caché para '{query}' (start={start}).")
+        metricas.sumar("respuestas_cache")
+        return respuesta
+
+    if solo_cache:
+        logging.warning(f"No hay respuesta en caché para '{query}' (start={start}), se omite.")
+        return {"news_results": []}
+
+    api_key = api_key or SERPAPI_API_KEY
+    if not api_key:
+        raise RuntimeError("Falta la variable de entorno SERPAPI_API_KEY.")
+
+    limitador_para(api_key).esperar()
+    with metricas.etapa("descarga"):
+        respuesta = buscar_noticias(dict(params, api_key=api_key))
+    metricas.sumar("consultas_api")
+
+    # No guardar errores de la API (cuota agotada, clave inválida...) para no repetirlos
+    if "error" in respuesta:
+        logging.error(f"SerpAPI respondió con error para '{query}': {respuesta['error']}")
+    else:
+        escribir_cache(ruta, params, respuesta)
+    return respuesta
+
+def cargar_fixture(ruta):
+    """
+    Carga una respuesta de SerpAPI grabada en un archivo JSON (por ejemplo, para pruebas sin red).
+    Acepta tanto la respuesta cruda como una entrada del directorio de caché.
+    """
+    with open(ruta, encoding="utf-8") as f:
+        contenido = json.load(f)
+    return contenido.get("respuesta", contenido)
+
+def fetch_news_paginado(query, paginas=1, num=50, **kwargs):
+    """
+    Descarga hasta `paginas` páginas de resultados de una consulta usando el parámetro `start`.
+    Se detiene antes si una página trae menos de `num` resultados.
+    """
+    resultados = []
+    for pagina in range(paginas):
+        respuesta = fetch_news(query, num=num, start=pagina * num, **kwargs)
+        noticias = respuesta.get("news_results", [])
+        resultados.extend(noticias)
+        if len(noticias) < num:
+            break
+    return resultados
+
+def normalizar_link(link):
+    """
+    Normaliza un link para detectar la misma noticia publicada con variaciones menores:
+    esquema y host en minúsculas, sin fragmento, sin parámetros utm_* y sin "/" final.
+    """
+    partes = urlsplit(link.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(partes.query) if not k.lower().startswith("utm_")])
+    path = partes.path.rstrip("/") or "/"
+    return urlunsplit((partes.scheme.lower(), partes.netloc.lower(), path, query, ""))
+
+def deduplicar_noticias(listas_de_noticias):
+    """
+    Une los resultados de varias consultas y elimina las noticias repetidas (por link normalizado),
+    conservando la primera aparición. Retorna una respuesta con el formato de SerpAPI.
+    """
+    vistos = set()
+    unicas = []
+    for noticias in listas_de_noticias:
+        for noticia in noticias:
+            link = noticia.get("link")
+            if not link:
+                continue
+            clave = normalizar_link(link)
+            if clave in vistos:
+                continue
+            vistos.add(clave)
+            unicas.append(noticia)
+    return {"news_results": unicas}
+
+def obtener_noticias(consultas, paginas=1, num=50, max_workers=None, **kwargs):
+    """
+    Descarga varias consultas en paralelo (cada una con su paginación) y deduplica los resultados
+    en memoria antes de tocar la base de datos. El ritmo de llamadas lo controla LimitadorTasa.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not consultas:
+        return {"news_results": []}
+
+    max_workers = max_workers or NEWS_WORKERS
+    # Los hilos suman en las métricas de este job aunque otros jobs corran en el mismo proceso
+    metricas_job = metricas.actual()
+
+    def descargar(consulta):
+        with metricas.usar(metricas_job):
+            return fetch_news_paginado(consulta, paginas=paginas, num=num, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(consultas))) as executor:
+        # map conserva el orden de las consultas, así la deduplicación es determinista
+        listas = list(executor.map(descargar, consultas))
+
+    total = sum(len(lista) for lista in listas)
+    resultado = deduplicar_noticias(listas)
+    logging.info(f"{len(consultas)} consultas, {total} resultados, {len(resultado['news_results'])} noticias únicas.")
+    return resultado
+
+def consultas_desde_bd():
+    """
+    Genera consultas a partir de los nombres de áreas de Laborum y de las carreras registradas.
+    """
+    from sqlalchemy import text
+
+    consultas = []
+    for tabla, columna in (("laborum_areas", "nombre_area"), ("carreras", "nombre")):
+        try:
+            with engine.connect() as connection:
+                nombres = connection.execute(text(f"SELECT DISTINCT {columna} FROM {tabla}")).scalars().all()
+        except Exception as e:
+            logging.warning(f"No se pudieron leer consultas desde '{tabla}': {e}")
             continue
+        consultas.extend(NEWS_QUERY_TEMPLATE.format(nombre) for nombre in nombres if nombre)
+    return consultas
+
+def hash_link(link):
+    """
+    Retorna el SHA-256 (hex) del link normalizado, usado como clave única de la noticia.
+    """
+    return hashlib.sha256(normalizar_link(link).encode("utf-8")).hexdigest()
+
+def asegurar_esquema_noticias():
+    """
+    Crea la tabla 'noticias' si no existe. Una tabla anterior debe tener ya el índice único
+    ux_noticias_link_hash: la columna, los duplicados y el índice los maneja la migración
+    migraciones/noticias_link_hash.py, que se ejecuta una vez y reporta las noticias que aparta.
+    """
+    from sqlalchemy import inspect
+
+    inspector = inspect(engine)
+    if not inspector.has_table('noticias'):
+        Noticias.__table__.create(engine)
+        logging.info("Tabla 'noticias' creada exitosamente.")
+        return
 
-        # Crear una instancia de Noticia (solo si no existe)
-        nueva_noticia = Noticias(
-            titulo=titulo,
-            contenido=contenido,
-            fecha_publicacion=fecha_publicacion,
-            link_noticia=link_noticia,
-            imagen_noticia=imagen_noticia
+    indices = {indice['name'] for indice in inspector.get_indexes('noticias')}
+    if 'ux_noticias_link_hash' not in indices:
+        raise RuntimeError(
+            "La tabla 'noticias' no tiene el índice único 'ux_noticias_link_hash'; "
+            "ejecutar antes python migraciones/noticias_link_hash.py."
         )
 
-        noticias_a_insertar.append(nueva_noticia)  # Agregar la noticia a la lista de batch
+def almacenar_noticias_en_db(results, tamano_lote=1000):
+    """
+    Inserta las noticias nuevas usando link_hash como clave única.
 
-    # Insertar todas las noticias en batch
-    try:
-        session.bulk_save_objects(noticias_a_insertar)  # Inserción en batch
-        session.commit()  # Confirmar los cambios
-        noticias_agregadas = len(noticias_a_insertar)
-        print(f"Se agregaron {noticias_agregadas} noticias en batch.")
-    except IntegrityError as e:
-        session.rollback()
-        print(f"Error al realizar la inserción en batch, error: {e}")
-
-    # Cerrar la sesión
-    session.close()
-
-    print(f"Noticias agregadas: {noticias_agregadas}, noticias ya existentes: {noticias_existentes}")
+    Por cada lote se ejecuta una consulta WHERE link_hash IN (...) para contar las existentes
+    y un único INSERT IGNORE para las nuevas: el costo no depende de la cantidad de noticias y
+    un duplicado (por ejemplo, insertado por otra ejecución en paralelo) ya no anula el lote.
+    """
+    from sqlalchemy import insert, select
+    from sqlalchemy.exc import SQLAlchemyError
+
+    noticias_agregadas = 0
+    noticias_existentes = 0
+
+    # Una sola referencia temporal para todas las fechas relativas del lote
+    referencia = datetime.now()
+    fechas_no_reconocidas = {}
+
+    # Preparar las filas, descartando duplicados dentro de la misma respuesta
+    filas = {}
+    with metricas.etapa("parseo"):
+        for result in results.get("news_results", []):
+            if not result.get("link") or not result.get("title"):
+                continue
+            link_hash = hash_link(result["link"])
+            if link_hash in filas:
+                continue
+            fecha_publicacion = calcular_fecha(result.get("date"), referencia)
+            if fecha_publicacion is None and result.get("date"):
+                fechas_no_reconocidas[result["date"]] = fechas_no_reconocidas.get(result["date"], 0) + 1
+            filas[link_hash] = {
+                "titulo": result["title"][:255],
+                "contenido": result.get("snippet", ""),
+                "fecha_publicacion": fecha_publicacion.date() if fecha_publicacion else None,
+                "link_noticia": result["link"][:255],
+                "imagen_noticia": (result.get("thumbnail") or "")[:255],
+                "link_hash": link_hash,
+            }
+    metricas.sumar("filas_parseadas", len(filas))
+
+    if fechas_no_reconocidas:
+        ejemplos = ", ".join(f"'{fecha}'" for fecha in list(fechas_no_reconocidas)[:5])
+        logging.warning(f"{sum(fechas_no_reconocidas.values())} noticias con formato de fecha no reconocido (ej.: {ejemplos}).")
+
+    tabla = Noticias.__table__
+    # INSERT IGNORE en MariaDB/MySQL (INSERT OR IGNORE en SQLite, usado en benchmarks)
+    insertar_ignorando = (
+        insert(tabla)
+        .prefix_with("IGNORE", dialect="mysql")
+        .prefix_with("OR IGNORE", dialect="sqlite")
+    )
+
+    lista_filas = list(filas.values())
+    for inicio in range(0, len(lista_filas), tamano_lote):
+        lote = lista_filas[inicio:inicio + tamano_lote]
+        try:
+            with metricas.etapa("carga_bd"), engine.begin() as connection:
+                existentes = set(connection.execute(
+                    select(tabla.c.link_hash).where(tabla.c.link_hash.in_([fila["link_hash"] for fila in lote]))
+                ).scalars())
+                nuevas = [fila for fila in lote if fila["link_hash"] not in existentes]
+                if nuevas:
+                    resultado = connection.execute(insertar_ignorando, nuevas)
+                    # rowcount cuenta solo las filas realmente insertadas (las ignoradas no suman)
+                    agregadas = resultado.rowcount if resultado.rowcount >= 0 else len(nuevas)
+                else:
+                    agregadas = 0
+        except SQLAlchemyError as e:
+            logging.error(f"Error al realizar la inserción en batch, error: {e}")
+            continue
+        noticias_agregadas += agregadas
+        noticias_existentes += len(lote) - agregadas
+        metricas.sumar("filas_insertadas", agregadas)
+
+    logging.info(f"Noticias agregadas: {noticias_agregadas}, noticias ya existentes: {noticias_existentes}")
     return {
         'total_agregadas': noticias_agregadas,
         'total_existentes': noticias_existentes
     }
 
-# Ejecutar el almacenamiento
+def main(consultas=None, desde_bd=False, paginas=1, num=50, desde_cache=False, fixture=None, ttl=None, max_workers=None,
+         engine_externo=None):
+    setup_logging()
+    metricas.iniciar("news_job")
+    cargar_configuracion()
+    inicializar_bd(engine_externo)
+    asegurar_esquema_noticias()
+
+    try:
+        if fixture:
+            results = cargar_fixture(fixture)
+        else:
+            # Consultas: argumentos, luego NEWS_QUERIES, y opcionalmente las generadas desde la base de datos
+            consultas = list(consultas or NEWS_QUERIES)
+            if desde_bd:
+                consultas.extend(consultas_desde_bd())
+            if not consultas:
+                consultas = [QUERY_POR_DEFECTO]
+            # Quitar consultas repetidas conservando el orden
+            consultas = list(dict.fromkeys(consultas))
+
+            results = obtener_noticias(
+                consultas, paginas=paginas, num=num, max_workers=max_workers,
+                ttl=ttl, solo_cache=desde_cache
+            )
+
+        # Ejecutar el almacenamiento
+        return almacenar_noticias_en_db(results)
+    finally:
+        metricas.emitir_resumen()
+
 if __name__ == "__main__":
-    almacenar_noticias_en_db(results)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Buscar noticias en SerpAPI y almacenarlas en la base de datos.")
+    parser.add_argument('--query', action='append', help='Consulta a buscar en Google News (se puede repetir).')
+    parser.add_argument('--queries-file', help='Archivo con una consulta por línea.')
+    parser.add_argument('--queries-from-db', action='store_true', help='Agregar consultas por área de Laborum y por carrera.')
+    parser.add_argument('--pages', type=int, default=1, help='Páginas de resultados por consulta.')
+    parser.add_argument('--num', type=int, default=50, help='Resultados por página.')
+    parser.add_argument('--workers', type=int, help='Consultas en paralelo (por defecto NEWS_WORKERS).')
+    parser.add_argument('--from-cache', action='store_true', help='Usar solo respuestas en caché, sin llamar a la API.')
+    parser.add_argument('--fixture', help='Archivo JSON con una respuesta de SerpAPI grabada; no usa la red.')
+    parser.add_argument('--cache-ttl', type=int, help='Vigencia de la caché en segundos (por defecto NEWS_CACHE_TTL).')
+    args = parser.parse_args()
+
+    consultas = list(args.query or [])
+    if args.queries_file:
+        with open(args.queries_file, encoding='utf-8') as f:
+            consultas.extend(linea.strip() for linea in f if linea.strip() and not linea.startswith('#'))
+
+    main(
+        consultas=consultas,
+        desde_bd=args.queries_from_db,
+        paginas=args.pages,
+        num=args.num,
+        desde_cache=args.from_cache,
+        fixture=args.fixture,
+        ttl=args.cache_ttl,
+        max_workers=args.workers,
+    )
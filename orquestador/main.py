@@ -0,0 +1,294 @@
+# main.py
+
+"""
+Orquestador de los jobs: los corre como un grafo de dependencias en un solo proceso.
+
+    laborum_areas ──> laborum_subareas
+    graduated
+    enrolled
+    news (opcional, --jobs)
+
+Antes cada job era un contenedor con su propio cron: subáreas podía correr antes de que áreas
+terminara de escribir los enlaces, y cada contenedor pagaba su arranque, su engine y su
+navegador. Ahora cada componente conexo del grafo (una "rama") corre en un hilo, con sus
+nodos en orden topológico, y las ramas corren en paralelo. Todas comparten:
+
+- un engine de SQLAlchemy con pool de conexiones (pool_pre_ping, pool_recycle),
+- una sesión HTTP de requests (validación de enlaces y camino rápido de Laborum),
+- un navegador Chromium por rama (jobs_common.navegador: la API síncrona de Playwright no se
+  usa desde otro hilo, y las páginas de Laborum están todas en la misma rama),
+- la configuración de logging (cada registro lleva el job del hilo que lo emitió).
+
+Las descargas de mineduc (graduated, enrolled) siguen usando sus propios requests.get en
+streaming. Si un nodo termina con excepción, los que dependen de él se omiten: por eso el job de
+áreas lanza una excepción cuando no extrae datos o no logra guardarlos, en lugar de terminar
+normalmente y dejar que subáreas corra sobre los enlaces de la ejecución anterior.
+
+Un candado de archivo (ORQUESTADOR_LOCK) evita que dos ejecuciones se traslapen en la misma
+máquina: la segunda registra que hay otra en curso y termina sin hacer nada. El sistema
+operativo libera el candado si el proceso muere.
+
+Al final se escribe un resumen combinado (métricas de cada job y tiempos de cada nodo) en
+METRICS_SUMMARY_PATH y METRICS_PROMETHEUS_TEXTFILE; los jobs ya no escriben los suyos.
+
+Uso (desde la raíz del repositorio, o /app en el contenedor):
+    python -m orquestador.main [--jobs laborum_areas,laborum_subareas,graduated,enrolled]
+                               [--secuencial] [--db-url URL]
+"""
+
+import argparse
+import contextlib
+import fcntl
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from jobs_common import enlaces, logs, metricas, navegador
+
+LOCK_PATH = os.getenv("ORQUESTADOR_LOCK", "/tmp/vocational_jobs.lock")
+LOG_DIRECTORY = os.getenv("LOG_DIRECTORY", "/app/logs")
+# Conexiones del pool compartido (más otras tantas de desborde)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+PLAYWRIGHT_HEADLESS = os.getenv("PLAYWRIGHT_HEADLESS", "True").lower() == "true"
+
+JOBS_POR_DEFECTO = ("laborum_areas", "laborum_subareas", "graduated", "enrolled")
+
+
+class OtraEjecucionEnCurso(Exception):
+    """
+    Otro proceso tiene el candado del orquestador.
+    """
+
+
+class Nodo:
+    """
+    Un job del grafo: `ejecutar(recursos)` corre el job con los recursos compartidos.
+    """
+    def __init__(self, nombre, ejecutar, depende_de=()):
+        self.nombre = nombre
+        self.ejecutar = ejecutar
+        self.depende_de = tuple(depende_de)
+
+
+def _laborum_areas(recursos):
+    from laborum_areas_job import areas_scrapper_v2
+    areas_scrapper_v2.main(recursos["engine"], recursos["sesion"])
+
+
+def _laborum_subareas(recursos):
+    from laborum_subareas_job import subareas_scrapper_v2
+    subareas_scrapper_v2.main(recursos["engine"], recursos["sesion"])
+
+
+def _graduated(recursos):
+    from graduated_job import main_linux
+    main_linux.main(engine_externo=recursos["engine"])
+
+
+def _enrolled(recursos):
+    from enrolled_job.matriculados_automatizacion import matriculados_linux
+    matriculados_linux.main(engine_externo=recursos["engine"])
+
+
+def _news(recursos):
+    from news_job import main as news
+    news.main(engine_externo=recursos["engine"])
+
+
+NODOS = (
+    Nodo("laborum_areas", _laborum_areas),
+    Nodo("laborum_subareas", _laborum_subareas, depende_de=("laborum_areas",)),
+    Nodo("graduated", _graduated),
+    Nodo("enrolled", _enrolled),
+    Nodo("news", _news),
+)
+
+
+def ramas(nodos):
+    """
+    Agrupa `nodos` en componentes conexos (solo cuentan las dependencias que están en `nodos`)
+    y ordena cada uno topológicamente, respetando el orden de `nodos` entre pares independientes.
+    """
+    por_nombre = {nodo.nombre: nodo for nodo in nodos}
+    grupo = {nombre: nombre for nombre in por_nombre}
+
+    def raiz(nombre):
+        while grupo[nombre] != nombre:
+            nombre = grupo[nombre]
+        return nombre
+
+    for nodo in nodos:
+        for dependencia in nodo.depende_de:
+            if dependencia in por_nombre:
+                grupo[raiz(nodo.nombre)] = raiz(dependencia)
+
+    componentes = {}
+    for nodo in nodos:
+        componentes.setdefault(raiz(nodo.nombre), []).append(nodo)
+
+    resultado = []
+    for componente in componentes.values():
+        ordenados, hechos = [], set()
+        pendientes = list(componente)
+        while pendientes:
+            listos = [nodo for nodo in pendientes
+                      if all(d in hechos or d not in por_nombre for d in nodo.depende_de)]
+            if not listos:
+                raise ValueError(f"Dependencias circulares entre {[nodo.nombre for nodo in pendientes]}")
+            for nodo in listos:
+                ordenados.append(nodo)
+                hechos.add(nodo.nombre)
+                pendientes.remove(nodo)
+        resultado.append(ordenados)
+    return resultado
+
+
+@contextlib.contextmanager
+def candado(ruta):
+    """
+    Candado exclusivo (flock) sobre `ruta` mientras dura el bloque. Lanza OtraEjecucionEnCurso
+    si otro proceso lo tiene.
+    """
+    archivo = open(ruta, "a+")
+    try:
+        try:
+            fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            archivo.seek(0)
+            raise OtraEjecucionEnCurso(f"pid {archivo.read().strip() or 'desconocido'}")
+        archivo.truncate(0)
+        archivo.write(str(os.getpid()))
+        archivo.flush()
+        yield
+    finally:
+        archivo.close()
+
+
+def crear_engine(url=None):
+    """
+    Engine compartido por todos los jobs, con las variables DB_* si no se entrega `url`.
+    """
+    from sqlalchemy import create_engine
+
+    if url is None:
+        url = (f"mysql+pymysql://{os.getenv('DB_USER')}:{os.getenv('DB_PASS')}@{os.getenv('DB_HOST')}:"
+               f"{os.getenv('DB_PORT', '3306')}/{os.getenv('DB_NAME')}")
+    opciones = {"pool_pre_ping": True, "pool_recycle": DB_POOL_RECYCLE}
+    if not url.startswith("sqlite"):
+        opciones.update(pool_size=DB_POOL_SIZE, max_overflow=DB_POOL_SIZE)
+    return create_engine(url, **opciones)
+
+
+def ejecutar_rama(rama, recursos, resultados, orquestacion, inicio_orquestacion):
+    """
+    Corre los nodos de `rama` en orden, en el hilo actual y con un navegador compartido.
+    Anota en `resultados` el estado, los tiempos y el resumen de métricas de cada nodo.
+    """
+    with navegador.compartido(PLAYWRIGHT_HEADLESS):
+        for nodo in rama:
+            fallidas = [d for d in nodo.depende_de if d in resultados and resultados[d]["estado"] != "ok"]
+            inicio = time.perf_counter()
+            resultado = {"depende_de": list(nodo.depende_de),
+                         "inicio_segundos": round(inicio - inicio_orquestacion, 3)}
+            if fallidas:
+                logging.error(f"Se omite {nodo.nombre}: falló {', '.join(fallidas)}.")
+                resultados[nodo.nombre] = dict(resultado, estado="omitido", segundos=0.0)
+                orquestacion.sumar("nodos_omitidos")
+                continue
+
+            logs.asignar_job(nodo.nombre)
+            # Métricas provisionales del nodo; el job las reemplaza al llamar a metricas.iniciar()
+            with metricas.usar(metricas.Metricas(nodo.nombre)):
+                try:
+                    with orquestacion.etapa(nodo.nombre):
+                        nodo.ejecutar(recursos)
+                    resultado["estado"] = "ok"
+                except Exception as e:
+                    logging.exception(f"El job {nodo.nombre} terminó con error: {e}")
+                    resultado["estado"] = "error"
+                    resultado["error"] = str(e)[:300]
+                resultado["metricas"] = metricas.actual().resumen()
+            logs.asignar_job(None)
+            resultado["segundos"] = round(time.perf_counter() - inicio, 3)
+            resultados[nodo.nombre] = resultado
+            orquestacion.sumar(f"nodos_{resultado['estado']}")
+
+
+def ejecutar(nombres=JOBS_POR_DEFECTO, engine=None, sesion=None, secuencial=False, nodos=NODOS, db_url=None,
+             ruta_json=None, ruta_prometheus=None):
+    """
+    Corre los jobs `nombres` del grafo `nodos` y retorna {nombre: resultado del nodo}.
+    Si no se entregan engine (se crea con db_url) o sesion se crean y se cierran al terminar.
+    El resumen combinado se escribe en ruta_json y ruta_prometheus.
+    """
+    desconocidos = set(nombres) - {nodo.nombre for nodo in nodos}
+    if desconocidos:
+        raise ValueError(f"Jobs desconocidos: {', '.join(sorted(desconocidos))}")
+    seleccionados = [nodo for nodo in nodos if nodo.nombre in nombres]
+    grupos = ramas(seleccionados)
+
+    orquestacion = metricas.Metricas("orquestador")
+    inicio = time.perf_counter()
+    recursos = {"engine": engine or crear_engine(db_url), "sesion": sesion or enlaces.crear_sesion()}
+    resultados = {}
+    logging.info(
+        f"Ejecutando {len(seleccionados)} jobs en {len(grupos)} ramas"
+        f"{' (en secuencia)' if secuencial else ''}: "
+        + "; ".join(" -> ".join(nodo.nombre for nodo in rama) for rama in grupos)
+    )
+    try:
+        with ThreadPoolExecutor(max_workers=1 if secuencial else len(grupos),
+                                thread_name_prefix="rama") as ejecutor:
+            for futuro in [ejecutor.submit(ejecutar_rama, rama, recursos, resultados, orquestacion, inicio)
+                           for rama in grupos]:
+                futuro.result()
+    finally:
+        if sesion is None:
+            recursos["sesion"].close()
+        if engine is None:
+            recursos["engine"].dispose()
+
+    resumenes = [orquestacion.resumen()] + [resultados[nodo.nombre].get("metricas")
+                                            for nodo in seleccionados if resultados[nodo.nombre].get("metricas")]
+    nodos_resumen = {nombre: {clave: valor for clave, valor in resultado.items() if clave != "metricas"}
+                     for nombre, resultado in resultados.items()}
+    metricas.emitir_resumenes(resumenes, extra={"nodos": nodos_resumen}, ruta_json=ruta_json,
+                              ruta_prometheus=ruta_prometheus)
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Corre los jobs como un grafo de dependencias en un solo proceso.")
+    parser.add_argument("--jobs", default=",".join(JOBS_POR_DEFECTO),
+                        help=f"Jobs a correr, separados por coma (disponibles: {', '.join(nodo.nombre for nodo in NODOS)}).")
+    parser.add_argument("--secuencial", action="store_true", help="Correr las ramas una tras otra.")
+    parser.add_argument("--db-url", help="URL de SQLAlchemy (por defecto se arma con las variables DB_*).")
+    args = parser.parse_args(argv)
+    nombres = [nombre.strip() for nombre in args.jobs.split(",") if nombre.strip()]
+    if not nombres:
+        parser.error("--jobs no incluye ningún job")
+    desconocidos = sorted(set(nombres) - {nodo.nombre for nodo in NODOS})
+    if desconocidos:
+        parser.error(f"jobs desconocidos: {', '.join(desconocidos)}")
+
+    logs.configurar_logging("orquestador", LOG_DIRECTORY, "orquestador.log", compartido=True)
+    # El resumen combinado se escribe al final; los jobs solo registran el suyo en el log
+    ruta_json = os.environ.pop("METRICS_SUMMARY_PATH", None)
+    ruta_prometheus = os.environ.pop("METRICS_PROMETHEUS_TEXTFILE", None)
+    try:
+        with candado(LOCK_PATH):
+            resultados = ejecutar(nombres, secuencial=args.secuencial, db_url=args.db_url,
+                                  ruta_json=ruta_json, ruta_prometheus=ruta_prometheus)
+    except OtraEjecucionEnCurso as e:
+        logging.warning(f"Ya hay una ejecución del orquestador en curso ({e}); no se hace nada.")
+        return 0
+    finally:
+        logs.cerrar_logging()
+    return 0 if all(resultado["estado"] == "ok" for resultado in resultados.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# conftest.py
+
+"""
+Tablas de Laborum en un SQLite en memoria para los tests de jobs_common, con las mismas
+columnas que definen los jobs (historial, resumen mensual y huellas de página).
+"""
+
+import pytest
+
+
+@pytest.fixture
+def engine():
+    from sqlalchemy import create_engine
+
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def tablas(engine):
+    from sqlalchemy import Column, Date, DateTime, Integer, MetaData, String, Table
+
+    metadata = MetaData()
+    historial = Table(
+        "laborum_areas_links_2", metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("area_id", Integer, nullable=False),
+        Column("salario_promedio", Integer, nullable=False),
+        Column("salarios_basados", Integer, nullable=False),
+        Column("link_area", String(255), nullable=False),
+        Column("executed_at", DateTime, nullable=False),
+        Column("month", Date, nullable=False),
+    )
+    resumen = Table(
+        "laborum_area_monthly", metadata,
+        Column("area_id", Integer, primary_key=True),
+        Column("month", Date, primary_key=True),
+        Column("salario_ultimo", Integer, nullable=False),
+        Column("salario_min", Integer, nullable=False),
+        Column("salario_max", Integer, nullable=False),
+        Column("salarios_basados_ultimo", Integer, nullable=False),
+        Column("muestras", Integer, nullable=False),
+        Column("variacion_salario", Integer, nullable=True),
+        Column("executed_at", DateTime, nullable=False),
+    )
+    huellas = Table(
+        "laborum_page_fingerprint", metadata,
+        Column("pagina", String(255), primary_key=True),
+        Column("huella", String(64), nullable=False),
+        Column("filas", Integer, nullable=False),
+        Column("written_at", DateTime, nullable=False),
+        Column("executed_at", DateTime, nullable=False),
+    )
+    metadata.create_all(engine)
+    return {"historial": historial, "resumen": resumen, "huellas": huellas}
@@ -0,0 +1,66 @@
+# test_calcular_fecha.py
+
+"""
+Tabla de fechas de SerpAPI para calcular_fecha (news_job/main.py), con una referencia fija.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from news_job.main import calcular_fecha
+
+REFERENCIA = datetime(2024, 5, 10, 12, 0, 0)
+
+# (texto de SerpAPI, resultado esperado con REFERENCIA)
+TABLA = [
+    ("hace 10 segundos", REFERENCIA - timedelta(seconds=10)),
+    ("hace 5 min", REFERENCIA - timedelta(minutes=5)),
+    ("hace 1 minuto", REFERENCIA - timedelta(minutes=1)),
+    ("hace 3 horas", REFERENCIA - timedelta(hours=3)),
+    ("hace 3 h", REFERENCIA - timedelta(hours=3)),
+    ("hace 1 día", REFERENCIA - timedelta(days=1)),
+    ("hace 2 dias", REFERENCIA - timedelta(days=2)),
+    ("hace un día", REFERENCIA - timedelta(days=1)),
+    ("hace 2 semanas", REFERENCIA - timedelta(days=14)),
+    ("hace 1 semana", REFERENCIA - timedelta(days=7)),
+    ("hace 2 sem.", REFERENCIA - timedelta(days=14)),
+    ("hace 1 mes", REFERENCIA - timedelta(days=30)),
+    ("hace 4 meses", REFERENCIA - timedelta(days=120)),
+    ("hace 1 año", REFERENCIA - timedelta(days=365)),
+    ("Hace 6 Horas", REFERENCIA - timedelta(hours=6)),
+    ("3 hours ago", REFERENCIA - timedelta(hours=3)),
+    ("an hour ago", REFERENCIA - timedelta(hours=1)),
+    ("12 mins ago", REFERENCIA - timedelta(minutes=12)),
+    ("5m ago", REFERENCIA - timedelta(minutes=5)),
+    ("1 day ago", REFERENCIA - timedelta(days=1)),
+    ("2 weeks ago", REFERENCIA - timedelta(days=14)),
+    ("3 months ago", REFERENCIA - timedelta(days=90)),
+    ("ayer", datetime(2024, 5, 9)),
+    ("anteayer", datetime(2024, 5, 8)),
+    ("Yesterday", datetime(2024, 5, 9)),
+    ("hoy", datetime(2024, 5, 10)),
+    ("03-02-2024", datetime(2024, 2, 3)),
+    ("3/2/2024", datetime(2024, 2, 3)),
+    ("3 mar 2024", datetime(2024, 3, 3)),
+    ("3 de marzo de 2024", datetime(2024, 3, 3)),
+    ("15 sept. 2023", datetime(2023, 9, 15)),
+    ("Mar 3, 2024", datetime(2024, 3, 3)),
+    ("December 24, 2023", datetime(2023, 12, 24)),
+    ("31-02-2024", None),
+    ("hace x horas", None),
+    ("hace 3 lunas", None),
+    ("la semana pasada", None),
+    ("", None),
+]
+
+
+@pytest.mark.parametrize("texto, esperado", TABLA, ids=[texto or "vacio" for texto, _ in TABLA])
+def test_calcular_fecha(texto, esperado):
+    assert calcular_fecha(texto, REFERENCIA) == esperado
+
+
+def test_sin_referencia_usa_ahora():
+    antes = datetime.now()
+    fecha = calcular_fecha("hace 2 horas")
+    assert antes - timedelta(hours=2, seconds=1) <= fecha <= datetime.now() - timedelta(hours=2)
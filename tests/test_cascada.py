@@ -0,0 +1,75 @@
+# test_cascada.py
+
+import json
+import os
+
+from jobs_common import cascada
+
+TIPOS = ("script", "stylesheet", "image", "fetch", "font")
+
+
+def cascada_sintetica(solicitudes=20, lenta=10):
+    """
+    Cascada sin página con `solicitudes` solicitudes; la número `lenta` demora 900 ms en responder.
+    """
+    red = cascada.Cascada(None, "https://laborum.test/salarios/area-0/", activa=True)
+    for i in range(solicitudes):
+        timing = {"startTime": red.inicio * 1000 + i, "domainLookupStart": -1, "domainLookupEnd": -1,
+                  "connectStart": 2.0, "secureConnectionStart": 5.0, "connectEnd": 9.0,
+                  "requestStart": 10.0, "responseStart": 900.0 if i == lenta else 20.0 + i % 7,
+                  "responseEnd": 950.0 if i == lenta else 25.0 + i % 11}
+        red.solicitudes.append({"url": f"https://laborum.test/recurso-{i}", "metodo": "GET", "tipo": TIPOS[i % len(TIPOS)],
+                                "estado": 200, "bytes": 1000 + i, "inicio": timing["startTime"], "error": None,
+                                **cascada.fases(timing)})
+    return red
+
+
+def test_fases():
+    fases = cascada.fases({"domainLookupStart": -1, "domainLookupEnd": -1, "connectStart": 2.0,
+                           "secureConnectionStart": 5.0, "connectEnd": 9.0, "requestStart": 10.0,
+                           "responseStart": 40.5, "responseEnd": 52.0})
+    assert fases == {"dns_ms": None, "conexion_ms": 7.0, "tls_ms": 4.0, "ttfb_ms": 30.5,
+                     "descarga_ms": 11.5, "total_ms": 52.0}
+
+
+def test_resumen():
+    red = cascada_sintetica()
+    red.marcar_selector(15)
+    resumen = red.resumen(top=3)
+
+    assert resumen["solicitudes"] == 20 and resumen["fallidas"] == 0
+    assert len(resumen["mas_lentas"]) == 3
+    assert resumen["mas_lentas"][0]["url"].endswith("-10")
+    assert resumen["mas_lentas"][0]["ttfb_ms"] == 890.0
+    assert resumen["bytes"] == sum(tipo["bytes"] for tipo in resumen["por_tipo"].values()) == sum(1000 + i for i in range(20))
+    assert resumen["por_tipo"]["script"]["solicitudes"] == 4
+    assert resumen["elementos"] == 15 and resumen["selector_ms"] is not None
+
+
+def test_escribir_resumen_y_har(tmp_path):
+    red = cascada_sintetica()
+    directorio = str(tmp_path)
+    assert red.escribir(directorio, har=True) is not None
+    # Solo la primera llamada escribe
+    assert red.escribir(directorio, har=True) is None
+
+    with open(os.path.join(directorio, "cascadas.jsonl"), encoding="utf-8") as f:
+        lineas = f.read().splitlines()
+    assert len(lineas) == 1 and json.loads(lineas[0])["solicitudes"] == 20
+
+    har = [archivo for archivo in os.listdir(directorio) if archivo.endswith(".har")]
+    assert len(har) == 1
+    with open(os.path.join(directorio, har[0]), encoding="utf-8") as f:
+        log = json.load(f)["log"]
+    assert log["version"] == "1.2"
+    assert len(log["entries"]) == 20
+    assert all({"dns", "connect", "wait", "receive"} <= set(entrada["timings"]) for entrada in log["entries"])
+    assert log["entries"][0]["timings"]["dns"] == -1
+
+
+def test_inactiva_no_hace_nada(tmp_path):
+    red = cascada.Cascada(None, "https://laborum.test/", activa=False)
+    red.marcar_selector(3)
+    assert red.selector_ms is None
+    assert red.escribir(str(tmp_path), har=True) is None
+    assert os.listdir(tmp_path) == []
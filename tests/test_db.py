@@ -0,0 +1,65 @@
+# test_db.py
+
+import pytest
+from sqlalchemy import select
+
+from jobs_common import db
+
+
+def filas(conexion, tabla):
+    return [tuple(fila) for fila in conexion.execute(select(tabla).order_by(*tabla.primary_key.columns))]
+
+
+def test_dialecto(engine):
+    assert db.dialecto(engine) == "sqlite"
+    with engine.connect() as conexion:
+        assert db.dialecto(conexion) == "sqlite"
+
+
+def test_upsert_inserta_y_actualiza(engine, tablas):
+    huellas = tablas["huellas"]
+    with engine.begin() as conexion:
+        db.upsert(conexion, huellas, [
+            {"pagina": "a", "huella": "h1", "filas": 1, "written_at": _dia(1), "executed_at": _dia(1)},
+            {"pagina": "b", "huella": "h2", "filas": 2, "written_at": _dia(1), "executed_at": _dia(1)},
+        ], ["pagina"])
+        db.upsert(conexion, huellas, [
+            {"pagina": "b", "huella": "h3", "filas": 3, "written_at": _dia(2), "executed_at": _dia(2)},
+            {"pagina": "c", "huella": "h4", "filas": 4, "written_at": _dia(2), "executed_at": _dia(2)},
+        ], ["pagina"])
+
+        assert filas(conexion, huellas) == [
+            ("a", "h1", 1, _dia(1), _dia(1)),
+            ("b", "h3", 3, _dia(2), _dia(2)),
+            ("c", "h4", 4, _dia(2), _dia(2)),
+        ]
+
+
+def test_upsert_solo_las_columnas_indicadas(engine, tablas):
+    huellas = tablas["huellas"]
+    with engine.begin() as conexion:
+        db.upsert(conexion, huellas, [
+            {"pagina": "a", "huella": "h1", "filas": 1, "written_at": _dia(1), "executed_at": _dia(1)},
+        ], ["pagina"])
+        db.upsert(conexion, huellas, [
+            {"pagina": "a", "huella": "h2", "filas": 2, "written_at": _dia(2), "executed_at": _dia(2)},
+        ], ["pagina"], actualizar=["executed_at"])
+
+        assert filas(conexion, huellas) == [("a", "h1", 1, _dia(1), _dia(2))]
+
+
+def test_upsert_sin_filas(engine, tablas):
+    with engine.begin() as conexion:
+        db.upsert(conexion, tablas["huellas"], [], ["pagina"])
+        assert filas(conexion, tablas["huellas"]) == []
+
+
+def _dia(dia):
+    from datetime import datetime
+
+    return datetime(2024, 3, dia, 6, 0)
+
+
+def test_dialecto_sin_upsert(tablas):
+    with pytest.raises(ValueError, match="oracle"):
+        db.sentencia_upsert(tablas["huellas"], "oracle", ["pagina"], ["huella"])
@@ -0,0 +1,78 @@
+# test_enlaces.py
+
+import http.server
+import threading
+
+import pytest
+
+from jobs_common import enlaces
+
+
+class Manejador(http.server.BaseHTTPRequestHandler):
+    """
+    /ok-N responde 200, /muerto-N 404, /borrado 410, /sin-head 405 a HEAD y 200 a GET, y
+    /bloqueado 403 siempre.
+    """
+    def responder(self, cuerpo):
+        if self.path.startswith("/ok-"):
+            codigo = 200
+        elif self.path == "/borrado":
+            codigo = 410
+        elif self.path == "/sin-head":
+            codigo = 405 if self.command == "HEAD" else 200
+        elif self.path == "/bloqueado":
+            codigo = 403
+        else:
+            codigo = 404
+        self.send_response(codigo)
+        self.send_header("Content-Length", "2" if cuerpo else "0")
+        self.end_headers()
+        if cuerpo:
+            self.wfile.write(b"ok")
+
+    def do_HEAD(self):
+        self.responder(False)
+
+    def do_GET(self):
+        self.responder(True)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base():
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_validar_enlaces(base):
+    urls = [f"{base}/ok-{i}" for i in range(10)] + [f"{base}/muerto-{i}" for i in range(5)]
+    estados = enlaces.validar_enlaces(urls + urls[:3], concurrencia=4)
+
+    assert list(estados) == urls
+    muertos = {url for url, estado in estados.items() if enlaces.enlace_muerto(estado)}
+    assert muertos == {f"{base}/muerto-{i}" for i in range(5)}
+
+
+def test_codigos(base):
+    with enlaces.crear_sesion() as sesion:
+        assert enlaces.estado_enlace(sesion, f"{base}/borrado") == 410
+        # Sin HEAD se consulta con GET
+        assert enlaces.estado_enlace(sesion, f"{base}/sin-head") == 200
+        assert enlaces.estado_enlace(sesion, f"{base}/bloqueado") == 403
+    assert enlaces.enlace_muerto(410)
+    assert not enlaces.enlace_muerto(403)
+    assert not enlaces.enlace_muerto(None)
+
+
+def test_sin_respuesta():
+    with enlaces.crear_sesion() as sesion:
+        assert enlaces.estado_enlace(sesion, "http://127.0.0.1:9/", timeout=1) is None
+
+
+def test_sin_urls():
+    assert enlaces.validar_enlaces([]) == {}
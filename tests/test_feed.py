@@ -0,0 +1,125 @@
+# test_feed.py
+
+import pytest
+
+from jobs_common import feed
+
+PAGINA = "https://www.laborum.cl/salarios/"
+CAMPOS_NUMERICOS = ("salario_promedio", "salarios_basados")
+
+FILAS_DOM = [
+    {"nombre_area": nombre, "salario_promedio": salario, "salarios_basados": basados,
+     "link_area": f"https://www.laborum.cl/salarios/{slug}"}
+    for nombre, salario, basados, slug in (
+        ("Ventas", 950000, 120, "ventas"),
+        ("Tecnología, Sistemas y Telecomunicaciones", 1800000, 45, "tecnologia-sistemas-y-telecomunicaciones"),
+        ("Salud, Medicina y Farmacia", 1300000, 80, "salud-medicina-y-farmacia"),
+    )
+]
+
+SENUELO = {"usuario": None, "experimentos": [{"nombre": "Ventas", "activo": True}]}
+
+
+def payload_areas():
+    return {"data": {"total": 3, "areas": [
+        {"id": i, "name": fila["nombre_area"].upper(), "salary": {"avg": f"${fila['salario_promedio']:,}".replace(",", ".")},
+         "count": fila["salarios_basados"], "href": fila["link_area"].replace("https://www.laborum.cl", "")}
+        for i, fila in enumerate(FILAS_DOM)
+    ]}}
+
+
+class Respuesta:
+    def __init__(self, payload, codigo=200):
+        self.payload = payload
+        self.codigo = codigo
+
+    def raise_for_status(self):
+        if self.codigo >= 400:
+            raise RuntimeError(f"HTTP {self.codigo}")
+
+    def json(self):
+        return self.payload
+
+
+class Sesion:
+    """
+    Responde siempre `respuesta` y guarda los requests recibidos.
+    """
+    def __init__(self, respuesta):
+        self.respuesta = respuesta
+        self.requests = []
+
+    def request(self, metodo, url, **kwargs):
+        self.requests.append((metodo, url, kwargs))
+        return self.respuesta
+
+
+def test_buscar_esquema():
+    esquema = feed.buscar_esquema(payload_areas(), FILAS_DOM, "nombre_area", CAMPOS_NUMERICOS, ("link_area",), PAGINA)
+    assert esquema == {
+        "ruta": ["data", "areas"],
+        "claves": {"nombre_area": "name", "salario_promedio": "salary.avg", "salarios_basados": "count"},
+        "enlaces": {"link_area": "href"},
+    }
+    assert feed.buscar_esquema(SENUELO, FILAS_DOM, "nombre_area", CAMPOS_NUMERICOS) is None
+
+
+def test_extraer_filas():
+    esquema = feed.buscar_esquema(payload_areas(), FILAS_DOM, "nombre_area", CAMPOS_NUMERICOS, ("link_area",), PAGINA)
+    filas = feed.extraer_filas(payload_areas(), esquema, "nombre_area", PAGINA)
+    assert [fila["nombre_area"] for fila in filas] == [fila["nombre_area"].upper() for fila in FILAS_DOM]
+    assert [(fila["salario_promedio"], fila["salarios_basados"], fila["link_area"]) for fila in filas] == [
+        (fila["salario_promedio"], fila["salarios_basados"], fila["link_area"]) for fila in FILAS_DOM
+    ]
+
+
+@pytest.mark.parametrize("cambio", [
+    lambda payload: payload["data"].pop("areas"),
+    lambda payload: [area.update(pay=area.pop("salary")) for area in payload["data"]["areas"]],
+    lambda payload: payload["data"]["areas"][0].update(count="sin datos"),
+    lambda payload: payload["data"].update(areas=[]),
+])
+def test_esquema_cambiado(cambio):
+    esquema = feed.buscar_esquema(payload_areas(), FILAS_DOM, "nombre_area", CAMPOS_NUMERICOS)
+    payload = payload_areas()
+    cambio(payload)
+    with pytest.raises(feed.EsquemaCambiado):
+        feed.extraer_filas(payload, esquema, "nombre_area")
+
+
+def test_descubrir_y_camino_rapido(tmp_path):
+    ruta = str(tmp_path / "laborum_feed.json")
+    endpoint = {"url": "https://www.laborum.cl/api/salarios/areas", "metodo": "GET", "cuerpo": None,
+                "cabeceras": {"accept": "application/json"}}
+    capturas = [({**endpoint, "url": "https://www.laborum.cl/api/usuario"}, SENUELO), (endpoint, payload_areas())]
+
+    assert feed.obtener_filas(PAGINA, Sesion(Respuesta(payload_areas())), "nombre_area", ruta=ruta) is None
+    assert feed.descubrir(PAGINA, capturas, FILAS_DOM, "nombre_area", CAMPOS_NUMERICOS, ("link_area",), ruta=ruta)
+    assert feed.leer_cache(ruta)[PAGINA]["endpoint"] == endpoint
+
+    sesion = Sesion(Respuesta(payload_areas()))
+    filas = feed.obtener_filas(PAGINA, sesion, "nombre_area", ruta=ruta)
+    assert len(filas) == 3
+    assert sesion.requests == [("GET", endpoint["url"], {"data": None, "headers": endpoint["cabeceras"], "timeout": 15})]
+
+
+def test_camino_rapido_olvida_el_esquema_cambiado(tmp_path):
+    ruta = str(tmp_path / "laborum_feed.json")
+    endpoint = {"url": "https://www.laborum.cl/api/salarios/areas", "metodo": "GET", "cuerpo": None, "cabeceras": {}}
+    feed.descubrir(PAGINA, [(endpoint, payload_areas())], FILAS_DOM, "nombre_area", CAMPOS_NUMERICOS, ruta=ruta)
+
+    payload = payload_areas()
+    for area in payload["data"]["areas"]:
+        area["pay"] = area.pop("salary")
+    with pytest.raises(feed.EsquemaCambiado):
+        feed.obtener_filas(PAGINA, Sesion(Respuesta(payload)), "nombre_area", ruta=ruta)
+    assert PAGINA not in feed.leer_cache(ruta)
+
+    feed.descubrir(PAGINA, [(endpoint, payload_areas())], FILAS_DOM, "nombre_area", CAMPOS_NUMERICOS, ruta=ruta)
+    with pytest.raises(feed.EsquemaCambiado):
+        feed.obtener_filas(PAGINA, Sesion(Respuesta({}, codigo=503)), "nombre_area", ruta=ruta)
+    assert PAGINA not in feed.leer_cache(ruta)
+
+
+def test_descubrir_sin_filas(tmp_path):
+    assert not feed.descubrir(PAGINA, [], [], "nombre_area", CAMPOS_NUMERICOS, ruta=str(tmp_path / "cache.json"))
@@ -0,0 +1,114 @@
+# test_graduated.py
+
+import pytest
+from sqlalchemy import select
+
+from graduated_job import main_linux as job
+
+
+@pytest.fixture
+def bd(engine):
+    job.inicializar_bd(engine)
+    job.crear_tablas()
+    yield
+    job.session.close()
+    job.Base.metadata.drop_all(engine)
+
+
+def escribir_csv(ruta, carreras):
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("anio;area_carrera_generica_n\n")
+        for carrera, cantidad in carreras.items():
+            f.write(f"2023;{carrera}\n" * cantidad)
+    return str(ruta)
+
+
+def titulados(engine, anno):
+    carreras, tabla = job.Carrera.__table__, job.TituladoCarrera.__table__
+    with engine.connect() as connection:
+        return dict(connection.execute(
+            select(carreras.c.nombre, tabla.c.cantidad_titulados)
+            .join(carreras, carreras.c.id == tabla.c.id_carrera)
+            .where(tabla.c.anno == anno)
+        ).all())
+
+
+@pytest.mark.parametrize("recargar", [False, True])
+def test_csv_del_archivo_se_suman(tmp_path, engine, bd, recargar):
+    """
+    Los CSV de un mismo archivo se suman y el año se escribe una sola vez, con o sin recarga.
+    """
+    rutas = [
+        escribir_csv(tmp_path / "titulados_1.csv", {"Derecho": 3, "Técnico en Enfermería": 2}),
+        escribir_csv(tmp_path / "titulados_2.csv", {"Derecho": 4, "Medicina": 1}),
+    ]
+    assert job.process_csvs(rutas, str(tmp_path / "salida.csv"), 2023, recargar)
+    assert titulados(engine, 2023) == {"Derecho": 7, "Técnico en Enfermería": 2, "Medicina": 1}
+
+    # Repetir la carga no duplica ni acumula
+    assert job.process_csvs(rutas, str(tmp_path / "salida.csv"), 2023, recargar)
+    assert titulados(engine, 2023) == {"Derecho": 7, "Técnico en Enfermería": 2, "Medicina": 1}
+
+
+def test_csv_con_error_no_escribe_el_anno(tmp_path, engine, bd):
+    rutas = [
+        escribir_csv(tmp_path / "titulados_1.csv", {"Derecho": 3}),
+        str(tmp_path / "no_existe.csv"),
+    ]
+    assert not job.process_csvs(rutas, str(tmp_path / "salida.csv"), 2023)
+    assert titulados(engine, 2023) == {}
+
+
+def test_clave_unica_suma_las_filas_parciales(engine, caplog):
+    """
+    Una tabla anterior a la clave única, con una fila por CSV, queda con una fila por carrera y
+    año cuya cantidad es la suma de las parciales.
+    """
+    from datetime import datetime
+
+    from sqlalchemy import Column, DateTime, Integer, MetaData, Table, insert
+
+    job.inicializar_bd(engine)
+    job.Carrera.__table__.create(engine)
+    antigua = Table(
+        "titulados_carrera", MetaData(),
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("id_carrera", Integer, nullable=False),
+        Column("cantidad_titulados", Integer, nullable=False),
+        Column("fecha_ejecucion", DateTime, nullable=False),
+        Column("anno", Integer, nullable=False),
+    )
+    antigua.create(engine)
+    ahora = datetime(2024, 5, 1)
+    with engine.begin() as connection:
+        connection.execute(insert(job.Carrera.__table__), [
+            {"nombre": "Derecho", "tipo": "Profesional"},
+            {"nombre": "Medicina", "tipo": "Profesional"},
+        ])
+        connection.execute(insert(antigua), [
+            {"id_carrera": 1, "cantidad_titulados": 3, "fecha_ejecucion": ahora, "anno": 2022},
+            {"id_carrera": 1, "cantidad_titulados": 4, "fecha_ejecucion": ahora, "anno": 2022},
+            {"id_carrera": 2, "cantidad_titulados": 1, "fecha_ejecucion": ahora, "anno": 2022},
+            {"id_carrera": 1, "cantidad_titulados": 5, "fecha_ejecucion": ahora, "anno": 2023},
+            {"id_carrera": 1, "cantidad_titulados": 6, "fecha_ejecucion": ahora, "anno": 2023},
+            {"id_carrera": 1, "cantidad_titulados": 7, "fecha_ejecucion": ahora, "anno": 2023},
+        ])
+
+    caplog.set_level("INFO")
+    try:
+        job.crear_tablas()
+        assert titulados(engine, 2022) == {"Derecho": 7, "Medicina": 1}
+        assert titulados(engine, 2023) == {"Derecho": 18}
+        assert "Año 2022: 1 filas parciales" in caplog.text
+        assert "Año 2023: 2 filas parciales" in caplog.text
+
+        # La clave quedó creada: otra fila para la misma carrera y año se rechaza
+        from sqlalchemy.exc import IntegrityError
+
+        with pytest.raises(IntegrityError), engine.begin() as connection:
+            connection.execute(insert(antigua), {
+                "id_carrera": 2, "cantidad_titulados": 1, "fecha_ejecucion": ahora, "anno": 2022,
+            })
+    finally:
+        job.session.close()
+        job.Base.metadata.drop_all(engine)
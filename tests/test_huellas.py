@@ -0,0 +1,82 @@
+# test_huellas.py
+
+from datetime import date, datetime
+
+from sqlalchemy import insert, select
+
+from jobs_common import huellas
+
+CAMPOS = ("nombre_area", "salario_promedio", "salarios_basados")
+FILAS = [
+    {"nombre_area": "Ventas", "salario_promedio": 950000, "salarios_basados": 120},
+    {"nombre_area": "Tecnología", "salario_promedio": 1800000, "salarios_basados": 45},
+]
+
+
+def test_calcular_no_depende_del_orden():
+    huella = huellas.calcular(FILAS, CAMPOS)
+    assert len(huella) == 64
+    assert huellas.calcular(list(reversed(FILAS)), CAMPOS) == huella
+
+
+def test_calcular_cambia_con_los_valores():
+    cambiadas = [dict(FILAS[0], salario_promedio=960000), FILAS[1]]
+    assert huellas.calcular(cambiadas, CAMPOS) != huellas.calcular(FILAS, CAMPOS)
+    # Solo cuentan los campos indicados
+    con_extra = [dict(fila, link_area="https://www.laborum.cl/salarios/x") for fila in FILAS]
+    assert huellas.calcular(con_extra, CAMPOS) == huellas.calcular(FILAS, CAMPOS)
+
+
+def test_pagina_sin_cambios_en_el_mismo_mes(engine, tablas):
+    tabla = tablas["huellas"]
+    huella = huellas.calcular(FILAS, CAMPOS)
+    with engine.begin() as conexion:
+        assert not huellas.pagina_sin_cambios(conexion, tabla, "salarios", huella, datetime(2024, 3, 5))
+
+        huellas.registrar(conexion, tabla, "salarios", huella, len(FILAS), datetime(2024, 3, 5), escrita=True)
+        assert huellas.pagina_sin_cambios(conexion, tabla, "salarios", huella, datetime(2024, 3, 20))
+        assert not huellas.pagina_sin_cambios(conexion, tabla, "salarios", "otra", datetime(2024, 3, 20))
+        # Al cambiar de mes se vuelve a escribir aunque la huella sea la misma
+        assert not huellas.pagina_sin_cambios(conexion, tabla, "salarios", huella, datetime(2024, 4, 1))
+
+
+def test_registrar_sin_escribir_conserva_written_at(engine, tablas):
+    tabla = tablas["huellas"]
+    with engine.begin() as conexion:
+        huellas.registrar(conexion, tabla, "salarios", "h", 2, datetime(2024, 3, 5), escrita=True)
+        huellas.registrar(conexion, tabla, "salarios", "h", 2, datetime(2024, 3, 6), escrita=False)
+        fila = conexion.execute(select(tabla)).one()
+    assert (fila.written_at, fila.executed_at) == (datetime(2024, 3, 5), datetime(2024, 3, 6))
+
+
+def test_fila_cambiada():
+    ahora = datetime(2024, 3, 20)
+    ultima = {"salario_promedio": 950000, "salarios_basados": 120, "month": date(2024, 3, 5)}
+    assert huellas.fila_cambiada(None, {"salario_promedio": 950000}, ahora)
+    assert not huellas.fila_cambiada(ultima, {"salario_promedio": 950000, "salarios_basados": 120}, ahora)
+    assert huellas.fila_cambiada(ultima, {"salario_promedio": 960000, "salarios_basados": 120}, ahora)
+    assert huellas.fila_cambiada(ultima, {"salario_promedio": 950000, "salarios_basados": 121}, ahora)
+    # Columnas sin migrar: salarios_basados llega como texto
+    sin_migrar = dict(ultima, salarios_basados="120")
+    assert not huellas.fila_cambiada(sin_migrar, {"salario_promedio": 950000, "salarios_basados": 120}, ahora)
+    assert huellas.fila_cambiada(sin_migrar, {"salario_promedio": 950000, "salarios_basados": 121}, ahora)
+    assert huellas.fila_cambiada(dict(ultima, salarios_basados="n/d"), {"salario_promedio": 950000, "salarios_basados": 120}, ahora)
+    # Sin fila en el mes en curso se escribe aunque no haya cambiado
+    assert huellas.fila_cambiada(ultima, {"salario_promedio": 950000, "salarios_basados": 120}, datetime(2024, 4, 1))
+
+
+def test_ultimas_filas(engine, tablas):
+    historial = tablas["historial"]
+    with engine.begin() as conexion:
+        conexion.execute(insert(historial), [
+            {"area_id": area, "salario_promedio": salario, "salarios_basados": 10, "link_area": "x",
+             "executed_at": datetime(2024, 3, dia), "month": date(2024, 3, dia)}
+            for area, salario, dia in ((1, 100, 1), (2, 200, 1), (1, 110, 2), (3, 300, 2), (1, 120, 3))
+        ])
+        ultimas = huellas.ultimas_filas(conexion, historial, "area_id", [1, 2, 2, 4], ["salario_promedio"])
+        assert huellas.ultimas_filas(conexion, historial, "area_id", [], ["salario_promedio"]) == {}
+
+    assert ultimas == {
+        1: {"area_id": 1, "month": date(2024, 3, 3), "salario_promedio": 120},
+        2: {"area_id": 2, "month": date(2024, 3, 1), "salario_promedio": 200},
+    }
@@ -0,0 +1,182 @@
+# test_laborum_areas.py
+
+import bisect
+import random
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, func, insert, select, text
+
+from jobs_common import feed
+from laborum_areas_job import areas_scrapper_v2 as areas
+from laborum_subareas_job import subareas_scrapper_v2 as subareas
+
+
+class Reloj(datetime):
+    """
+    Reemplaza a datetime en el job para simular ejecuciones en días distintos.
+    """
+    actual = datetime(2024, 3, 10, 6, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.actual
+
+
+@pytest.fixture
+def job(engine, monkeypatch):
+    monkeypatch.setattr(Reloj, "actual", datetime(2024, 3, 10, 6, 0))
+    monkeypatch.setattr(areas, "datetime", Reloj)
+    monkeypatch.setattr(areas, "DETECTAR_CAMBIOS", True)
+    areas.inicializar_bd(engine)
+    yield areas
+    areas.session.close()
+    areas.Base.metadata.drop_all(engine)
+
+
+def filas(salarios):
+    return [{"nombre_area": f"Área {i}", "salario_promedio": salario, "salarios_basados": 100 + i,
+             "link_area": f"https://www.laborum.cl/salarios/area-{i}"} for i, salario in enumerate(salarios, start=1)]
+
+
+class Sesion:
+    """
+    Sesión HTTP que responde siempre `payload`.
+    """
+    def __init__(self, payload):
+        self.payload = payload
+
+    def request(self, metodo, url, **kwargs):
+        return self
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def contar(engine, tabla):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(tabla)).scalar()
+
+
+def test_ultimos_links_iguales_al_historial(engine, job):
+    # Historial anterior a la tabla de últimos links
+    job.LaborumArea.__table__.create(engine)
+    job.LaborumAreaLink.__table__.create(engine)
+    inicio = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(insert(job.LaborumArea.__table__), [{"id": i, "nombre_area": f"Área {i}"} for i in range(1, 9)])
+        connection.execute(insert(job.LaborumAreaLink.__table__), [{
+            "area_id": i, "salario_promedio": 800000 + i * 1000 + n, "salarios_basados": 100 + i,
+            "link_area": f"https://www.laborum.cl/salarios/area-{i}?v={n}",
+            "executed_at": inicio + timedelta(hours=6 * n), "month": (inicio + timedelta(hours=6 * n)).date(),
+        } for n in range(40) for i in range(1, 9)])
+
+    job.crear_tablas()
+    job.guardar_en_bd(filas([1000000] * 4)[::2], engine, job.session)
+
+    historial = pd.read_sql(subareas.CONSULTA_ULTIMOS_LINKS_HISTORIAL, engine).sort_values("area_id").reset_index(drop=True)
+    tabla = pd.read_sql(subareas.CONSULTA_ULTIMOS_LINKS, engine).sort_values("area_id").reset_index(drop=True)
+    assert len(tabla) == 8
+    assert tabla.equals(historial)
+    assert tabla.loc[0, "link_area"] == "https://www.laborum.cl/salarios/area-1"
+
+
+def test_solo_se_escriben_los_cambios(engine, job):
+    job.crear_tablas()
+    historial = job.LaborumAreaLink.__table__
+
+    job.guardar_en_bd(filas([900000, 1000000, 1100000]), engine, job.session)
+    assert contar(engine, historial) == 3
+
+    # Misma página: no se escribe nada
+    Reloj.actual = datetime(2024, 3, 11, 6, 0)
+    job.guardar_en_bd(filas([900000, 1000000, 1100000]), engine, job.session)
+    assert contar(engine, historial) == 3
+
+    # Cambia un área: solo esa fila
+    Reloj.actual = datetime(2024, 3, 12, 6, 0)
+    job.guardar_en_bd(filas([900000, 1050000, 1100000]), engine, job.session)
+    assert contar(engine, historial) == 4
+
+    # Mes nuevo: una fila por área aunque no cambien
+    Reloj.actual = datetime(2024, 4, 1, 6, 0)
+    job.guardar_en_bd(filas([900000, 1050000, 1100000]), engine, job.session)
+    assert contar(engine, historial) == 7
+
+    with engine.connect() as connection:
+        resumen = {(fila.area_id, fila.month): fila for fila in connection.execute(select(job.LaborumAreaMonthly.__table__))}
+    assert resumen[(2, date(2024, 3, 1))].salario_ultimo == 1050000
+    assert resumen[(2, date(2024, 3, 1))].muestras == 2
+    assert resumen[(2, date(2024, 4, 1))].variacion_salario == 0
+
+
+def test_serie_reconstruible_desde_los_cambios(monkeypatch, tmp_path):
+    """
+    Con la detección de cambios, la última fila anterior a cada ejecución es la que habría
+    escrito el job sin detección, y el resumen mensual coincide salvo en `muestras`.
+    """
+    rnd = random.Random(2024)
+    salarios = [rnd.randint(450, 3500) * 1000 for _ in range(12)]
+    ejecuciones = []
+    for n in range(70):
+        salarios = [salario + rnd.randint(-50, 50) * 1000 if rnd.random() < 0.1 else salario for salario in salarios]
+        ejecuciones.append((datetime(2024, 1, 20, 6, 0) + timedelta(days=n), filas(salarios)))
+
+    monkeypatch.setattr(areas, "datetime", Reloj)
+    series, resumenes = {}, {}
+    for detectar in (False, True):
+        engine = create_engine(f"sqlite:///{tmp_path / f'areas_{detectar}.db'}")
+        monkeypatch.setattr(areas, "DETECTAR_CAMBIOS", detectar)
+        areas.inicializar_bd(engine)
+        areas.crear_tablas()
+        for momento, datos in ejecuciones:
+            monkeypatch.setattr(Reloj, "actual", momento)
+            areas.guardar_en_bd(datos, engine, areas.session)
+        areas.session.close()
+        with engine.connect() as connection:
+            series[detectar] = connection.execute(text(
+                "SELECT area_id, executed_at, salario_promedio, salarios_basados FROM laborum_areas_links_2 "
+                "ORDER BY executed_at, id"
+            )).all()
+            resumenes[detectar] = connection.execute(text(
+                "SELECT area_id, month, salario_ultimo, salario_min, salario_max, salarios_basados_ultimo, "
+                "variacion_salario FROM laborum_area_monthly ORDER BY 1, 2"
+            )).all()
+        engine.dispose()
+
+    assert len(series[True]) < len(series[False]) / 3
+    cambios = {}
+    for area_id, momento, salario, basados in series[True]:
+        momentos, valores = cambios.setdefault(area_id, ([], []))
+        momentos.append(momento)
+        valores.append((salario, basados))
+    for area_id, momento, salario, basados in series[False]:
+        momentos, valores = cambios[area_id]
+        assert valores[bisect.bisect_right(momentos, momento) - 1] == (salario, basados)
+    assert resumenes[True] == resumenes[False]
+
+
+def test_camino_rapido_igual_al_dom(tmp_path, monkeypatch):
+    monkeypatch.setenv("LABORUM_FEED_CACHE", str(tmp_path / "laborum_feed.json"))
+    url = "https://www.laborum.cl/salarios/"
+    dom = filas([900000, 1000000, 1100000])
+    payload = {"data": {"areas": [
+        {"name": fila["nombre_area"], "salary": fila["salario_promedio"], "count": fila["salarios_basados"],
+         "href": fila["link_area"].replace("https://www.laborum.cl", "")} for fila in dom
+    ]}}
+    endpoint = {"url": "https://www.laborum.cl/api/salarios/areas", "metodo": "GET", "cuerpo": None, "cabeceras": {}}
+
+    assert areas.scrape_data_http(url, Sesion(payload)) is None
+    assert feed.descubrir(url, [(endpoint, payload)], dom, "nombre_area", ("salario_promedio", "salarios_basados"),
+                          campos_enlace=("link_area",))
+    assert areas.scrape_data_http(url, Sesion(payload)) == dom
+
+    # Cambio de esquema: se vuelve al navegador y se olvida el feed
+    for area in payload["data"]["areas"]:
+        area["pay"] = area.pop("salary")
+    assert areas.scrape_data_http(url, Sesion(payload)) is None
+    assert url not in feed.leer_cache()
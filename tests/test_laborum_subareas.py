@@ -0,0 +1,36 @@
+# test_laborum_subareas.py
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy import insert
+
+from laborum_subareas_job import subareas_scrapper_v2 as subareas
+
+
+@pytest.fixture
+def job(engine):
+    subareas.inicializar_bd(engine)
+    subareas.crear_tablas()
+    yield subareas
+    subareas.session.close()
+    subareas.Base.metadata.drop_all(engine)
+
+
+def test_orden_por_antiguedad_retoma_intentos_en_curso(job, engine):
+    """
+    Un área cuya tarea murió a mitad del scraping ('en_curso') no cuenta como refrescada.
+    """
+    with engine.begin() as connection:
+        connection.execute(insert(job.LaborumSubareaSchedule.__table__), [
+            {"area_id": 1, "attempted_at": datetime(2024, 3, 10, 6, 5), "resultado": "ok"},
+            {"area_id": 2, "attempted_at": datetime(2024, 3, 10, 6, 9), "resultado": "en_curso"},
+            {"area_id": 3, "attempted_at": datetime(2024, 3, 9, 6, 5), "resultado": "sin_subareas"},
+        ])
+    links = pd.DataFrame({"area_id": [1, 2, 3, 4],
+                          "link_area": [f"https://www.laborum.cl/salarios/area-{i}" for i in range(1, 5)]})
+
+    ordenados = job.ordenar_por_antiguedad(links)
+
+    assert ordenados["area_id"].tolist() == [2, 4, 3, 1]
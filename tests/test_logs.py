@@ -0,0 +1,58 @@
+# test_logs.py
+
+import json
+import logging
+
+from jobs_common import logs
+from jobs_common.logs import FiltroRepetidos, FormateadorJSON
+
+
+def registro(mensaje="mensaje", **extra):
+    record = logging.makeLogRecord({"name": "test", "levelno": logging.WARNING, "levelname": "WARNING",
+                                    "msg": mensaje})
+    record.__dict__.update(extra)
+    return record
+
+
+def test_filtro_repetidos():
+    filtro = FiltroRepetidos(2)
+    pasan = [filtro.filter(registro(agrupar="fila_mal_formateada")) for _ in range(5)]
+    pasan += [filtro.filter(registro(agrupar="otra")) for _ in range(3)]
+    assert pasan == [True, True, False, False, False, True, True, False]
+    assert filtro.omitidos() == {"fila_mal_formateada": 3, "otra": 1}
+
+
+def test_filtro_repetidos_sin_clave():
+    filtro = FiltroRepetidos(0)
+    assert all(filtro.filter(registro()) for _ in range(10))
+    assert filtro.omitidos() == {}
+
+
+def test_formateador_json():
+    record = registro("Fila %d mal formateada", args=(3,), agrupar="fila", _job="otro", fila=3)
+    entrada = json.loads(FormateadorJSON("graduated_job").format(record))
+    assert entrada["mensaje"] == "Fila 3 mal formateada"
+    assert entrada["nivel"] == "WARNING"
+    assert entrada["job"] == "otro"
+    assert (entrada["agrupar"], entrada["fila"]) == ("fila", 3)
+    assert "_job" not in entrada and "excepcion" not in entrada
+
+
+def test_excepcion_en_su_campo(tmp_path, monkeypatch):
+    """
+    El traceback atraviesa la cola en el campo "excepcion" y no queda dentro del mensaje.
+    """
+    monkeypatch.delenv("LOG_FORMAT", raising=False)
+    logs.configurar_logging("test", str(tmp_path), "test.log", consola=False)
+    try:
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logging.exception("Falló la división")
+    finally:
+        logs.cerrar_logging()
+    with open(tmp_path / "test.log", encoding="utf-8") as f:
+        entrada = json.loads(f.readline())
+    assert entrada["mensaje"] == "Falló la división"
+    assert entrada["excepcion"].startswith("Traceback")
+    assert "ZeroDivisionError" in entrada["excepcion"]
@@ -0,0 +1,142 @@
+# test_migracion_laborum.py
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, Date, Integer, MetaData, String, Table, create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
+
+from migraciones import laborum_tipos_nativos as migracion
+
+CONSULTAS = {
+    "serie_area": (
+        "SELECT month, salario_promedio, salarios_basados, executed_at FROM laborum_areas_links_2 "
+        "WHERE area_id = :id ORDER BY month, executed_at"
+    ),
+    "promedio_mensual_subarea": (
+        "SELECT month, AVG(salario_promedio), SUM(salarios_basados) FROM laborum_subareas_links_2 "
+        "WHERE id_subarea = :id GROUP BY month ORDER BY month"
+    ),
+}
+
+
+@pytest.fixture
+def historial_anterior(engine):
+    """
+    Historial con el esquema anterior a la migración: executed_at como texto (áreas) o fecha
+    (subáreas) y salarios_basados de subáreas como texto, sin índices.
+    """
+    metadata = MetaData()
+    areas = Table("laborum_areas_links_2", metadata,
+                  Column("id", Integer, primary_key=True, autoincrement=True),
+                  Column("area_id", Integer, nullable=False),
+                  Column("salario_promedio", Integer, nullable=False),
+                  Column("salarios_basados", Integer, nullable=False),
+                  Column("link_area", String(255), nullable=False),
+                  Column("executed_at", String(255), nullable=False),
+                  Column("month", Date, nullable=False))
+    subareas = Table("laborum_subareas_links_2", metadata,
+                     Column("id", Integer, primary_key=True, autoincrement=True),
+                     Column("id_subarea", Integer, nullable=False),
+                     Column("salario_promedio", Integer, nullable=False),
+                     Column("salarios_basados", String(100), nullable=False),
+                     Column("executed_at", Date, nullable=False),
+                     Column("month", Date, nullable=False))
+    metadata.create_all(engine)
+
+    inicio = datetime(2024, 1, 1, 6, 0)
+    with engine.begin() as connection:
+        connection.execute(areas.insert(), [{
+            "area_id": i % 4, "salario_promedio": 800000 + i, "salarios_basados": 100 + i, "link_area": "x",
+            "executed_at": (inicio + timedelta(hours=6 * i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "month": (inicio + timedelta(hours=6 * i)).date(),
+        } for i in range(400)])
+        connection.execute(subareas.insert(), [{
+            "id_subarea": i % 5, "salario_promedio": 700000 + i, "salarios_basados": str(10 + i % 90),
+            "executed_at": (inicio + timedelta(days=i)).date(), "month": (inicio + timedelta(days=i)).date(),
+        } for i in range(300)])
+    return metadata
+
+
+def consultar(engine):
+    resultados = {}
+    with engine.connect() as connection:
+        for nombre, sql in CONSULTAS.items():
+            filas = []
+            for id_ in range(5):
+                filas.extend(
+                    tuple(str(valor)[:19] if isinstance(valor, (str, datetime, date)) else round(float(valor), 2)
+                          for valor in fila)
+                    for fila in connection.execute(text(sql), {"id": id_})
+                )
+            resultados[nombre] = filas
+    return resultados
+
+
+def test_migrar_conserva_los_datos(engine, historial_anterior):
+    antes = consultar(engine)
+    assert all(migracion._pendiente(engine, conversion) for conversion in migracion.CONVERSIONES)
+
+    migracion.migrar(engine, tamano_lote=64, pausa=0)
+
+    assert not any(migracion._pendiente(engine, conversion) for conversion in migracion.CONVERSIONES)
+    assert consultar(engine) == antes
+    for tabla, nombre, _ in migracion.INDICES:
+        assert nombre in {indice["name"] for indice in inspect(engine).get_indexes(tabla)}
+    columnas = {columna["name"] for columna in inspect(engine).get_columns("laborum_subareas_links_2")}
+    assert not {"executed_at_nuevo", "salarios_basados_nuevo"} & columnas
+
+
+def test_fases_idempotentes(engine, historial_anterior):
+    migracion.migrar(engine, fases=("preparar", "backfill"), tamano_lote=64, pausa=0)
+    migracion.migrar(engine, fases=("preparar", "backfill"), tamano_lote=64, pausa=0)
+    migracion.migrar(engine, tamano_lote=64, pausa=0)
+    migracion.migrar(engine, tamano_lote=64, pausa=0)
+    assert not any(migracion._pendiente(engine, conversion) for conversion in migracion.CONVERSIONES)
+
+
+def test_cambiar_sin_preparar(engine, historial_anterior):
+    with pytest.raises(RuntimeError):
+        migracion.cambiar(engine)
+
+
+def test_cambiar_completa_las_filas_nuevas(engine, historial_anterior):
+    """
+    Las filas que los jobs insertan después del backfill se convierten antes del intercambio.
+    """
+    migracion.migrar(engine, fases=("preparar", "backfill"), tamano_lote=64, pausa=0)
+    subareas = historial_anterior.tables["laborum_subareas_links_2"]
+    with engine.begin() as connection:
+        connection.execute(subareas.insert(), {"id_subarea": 1, "salario_promedio": 1, "salarios_basados": "77",
+                                               "executed_at": date(2024, 12, 1), "month": date(2024, 12, 1)})
+    migracion.cambiar(engine, tamano_lote=64)
+
+    with engine.connect() as connection:
+        assert connection.execute(text(
+            "SELECT salarios_basados FROM laborum_subareas_links_2 ORDER BY id DESC LIMIT 1"
+        )).scalar() == 77
+        assert connection.execute(text(
+            "SELECT COUNT(*) FROM laborum_subareas_links_2 WHERE salarios_basados IS NULL OR executed_at IS NULL"
+        )).scalar() == 0
+
+
+def test_tabla_bloqueada_detiene_los_inserts(tmp_path):
+    """
+    Mientras se completan las últimas filas e intercambian las columnas, otro proceso no puede escribir.
+    """
+    ruta = tmp_path / "historial.db"
+    engine = create_engine(f"sqlite:///{ruta}")
+    otro = create_engine(f"sqlite:///{ruta}", connect_args={"timeout": 0.1})
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, valor TEXT, valor_nuevo INTEGER)"))
+        with migracion._tabla_bloqueada(engine, "t") as connection:
+            connection.execute(text("UPDATE t SET valor_nuevo = 1 WHERE valor_nuevo IS NULL AND valor IS NOT NULL"))
+            with pytest.raises(OperationalError, match="locked"):
+                with otro.begin() as conexion_job:
+                    conexion_job.execute(text("INSERT INTO t (valor) VALUES ('1')"))
+        with otro.begin() as conexion_job:
+            conexion_job.execute(text("INSERT INTO t (valor) VALUES ('1')"))
+    finally:
+        otro.dispose()
+        engine.dispose()
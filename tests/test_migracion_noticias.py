@@ -0,0 +1,87 @@
+# test_migracion_noticias.py
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, inspect, text
+
+from migraciones import noticias_link_hash as migracion
+from news_job import main as news
+
+LINKS = [
+    "https://www.emol.com/noticias/carreras-tecnicas/",
+    "https://WWW.EMOL.COM/noticias/carreras-tecnicas?utm_source=google",
+    "https://www.latercera.com/educacion/matricula",
+    "https://www.emol.com/noticias/carreras-tecnicas?utm_medium=rss",
+    None,
+    None,
+]
+
+
+@pytest.fixture
+def noticias_anteriores(engine):
+    """
+    Tabla 'noticias' anterior a link_hash: sin la columna ni el índice único.
+    """
+    tabla = Table("noticias", MetaData(),
+                  Column("id_noticia", Integer, primary_key=True),
+                  Column("titulo", String(255), nullable=False),
+                  Column("link_noticia", String(255)))
+    tabla.create(engine)
+    with engine.begin() as connection:
+        connection.execute(tabla.insert(), [{"titulo": f"Noticia {i}", "link_noticia": link}
+                                            for i, link in enumerate(LINKS, start=1)])
+    # Columnas que la tabla de producción ya tenía
+    with engine.begin() as connection:
+        for columna in ("contenido TEXT", "fecha_publicacion DATE", "imagen_noticia VARCHAR(255)"):
+            connection.execute(text(f"ALTER TABLE noticias ADD COLUMN {columna}"))
+    news.inicializar_bd(engine)
+    return engine
+
+
+def filas(engine, tabla, columnas):
+    with engine.connect() as connection:
+        return connection.execute(text(f"SELECT {columnas} FROM {tabla} ORDER BY id_noticia")).all()
+
+
+def test_el_job_exige_la_migracion(noticias_anteriores):
+    with pytest.raises(RuntimeError, match="noticias_link_hash"):
+        news.asegurar_esquema_noticias()
+    # El job no modifica la tabla
+    assert "link_hash" not in {columna["name"] for columna in inspect(noticias_anteriores).get_columns("noticias")}
+
+
+def test_reportar_no_modifica(noticias_anteriores, caplog):
+    caplog.set_level("INFO")
+    migracion.migrar(noticias_anteriores, ("preparar", "backfill", "reportar"))
+
+    assert len(filas(noticias_anteriores, "noticias", "id_noticia")) == len(LINKS)
+    assert "Se conserva la noticia 1" in caplog.text
+    assert "repetidas: 2 (https://WWW.EMOL.COM/noticias/carreras-tecnicas?utm_source=google), 4 (" in caplog.text
+
+
+def test_aparta_las_repetidas_y_crea_el_indice(noticias_anteriores):
+    engine = noticias_anteriores
+    migracion.migrar(engine, tamano_lote=2)
+
+    assert filas(engine, "noticias", "id_noticia, link_noticia") == [
+        (1, LINKS[0]), (3, LINKS[2]), (5, None), (6, None),
+    ]
+    assert filas(engine, "noticias_duplicadas", "id_noticia, id_noticia_conservada, titulo, link_noticia") == [
+        (2, 1, "Noticia 2", LINKS[1]), (4, 1, "Noticia 4", LINKS[3]),
+    ]
+    assert migracion.INDICE in {indice["name"] for indice in inspect(engine).get_indexes("noticias")}
+
+    # Repetir la migración no cambia nada y el job ya puede correr
+    migracion.migrar(engine)
+    assert len(filas(engine, "noticias_duplicadas", "id_noticia")) == 2
+    news.asegurar_esquema_noticias()
+    resultado = news.almacenar_noticias_en_db({"news_results": [
+        {"title": "Repetida", "link": "https://www.emol.com/noticias/carreras-tecnicas/?utm_campaign=x"},
+        {"title": "Nueva", "link": "https://www.biobiochile.cl/educacion"},
+    ]})
+    assert resultado == {"total_agregadas": 1, "total_existentes": 1}
+
+
+def test_indice_sin_apartar_duplicados_falla(noticias_anteriores):
+    with pytest.raises(RuntimeError, match="duplicados"):
+        migracion.migrar(noticias_anteriores, ("preparar", "backfill", "indice"))
+    assert migracion.INDICE not in {indice["name"] for indice in inspect(noticias_anteriores).get_indexes("noticias")}
@@ -0,0 +1,28 @@
+# test_navegador.py
+
+import pytest
+
+from jobs_common.navegador import Perfil
+
+
+def test_perfil_por_defecto_es_el_estandar(monkeypatch):
+    monkeypatch.delenv("NAVEGADOR_PERFIL", raising=False)
+    monkeypatch.delenv("NAVEGADOR_VIEWPORT", raising=False)
+    perfil = Perfil.desde_entorno()
+    assert (perfil.nombre, perfil.args, perfil.viewport) == ("estandar", [], {"width": 1920, "height": 1080})
+
+
+def test_perfil_memoria_se_activa(monkeypatch):
+    monkeypatch.setenv("NAVEGADOR_PERFIL", "memoria")
+    monkeypatch.setenv("NAVEGADOR_RENDERERS", "3")
+    monkeypatch.setenv("NAVEGADOR_VIEWPORT", "1280x800")
+    perfil = Perfil.desde_entorno()
+    assert "--disable-dev-shm-usage" in perfil.args
+    assert "--renderer-process-limit=3" in perfil.args
+    assert perfil.viewport == {"width": 1280, "height": 800}
+
+
+def test_perfil_desconocido(monkeypatch):
+    monkeypatch.setenv("NAVEGADOR_PERFIL", "turbo")
+    with pytest.raises(ValueError):
+        Perfil.desde_entorno()
@@ -0,0 +1,184 @@
+# test_orquestador.py
+
+import json
+import threading
+import time
+
+import pytest
+
+from jobs_common import metricas
+from orquestador import main as orquestador
+
+
+def nombres(grupos):
+    return [[nodo.nombre for nodo in rama] for rama in grupos]
+
+
+def test_ramas():
+    nodos = (
+        orquestador.Nodo("subareas", None, depende_de=("areas",)),
+        orquestador.Nodo("graduated", None),
+        orquestador.Nodo("areas", None),
+        orquestador.Nodo("detalle", None, depende_de=("subareas", "no_seleccionado")),
+    )
+    assert nombres(orquestador.ramas(nodos)) == [["areas", "subareas", "detalle"], ["graduated"]]
+
+
+def test_ramas_circulares():
+    nodos = (orquestador.Nodo("a", None, depende_de=("b",)), orquestador.Nodo("b", None, depende_de=("a",)))
+    with pytest.raises(ValueError):
+        orquestador.ramas(nodos)
+
+
+def job(nombre, registro, segundos=0.0, error=None):
+    """
+    Job simulado: anota su inicio y fin en `registro`, espera `segundos` y lanza `error` si se entrega.
+    """
+    def ejecutar(recursos):
+        metricas.iniciar(nombre)
+        registro.append((nombre, "inicio", time.perf_counter(), threading.current_thread().name))
+        time.sleep(segundos)
+        metricas.sumar("filas", 3)
+        registro.append((nombre, "fin", time.perf_counter(), threading.current_thread().name))
+        if error:
+            raise error
+    return ejecutar
+
+
+def ejecutar(nodos, tmp_path, secuencial=False, nombres=None):
+    from sqlalchemy import create_engine
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'orquestador.db'}")
+    ruta_json = str(tmp_path / "resumen.json")
+    try:
+        resultados = orquestador.ejecutar(nombres or [nodo.nombre for nodo in nodos], engine=engine, sesion=object(),
+                                          secuencial=secuencial, nodos=nodos, ruta_json=ruta_json)
+    finally:
+        engine.dispose()
+    with open(ruta_json, encoding="utf-8") as f:
+        return resultados, json.load(f)
+
+
+@pytest.mark.parametrize("secuencial", [False, True])
+def test_respeta_dependencias(tmp_path, secuencial):
+    registro = []
+    nodos = (
+        orquestador.Nodo("areas", job("areas", registro, 0.05)),
+        orquestador.Nodo("subareas", job("subareas", registro), depende_de=("areas",)),
+        orquestador.Nodo("graduated", job("graduated", registro, 0.02)),
+    )
+    resultados, resumen = ejecutar(nodos, tmp_path, secuencial)
+
+    assert {nombre: resultado["estado"] for nombre, resultado in resultados.items()} == dict.fromkeys(
+        ("areas", "subareas", "graduated"), "ok")
+    momentos = {(nombre, evento): momento for nombre, evento, momento, _ in registro}
+    assert momentos[("subareas", "inicio")] >= momentos[("areas", "fin")]
+    hilos = {nombre: hilo for nombre, _, _, hilo in registro}
+    assert hilos["areas"] == hilos["subareas"]
+    assert [job_["job"] for job_ in resumen["jobs"]] == ["orquestador", "areas", "subareas", "graduated"]
+    assert resumen["jobs"][1]["contadores"]["filas"] == 3
+    assert set(resumen["nodos"]) == {"areas", "subareas", "graduated"}
+
+
+def test_omite_los_dependientes_de_un_job_fallido(tmp_path):
+    registro = []
+    nodos = (
+        orquestador.Nodo("areas", job("areas", registro, error=RuntimeError("Laborum caído"))),
+        orquestador.Nodo("subareas", job("subareas", registro), depende_de=("areas",)),
+        orquestador.Nodo("graduated", job("graduated", registro)),
+    )
+    resultados, _ = ejecutar(nodos, tmp_path)
+
+    assert resultados["areas"]["estado"] == "error"
+    assert resultados["areas"]["error"] == "Laborum caído"
+    assert resultados["subareas"]["estado"] == "omitido"
+    assert resultados["graduated"]["estado"] == "ok"
+    assert "subareas" not in {nombre for nombre, *_ in registro}
+
+
+@pytest.fixture
+def areas_sin_logs(monkeypatch):
+    from laborum_areas_job import areas_scrapper_v2 as areas
+
+    monkeypatch.setattr(areas, "setup_logging", lambda: None)
+    monkeypatch.setattr(areas, "CAMINO_RAPIDO", False)
+    return areas
+
+
+def test_areas_sin_datos_omite_subareas(tmp_path, monkeypatch, areas_sin_logs):
+    """
+    El job de áreas real falla si no extrae datos, y subáreas no corre sobre los enlaces anteriores.
+    """
+    registro = []
+    monkeypatch.setattr(areas_sin_logs, "scrape_data", lambda url: [])
+    nodos = (
+        orquestador.Nodo("laborum_areas", orquestador._laborum_areas),
+        orquestador.Nodo("laborum_subareas", job("laborum_subareas", registro), depende_de=("laborum_areas",)),
+    )
+    resultados, _ = ejecutar(nodos, tmp_path)
+
+    assert resultados["laborum_areas"]["estado"] == "error"
+    assert "No se extrajeron datos" in resultados["laborum_areas"]["error"]
+    assert resultados["laborum_subareas"]["estado"] == "omitido"
+    assert registro == []
+
+
+def test_areas_con_escritura_fallida_omite_subareas(tmp_path, monkeypatch, areas_sin_logs):
+    """
+    Un error al escribir se deshace y se relanza: no queda nada escrito y subáreas se omite.
+    """
+    from sqlalchemy import create_engine, text
+
+    def falla(*args, **kwargs):
+        raise RuntimeError("disco lleno")
+
+    registro = []
+    datos = [{"nombre_area": "Ventas", "salario_promedio": 900000, "salarios_basados": 40,
+              "link_area": "https://www.laborum.cl/salarios/ventas"}]
+    monkeypatch.setattr(areas_sin_logs, "scrape_data", lambda url: datos)
+    monkeypatch.setattr(areas_sin_logs.resumen_mensual, "recalcular", falla)
+    nodos = (
+        orquestador.Nodo("laborum_areas", orquestador._laborum_areas),
+        orquestador.Nodo("laborum_subareas", job("laborum_subareas", registro), depende_de=("laborum_areas",)),
+    )
+    resultados, _ = ejecutar(nodos, tmp_path)
+
+    assert resultados["laborum_areas"]["estado"] == "error"
+    assert resultados["laborum_areas"]["error"] == "disco lleno"
+    assert resultados["laborum_subareas"]["estado"] == "omitido"
+    engine = create_engine(f"sqlite:///{tmp_path / 'orquestador.db'}")
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM laborum_areas_links_2")).scalar() == 0
+    engine.dispose()
+
+
+def test_solo_los_jobs_seleccionados(tmp_path):
+    registro = []
+    nodos = (
+        orquestador.Nodo("areas", job("areas", registro)),
+        orquestador.Nodo("subareas", job("subareas", registro), depende_de=("areas",)),
+    )
+    resultados, _ = ejecutar(nodos, tmp_path, nombres=["subareas"])
+    assert list(resultados) == ["subareas"]
+    assert resultados["subareas"]["estado"] == "ok"
+
+    with pytest.raises(ValueError):
+        ejecutar(nodos, tmp_path, nombres=["news"])
+
+
+@pytest.mark.parametrize("jobs", ["", ",", " , "])
+def test_main_sin_jobs(jobs, capsys):
+    with pytest.raises(SystemExit) as salida:
+        orquestador.main(["--jobs", jobs])
+    assert salida.value.code == 2
+    assert "ningún job" in capsys.readouterr().err
+
+
+def test_candado(tmp_path):
+    ruta = str(tmp_path / "vocational_jobs.lock")
+    with orquestador.candado(ruta):
+        with pytest.raises(orquestador.OtraEjecucionEnCurso):
+            with orquestador.candado(ruta):
+                pass
+    with orquestador.candado(ruta):
+        pass
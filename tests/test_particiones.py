@@ -0,0 +1,49 @@
+# test_particiones.py
+
+import zlib
+
+import pytest
+
+from jobs_common.particiones import Tarea
+
+
+@pytest.mark.parametrize("total", [1, 2, 3, 4, 7])
+def test_cada_clave_en_una_sola_tarea(total):
+    tareas = [Tarea(indice, total) for indice in range(total)]
+    claves = list(range(1, 200)) + [f"https://www.laborum.cl/salarios/area-{i}" for i in range(100)]
+    for clave in claves:
+        assert sum(tarea.asignada(clave) for tarea in tareas) == 1
+
+
+def test_reparto_de_ids_casi_parejo():
+    tareas = [Tarea(indice, 4) for indice in range(4)]
+    tamanos = [sum(tarea.asignada(clave) for clave in range(1, 101)) for tarea in tareas]
+    assert tamanos == [25, 25, 25, 25]
+
+
+def test_cubeta_estable_para_texto():
+    # CRC32, no hash(): no depende de PYTHONHASHSEED
+    assert Tarea(0, 5).cubeta("Ventas") == Tarea(3, 5).cubeta("Ventas") == zlib.crc32("Ventas".encode("utf-8")) % 5
+
+
+@pytest.mark.parametrize("indice, total", [(0, 0), (2, 2), (-1, 3)])
+def test_tarea_invalida(indice, total):
+    with pytest.raises(ValueError):
+        Tarea(indice, total)
+
+
+def test_desde_entorno(monkeypatch):
+    for variable in ("CLOUD_RUN_TASK_INDEX", "CLOUD_RUN_TASK_COUNT", "TASK_INDEX", "TASK_COUNT"):
+        monkeypatch.delenv(variable, raising=False)
+    tarea = Tarea.desde_entorno()
+    assert (tarea.indice, tarea.total, tarea.particionada) == (0, 1, False)
+
+    monkeypatch.setenv("TASK_INDEX", "1")
+    monkeypatch.setenv("TASK_COUNT", "3")
+    assert str(Tarea.desde_entorno()) == "2/3"
+
+    # Las variables de Cloud Run tienen prioridad
+    monkeypatch.setenv("CLOUD_RUN_TASK_INDEX", "3")
+    monkeypatch.setenv("CLOUD_RUN_TASK_COUNT", "4")
+    tarea = Tarea.desde_entorno()
+    assert (tarea.indice, tarea.total, tarea.particionada) == (3, 4, True)
@@ -0,0 +1,42 @@
+# test_presupuesto.py
+
+from jobs_common.presupuesto import Presupuesto
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def test_sin_limite():
+    reloj = Reloj()
+    tiempo = Presupuesto(0, margen=15, reloj=reloj)
+    reloj.ahora += 10 ** 6
+    tiempo.registrar(3600)
+    assert not tiempo.limitado
+    assert tiempo.restante() == float("inf")
+    assert tiempo.alcanza()
+
+
+def test_alcanza_segun_la_unidad_mas_lenta_y_el_margen():
+    reloj = Reloj()
+    tiempo = Presupuesto(100, margen=15, reloj=reloj)
+    assert tiempo.alcanza()
+
+    reloj.ahora += 30
+    tiempo.registrar(30)
+    reloj.ahora += 10
+    tiempo.registrar(10)
+    assert tiempo.mas_lenta == 30
+    assert tiempo.transcurrido() == 40
+    assert tiempo.restante() == 60
+    assert tiempo.alcanza()
+
+    # Quedan 45 s: justo la unidad más lenta (30) más el margen (15)
+    reloj.ahora += 15
+    assert tiempo.alcanza()
+    reloj.ahora += 0.5
+    assert not tiempo.alcanza()
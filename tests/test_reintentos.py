@@ -0,0 +1,102 @@
+# test_reintentos.py
+
+import random
+
+import pytest
+
+from jobs_common.reintentos import CircuitoAbierto, Interruptor, Politica, reintentar
+
+
+class Falla(Exception):
+    pass
+
+
+def funcion_que_falla(veces):
+    """
+    Función de carga que falla las primeras `veces` llamadas; guarda los timeouts recibidos.
+    """
+    def cargar(timeout_ms):
+        cargar.timeouts.append(timeout_ms)
+        if len(cargar.timeouts) <= veces:
+            raise Falla(f"Timeout {timeout_ms}ms exceeded.")
+        return "ok"
+    cargar.timeouts = []
+    return cargar
+
+
+def test_espera_con_jitter_acotada_por_el_tope():
+    politica = Politica(espera_base=1.0, factor=2.0, espera_maxima=5.0, aleatorio=random.Random(1))
+    for intento, tope in ((1, 1.0), (2, 2.0), (3, 4.0), (4, 5.0), (10, 5.0)):
+        esperas = [politica.espera(intento) for _ in range(200)]
+        assert all(0 <= espera <= tope for espera in esperas)
+        assert max(esperas) > tope / 2
+
+
+def test_peor_caso():
+    politica = Politica(timeouts_ms=(10000, 20000, 40000), espera_base=1.0, factor=2.0, espera_maxima=15.0)
+    assert politica.intentos == 3
+    assert politica.peor_caso() == 70 + 1 + 2
+    assert politica.peor_caso(cargas_por_intento=2) == 140 + 1 + 2
+
+
+def test_desde_entorno(monkeypatch):
+    monkeypatch.setenv("GOTO_TIMEOUTS_MS", "5000, 15000")
+    monkeypatch.setenv("GOTO_ESPERA_BASE", "0.5")
+    politica = Politica.desde_entorno()
+    assert politica.timeouts_ms == (5000, 15000)
+    assert politica.espera_base == 0.5
+
+
+def test_reintenta_con_timeouts_crecientes():
+    cargar = funcion_que_falla(2)
+    esperas = []
+    interruptor = Interruptor(umbral=3)
+    interruptor.registrar_fallo()
+
+    resultado = reintentar(cargar, Politica(aleatorio=random.Random(0)), "la página", interruptor, dormir=esperas.append)
+
+    assert resultado == "ok"
+    assert cargar.timeouts == [10000, 20000, 40000]
+    assert len(esperas) == 2
+    assert interruptor.fallos_consecutivos == 0
+
+
+def test_todos_los_intentos_fallan():
+    cargar = funcion_que_falla(10)
+    interruptor = Interruptor(umbral=3)
+
+    with pytest.raises(Falla):
+        reintentar(cargar, Politica(timeouts_ms=(100, 200)), "la página", interruptor, dormir=lambda _: None)
+
+    assert cargar.timeouts == [100, 200]
+    assert interruptor.fallos_consecutivos == 1
+
+
+def test_interruptor_se_abre_tras_el_umbral():
+    interruptor = Interruptor(umbral=2)
+    interruptor.registrar_fallo()
+    interruptor.verificar()
+    interruptor.registrar_fallo()
+    assert interruptor.abierto
+    with pytest.raises(CircuitoAbierto):
+        interruptor.verificar()
+
+    interruptor.registrar_exito()
+    assert not interruptor.abierto
+
+
+def test_interruptor_sin_umbral_no_se_abre():
+    interruptor = Interruptor(umbral=0)
+    for _ in range(50):
+        interruptor.registrar_fallo()
+    assert not interruptor.abierto
+
+
+def test_circuito_abierto_no_intenta():
+    cargar = funcion_que_falla(0)
+    interruptor = Interruptor(umbral=1)
+    interruptor.registrar_fallo()
+
+    with pytest.raises(CircuitoAbierto):
+        reintentar(cargar, Politica(), "la página", interruptor, dormir=lambda _: None)
+    assert cargar.timeouts == []
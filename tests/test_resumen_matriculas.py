@@ -0,0 +1,78 @@
+# test_resumen_matriculas.py
+
+import csv
+import random
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, text
+
+from enrolled_job.matriculados_automatizacion import matriculados_linux as job
+
+AREAS = ("Ingeniería Civil", "Enfermería", "Derecho", "Pedagogía en Educación Básica")
+REGIONES = ("Metropolitana", "Valparaíso", "Biobío")
+TIPOS_INSTITUCION = ("Universidades", "Institutos Profesionales", "Centros de Formación Técnica")
+ANNO = 2023
+
+
+def escribir_csv(ruta, filas):
+    """
+    CSV de matrículas con las columnas originales de mineduc; algunas filas sin región.
+    """
+    rnd = random.Random(3)
+    columnas = list(job.MATRICULAS_RENAME)
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f, delimiter=";")
+        escritor.writerow(columnas)
+        for i in range(filas):
+            valores = {"cat_periodo": ANNO, "id": i + 1, "gen_alu": rnd.choice(("1", "2")),
+                       "tipo_inst_1": rnd.choice(TIPOS_INSTITUCION), "area_carrera_generica": rnd.choice(AREAS),
+                       "region_sede": "" if i % 50 == 0 else rnd.choice(REGIONES)}
+            escritor.writerow([valores.get(columna, f"{columna[:6]}{rnd.randint(1, 9)}") for columna in columnas])
+    return ruta
+
+
+def test_resumen_igual_a_la_tabla_cruda(engine, tmp_path):
+    metadata = MetaData()
+    tipos = {"year": Integer, "preprocessed_at": DateTime, "processed_at": DateTime}
+    Table("registro_matriculas_1", metadata,
+          Column("id_registro", Integer, primary_key=True, autoincrement=True),
+          *[Column(columna, tipos.get(columna, String(255))) for columna in job.COLUMNAS_DESTINO])
+    metadata.create_all(engine)
+
+    # Titulados de dos carreras genéricas; Derecho tiene dos cargas y vale la última
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE carreras (id INTEGER PRIMARY KEY, nombre VARCHAR(255))"))
+        connection.execute(text("CREATE TABLE titulados_carrera (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                                "id_carrera INTEGER, cantidad_titulados INTEGER, anno INTEGER)"))
+        connection.execute(text("INSERT INTO carreras (id, nombre) VALUES (1, 'Derecho'), (2, 'Enfermería')"))
+        connection.execute(text("INSERT INTO titulados_carrera (id_carrera, cantidad_titulados, anno) "
+                                "VALUES (1, 1, 2023), (2, 200, 2023), (1, 100, 2023), (2, 7, 2022)"))
+
+    conteos = Counter()
+    columnas = job.get_table_columns(engine, "registro_matriculas_1")
+    filas = job.cargar_csv_en_bd(escribir_csv(tmp_path / "matriculas_2023.csv", 500), engine, "registro_matriculas_1",
+                                 columnas, ANNO, datetime.now(), chunksize=64, conteos=conteos)
+    job.actualizar_resumenes(engine, ANNO, conteos)
+    # Volver a cargar el año reemplaza sus filas de resumen
+    job.actualizar_resumenes(engine, ANNO, conteos)
+
+    with engine.connect() as connection:
+        for dimensiones in ("area_carrera_generica, region_sede", "gen_alu, tipo_instituto"):
+            cruda = connection.execute(text(
+                f"SELECT {dimensiones}, COUNT(*) FROM registro_matriculas_1 WHERE year = :anno GROUP BY {dimensiones}"
+            ), {"anno": ANNO}).all()
+            resumen = connection.execute(text(
+                f"SELECT {dimensiones}, SUM(cantidad) FROM resumen_matriculas WHERE anno = :anno GROUP BY {dimensiones}"
+            ), {"anno": ANNO}).all()
+            assert sorted(map(tuple, resumen), key=str) == sorted(map(tuple, cruda), key=str)
+        titulados = dict(connection.execute(text(
+            "SELECT area_carrera_generica, titulados FROM resumen_matriculas_titulados WHERE anno = :anno"
+        ), {"anno": ANNO}).all())
+        matriculados = connection.execute(text(
+            "SELECT SUM(matriculados) FROM resumen_matriculas_titulados WHERE anno = :anno"
+        ), {"anno": ANNO}).scalar()
+
+    assert filas == matriculados == 500
+    assert titulados == {"Derecho": 100, "Enfermería": 200, "Ingeniería Civil": None,
+                         "Pedagogía en Educación Básica": None}
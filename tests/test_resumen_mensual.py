@@ -0,0 +1,93 @@
+# test_resumen_mensual.py
+
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+
+from jobs_common import resumen_mensual
+from jobs_common.resumen_mensual import mes_anterior, mes_de, mes_siguiente
+
+
+def agregar(conexion, historial, filas):
+    """
+    Agrega (area_id, executed_at, salario) al historial; month es el día de la ejecución.
+    """
+    conexion.execute(insert(historial), [
+        {"area_id": area, "salario_promedio": salario, "salarios_basados": salario // 1000, "link_area": "x",
+         "executed_at": momento, "month": momento.date()}
+        for area, momento, salario in filas
+    ])
+
+
+def leer(conexion, resumen):
+    return {(fila.area_id, fila.month): dict(fila._mapping) for fila in conexion.execute(select(resumen))}
+
+
+def test_meses():
+    assert mes_de(datetime(2024, 3, 31, 23, 59)) == date(2024, 3, 1)
+    assert mes_anterior(date(2024, 1, 1)) == date(2023, 12, 1)
+    assert mes_siguiente(date(2024, 12, 1)) == date(2025, 1, 1)
+
+
+def test_recalcular_completo(engine, tablas):
+    historial, resumen = tablas["historial"], tablas["resumen"]
+    with engine.begin() as conexion:
+        agregar(conexion, historial, [
+            (1, datetime(2024, 2, 10), 900000),
+            (1, datetime(2024, 3, 2), 1000000),
+            (1, datetime(2024, 3, 20), 800000),
+            (1, datetime(2024, 3, 9), 1200000),
+            (2, datetime(2024, 3, 1), 500000),
+        ])
+        assert resumen_mensual.recalcular(conexion, historial, resumen, "area_id") == 3
+        filas = leer(conexion, resumen)
+
+    marzo = filas[(1, date(2024, 3, 1))]
+    assert marzo["salario_ultimo"] == 800000
+    assert marzo["salarios_basados_ultimo"] == 800
+    assert (marzo["salario_min"], marzo["salario_max"], marzo["muestras"]) == (800000, 1200000, 3)
+    assert marzo["executed_at"] == datetime(2024, 3, 20)
+    assert marzo["variacion_salario"] == 800000 - 900000
+    assert filas[(1, date(2024, 2, 1))]["variacion_salario"] is None
+    assert filas[(2, date(2024, 3, 1))]["variacion_salario"] is None
+
+
+def test_mes_pasado_corrige_la_variacion_del_siguiente(engine, tablas):
+    historial, resumen = tablas["historial"], tablas["resumen"]
+    with engine.begin() as conexion:
+        agregar(conexion, historial, [(1, datetime(2024, 2, 10), 900000), (1, datetime(2024, 3, 10), 1000000)])
+        resumen_mensual.recalcular(conexion, historial, resumen, "area_id")
+
+        agregar(conexion, historial, [(1, datetime(2024, 2, 25), 700000)])
+        assert resumen_mensual.recalcular(conexion, historial, resumen, "area_id", [(1, datetime(2024, 2, 25))]) == 1
+        filas = leer(conexion, resumen)
+
+    assert filas[(1, date(2024, 2, 1))]["salario_ultimo"] == 700000
+    assert filas[(1, date(2024, 3, 1))]["variacion_salario"] == 1000000 - 700000
+
+
+def test_incremental_igual_a_completo(engine, tablas):
+    historial, resumen = tablas["historial"], tablas["resumen"]
+    rnd = random.Random(7)
+    momento = datetime(2024, 1, 25, 6, 0)
+    with engine.begin() as conexion:
+        for _ in range(60):
+            filas = [(area, momento, rnd.randint(450, 3500) * 1000) for area in range(1, 6)]
+            agregar(conexion, historial, filas)
+            resumen_mensual.recalcular(conexion, historial, resumen, "area_id",
+                                       [(area, fecha) for area, fecha, _ in filas])
+            momento += timedelta(hours=rnd.choice((6, 18, 30)))
+        incremental = leer(conexion, resumen)
+
+        conexion.execute(delete(resumen))
+        resumen_mensual.recalcular(conexion, historial, resumen, "area_id")
+        completo = leer(conexion, resumen)
+
+    assert len({mes for _, mes in completo}) > 1
+    assert incremental == completo
+
+
+def test_sin_particiones(engine, tablas):
+    with engine.begin() as conexion:
+        assert resumen_mensual.recalcular(conexion, tablas["historial"], tablas["resumen"], "area_id", []) == 0
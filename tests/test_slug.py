@@ -0,0 +1,18 @@
+# test_slug.py
+
+import json
+import os
+
+import pytest
+
+from jobs_common.slug import slugificar
+
+# Nombres reales de áreas de Laborum (tildes, ñ, ü, comas y " / ") con el slug de su URL
+with open(os.path.join(os.path.dirname(__file__), "fixtures", "nombres_areas_laborum.json"), encoding="utf-8") as f:
+    CORPUS = json.load(f)
+
+
+@pytest.mark.parametrize("nombre, slug", [(entrada["nombre"], entrada["slug"]) for entrada in CORPUS],
+                         ids=[entrada["slug"] for entrada in CORPUS])
+def test_slugificar_corpus(nombre, slug):
+    assert slugificar(nombre) == slug